@@ -46,7 +46,7 @@ STEPS = [
     {
         "id": "perf-threads",
         "name": "Thread Scaling Test",
-        "description": "Executes scaling tests from 1 to 64 threads.",
+        "description": "Adaptive scaling test from 1 to 64 threads, refined around the saturation knee.",
         "command": "make perf-threads"
     }
 ]
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""On-disk cache of per-query analysis results.
+
+An entry holds everything the analyzer derived from the server for one
+statement: timing distribution, counter deltas, plan, schema context and
+score. It is keyed by:
+
+- the statement text (comments and whitespace normalized, literals kept,
+  since they change the plan and the timing);
+- the structure of the tables the statement names (SchemaCatalog
+  fingerprints: create time, columns and indexes; not UPDATE_TIME, which the
+  corpus's own DML changes on every run);
+- a server fingerprint: version plus the variables that drive the
+  optimizer and memory usage;
+- the target server (container or host:port), the backend that measures
+  (CLI timings include process spawn and login, driver timings do not) and
+  the analyzer settings that change the measurement (warmup, iterations,
+  execution lanes, streaming...).
+
+Any change to one of them is a miss, so stale results are never served.
+Entries are JSON files; reads refresh their mtime, and the least recently
+used ones are evicted when the entry count or total size exceeds its limit.
+"""
+import hashlib
+import json
+import os
+import re
+import time
+
+from db_backend import parse_rows
+from query_digest import strip_comments
+
+CACHE_VERSION = 2
+
+SERVER_VARIABLES = (
+    "version",
+    "version_comment",
+    "optimizer_switch",
+    "optimizer_search_depth",
+    "optimizer_use_condition_selectivity",
+    "innodb_buffer_pool_size",
+    "join_buffer_size",
+    "sort_buffer_size",
+    "tmp_table_size",
+    "max_heap_table_size",
+    "read_rnd_buffer_size",
+    "histogram_size",
+    "use_stat_tables",
+)
+
+SERVER_VARIABLES_SQL = "SHOW GLOBAL VARIABLES WHERE Variable_name IN ({});".format(
+    ", ".join(f"'{name}'" for name in SERVER_VARIABLES))
+
+# Item fields derived from the server; the rest (id, line, trend...) belongs to the run.
+CACHED_FIELDS = ("query", "time", "timing", "rating", "issues", "suggestions", "index_sql",
+                 "schema_info", "explain", "rows_examined", "cost", "counters")
+
+
+def normalize_statement(sql):
+    """Statement text without comments, extra whitespace or trailing semicolon."""
+    text = strip_comments(sql)
+    return re.sub(r"\s+", " ", text).strip().rstrip(";").strip()
+
+
+def server_fingerprint(backend):
+    """Hash of the server version and optimizer/memory variables; "" on failure."""
+    output, err = backend.query(SERVER_VARIABLES_SQL)
+    rows = parse_rows(output) if not err.strip() else []
+    if not rows:
+        return ""
+    values = sorted((row["Variable_name"], row["Value"]) for row in rows)
+    return hashlib.sha256(json.dumps(values).encode("utf-8")).hexdigest()
+
+
+def settings_fingerprint(args, backend):
+    """Target, backend and analyzer settings that change what is measured."""
+    target = args.container or f"{args.host}:{args.port}"
+    settings = [target, backend.name, args.db, args.warmup, args.iterations, args.cv_threshold,
+                args.no_counters, args.stream, args.exec_lanes]
+    return json.dumps(settings)
+
+
+class AnalysisCache:
+    """Directory of JSON entries with LRU eviction by count and size."""
+
+    def __init__(self, cache_dir, catalog, server_fp, settings, max_entries=5000, max_bytes=100 << 20):
+        self.cache_dir = cache_dir
+        self.catalog = catalog
+        self.context = f"{CACHE_VERSION}|{server_fp}|{settings}"
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, query):
+        statement = normalize_statement(query)
+        schema = self.catalog.fingerprint_for(statement)
+        return hashlib.sha256(f"{self.context}|{schema}|{statement}".encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, query):
+        """Cached fields plus ``cached_at`` (epoch seconds), or None on a miss."""
+        path = self._path(self.key(query))
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+            os.utime(path, None)  # LRU: reads count as use
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, item):
+        entry = {name: item[name] for name in CACHED_FIELDS}
+        entry["cached_at"] = time.time()
+        path = self._path(self.key(item["query"]))
+        tmp = f"{path}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    def evict(self):
+        """Drops least recently used entries beyond max_entries / max_bytes; returns the count."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort(reverse=True)  # most recently used first
+        kept_bytes = 0
+        removed = 0
+        for index, (_, size, path) in enumerate(entries):
+            kept_bytes += size
+            if index >= self.max_entries or kept_bytes > self.max_bytes:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+
+def format_age(seconds):
+    """Compact age: 42s, 5m, 3h, 2d."""
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size:
+            return f"{seconds / size:.0f}{unit}"
+    return f"{seconds:.0f}s"
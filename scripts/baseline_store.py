@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""Persistent store of analyzer results, for trends and regression checks.
+
+Every ``sql_analyzer.py`` run is recorded in a local SQLite database: one
+``runs`` row with the run metadata (server version, dataset, target host,
+timestamp) and one ``results`` row per query, keyed by the normalized query
+fingerprint, with the timing samples, plan hash and score. A later run can
+be compared against any stored run: latency regressions are flagged with a
+one-sided Mann-Whitney U test on the timing samples, and plan changes by
+comparing plan hashes.
+
+As a command line tool it lists the stored runs.
+"""
+import argparse
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+
+from query_digest import fingerprint, normalize_query
+from timing_stats import mann_whitney_greater
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    label TEXT,
+    started_at TEXT NOT NULL,
+    client_host TEXT,
+    target TEXT,
+    server_version TEXT,
+    db TEXT,
+    dataset TEXT,
+    query_file TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    fingerprint TEXT NOT NULL,
+    query_id INTEGER,
+    normalized TEXT,
+    query TEXT,
+    median REAL, min REAL, mean REAL, p95 REAL, p99 REAL, stddev REAL, cv REAL, n INTEGER,
+    samples TEXT,
+    plan_hash TEXT,
+    plan_summary TEXT,
+    rows_examined REAL,
+    cost REAL,
+    rating INTEGER,
+    PRIMARY KEY (run_id, fingerprint)
+);
+CREATE INDEX IF NOT EXISTS results_fingerprint ON results(fingerprint, run_id);
+"""
+
+
+def plan_signature(item):
+    """(hash, summary) of the plan shape: per-table access type and key, in join order.
+
+    Estimates (rows, cost) are left out so that statistics drift does not
+    count as a plan change.
+    """
+    explain = item.get('explain') or ""
+    lines = explain.strip().split("\n")
+    if lines and lines[0].startswith("id\tdepth\ttable"):
+        # ExplainPlan.render(): id, depth, table, type, key, ...
+        shape = [" ".join(line.split("\t")[:5]) for line in lines[1:]]
+    else:
+        shape = [line for line in lines if line.strip()]
+    summary = "; ".join(shape)
+    return hashlib.sha1(summary.encode("utf-8")).hexdigest()[:16], summary
+
+
+@dataclass
+class Comparison:
+    """Result of one query against its baseline run."""
+    fingerprint: str
+    base_median: float
+    new_median: float
+    p_value: float
+    regression: bool
+    improvement: bool
+    plan_changed: bool
+    base_plan: str = ""
+    new_plan: str = ""
+
+    @property
+    def ratio(self):
+        return self.new_median / self.base_median if self.base_median > 0 else 0.0
+
+
+class BaselineStore:
+    """SQLite-backed run history."""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA_SQL)
+
+    def close(self):
+        self.conn.close()
+
+    def record_run(self, summary_data, args, server_version):
+        """Stores one run and its per-query results; returns the new run_id."""
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO runs (label, started_at, client_host, target, server_version, db, dataset, query_file) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (args.run_label, time.strftime('%Y-%m-%d %H:%M:%S'), socket.gethostname(),
+                 args.container or f"{args.host}:{args.port}", server_version, args.db,
+                 args.dataset or args.db, None if args.query else args.query_file),
+            )
+            run_id = cur.lastrowid
+            for item in summary_data:
+                t = item['timing']
+                plan_hash, plan_summary = plan_signature(item)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO results VALUES (" + ", ".join("?" * 19) + ")",
+                    (run_id, fingerprint(item['query']), item['id'], normalize_query(item['query']), item['query'],
+                     t['median'], t['min'], t['mean'], t['p95'], t['p99'], t['stddev'], t['cv'], t['n'],
+                     json.dumps(t['samples']), plan_hash, plan_summary, item['rows_examined'], item['cost'], item['rating']),
+                )
+        return run_id
+
+    def runs(self, limit=20):
+        return self.conn.execute("SELECT * FROM runs ORDER BY run_id DESC LIMIT ?", (limit,)).fetchall()
+
+    def resolve_run(self, ref, db=None):
+        """Run id for ``latest`` (optionally for one db), a numeric id or a label; None if unknown."""
+        if ref == "latest":
+            row = self.conn.execute(
+                "SELECT run_id FROM runs WHERE (? IS NULL OR db = ?) ORDER BY run_id DESC LIMIT 1", (db, db)
+            ).fetchone()
+        elif str(ref).isdigit():
+            row = self.conn.execute("SELECT run_id FROM runs WHERE run_id = ?", (int(ref),)).fetchone()
+        else:
+            row = self.conn.execute(
+                "SELECT run_id FROM runs WHERE label = ? ORDER BY run_id DESC LIMIT 1", (ref,)
+            ).fetchone()
+        return row["run_id"] if row else None
+
+    def results(self, run_id):
+        """{fingerprint: row} for one run."""
+        rows = self.conn.execute("SELECT * FROM results WHERE run_id = ?", (run_id,)).fetchall()
+        return {row["fingerprint"]: row for row in rows}
+
+    def trend(self, fp, limit=10, db=None):
+        """Median latencies of one query over its last runs, oldest first."""
+        rows = self.conn.execute(
+            "SELECT r.median FROM results r JOIN runs USING (run_id) "
+            "WHERE r.fingerprint = ? AND (? IS NULL OR runs.db = ?) ORDER BY r.run_id DESC LIMIT ?",
+            (fp, db, db, limit),
+        ).fetchall()
+        return [row["median"] for row in reversed(rows)]
+
+    def compare(self, summary_data, run_id, alpha=0.05, threshold=0.1):
+        """Compares the current items against a stored run; returns {item id: Comparison}.
+
+        A regression needs both a median slowdown above ``threshold`` and a
+        significant one-sided Mann-Whitney U test at ``alpha``.
+        """
+        baseline = self.results(run_id)
+        comparisons = {}
+        for item in summary_data:
+            row = baseline.get(fingerprint(item['query']))
+            if row is None:
+                continue
+            base_samples = json.loads(row["samples"] or "[]")
+            new_samples = item['timing']['samples']
+            new_median = item['timing']['median']
+            slower = new_median > row["median"] * (1 + threshold)
+            faster = new_median < row["median"] * (1 - threshold)
+            p_slower = mann_whitney_greater(base_samples, new_samples)
+            p_faster = mann_whitney_greater(new_samples, base_samples)
+            plan_hash, plan_summary = plan_signature(item)
+            comparisons[item['id']] = Comparison(
+                fingerprint=row["fingerprint"],
+                base_median=row["median"],
+                new_median=new_median,
+                p_value=p_slower if new_median >= row["median"] else p_faster,
+                regression=slower and p_slower < alpha,
+                improvement=faster and p_faster < alpha,
+                plan_changed=plan_hash != row["plan_hash"],
+                base_plan=row["plan_summary"] or "",
+                new_plan=plan_summary,
+            )
+        return comparisons
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the analyzer runs stored in the baseline database.")
+    parser.add_argument("--baseline-db", default="reports/baselines.sqlite", help="SQLite baseline database")
+    parser.add_argument("--limit", type=int, default=20, help="Number of runs to show")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.baseline_db):
+        print(f"Error: baseline database not found at {args.baseline_db}")
+        sys.exit(1)
+    store = BaselineStore(args.baseline_db)
+    print("run_id\tstarted_at\tlabel\tdb\tdataset\ttarget\tserver_version\tqueries")
+    for run in store.runs(args.limit):
+        count = store.conn.execute("SELECT COUNT(*) FROM results WHERE run_id = ?", (run["run_id"],)).fetchone()[0]
+        print("\t".join(str(v) for v in (run["run_id"], run["started_at"], run["label"] or "", run["db"], run["dataset"],
+                                          run["target"], run["server_version"] or "", count)))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
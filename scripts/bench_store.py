@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""Persistent store of thread-scaling benchmark runs, for cross-run comparison.
+
+``reports/perf_threads`` only ever holds the last sweep. Ingesting it records
+the result files in a local SQLite database: one ``runs`` row with the run
+metadata (git revision, server version and the server variables that shape
+throughput, CPU count of the database host, dataset size and scale, knee of
+the adaptive sweep) and one ``levels`` row per thread count with throughput,
+latency percentiles and steady-state figures.
+
+Ingest is incremental: every file is identified by its SHA-1, so only files
+not seen before are parsed, and they form a new run (one per source, sysbench
+or load generator). Re-ingesting an unchanged directory does nothing.
+
+``perf_threads_reporter.py --compare`` overlays the scaling curves of stored
+runs. As a command line tool this module ingests a results directory
+(``--ingest``) or lists the stored runs.
+"""
+import argparse
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import sys
+import time
+
+from db_backend import open_backend, parse_rows, run_command
+
+BASE_EMPLOYEES = 300024
+SERVER_VARIABLES = (
+    "innodb_buffer_pool_size", "innodb_buffer_pool_instances", "innodb_log_file_size",
+    "innodb_flush_log_at_trx_commit", "innodb_flush_method", "innodb_io_capacity",
+    "innodb_read_io_threads", "innodb_write_io_threads", "sync_binlog", "log_bin",
+    "max_connections", "thread_handling", "thread_pool_size", "table_open_cache",
+    "tmp_table_size", "max_heap_table_size", "join_buffer_size", "sort_buffer_size",
+    "query_cache_type", "optimizer_switch",
+)
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    label TEXT,
+    started_at TEXT NOT NULL,
+    ingested_at TEXT NOT NULL,
+    source TEXT NOT NULL,
+    results_dir TEXT,
+    git_revision TEXT,
+    server_version TEXT,
+    server_variables TEXT,
+    host_cpus INTEGER,
+    client_host TEXT,
+    target TEXT,
+    db TEXT,
+    dataset TEXT,
+    dataset_rows INTEGER,
+    scale REAL,
+    knee INTEGER
+);
+CREATE TABLE IF NOT EXISTS levels (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    threads INTEGER NOT NULL,
+    qps REAL, tps REAL, steady_qps REAL, jitter REAL, warmup INTEGER, stalls INTEGER,
+    avg_lat REAL, p50 REAL, p95 REAL, p99 REAL, p999 REAL, max_lat REAL, errors REAL,
+    PRIMARY KEY (run_id, threads)
+);
+CREATE TABLE IF NOT EXISTS files (
+    digest TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    run_id INTEGER REFERENCES runs(run_id) ON DELETE CASCADE
+);
+"""
+
+
+def file_digest(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def git_revision():
+    """Short HEAD revision of this checkout, with -dirty for local changes; None outside git."""
+    out, _ = run_command(["git", "rev-parse", "--short", "HEAD"])
+    if not out.strip():
+        return None
+    status, _ = run_command(["git", "status", "--porcelain", "--untracked-files=no"])
+    return out.strip() + ("-dirty" if status.strip() else "")
+
+
+def host_cpus(args):
+    """CPU count of the database host: the container's when there is one, this host's otherwise."""
+    if args.container:
+        out, _ = run_command(["docker", "exec", args.container, "nproc"])
+        if out.strip().isdigit():
+            return int(out.strip())
+        return None
+    return os.cpu_count()
+
+
+def server_metadata(args, extra=()):
+    """(version, {variable: value}, employees rows) of the server; Nones when it is unreachable.
+
+    ``extra`` adds variable names to SERVER_VARIABLES (e.g. the settings a config sweep changes).
+    """
+    try:
+        backend = open_backend(args)
+    except RuntimeError as e:
+        print(f"⚠️ Server metadata unavailable: {e}")
+        return None, {}, None
+    try:
+        rows = parse_rows(backend.query("SELECT VERSION() AS version;")[0])
+        version = rows[0]["version"] if rows else None
+        names = ", ".join(f"'{name}'" for name in dict.fromkeys(SERVER_VARIABLES + tuple(extra)))
+        out, _ = backend.query(f"SHOW GLOBAL VARIABLES WHERE Variable_name IN ({names});")
+        variables = {row["Variable_name"]: row["Value"] for row in parse_rows(out)}
+        count = parse_rows(backend.query("SELECT COUNT(*) AS n FROM employees;")[0])
+        employees = int(count[0]["n"]) if count and count[0]["n"].isdigit() else None
+    finally:
+        backend.close()
+    if version is None:
+        print("⚠️ Server metadata unavailable: could not query the server")
+    return version, variables, employees
+
+
+class BenchStore:
+    """SQLite-backed history of scaling runs."""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA_SQL)
+
+    def close(self):
+        self.conn.close()
+
+    def new_files(self, results_dir):
+        """{source: [(path, digest)]} of the result files not ingested yet, in thread order."""
+        from perf_threads_reporter import LOADGEN_FILE, SYSBENCH_FILE  # the reporter imports this module
+        found = {"sysbench": [], "loadgen": []}
+        if not os.path.isdir(results_dir):
+            return found
+        for name in os.listdir(results_dir):
+            for source, pattern in (("sysbench", SYSBENCH_FILE), ("loadgen", LOADGEN_FILE)):
+                m = pattern.match(name)
+                if m:
+                    path = os.path.join(results_dir, name)
+                    digest = file_digest(path)
+                    if not self.conn.execute("SELECT 1 FROM files WHERE digest = ?", (digest,)).fetchone():
+                        found[source].append((int(m.group(1)), path, digest))
+        return {source: [(path, digest) for _, path, digest in sorted(files)] for source, files in found.items()}
+
+    def ingest(self, results_dir, metadata, label=None):
+        """Parses the new result files of a directory into one run per source; returns the new run ids."""
+        from perf_threads_reporter import PerfReporter
+        reporter = PerfReporter(results_dir, None, None)
+        sweep_path = os.path.join(results_dir, "sweep.json")
+        knee = None
+        if os.path.exists(sweep_path):
+            with open(sweep_path) as f:
+                reporter.sweep = json.load(f)
+            knee = (reporter.sweep.get("knee") or {}).get("threads")
+
+        run_ids = []
+        for source, files in self.new_files(results_dir).items():
+            if not files:
+                continue
+            if source == "sysbench":
+                levels = [reporter.parse_sysbench_file(path) for path, _ in files]
+            else:
+                levels = [reporter.parse_loadgen_file(path)[0] for path, _ in files]
+            started = min(os.path.getmtime(path) for path, _ in files)
+            with self.conn:
+                cur = self.conn.execute(
+                    "INSERT INTO runs (label, started_at, ingested_at, source, results_dir, git_revision, server_version, "
+                    "server_variables, host_cpus, client_host, target, db, dataset, dataset_rows, scale, knee) "
+                    "VALUES (" + ", ".join("?" * 16) + ")",
+                    (label, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started)), time.strftime('%Y-%m-%d %H:%M:%S'),
+                     source, results_dir, metadata.get("git_revision"), metadata.get("server_version"),
+                     json.dumps(metadata.get("server_variables") or {}, sort_keys=True), metadata.get("host_cpus"),
+                     socket.gethostname(), metadata.get("target"), metadata.get("db"), metadata.get("dataset"),
+                     metadata.get("dataset_rows"), metadata.get("scale"), knee if source == "sysbench" else None),
+                )
+                run_id = cur.lastrowid
+                for d in levels:
+                    steady = d.get('steady') or {}
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO levels VALUES (" + ", ".join("?" * 15) + ")",
+                        (run_id, d['threads'], d['queries_per_sec'], d['tps'], steady.get('qps'), steady.get('jitter'),
+                         steady.get('warmup'), len(steady.get('stalls', [])) if steady else None,
+                         d['avg_lat'], d.get('p50_lat') or None, d['p95_lat'] or None, d.get('p99_lat') or None,
+                         d.get('p999_lat') or None, d.get('max_lat') or None, d.get('errors')),
+                    )
+                self.conn.executemany("INSERT INTO files VALUES (?, ?, ?)",
+                                      [(digest, path, run_id) for path, digest in files])
+            run_ids.append(run_id)
+        return run_ids
+
+    def runs(self, limit=20):
+        return self.conn.execute("SELECT * FROM runs ORDER BY run_id DESC LIMIT ?", (limit,)).fetchall()
+
+    def resolve_run(self, ref, after=0):
+        """Run id for ``latest``, ``latest~N`` (N runs before), a numeric id or a label; None if unknown.
+
+        A label resolves to its latest run with an id above ``after``.
+        """
+        if ref == "latest" or ref.startswith("latest~"):
+            back = int(ref.split("~", 1)[1]) if "~" in ref and ref.split("~", 1)[1].isdigit() else 0
+            row = self.conn.execute("SELECT run_id FROM runs ORDER BY run_id DESC LIMIT 1 OFFSET ?", (back,)).fetchone()
+        elif ref.isdigit():
+            row = self.conn.execute("SELECT run_id FROM runs WHERE run_id = ?", (int(ref),)).fetchone()
+        else:
+            row = self.conn.execute("SELECT run_id FROM runs WHERE label = ? AND run_id > ? ORDER BY run_id DESC LIMIT 1",
+                                   (ref, after)).fetchone()
+        return row["run_id"] if row else None
+
+    def run(self, run_id):
+        return self.conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+
+    def levels(self, run_id):
+        """Level rows of a run, by thread count."""
+        return self.conn.execute("SELECT * FROM levels WHERE run_id = ? ORDER BY threads", (run_id,)).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest thread-scaling results into the benchmark database, or list the stored runs.")
+    parser.add_argument("--results-db", default="reports/bench_results.sqlite", help="SQLite benchmark database")
+    parser.add_argument("--ingest", metavar="DIR", help="Ingest the new result files of a directory (e.g. reports/perf_threads)")
+    parser.add_argument("--label", help="Label of the ingested run (usable with perf_threads_reporter.py --compare)")
+    parser.add_argument("--dataset", help="Dataset name recorded with the run (default: the database name)")
+    parser.add_argument("--variables", default="", help="Comma-separated server variables recorded in addition to the default set")
+    parser.add_argument("--no-server", action="store_true", help="Do not query the server for its version and variables")
+    parser.add_argument("--limit", type=int, default=20, help="Number of runs to list")
+    parser.add_argument("--container", help="Name of the MariaDB container (if using Docker)")
+    parser.add_argument("--host", default="127.0.0.1", help="Database host")
+    parser.add_argument("--port", type=int, default=3306, help="Database port")
+    parser.add_argument("--user", default="root", help="Database user")
+    parser.add_argument("--password", default="root", help="Database password")
+    parser.add_argument("--db", default="employees", help="Database name")
+    parser.add_argument("--socket", help="Local socket path (driver backend only, instead of host/port)")
+    parser.add_argument("--backend", choices=["auto", "driver", "cli"], default="auto", help="Connection backend: pooled driver sessions, mariadb CLI per statement, or auto-detect")
+    args = parser.parse_args()
+
+    if not args.ingest and not os.path.exists(args.results_db):
+        print(f"Error: benchmark database not found at {args.results_db}")
+        sys.exit(1)
+    store = BenchStore(args.results_db)
+
+    if args.ingest:
+        if not os.path.isdir(args.ingest):
+            print(f"Error: results directory not found at {args.ingest}")
+            sys.exit(1)
+        if not any(store.new_files(args.ingest).values()):
+            print(f"✅ Nothing new to ingest in {args.ingest}")
+            store.close()
+            return
+        version, variables, employees = (None, {}, None) if args.no_server else server_metadata(args, [v.strip() for v in args.variables.split(",") if v.strip()])
+        metadata = {
+            "git_revision": git_revision(),
+            "server_version": version,
+            "server_variables": variables,
+            "host_cpus": host_cpus(args),
+            "target": args.container or f"{args.host}:{args.port}",
+            "db": args.db,
+            "dataset": args.dataset or args.db,
+            "dataset_rows": employees,
+            "scale": round(employees / BASE_EMPLOYEES, 2) if employees else None,
+        }
+        for run_id in store.ingest(args.ingest, metadata, args.label):
+            run = store.run(run_id)
+            print(f"🗄️ Run {run_id} ({run['source']}, {len(store.levels(run_id))} levels) recorded in {args.results_db}")
+        store.close()
+        return
+
+    print("run_id\tstarted_at\tlabel\tsource\tlevels\tgit\tserver_version\tcpus\tscale\tknee")
+    for run in store.runs(args.limit):
+        print("\t".join("" if v is None else str(v) for v in (
+            run["run_id"], run["started_at"], run["label"], run["source"], len(store.levels(run["run_id"])),
+            run["git_revision"], run["server_version"], run["host_cpus"], run["scale"], run["knee"])))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
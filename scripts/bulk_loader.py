@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""Parallel bulk loader for the employees dataset (original or generated).
+
+Replaces the serial ``mariadb < employees.sql`` path:
+
+1. The database is dropped and recreated, and the tables are created from
+   the schema script (``employees/employees.sql`` by default). Secondary
+   keys that no foreign key depends on are left out of the CREATE TABLE and
+   added once the data is in.
+2. Tables are loaded level by level in foreign key order (parents first).
+   Every input file of every table of a level is loaded concurrently on
+   ``--jobs`` connections, with ``foreign_key_checks`` and ``unique_checks``
+   disabled for the loading sessions and enabled again afterwards.
+3. Input is either a chunked dataset (``manifest.json`` and TSV/CSV chunks
+   from ``employees_generator.py`` or ``dump_converter.py``), loaded with
+   ``LOAD DATA LOCAL INFILE``, or the ``load_*.dump`` INSERT scripts the
+   schema script ``source``s.
+4. Deferred keys are added (one ALTER per table, tables in parallel) and
+   the views are created.
+
+Rows/s and MB/s are reported per table, plus the key build time, instead of
+the single timediff of ``show_elapsed.sql``.
+"""
+import argparse
+import json
+import os
+import posixpath
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from db_backend import get_db_command, open_backend, parse_rows, run_command
+from sql_splitter import iter_statements
+
+CREATE_TABLE = re.compile(r"^CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?\s*\((.*)\)([^)]*)$", re.IGNORECASE | re.DOTALL)
+CREATE_VIEW = re.compile(r"^CREATE\s+(?:OR\s+REPLACE\s+)?(?:ALGORITHM\s*=\s*\w+\s+)?(?:DEFINER\s*=\s*\S+\s+)?(?:SQL\s+SECURITY\s+\w+\s+)?VIEW\b", re.IGNORECASE)
+NOT_A_COLUMN = re.compile(r"^(?:PRIMARY|UNIQUE|KEY|INDEX|FULLTEXT|SPATIAL|CONSTRAINT|FOREIGN|CHECK|PERIOD)\b", re.IGNORECASE)
+INTEGER_TYPE = re.compile(r"^(?:TINY|SMALL|MEDIUM|BIG)?INT(?:EGER)?\b", re.IGNORECASE)
+SECONDARY_KEY = re.compile(r"^(?:UNIQUE\s+|FULLTEXT\s+|SPATIAL\s+)?(?:KEY|INDEX)\b", re.IGNORECASE)
+FOREIGN_KEY = re.compile(r"^(?:CONSTRAINT\s+`?\w+`?\s+)?FOREIGN\s+KEY\s*(?:`?\w+`?\s*)?\(([^)]*)\)\s*REFERENCES\s+`?(\w+)`?", re.IGNORECASE)
+SOURCE = re.compile(r"^source\s+(\S+?)\s*;?$", re.IGNORECASE)
+LEADING_COMMENTS = re.compile(r"^(?:/\*.*?\*/\s*)+", re.DOTALL)
+EXECUTABLE_COMMENT = re.compile(r"/\*!\d*\s?(.*?)\*/", re.DOTALL)
+INSERT_INTO = re.compile(r"INSERT\s+INTO\s+`?(\w+)`?", re.IGNORECASE)
+
+LOAD_SESSION = "SET SESSION foreign_key_checks = 0, unique_checks = 0"
+RESTORE_SESSION = "SET SESSION foreign_key_checks = 1, unique_checks = 1"
+REMOTE_DIR = "/tmp/bulk_load"
+
+
+@dataclass
+class TableDef:
+    """A CREATE TABLE split into what is created up front and what is deferred."""
+    name: str
+    create_sql: str
+    deferred: List[str] = field(default_factory=list)
+    parents: Set[str] = field(default_factory=set)
+    columns: List[str] = field(default_factory=list)
+    primary_key: List[str] = field(default_factory=list)
+    integer_key: bool = False  # first primary key column is an integer type
+
+
+@dataclass
+class Schema:
+    tables: Dict[str, TableDef]
+    views: List[str]
+    sources: List[str]  # files ``source``d by the script, in script order
+
+
+@dataclass
+class Source:
+    """One input file of one table."""
+    table: str
+    path: str
+    kind: str  # "tsv" or "csv" (LOAD DATA), or "sql" (INSERT script)
+    bytes: int
+    columns: Tuple[str, ...] = ()
+    charset: str = "utf8mb4"
+
+
+@dataclass
+class TableStats:
+    name: str
+    files: int = 0
+    bytes: int = 0
+    rows: Optional[int] = None
+    start: float = 0.0
+    end: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def seconds(self):
+        return max(0.0, self.end - self.start)
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.rows and self.seconds > 0 else 0.0
+
+    @property
+    def mb_per_sec(self):
+        return self.bytes / 1e6 / self.seconds if self.seconds > 0 else 0.0
+
+
+def split_definitions(body):
+    """Splits a CREATE TABLE body on its top-level commas.
+
+    Quoted text and /* ... */ comments are opaque, so a versioned comment
+    such as ``/*!50705 location GEOMETRY NOT NULL,*/`` stays attached to the
+    next definition.
+    """
+    parts, depth, start, quote = [], 0, 0, None
+    i = 0
+    while i < len(body):
+        ch = body[i]
+        if quote:
+            if ch == quote:
+                quote = None
+        elif body.startswith("/*", i):
+            end = body.find("*/", i + 2)
+            i = len(body) if end < 0 else end + 2
+            continue
+        elif ch in "'\"`":
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append(body[start:i].strip())
+            start = i + 1
+        i += 1
+    if body[start:].strip():
+        parts.append(body[start:].strip())
+    return parts
+
+
+def without_comments(definition):
+    return LEADING_COMMENTS.sub("", definition)
+
+
+def key_columns(definition):
+    """Column names of a key or foreign key definition (backticks and prefix lengths removed)."""
+    start = definition.find("(")
+    if start < 0:
+        return []
+    depth = 0
+    for end in range(start, len(definition)):
+        depth += {"(": 1, ")": -1}.get(definition[end], 0)
+        if depth == 0:
+            break
+    columns = split_definitions(definition[start + 1:end])
+    return [re.sub(r"\(.*?\)", "", c).strip().strip("`").split()[0] for c in columns if c.strip()]
+
+
+def parse_table(name, body, tail):
+    definitions = split_definitions(body)
+    table = TableDef(name, "")
+    fk_columns = set()
+    for definition in definitions:
+        fk = FOREIGN_KEY.match(without_comments(definition))
+        if fk:
+            table.parents.add(fk.group(2))
+            fk_columns.add(key_columns(f"({fk.group(1)})")[0])
+    # Columns as the server sees them: executable comments such as
+    # /*!50705 location GEOMETRY NOT NULL,*/ are part of the table.
+    types = {}
+    for definition in split_definitions(EXECUTABLE_COMMENT.sub(r"\1", body)):
+        bare = without_comments(definition)
+        if not bare:
+            continue
+        if NOT_A_COLUMN.match(bare):
+            if re.match(r"^PRIMARY\s+KEY\b", bare, re.IGNORECASE):
+                table.primary_key = key_columns(bare)
+            continue
+        parts = bare.split(None, 2)
+        column = parts[0].strip("`")
+        table.columns.append(column)
+        types[column] = parts[1] if len(parts) > 1 else ""
+        if re.search(r"\bPRIMARY\s+KEY\b", bare, re.IGNORECASE):
+            table.primary_key = [column]
+    kept = []
+    for definition in definitions:
+        bare = without_comments(definition)
+        columns = key_columns(bare) if SECONDARY_KEY.match(bare) else []
+        # Keys backing a foreign key must exist when the constraint is created.
+        if columns and columns[0] not in fk_columns and bare == definition:
+            table.deferred.append(f"ADD {definition}")
+        else:
+            kept.append(definition)
+    table.parents.discard(name)
+    table.integer_key = bool(table.primary_key) and bool(INTEGER_TYPE.match(types.get(table.primary_key[0], "")))
+    table.create_sql = f"CREATE TABLE `{name}` (\n    " + ",\n    ".join(kept) + f"\n){tail.rstrip()}"
+    return table
+
+
+def parse_schema(path):
+    """Tables, views and sourced files of a schema script such as employees.sql."""
+    tables, views, sources = {}, [], []
+    for stmt in iter_statements(path, strip_comments=True):
+        text = stmt.text.strip().rstrip(";").strip()
+        source = SOURCE.match(text)
+        create = CREATE_TABLE.match(text)
+        if source:
+            sources.append(source.group(1))
+        elif create:
+            tables[create.group(1)] = parse_table(*create.groups())
+        elif CREATE_VIEW.match(text):
+            views.append(text)
+    return Schema(tables, views, sources)
+
+
+def load_levels(tables):
+    """Table names grouped by foreign key depth; every table comes after its parents."""
+    done, levels = set(), []
+    remaining = list(tables)
+    while remaining:
+        level = [t for t in remaining if tables[t].parents & set(tables) <= done]
+        if not level:  # cycle: load the rest together
+            level = remaining
+        levels.append(level)
+        done.update(level)
+        remaining = [t for t in remaining if t not in done]
+    return levels
+
+
+def find_sources(data_dir, schema, schema_path):
+    """Input files per table, and the row counts when a manifest provides them."""
+    sources: Dict[str, List[Source]] = {}
+    manifest_path = os.path.join(data_dir, "manifest.json") if data_dir else ""
+    if manifest_path and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        rows = {}
+        kind = manifest.get("format", "tsv")
+        for table, info in manifest["tables"].items():
+            rows[table] = info["rows"]
+            for name in info["files"]:
+                path = os.path.join(data_dir, name)
+                sources.setdefault(table, []).append(Source(table, path, kind, os.path.getsize(path), tuple(info["columns"]),
+                                                            info.get("charset", "utf8mb4")))
+        return sources, rows
+
+    base = data_dir or os.path.dirname(os.path.abspath(schema_path))
+    for name in schema.sources:
+        path = os.path.join(base, name)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} (sourced by {schema_path})")
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            insert = INSERT_INTO.search(f.read(4096))
+        if insert and insert.group(1) in schema.tables:
+            sources.setdefault(insert.group(1), []).append(Source(insert.group(1), path, "sql", os.path.getsize(path)))
+    return sources, {}
+
+
+def load_data_sql(source, path):
+    quoted = path.replace("\\", "\\\\").replace("'", "\\'")
+    columns = ", ".join(f"`{c}`" for c in source.columns)
+    fields = "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"'" if source.kind == "csv" else "FIELDS TERMINATED BY '\\t'"
+    return (f"LOAD DATA LOCAL INFILE '{quoted}' INTO TABLE `{source.table}` CHARACTER SET {source.charset} "
+            f"{fields} LINES TERMINATED BY '\\n' ({columns})")
+
+
+class BulkLoader:
+    """Runs the load steps on a backend opened with local_infile enabled."""
+
+    def __init__(self, args, backend):
+        self.args = args
+        self.backend = backend
+        self.remote_dir = None  # where TSV files are visible to a containerized CLI
+
+    def stage_files(self, data_dir):
+        """Copies the TSV chunks into the container when the CLI runs there."""
+        if self.backend.name != "cli" or not self.args.container:
+            return None
+        run_command(["docker", "exec", self.args.container, "mkdir", "-p", REMOTE_DIR])
+        _, err = run_command(["docker", "cp", f"{data_dir}/.", f"{self.args.container}:{REMOTE_DIR}"])
+        self.remote_dir = REMOTE_DIR
+        return err.strip() or None
+
+    def load(self, source):
+        """Loads one file; returns (start, end, error or None)."""
+        start = time.perf_counter()
+        if source.kind == "sql":
+            err = self._load_sql(source)
+        else:
+            err = self._load_data(source)
+        return start, time.perf_counter(), (err.strip() or None)
+
+    def _load_data(self, source):
+        if self.backend.name == "cli":
+            path = posixpath.join(self.remote_dir, os.path.basename(source.path)) if self.remote_dir else os.path.abspath(source.path)
+            _, err = self.backend.query(f"{LOAD_SESSION};\n{load_data_sql(source, path)}")
+            return err
+        with self.backend.session() as sess:
+            sess.query(LOAD_SESSION)
+            try:
+                _, err = sess.query(load_data_sql(source, os.path.abspath(source.path)))
+            finally:
+                sess.query(RESTORE_SESSION)
+        return err
+
+    def _load_sql(self, source):
+        if self.backend.name == "cli":
+            # One client process reads the whole script on stdin.
+            cmd = get_db_command(self.args, "")[:-2]
+            cmd.insert(cmd.index("mariadb") + 1, f"--init-command={LOAD_SESSION}")
+            if self.args.container:
+                cmd.insert(cmd.index("exec") + 1, "-i")
+            try:
+                with open(source.path, "rb") as f:
+                    result = subprocess.run(cmd, stdin=f, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=False)
+            except Exception as e:
+                return str(e)
+            return result.stderr.decode("utf-8", errors="replace")
+        with self.backend.session() as sess:
+            sess.query(LOAD_SESSION)
+            try:
+                for stmt in iter_statements(source.path):
+                    _, err = sess.query(stmt.text)
+                    if err.strip():
+                        return f"{source.path}:{stmt.line}: {err}"
+            finally:
+                sess.query(RESTORE_SESSION)
+        return ""
+
+    def count_rows(self, table):
+        output, err = self.backend.query(f"SELECT COUNT(*) AS n FROM `{table}`")
+        rows = parse_rows(output) if not err.strip() else []
+        return int(rows[0]["n"]) if rows else None
+
+
+def recreate_database(args):
+    """Drops and recreates --db through a connection to information_schema."""
+    admin = argparse.Namespace(**vars(args))
+    admin.db = "information_schema"
+    admin.pool_size = 1
+    backend = open_backend(admin)
+    try:
+        for sql in (f"DROP DATABASE IF EXISTS `{args.db}`", f"CREATE DATABASE `{args.db}`"):
+            _, err = backend.query(sql)
+            if err.strip():
+                return err.strip()
+    finally:
+        backend.close()
+    return None
+
+
+def run_load(args, schema, sources, known_rows, data_dir):
+    """Creates, loads and indexes every table; returns (table stats, key stats, wall seconds, errors)."""
+    errors = []
+    backend = open_backend(args)
+    loader = BulkLoader(args, backend)
+    wall_start = time.perf_counter()
+    try:
+        for table in schema.tables.values():
+            _, err = backend.query(table.create_sql)
+            if err.strip():
+                return {}, {}, 0.0, [f"CREATE TABLE {table.name}: {err.strip()}"]
+        if any(s.kind != "sql" for files in sources.values() for s in files):
+            err = loader.stage_files(data_dir)
+            if err:
+                return {}, {}, 0.0, [f"Staging files into {args.container}: {err}"]
+
+        stats = {name: TableStats(name) for name in schema.tables if name in sources}
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            for level in load_levels(schema.tables):
+                jobs = [(source, pool.submit(loader.load, source))
+                        for name in level for source in sources.get(name, [])]
+                print(f"📦 Loading {', '.join(t for t in level if t in sources) or '-'} ({len(jobs)} file(s))")
+                for source, future in jobs:
+                    start, end, err = future.result()
+                    table = stats[source.table]
+                    table.start = start if not table.files else min(table.start, start)
+                    table.end = max(table.end, end)
+                    table.files += 1
+                    table.bytes += source.bytes
+                    if err:
+                        table.errors.append(err)
+                for name in level:
+                    if name in stats:
+                        if name in known_rows and not stats[name].errors:
+                            stats[name].rows = known_rows[name]
+                        else:
+                            stats[name].rows = loader.count_rows(name)
+                        errors.extend(f"{name}: {e}" for e in stats[name].errors)
+                if errors:
+                    return stats, {}, time.perf_counter() - wall_start, errors
+
+            # Deferred secondary keys, one ALTER per table, tables in parallel.
+            def add_keys(table):
+                start = time.perf_counter()
+                _, err = backend.query(f"ALTER TABLE `{table.name}` " + ", ".join(table.deferred))
+                return table.name, time.perf_counter() - start, err.strip()
+
+            key_stats = {}
+            for name, seconds, err in pool.map(add_keys, [t for t in schema.tables.values() if t.deferred]):
+                key_stats[name] = seconds
+                if err:
+                    errors.append(f"{name} keys: {err}")
+        for view in schema.views:
+            _, err = backend.query(view)
+            if err.strip():
+                errors.append(f"view: {err.strip()}")
+    finally:
+        backend.close()
+    return stats, key_stats, time.perf_counter() - wall_start, errors
+
+
+def generate_markdown(stats, key_stats, schema, wall, args, data_dir, timestamp):
+    total_rows = sum(s.rows or 0 for s in stats.values())
+    total_bytes = sum(s.bytes for s in stats.values())
+    lines = [f"# Bulk Load Report - {args.db}\n", f"Generated: {timestamp}\n",
+             f"Source: `{data_dir}` · {args.jobs} connection(s) · backend {args.backend}\n",
+             "| Table | Files | Rows | MB | Seconds | Rows/s | MB/s | Deferred Keys (s) |",
+             "|---|---|---|---|---|---|---|---|"]
+    for level in load_levels(schema.tables):
+        for name in level:
+            if name not in stats:
+                continue
+            s = stats[name]
+            rows = "n/a" if s.rows is None else f"{s.rows:,}"
+            keys = f"{key_stats[name]:.2f}" if name in key_stats else "-"
+            lines.append(f"| {name} | {s.files} | {rows} | {s.bytes / 1e6:.1f} | {s.seconds:.2f} | {s.rows_per_sec:,.0f} | {s.mb_per_sec:.1f} | {keys} |")
+    lines.append(f"\n**Total**: {total_rows:,} rows, {total_bytes / 1e6:.1f} MB in {wall:.2f}s "
+                 f"({total_rows / wall if wall > 0 else 0:,.0f} rows/s, {total_bytes / 1e6 / wall if wall > 0 else 0:.1f} MB/s)")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load the employees dataset in parallel (original dumps or generated TSV chunks).")
+    parser.add_argument("--schema", default="employees/employees.sql", help="Schema script (CREATE TABLE/VIEW statements and sourced dumps)")
+    parser.add_argument("--data", help="Data directory: a generated dataset (manifest.json) or the directory of the sourced dumps (default: the schema's directory)")
+    parser.add_argument("--jobs", type=int, default=4, help="Concurrent loading connections")
+    parser.add_argument("--report-file", default="reports/load_report.md", help="Markdown load report")
+    parser.add_argument("--container", help="Name of the MariaDB container (if using Docker)")
+    parser.add_argument("--host", default="127.0.0.1", help="Database host")
+    parser.add_argument("--port", type=int, default=3306, help="Database port")
+    parser.add_argument("--user", default="root", help="Database user")
+    parser.add_argument("--password", default="root", help="Database password")
+    parser.add_argument("--db", default="employees", help="Database name (dropped and recreated)")
+    parser.add_argument("--socket", help="Local socket path (driver backend only, instead of host/port)")
+    parser.add_argument("--backend", choices=["auto", "driver", "cli"], default="auto", help="Connection backend: pooled driver sessions, mariadb CLI per statement, or auto-detect")
+    args = parser.parse_args()
+    args.local_infile = True
+    args.pool_size = max(1, args.jobs)
+
+    if not os.path.exists(args.schema):
+        print(f"Error: schema script not found at {args.schema}")
+        sys.exit(1)
+    schema = parse_schema(args.schema)
+    data_dir = args.data or os.path.dirname(os.path.abspath(args.schema))
+    try:
+        sources, known_rows = find_sources(args.data, schema, args.schema)
+    except FileNotFoundError as e:
+        print(f"Error: data file not found: {e}")
+        sys.exit(1)
+    if not sources:
+        print(f"Error: no data files found for {', '.join(schema.tables)}")
+        sys.exit(1)
+
+    print(f"🚚 Loading {args.db} from {data_dir} with {args.jobs} connection(s)")
+    try:
+        err = recreate_database(args)
+        if err:
+            print(f"Error: could not recreate {args.db}: {err}")
+            sys.exit(1)
+        stats, key_stats, wall, errors = run_load(args, schema, sources, known_rows, data_dir)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    report = generate_markdown(stats, key_stats, schema, wall, args, data_dir, time.strftime('%Y-%m-%d %H:%M:%S'))
+    print(report)
+    if os.path.dirname(args.report_file):
+        os.makedirs(os.path.dirname(args.report_file), exist_ok=True)
+    with open(args.report_file, "w") as f:
+        f.write(report)
+
+    if errors:
+        for err in errors:
+            print(f"❌ {err}")
+        sys.exit(1)
+    print(f"✅ Load complete. Report: {args.report_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""Server configuration sweep: the benchmark once per combination of settings.
+
+The grid file (JSON, see ``config_grid.json``) lists values per server
+variable. Every combination of the ``grid`` (cartesian product, minus the
+``exclude`` matches, plus the explicit ``configs``) is:
+
+1. applied: the variables the server accepts in ``SET GLOBAL`` are set live,
+   the others (``thread_handling``, ``innodb_buffer_pool_instances``...) are
+   written to a conf.d file of the container, which is then restarted.
+   Variables are probed once (``SET GLOBAL v = @@GLOBAL.v``) and the
+   combinations are ordered so that restart-only settings change as rarely as
+   possible;
+2. checked: ``SHOW GLOBAL VARIABLES`` must read back the requested values
+   (sizes compared in bytes); the server may round some, which is reported;
+3. warmed up after a restart (and before the first run): a scan of every
+   base table loads the clustered indexes into the buffer pool;
+4. benchmarked with ``test_runner.sh perf-threads`` (or ``bench``), which
+   stores the results in the benchmark database under the label
+   ``<name>-<n>`` together with the swept variables (see bench_store.py).
+
+The initial values are restored at the end, or on Ctrl+C. Configurations are
+ranked by peak throughput and by p95 latency at ``--target-threads``, and
+``comparison_report.{md,html}`` overlays their scaling curves.
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+import time
+
+from bench_store import BenchStore
+from db_backend import open_backend, parse_rows, run_command
+from perf_threads_reporter import PerfReporter
+
+CNF_PATH = "/etc/mysql/conf.d/zz-config-sweep.cnf"
+VARIABLE_NAME = re.compile(r"^[a-z_][a-z0-9_]*$", re.I)
+SIZE = re.compile(r"^(\d+)([KMGT])$", re.I)
+NUMBER = re.compile(r"^-?\d+(\.\d+)?$")
+READ_ONLY = re.compile(r"read[ -]only", re.I)
+WORKLOADS = ("perf-threads", "bench")
+
+
+def _text(value):
+    if isinstance(value, bool):
+        return "ON" if value else "OFF"
+    return str(value)
+
+
+def to_sql(value):
+    """SET GLOBAL literal: sizes (1G) in bytes, numbers as they are, anything else quoted."""
+    text = _text(value)
+    m = SIZE.match(text)
+    if m:
+        return str(int(m.group(1)) * 1024 ** ("KMGT".index(m.group(2).upper()) + 1))
+    if NUMBER.match(text):
+        return text
+    return "'" + text.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def normalize(value):
+    """Comparable form of a setting: sizes in bytes, ON/TRUE as 1, OFF/FALSE as 0, lower case."""
+    if value is None:
+        return None
+    text = _text(value).strip()
+    if SIZE.match(text):
+        return to_sql(text)
+    return {"on": "1", "true": "1", "off": "0", "false": "0"}.get(text.lower(), text.lower())
+
+
+def load_grid(path):
+    """(spec, combinations) of a grid file; exits on an invalid file."""
+    try:
+        with open(path) as f:
+            spec = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error: could not read grid file {path}: {e}")
+        sys.exit(1)
+    grid = spec.get("grid", {})
+    if any(not isinstance(values, list) or not values for values in grid.values()):
+        print("Error: every grid entry must be a non-empty list of values")
+        sys.exit(1)
+    names = list(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))] if names else []
+    excluded = lambda c: any(all(normalize(c.get(k)) == normalize(v) for k, v in ex.items())
+                             for ex in spec.get("exclude", []))
+    combos = [c for c in combos if not excluded(c)] + [dict(c) for c in spec.get("configs", [])]
+    bad = sorted({k for c in combos for k in c if not VARIABLE_NAME.match(k)})
+    if bad:
+        print(f"Error: invalid variable name(s): {', '.join(bad)}")
+        sys.exit(1)
+    if not combos:
+        print("Error: the grid file defines no configuration")
+        sys.exit(1)
+    return spec, combos
+
+
+def value_at(points, target):
+    """Value at ``target`` threads, interpolated on log2(threads) between the nearest measured levels."""
+    points = sorted((t, v) for t, v in points if v)
+    if not points:
+        return None
+    for (t0, v0), (t1, v1) in zip(points, points[1:]):
+        if t0 <= target <= t1:
+            f = (math.log2(target) - math.log2(t0)) / (math.log2(t1) - math.log2(t0))
+            return v0 + f * (v1 - v0)
+    return points[0][1] if target < points[0][0] else points[-1][1]
+
+
+class Server:
+    """Settings of the server in a container: SET GLOBAL, or a conf.d file and a restart."""
+
+    def __init__(self, args):
+        self.args = args
+        self.backend = None
+        self.cnf = {}
+        self.running = {}
+        self.failed = set()
+
+    def query(self, sql):
+        if self.backend is None:
+            self.backend = open_backend(self.args)
+        return self.backend.query(sql)
+
+    def disconnect(self):
+        if self.backend is not None:
+            self.backend.close()
+            self.backend = None
+
+    def variables(self, names):
+        quoted = ", ".join(f"'{name}'" for name in names)
+        out, _ = self.query(f"SHOW GLOBAL VARIABLES WHERE Variable_name IN ({quoted});")
+        return {row["Variable_name"]: row["Value"] for row in parse_rows(out)}
+
+    def probe(self, names):
+        """Names that SET GLOBAL refuses as read-only; raises RuntimeError for any other error."""
+        static = set()
+        for name in names:
+            _, err = self.query(f"SET GLOBAL {name} = @@GLOBAL.{name};")
+            if not err.strip():
+                continue
+            if READ_ONLY.search(err):
+                static.add(name)
+            else:
+                raise RuntimeError(f"{name}: {err.strip().splitlines()[-1]}")
+        return static
+
+    def set_global(self, settings):
+        """Applies settings live; returns the error of the first one refused, or ""."""
+        for name, value in settings.items():
+            _, err = self.query(f"SET GLOBAL {name} = {to_sql(value)};")
+            if err.strip():
+                return f"{name}: {err.strip().splitlines()[-1]}"
+        if "innodb_buffer_pool_size" in settings:
+            self.wait_resize()
+        return ""
+
+    def wait_resize(self):
+        """Waits for an online buffer pool resize to finish."""
+        deadline = time.time() + self.args.restart_timeout
+        while time.time() < deadline:
+            out, _ = self.query("SHOW GLOBAL STATUS LIKE 'Innodb_buffer_pool_resize_status';")
+            rows = parse_rows(out)
+            status = rows[0]["Value"] if rows else ""
+            if not status or status.startswith(("Completed", "Size did not change")):
+                return
+            time.sleep(1)
+        print("   ⚠️ Buffer pool resize still in progress, continuing")
+
+    def write_cnf(self, settings):
+        """Writes the restart-only settings to the conf.d file (removes it when there are none)."""
+        if settings:
+            body = "[mariadb]\n" + "".join(f"{name} = {_text(value)}\n" for name, value in settings.items())
+            result = subprocess.run(["docker", "exec", "-i", self.args.container, "sh", "-c", f"cat > {CNF_PATH}"],
+                                    input=body, capture_output=True, text=True, check=False)
+            err = result.stderr if result.returncode else ""
+        else:
+            _, err = run_command(["docker", "exec", self.args.container, "rm", "-f", CNF_PATH])
+        if err.strip():
+            raise RuntimeError(f"could not update {CNF_PATH}: {err.strip()}")
+        self.cnf = dict(settings)
+
+    def restart(self):
+        """Restarts the container and waits until the server answers; False on timeout."""
+        self.disconnect()
+        _, err = run_command(["docker", "restart", self.args.container])
+        if err.strip():
+            print(f"   ❌ docker restart failed: {err.strip()}")
+            return False
+        deadline = time.time() + self.args.restart_timeout
+        while time.time() < deadline:
+            try:
+                out, _ = self.query("SELECT 1 AS ok;")
+            except RuntimeError:
+                out = ""
+            if parse_rows(out):
+                return True
+            self.disconnect()
+            time.sleep(2)
+        return False
+
+    def warm_up(self):
+        """Scans every base table through its primary key to load it into the buffer pool."""
+        out, _ = self.query("SELECT TABLE_NAME FROM information_schema.TABLES "
+                            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_TYPE = 'BASE TABLE';")
+        tables = [row["TABLE_NAME"] for row in parse_rows(out)]
+        started = time.time()
+        for table in tables:
+            _, err = self.query(f"SELECT COUNT(*) FROM `{table}` FORCE INDEX (PRIMARY);")
+            if err.strip():
+                self.query(f"SELECT COUNT(*) FROM `{table}`;")
+        print(f"   🔥 Warmed up {len(tables)} tables in {time.time() - started:.1f}s")
+
+
+def plan(combos, static, initial):
+    """Combinations ordered to group restart-only settings, as (index, combination, needs restart)."""
+    ordered = sorted(enumerate(combos), key=lambda ic: tuple(normalize(ic[1].get(n)) or "" for n in sorted(static)))
+    steps = []
+    running = {n: initial.get(n) for n in static}
+    in_cnf = {}
+    for index, combo in ordered:
+        wanted = {n: v for n, v in combo.items() if n in static}
+        restart = (any(normalize(v) != normalize(running.get(n)) for n, v in wanted.items())
+                   or bool(set(in_cnf) - set(wanted)))
+        if restart:
+            running = {n: wanted.get(n, initial.get(n)) for n in static}
+            in_cnf = wanted
+        steps.append((index, combo, restart))
+    return steps
+
+
+def run_config(server, args, label, combo, static, names, first):
+    """Applies one combination and runs the workload; returns its result entry.
+
+    Restart-only settings are compared with what the server runs (not with
+    the plan), so a configuration the server refused to start with does not
+    leave the next ones running with the wrong settings.
+    """
+    wanted = {n: v for n, v in combo.items() if n in static}
+    restart = (any(normalize(v) != normalize(server.running.get(n)) for n, v in wanted.items())
+               or bool(set(server.cnf) - set(wanted)))
+    entry = {"label": label, "settings": combo, "restart": restart, "status": "ok", "mismatches": {}}
+    if restart:
+        key = json.dumps({n: normalize(v) for n, v in wanted.items()}, sort_keys=True)
+        if key in server.failed:
+            entry["status"] = "server did not start with these settings"
+            return entry
+        print(f"   🔄 Restarting {args.container} with {', '.join(f'{n}={_text(v)}' for n, v in wanted.items()) or 'its initial settings'}")
+        server.write_cnf(wanted)
+        if not server.restart():
+            server.failed.add(key)
+            entry["status"] = "server did not restart"
+            print(f"   ❌ {args.container} did not start with these settings, restarting it without them")
+            server.write_cnf({})
+            if not server.restart():
+                raise RuntimeError(f"{args.container} did not come back after removing {CNF_PATH}")
+            server.running = server.variables(sorted(static))
+            return entry
+        server.running = server.variables(sorted(static))
+    err = server.set_global({n: v for n, v in combo.items() if n not in static})
+    if err:
+        entry["status"] = f"SET GLOBAL failed: {err}"
+        return entry
+    actual = server.variables(list(combo))
+    entry["applied"] = actual
+    for name, value in combo.items():
+        if normalize(actual.get(name)) != normalize(value):
+            entry["mismatches"][name] = actual.get(name)
+            print(f"   ⚠️ {name}: asked {_text(value)}, server runs with {actual.get(name)}")
+    if (restart or first) and not args.no_warmup:
+        server.warm_up()
+
+    env = dict(os.environ, CONTAINER_NAME=args.container, RUN_LABEL=label,
+               BENCH_VARIABLES=",".join(names), SWEEP_ARGS=args.sweep_args)
+    server.disconnect()
+    code = subprocess.run(["bash", os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_runner.sh"),
+                           args.workload], env=env).returncode
+    if code:
+        entry["status"] = f"{args.workload} exited with status {code}"
+    return entry
+
+
+def score(entry, store, target, after):
+    """Adds the stored run id, peak throughput and p95 at the target concurrency to an entry.
+
+    Only successful configurations are scored, from a run recorded by this
+    sweep (id above ``after``): labels repeat from one sweep to the next.
+    """
+    if entry["status"] != "ok":
+        return
+    run_id = store.resolve_run(entry["label"], after)
+    if run_id is None:
+        entry["status"] = "no results recorded"
+        return
+    levels = store.levels(run_id)
+    qps = [(row["threads"], row["steady_qps"] or row["qps"]) for row in levels]
+    peak_threads, peak = max(qps, key=lambda p: p[1] or 0)
+    entry.update({
+        "run_id": run_id,
+        "peak_qps": peak,
+        "peak_threads": peak_threads,
+        "p95_at_target": value_at([(row["threads"], row["p95"]) for row in levels], target),
+        "target_measured": any(row["threads"] == target for row in levels),
+    })
+
+
+def write_ranking(path, doc):
+    """Markdown ranking of the configurations by peak QPS and by p95 at the target concurrency."""
+    target = doc["target_threads"]
+    scored = [e for e in doc["configs"] if e.get("run_id")]
+    settings = lambda e: ", ".join(f"{n}={_text(v)}" for n, v in e["settings"].items())
+    p95 = lambda e: "—" if e["p95_at_target"] is None else f"{e['p95_at_target']:.2f}" + ("" if e["target_measured"] else " ≈")
+    lines = [
+        f"# 🏁 Configuration Sweep: {doc['name']}",
+        f"Generated: {doc['finished']}\n",
+        f"Workload: `{doc['workload']}`, {len(doc['configs'])} configurations, target concurrency {target} threads. "
+        f"Restart-only variables: {', '.join(doc['restart_only']) or 'none'}. "
+        "≈: p95 interpolated between the measured levels.\n",
+        "## Ranking by Peak Throughput",
+        f"| Rank | Config | Settings | Peak QPS | at Threads | p95 @ {target} (ms) | Restart | Run |",
+        "|---|---|---|---|---|---|---|---|",
+    ]
+    for rank, e in enumerate(sorted(scored, key=lambda e: -e["peak_qps"]), 1):
+        lines.append(f"| {rank} | {e['label']} | {settings(e)} | {e['peak_qps']:.2f} | {e['peak_threads']} | "
+                     f"{p95(e)} | {'yes' if e['restart'] else ''} | {e['run_id']} |")
+    lines += ["", f"## Ranking by p95 Latency at {target} Threads",
+              f"| Rank | Config | Settings | p95 @ {target} (ms) | Peak QPS | Run |", "|---|---|---|---|---|---|"]
+    with_p95 = [e for e in scored if e["p95_at_target"] is not None]
+    for rank, e in enumerate(sorted(with_p95, key=lambda e: e["p95_at_target"]), 1):
+        lines.append(f"| {rank} | {e['label']} | {settings(e)} | {p95(e)} | {e['peak_qps']:.2f} | {e['run_id']} |")
+    mismatched = [e for e in doc["configs"] if e["mismatches"]]
+    if mismatched:
+        lines += ["", "## Settings Adjusted by the Server"]
+        lines += [f"- {e['label']}: " + ", ".join(f"{n} = {v}" for n, v in e["mismatches"].items()) for e in mismatched]
+    failed = [e for e in doc["configs"] if e["status"] != "ok"]
+    if failed:
+        lines += ["", "## Failed Configurations"]
+        lines += [f"- ❌ {e['label']} ({settings(e)}): {e['status']}" for e in failed]
+    if len(scored) >= 2:
+        lines += ["", "Scaling curves of every configuration: `comparison_report.html` "
+                  f"(`make compare RUNS={','.join(e['label'] for e in scored[:2])}` for any pair)."]
+    with open(path, "w") as f:
+        f.write("\n".join(lines))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark for every combination of a server configuration grid and rank the configurations.")
+    parser.add_argument("--grid", default="scripts/config_grid.json", help="JSON grid file (grid, exclude, configs, name, workload, target_threads, sweep_args)")
+    parser.add_argument("--workload", choices=WORKLOADS, help="test_runner.sh workload run per configuration (default: the grid's, else perf-threads)")
+    parser.add_argument("--target-threads", type=int, help="Concurrency of the p95 ranking (default: the grid's, else 16)")
+    parser.add_argument("--sweep-args", help="Extra thread_sweep.py options for perf-threads (default: the grid's sweep_args)")
+    parser.add_argument("--name", help="Run label prefix (default: the grid's name, else config)")
+    parser.add_argument("--out-dir", default="reports/config_sweep", help="Directory of the ranking and comparison reports")
+    parser.add_argument("--results-db", default="reports/bench_results.sqlite", help="SQLite benchmark database (see bench_store.py)")
+    parser.add_argument("--restart-timeout", type=int, default=180, help="Seconds to wait for the server after a restart or a buffer pool resize")
+    parser.add_argument("--no-warmup", action="store_true", help="Skip the table scans after a restart")
+    parser.add_argument("--dry-run", action="store_true", help="Probe the variables and print the plan without changing anything")
+    parser.add_argument("--container", default="mariadb-11-8", help="Name of the MariaDB container (restarted for restart-only settings)")
+    parser.add_argument("--host", default="127.0.0.1", help="Database host")
+    parser.add_argument("--port", type=int, default=3306, help="Database port")
+    parser.add_argument("--user", default="root", help="Database user")
+    parser.add_argument("--password", default="root", help="Database password")
+    parser.add_argument("--db", default="employees", help="Database name")
+    parser.add_argument("--socket", help="Local socket path (driver backend only, instead of host/port)")
+    parser.add_argument("--backend", choices=["auto", "driver", "cli"], default="auto", help="Connection backend: pooled driver sessions, mariadb CLI per statement, or auto-detect")
+    args = parser.parse_args()
+
+    spec, combos = load_grid(args.grid)
+    args.workload = args.workload or spec.get("workload", "perf-threads")
+    if args.workload not in WORKLOADS:
+        print(f"Error: unknown workload {args.workload} (expected {' or '.join(WORKLOADS)})")
+        sys.exit(1)
+    args.target_threads = args.target_threads or spec.get("target_threads", 16)
+    args.sweep_args = args.sweep_args if args.sweep_args is not None else spec.get("sweep_args", "")
+    name = args.name or spec.get("name", "config")
+    names = sorted({n for c in combos for n in c})
+
+    server = Server(args)
+    try:
+        static = server.probe(names)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    initial = server.variables(names)
+    if len(initial) < len(names):
+        print(f"Error: could not read the current values of {', '.join(sorted(set(names) - set(initial)))}")
+        sys.exit(1)
+    server.running = {n: initial[n] for n in static}
+    steps = plan(combos, static, initial)
+
+    print(f"🔍 {len(steps)} configurations, {sum(r for _, _, r in steps)} restart(s); "
+          f"restart-only: {', '.join(sorted(static)) or 'none'}")
+    for index, combo, restart in steps:
+        print(f"   {'🔄' if restart else '⚡'} {name}-{index + 1}: " + ", ".join(f"{n}={_text(v)}" for n, v in combo.items()))
+    if args.dry_run:
+        return
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    # Runs recorded from here on belong to this sweep.
+    store = BenchStore(args.results_db)
+    last_run = store.resolve_run("latest") or 0
+    store.close()
+    doc = {"name": name, "grid": args.grid, "workload": args.workload, "target_threads": args.target_threads,
+           "started": time.strftime("%Y-%m-%d %H:%M:%S"), "restart_only": sorted(static), "initial": initial, "configs": []}
+    entries = {}
+    try:
+        for step, (index, combo, _) in enumerate(steps):
+            label = f"{name}-{index + 1}"
+            print(f"\n🎯 [{step + 1}/{len(steps)}] {label}")
+            entries[index] = run_config(server, args, label, combo, static, names, step == 0)
+            if entries[index]["status"] != "ok":
+                print(f"   ❌ {entries[index]['status']}")
+    except KeyboardInterrupt:
+        print("\n⚠️ Interrupted")
+    except RuntimeError as e:
+        print(f"\n❌ Sweep stopped: {e}")
+    finally:
+        print("\n♻️  Restoring the initial configuration")
+        if server.cnf:
+            server.write_cnf({})
+            if not server.restart():
+                print(f"   ❌ {args.container} did not come back; check {CNF_PATH}")
+        err = server.set_global({n: v for n, v in initial.items() if n not in static})
+        if err:
+            print(f"   ⚠️ {err}")
+        server.disconnect()
+
+    store = BenchStore(args.results_db)
+    for entry in entries.values():
+        score(entry, store, args.target_threads, last_run)
+    doc["configs"] = [entries[i] for i in sorted(entries)]
+    doc["finished"] = time.strftime("%Y-%m-%d %H:%M:%S")
+    with open(os.path.join(args.out_dir, "config_sweep.json"), "w") as f:
+        json.dump(doc, f, indent=1)
+    write_ranking(os.path.join(args.out_dir, "config_ranking.md"), doc)
+
+    run_ids = [e["run_id"] for e in doc["configs"] if e.get("run_id")]
+    if len(run_ids) >= 2:
+        reporter = PerfReporter(None, os.path.join(args.out_dir, "comparison_report.md"),
+                                os.path.join(args.out_dir, "comparison_report.html"))
+        reporter.load_runs(store, run_ids)
+        reporter.generate_comparison_markdown()
+        reporter.generate_comparison_html()
+    store.close()
+
+    scored = sorted((e for e in doc["configs"] if e.get("run_id")), key=lambda e: -e["peak_qps"])
+    if scored:
+        best = scored[0]
+        print(f"\n🏁 Best peak throughput: {best['label']} ({best['peak_qps']:.0f} QPS at {best['peak_threads']} threads)")
+    print(f"✅ Ranking in {os.path.join(args.out_dir, 'config_ranking.md')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""Connection backends used by the SQL analyzer.
+
+Two backends share the same small interface (``query``, ``timed_query``,
+``execute``, ``stream_query``, ``session`` and ``close``):
+
+- ``DriverBackend`` keeps a pool of long-lived sessions opened through a
+  Python DB-API driver (MariaDB Connector/Python or PyMySQL) over TCP or the
+  local socket. Timings cover the statement round-trip only.
+- ``CliBackend`` is the historical path: one ``mariadb`` client process,
+  optionally wrapped in ``docker exec``, per statement.
+
+Both return results as tab-separated text with a header line, the same layout
+as ``mariadb -e`` in batch mode, so the EXPLAIN/schema parsers work unchanged.
+``stream_query`` is the exception: it reads the result set row by row
+(unbuffered cursor, ``mariadb --quick``) and only counts rows and bytes, so
+time to first row and time to last row can be told apart.
+"""
+import importlib
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+# Tried in order when --backend is "auto" or "driver".
+DRIVER_MODULES = ("mariadb", "pymysql")
+
+# Rows fetched per round-trip by stream_query after the first row.
+STREAM_BATCH_ROWS = 1000
+
+
+def run_command(cmd_list):
+    """Runs a shell command and returns stdout and stderr."""
+    try:
+        result = subprocess.run(cmd_list, capture_output=True, text=True, check=False)
+        return result.stdout, result.stderr
+    except Exception as e:
+        return "", str(e)
+
+
+def get_db_command(args, query):
+    """Constructs the database command based on Docker or direct connection."""
+    options = ["--local-infile=1"] if getattr(args, "local_infile", False) else []
+    if args.container:
+        return ["docker", "exec", args.container, "mariadb", *options, "-h", args.host, "-P", str(args.port), "-u", args.user, f"-p{args.password}", args.db, "-e", query]
+    else:
+        return ["mariadb", *options, "-h", args.host, "-P", str(args.port), "-u", args.user, f"-p{args.password}", args.db, "-e", query]
+
+
+def load_driver():
+    """Returns the first importable DB-API driver module, or None."""
+    for name in DRIVER_MODULES:
+        try:
+            return importlib.import_module(name)
+        except ImportError:
+            continue
+    return None
+
+
+BATCH_ESCAPES = {"\\": "\\\\", "\n": "\\n", "\t": "\\t", "\0": "\\0"}
+BATCH_UNESCAPES = {v[1]: k for k, v in BATCH_ESCAPES.items()}
+
+
+def format_value(value):
+    """Formats a single column value the way the mariadb client does in batch mode."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode("utf-8", errors="replace")
+    return "".join(BATCH_ESCAPES.get(ch, ch) for ch in str(value))
+
+
+def unescape_value(text):
+    """Reverses the batch-mode escaping of backslash, newline, tab and NUL."""
+    out = []
+    chars = iter(text)
+    for ch in chars:
+        if ch == "\\":
+            nxt = next(chars, "")
+            out.append(BATCH_UNESCAPES.get(nxt, "\\" + nxt))
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def format_result(cursor):
+    """Renders the current result set of a cursor as tab-separated text."""
+    if cursor.description is None:
+        return ""
+    lines = ["\t".join(col[0] for col in cursor.description)]
+    for row in cursor.fetchall():
+        lines.append("\t".join(format_value(v) for v in row))
+    return "\n".join(lines) + "\n"
+
+
+def value_size(value):
+    """Approximate batch-format text size of a column value, without formatting it."""
+    if value is None:
+        return 4  # NULL
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    return len(str(value))
+
+
+def row_size(row):
+    """Approximate batch-format line size of a row: values, tabs and newline."""
+    return sum(value_size(v) for v in row) + len(row)
+
+
+def parse_rows(output):
+    """Parses tab-separated batch output (header line first) into a list of dicts."""
+    lines = [line for line in output.split("\n") if line]
+    if not lines:
+        return []
+    header = lines[0].split("\t")
+    return [dict(zip(header, line.split("\t"))) for line in lines[1:]]
+
+
+class CliBackend:
+    """Runs every statement in a fresh mariadb client process."""
+
+    name = "cli"
+
+    def __init__(self, args):
+        self.args = args
+
+    def query(self, sql):
+        """Executes a statement and returns (stdout, stderr)."""
+        return run_command(get_db_command(self.args, sql))
+
+    def timed_query(self, sql):
+        """Executes a statement and returns (elapsed, rows, stderr); see DriverSession.timed_query."""
+        start = time.perf_counter()
+        stdout, stderr = self.query(sql)
+        return time.perf_counter() - start, max(0, stdout.count("\n") - 1), stderr
+
+    def execute(self, sql):
+        """Executes a statement and returns (rows, stderr); see DriverSession.execute."""
+        stdout, stderr = self.query(sql)
+        return max(0, stdout.count("\n") - 1), stderr
+
+    def stream_query(self, sql):
+        """Streams a result set through ``mariadb --quick``; see DriverSession.stream_query."""
+        cmd = get_db_command(self.args, sql)
+        cmd.insert(cmd.index("mariadb") + 1, "--quick")
+        # stderr goes to a file: a client blocked on a full stderr pipe would
+        # never close stdout while we are still reading it.
+        with tempfile.TemporaryFile() as errfile:
+            start = time.perf_counter()
+            try:
+                proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errfile)
+            except Exception as e:
+                return 0.0, 0.0, 0, 0, str(e)
+            first_row = None
+            rows = nbytes = 0
+            header = True
+            with proc.stdout:
+                for line in proc.stdout:
+                    if header:
+                        header = False
+                        continue
+                    if first_row is None:
+                        first_row = time.perf_counter() - start
+                    rows += 1
+                    nbytes += len(line)
+            proc.wait()
+            last_row = time.perf_counter() - start
+            errfile.seek(0)
+            stderr = errfile.read().decode("utf-8", errors="replace")
+        return (last_row if first_row is None else first_row), last_row, rows, nbytes, stderr
+
+    @contextmanager
+    def session(self):
+        """The CLI has no persistent session; the backend itself is yielded."""
+        yield self
+
+    def close(self):
+        pass
+
+
+class DriverSession:
+    """A single persistent connection checked out of a DriverBackend pool."""
+
+    def __init__(self, driver, conn):
+        self.driver = driver
+        self.conn = conn
+        self.broken = False
+
+    def _failed(self, error):
+        """Marks the session broken on connection errors; returns the message."""
+        if isinstance(error, (self.driver.OperationalError, self.driver.InterfaceError)):
+            self.broken = True
+        return str(error)
+
+    def query(self, sql):
+        """Executes a statement and returns (stdout, stderr)."""
+        try:
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute(sql)
+                return format_result(cursor), ""
+            finally:
+                cursor.close()
+        except self.driver.Error as e:
+            return "", self._failed(e)
+
+    def timed_query(self, sql):
+        """Executes a statement and returns (elapsed, rows, stderr).
+
+        Only the execute/fetch round-trip is timed; no process or login cost.
+        Rows are fetched in batches and dropped, never formatted, so a large
+        result set measures the server and the transfer, not Python string
+        building. ``elapsed`` is 0.0 on error: check stderr before using it.
+        """
+        try:
+            cursor = self.conn.cursor()
+            try:
+                start = time.perf_counter()
+                cursor.execute(sql)
+                rows = 0
+                if cursor.description is not None:
+                    while True:
+                        batch = cursor.fetchmany(STREAM_BATCH_ROWS)
+                        if not batch:
+                            break
+                        rows += len(batch)
+                elapsed = time.perf_counter() - start
+            finally:
+                cursor.close()
+        except self.driver.Error as e:
+            return 0.0, 0, self._failed(e)
+        return elapsed, rows, ""
+
+    def execute(self, sql):
+        """Executes a statement and returns (rows, stderr).
+
+        The result set is fetched but not formatted, so that a load generator
+        running many sessions spends as little client time as possible.
+        """
+        try:
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute(sql)
+                rows = len(cursor.fetchall()) if cursor.description is not None else 0
+            finally:
+                cursor.close()
+        except self.driver.Error as e:
+            return 0, self._failed(e)
+        return rows, ""
+
+    def _stream_cursor(self):
+        """Unbuffered cursor: rows are read from the socket as they are fetched."""
+        if self.driver.__name__ == "mariadb":
+            return self.conn.cursor(buffered=False)
+        cursors = importlib.import_module(f"{self.driver.__name__}.cursors")
+        return self.conn.cursor(cursors.SSCursor)
+
+    def stream_query(self, sql):
+        """Executes a statement and streams its result set without keeping it.
+
+        Returns (first_row, last_row, rows, bytes, stderr): seconds until the
+        first and the last row were received (equal for an empty result), the
+        row count and the approximate batch-format size of the result.
+        """
+        try:
+            cursor = self._stream_cursor()
+            try:
+                start = time.perf_counter()
+                cursor.execute(sql)
+                first_row = None
+                rows = nbytes = 0
+                if cursor.description is not None:
+                    row = cursor.fetchone()
+                    if row is not None:
+                        first_row = time.perf_counter() - start
+                        rows, nbytes = 1, row_size(row)
+                        while True:
+                            batch = cursor.fetchmany(STREAM_BATCH_ROWS)
+                            if not batch:
+                                break
+                            rows += len(batch)
+                            nbytes += sum(row_size(r) for r in batch)
+                last_row = time.perf_counter() - start
+            finally:
+                cursor.close()
+        except self.driver.Error as e:
+            return 0.0, 0.0, 0, 0, self._failed(e)
+        return (last_row if first_row is None else first_row), last_row, rows, nbytes, ""
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+class DriverBackend:
+    """A bounded pool of persistent DB-API connections."""
+
+    name = "driver"
+
+    def __init__(self, args, driver, size=2):
+        self.args = args
+        self.driver = driver
+        self.size = max(1, size)
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def connect(self):
+        """Opens a new session over the socket (if given) or TCP."""
+        params = {
+            "user": self.args.user,
+            "password": self.args.password,
+            "database": self.args.db,
+            "autocommit": True,
+        }
+        if getattr(self.args, "local_infile", False):
+            params["local_infile"] = True
+        if getattr(self.args, "socket", None):
+            params["unix_socket"] = self.args.socket
+        else:
+            params["host"] = self.args.host
+            params["port"] = int(self.args.port)
+        return DriverSession(self.driver, self.driver.connect(**params))
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                try:
+                    return self.connect()
+                except Exception:
+                    self._opened -= 1
+                    raise
+        return self._idle.get()
+
+    def _release(self, sess):
+        if sess.broken:
+            sess.close()
+            with self._lock:
+                self._opened -= 1
+        else:
+            self._idle.put(sess)
+
+    @contextmanager
+    def session(self):
+        """Checks out one pooled session for a sequence of statements."""
+        sess = self._acquire()
+        try:
+            yield sess
+        finally:
+            self._release(sess)
+
+    def query(self, sql):
+        with self.session() as sess:
+            return sess.query(sql)
+
+    def timed_query(self, sql):
+        with self.session() as sess:
+            return sess.timed_query(sql)
+
+    def execute(self, sql):
+        with self.session() as sess:
+            return sess.execute(sql)
+
+    def stream_query(self, sql):
+        with self.session() as sess:
+            return sess.stream_query(sql)
+
+    def close(self):
+        while True:
+            try:
+                sess = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            sess.close()
+        with self._lock:
+            self._opened = 0
+
+
+def container_hostname(container):
+    """Hostname of a Docker container (the server's @@hostname inside it), "" if unknown."""
+    out, err = run_command(["docker", "exec", container, "hostname"])
+    return out.strip() if not err.strip() else ""
+
+
+def open_backend(args):
+    """Selects the backend requested by --backend ("auto", "driver" or "cli").
+
+    "auto" uses a pooled driver backend when a driver is installed and the
+    server is reachable, and falls back to the CLI otherwise. With
+    --container, the driver connects to --host/--port (or --socket) from
+    the host, which may be another server: "auto" then only keeps the driver
+    if the server it reached reports the container's hostname.
+    """
+    mode = getattr(args, "backend", "auto")
+    if mode == "cli":
+        return CliBackend(args)
+
+    driver = load_driver()
+    if driver is None:
+        if mode == "driver":
+            raise RuntimeError(f"No database driver available (install one of: {', '.join(DRIVER_MODULES)})")
+        return CliBackend(args)
+
+    backend = DriverBackend(args, driver, getattr(args, "pool_size", 2))
+    try:
+        with backend.session():
+            pass
+    except Exception as e:
+        if mode == "driver":
+            raise RuntimeError(f"Could not connect with {driver.__name__}: {e}")
+        print(f"⚠️ {driver.__name__} connection failed ({e}), falling back to the mariadb CLI.")
+        return CliBackend(args)
+
+    container = getattr(args, "container", None)
+    if container:
+        target = getattr(args, "socket", None) or f"{args.host}:{args.port}"
+        output, err = backend.query("SELECT @@hostname AS hostname")
+        rows = parse_rows(output) if not err.strip() else []
+        server = rows[0]["hostname"] if rows else ""
+        if not server or server != container_hostname(container):
+            if mode == "driver":
+                print(f"⚠️ {driver.__name__} is timing the server at {target}, which may not be the {container} container.")
+            else:
+                print(f"⚠️ Could not confirm that the server at {target} is the {container} container, using the mariadb CLI inside it.")
+                backend.close()
+                return CliBackend(args)
+    return backend
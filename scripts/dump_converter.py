@@ -0,0 +1,579 @@
+#!/usr/bin/env python3
+"""Streaming converter for extended-INSERT dumps, with an offline checksum.
+
+The ``employees/load_*.dump`` files and ``sakila/sakila-mv-data.sql`` are
+extended INSERT statements: the slowest format to load, and one that can
+only be checked once it is in a server. This converter reads them one
+statement at a time (memory is bounded by the largest statement) and writes:
+
+- ``<table>.NNNNN.tsv`` (or ``.csv``) chunks of ``--chunk-rows`` rows, ready
+  for ``LOAD DATA``, with a ``manifest.json`` that ``bulk_loader.py`` and
+  ``integrity_verifier.py`` read like a generated dataset;
+- ``dataset.colcache``, a compact columnar copy of the data: blocks of
+  ``BLOCK_ROWS`` rows, each column delta-encoded (integers) or
+  dictionary-encoded, then zlib-compressed, with a JSON footer holding the
+  sizes and modification times of the inputs, the row counts and the sums;
+- ``expected.txt``: per table ``table:count:crc:columns`` with
+  ``crc = SUM(CRC32(CONCAT_WS('#', columns...)))``, the format
+  ``verify_data.sh`` accepts as its fifth argument.
+
+With ``--check`` (by default ``test_employees_md5.sql`` next to the schema,
+when present), the ordered MD5 or SHA1 chains of that script are recomputed
+from the columnar cache and compared with its ``expected_values``. A later
+run whose inputs have not changed skips the parsing and checks the cache
+only, which takes seconds instead of a server round trip.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import struct
+import sys
+import time
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from itertools import accumulate
+from typing import Dict, List, Optional
+
+from bulk_loader import parse_schema
+from sql_splitter import iter_statements
+
+FORMATS = ("tsv", "csv")
+CACHE_FILE = "dataset.colcache"
+CACHE_MAGIC = b"TDBCOLS1"
+BLOCK_ROWS = 65536
+NULL_FIELD = b"\\N"
+
+INSERT_COLUMNS = re.compile(r"^\s*INSERT\s+(?:IGNORE\s+)?INTO\s+`?(\w+)`?\s*(?:\(([^)]*)\))?\s*VALUES\b", re.IGNORECASE)
+EXECUTABLE_COMMENT = re.compile(r"/\*!\d*\s?(.*?)\*/", re.DOTALL)
+# One token per value, plus the closing parenthesis of each row tuple. The
+# quote is captured on its own so that '' (empty string) differs from "no match".
+VALUE_TOKEN = re.compile(r"(')([^'\\]*(?:(?:\\.|'')[^'\\]*)*)'|(NULL)\b|0x([0-9A-Fa-f]*)|([^\s,()'][^,()]*?)(?=\s*[,)])|(\))",
+                         re.IGNORECASE)
+SQL_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "0": "\0", "Z": "\x1a", "b": "\b"}
+SQL_ESCAPE = re.compile(r"\\(.)|''", re.DOTALL)
+FIELD_ESCAPES = {b"\\": b"\\\\", b"\t": b"\\t", b"\n": b"\\n", b"\r": b"\\r", b"\0": b"\\0"}
+FIELD_SPECIAL = re.compile(rb"[\\\t\n\r\0]")
+TEXT_SPECIAL = re.compile(r'[\\\n\r\0"]')
+FIELD_UNESCAPES = {b"t": b"\t", b"n": b"\n", b"r": b"\r", b"0": b"\0", b"Z": b"\x1a", b"b": b"\b"}
+FIELD_ESCAPE = re.compile(rb"\\(.)", re.DOTALL)
+INT_TEXT = re.compile(r"-?(?:0|[1-9]\d{0,17})\Z")
+CHAIN = re.compile(r"@crc\s*:=\s*(MD5|SHA1?)\s*\(\s*CONCAT_WS\s*\(\s*'#'\s*,\s*@crc\s*,(.*?)\)\s*\)\s*FROM\s+`?(\w+)`?"
+                   r"\s+ORDER\s+BY\s+([\w`,\s]+?)\s*;", re.IGNORECASE | re.DOTALL)
+EXPECTED_VALUES = re.compile(r"INSERT\s+INTO\s+`?expected_values`?\s+VALUES(.*?);", re.IGNORECASE | re.DOTALL)
+
+
+# --- Reading ----------------------------------------------------------------
+
+def sql_unescape(text):
+    return SQL_ESCAPE.sub(lambda m: "'" if m.group(1) is None else SQL_ESCAPES.get(m.group(1), m.group(1)), text)
+
+
+def iter_tuples(text, pos=0):
+    """Row tuples of a VALUES list: lists of str, bytes (hex literals) or None (NULL)."""
+    row = []
+    for quote, quoted, null, hexa, bare, close in VALUE_TOKEN.findall(text, pos):
+        if quote:
+            row.append(sql_unescape(quoted) if "\\" in quoted or "''" in quoted else quoted)
+        elif bare:
+            row.append(bare)
+        elif null:
+            row.append(None)
+        elif close:
+            yield row
+            row = []
+        else:
+            row.append(bytes.fromhex(hexa))
+
+
+def iter_inserts(path):
+    """Yields (table, column names or None, values) for every row of every INSERT of a script."""
+    for stmt in iter_statements(path, strip_comments=True):
+        text = stmt.text
+        if "/*!" in text:
+            text = EXECUTABLE_COMMENT.sub(r"\1", text)
+        head = INSERT_COLUMNS.match(text)
+        if not head:
+            continue
+        columns = tuple(c.strip().strip("`") for c in head.group(2).split(",")) if head.group(2) else None
+        for values in iter_tuples(text, head.end()):
+            yield head.group(1), columns, values
+
+
+def field_unescape(raw):
+    return FIELD_ESCAPE.sub(lambda m: FIELD_UNESCAPES.get(m.group(1), m.group(1)), raw) if b"\\" in raw else raw
+
+
+def split_csv(line):
+    """Raw fields of a CSV line written by csv_line(): "quoted" or bare (\\N)."""
+    fields, i, n = [], 0, len(line)
+    while i <= n:
+        if line[i:i + 1] == b'"':
+            j = i + 1
+            while True:
+                j = line.index(b'"', j)
+                if line[j + 1:j + 2] == b'"':
+                    j += 2
+                    continue
+                break
+            fields.append(field_unescape(line[i + 1:j].replace(b'""', b'"')))
+            i = j + 2
+        else:
+            j = line.find(b",", i)
+            j = n if j < 0 else j
+            raw = line[i:j]
+            fields.append(None if raw == NULL_FIELD else field_unescape(raw))
+            i = j + 1
+    return fields
+
+
+def iter_rows(path, kind, table=None):
+    """Column values of every row of a TSV/CSV chunk (bytes) or an INSERT script (str/bytes).
+
+    For a script holding several tables, ``table`` keeps that table's rows only.
+    """
+    if kind == "sql":
+        for name, _, values in iter_inserts(path):
+            if table is None or name == table:
+                yield values
+        return
+    with open(path, "rb") as f:
+        for line in f:
+            line = line.rstrip(b"\n")
+            if kind == "csv":
+                yield split_csv(line)
+            else:
+                yield [None if v == NULL_FIELD else field_unescape(v) for v in line.split(b"\t")]
+
+
+def as_bytes(value):
+    return value if isinstance(value, bytes) else value.encode("utf-8")
+
+
+def row_bytes(values):
+    """CONCAT_WS('#', values...) as the server builds it: NULLs are skipped."""
+    try:
+        return "#".join(values).encode("utf-8")
+    except TypeError:  # NULLs or bytes
+        return b"#".join(as_bytes(v) for v in values if v is not None)
+
+
+# --- Writing ----------------------------------------------------------------
+
+def escape_field(value):
+    if value is None:
+        return NULL_FIELD
+    data = as_bytes(value)
+    if FIELD_SPECIAL.search(data):
+        data = FIELD_SPECIAL.sub(lambda m: FIELD_ESCAPES[m.group(0)], data)
+    return data
+
+
+def plain_text(values, separator):
+    """The joined line when every value is text needing no escaping, else None."""
+    try:
+        line = separator.join(values)
+    except TypeError:  # NULLs or bytes
+        return None
+    if line.count("\t") != len(values) - 1 or TEXT_SPECIAL.search(line):
+        return None
+    return line
+
+
+def tsv_line(values):
+    line = plain_text(values, "\t")
+    if line is not None:
+        return (line + "\n").encode("utf-8")
+    return b"\t".join(escape_field(v) for v in values) + b"\n"
+
+
+def csv_line(values):
+    line = plain_text(values, "\t")
+    if line is not None:
+        return ('"' + line.replace("\t", '","') + '"\n').encode("utf-8")
+    return b",".join(NULL_FIELD if v is None else b'"' + escape_field(v).replace(b'"', b'""') + b'"' for v in values) + b"\n"
+
+
+class ChunkWriter:
+    """Rolls one table's rows over ``<table>.NNNNN.<format>`` files."""
+
+    def __init__(self, out_dir, table, fmt, chunk_rows):
+        self.out_dir = out_dir
+        self.table = table
+        self.fmt = fmt
+        self.chunk_rows = chunk_rows
+        self.encode = csv_line if fmt == "csv" else tsv_line
+        self.files: List[str] = []
+        self.handle = None
+        self.in_file = 0
+
+    def add(self, values):
+        if self.handle is None or self.in_file >= self.chunk_rows:
+            self.close()
+            name = f"{self.table}.{len(self.files):05d}.{self.fmt}"
+            self.files.append(name)
+            self.handle = open(os.path.join(self.out_dir, name), "wb")
+            self.in_file = 0
+        self.handle.write(self.encode(values))
+        self.in_file += 1
+
+    def close(self):
+        if self.handle:
+            self.handle.close()
+            self.handle = None
+
+
+def little_endian(values):
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def encode_column(values):
+    """('int', data) for canonical int64 text, ('dict', data) otherwise."""
+    if all(isinstance(v, str) and INT_TEXT.match(v) for v in values):
+        numbers = [int(v) for v in values]
+        deltas = array("q", [b - a for a, b in zip([0] + numbers, numbers)])
+        return "int", zlib.compress(little_endian(deltas))
+    index: Dict = {}
+    codes = [index.setdefault((type(v), v), len(index)) for v in values]
+    parts = [struct.pack("<I", len(index))]
+    for kind, value in index:
+        if value is None:
+            parts.append(b"\0")
+        else:
+            data = as_bytes(value)
+            parts.append((b"b" if kind is bytes else b"s") + struct.pack("<I", len(data)) + data)
+    width = "H" if len(index) <= 0xFFFF else "I"
+    parts.append(width.encode() + little_endian(array(width, codes)))
+    return "dict", zlib.compress(b"".join(parts))
+
+
+def decode_column(encoding, data, as_text=True):
+    """Values of one encoded block column; integers come back as text unless as_text is False."""
+    data = zlib.decompress(data)
+    if encoding == "int":
+        deltas = array("q")
+        deltas.frombytes(data)
+        if sys.byteorder == "big":
+            deltas.byteswap()
+        numbers = accumulate(deltas)
+        return [str(n) for n in numbers] if as_text else list(numbers)
+    (count,), pos, dictionary = struct.unpack_from("<I", data), 4, []
+    for _ in range(count):
+        tag = data[pos:pos + 1]
+        if tag == b"\0":
+            dictionary.append(None)
+            pos += 1
+            continue
+        (size,) = struct.unpack_from("<I", data, pos + 1)
+        value = data[pos + 5:pos + 5 + size]
+        dictionary.append(value if tag == b"b" else value.decode("utf-8"))
+        pos += 5 + size
+    codes = array(data[pos:pos + 1].decode())
+    codes.frombytes(data[pos + 1:])
+    if sys.byteorder == "big":
+        codes.byteswap()
+    return [dictionary[c] for c in codes]
+
+
+@dataclass
+class TableData:
+    """Per-table state of a conversion: buffered block, chunk files, count and sum."""
+    name: str
+    columns: List[str]
+    rows: int = 0
+    crc32: int = 0
+    binary: bool = False
+    block: List[List] = field(default_factory=list)
+    blocks: List[Dict] = field(default_factory=list)
+    chunks: Optional[ChunkWriter] = None
+
+
+class CacheWriter:
+    """Appends column blocks to the cache file; the footer is written last."""
+
+    def __init__(self, path):
+        self.path = path
+        self.handle = open(path + ".tmp", "wb")
+        self.handle.write(CACHE_MAGIC)
+
+    def flush(self, table):
+        if not table.block:
+            return
+        columns = []
+        for values in zip(*table.block):
+            encoding, data = encode_column(values)
+            columns.append({"encoding": encoding, "offset": self.handle.tell(), "length": len(data)})
+            self.handle.write(data)
+        table.blocks.append({"rows": len(table.block), "columns": columns})
+        table.block = []
+
+    def close(self, tables, inputs):
+        footer = json.dumps({
+            "version": 1,
+            "inputs": inputs,
+            "tables": {t.name: {"columns": t.columns, "rows": t.rows, "crc32": t.crc32, "binary": t.binary,
+                                "blocks": t.blocks} for t in tables},
+        }).encode("utf-8")
+        self.handle.write(footer + struct.pack("<Q", len(footer)) + CACHE_MAGIC)
+        self.handle.close()
+        os.replace(self.path + ".tmp", self.path)
+
+
+class CacheReader:
+    """Random access to the columns of a dataset.colcache file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            f.seek(-16, os.SEEK_END)
+            tail = f.read(16)
+            if tail[8:] != CACHE_MAGIC:
+                raise ValueError(f"{path} is not a column cache")
+            (size,) = struct.unpack("<Q", tail[:8])
+            f.seek(-16 - size, os.SEEK_END)
+            footer = json.loads(f.read(size).decode("utf-8"))
+        self.inputs = footer["inputs"]
+        self.tables = footer["tables"]
+
+    def column(self, table, name, as_text=True):
+        info = self.tables[table]
+        index = info["columns"].index(name)
+        values = []
+        with open(self.path, "rb") as f:
+            for block in info["blocks"]:
+                col = block["columns"][index]
+                f.seek(col["offset"])
+                values.extend(decode_column(col["encoding"], f.read(col["length"]), as_text))
+        return values
+
+    def iter_rows(self, table):
+        info = self.tables[table]
+        with open(self.path, "rb") as f:
+            for block in info["blocks"]:
+                columns = []
+                for col in block["columns"]:
+                    f.seek(col["offset"])
+                    columns.append(decode_column(col["encoding"], f.read(col["length"])))
+                yield from zip(*columns)
+
+
+def input_signature(paths):
+    return {os.path.abspath(p): [os.path.getsize(p), os.stat(p).st_mtime_ns] for p in paths}
+
+
+def convert(inputs, schema, out_dir, fmt, chunk_rows, write_chunks=True):
+    """Parses every input once; writes chunks, the cache, manifest.json and expected.txt."""
+    os.makedirs(out_dir, exist_ok=True)
+    cache = CacheWriter(os.path.join(out_dir, CACHE_FILE))
+    tables: Dict[str, TableData] = {}
+    start = time.perf_counter()
+    try:
+        for path in inputs:
+            for name, columns, values in iter_inserts(path):
+                table = tables.get(name)
+                if table is None:
+                    known = schema.tables[name].columns if name in schema.tables else None
+                    names = list(columns or known or [f"c{i + 1}" for i in range(len(values))])
+                    table = tables[name] = TableData(name, names)
+                    if write_chunks:
+                        table.chunks = ChunkWriter(out_dir, name, fmt, chunk_rows)
+                if columns and list(columns) != table.columns:
+                    raise ValueError(f"{path}: {name} rows with columns ({', '.join(columns)}) instead of ({', '.join(table.columns)})")
+                if len(values) != len(table.columns):
+                    raise ValueError(f"{path}: {name} row with {len(values)} values for {len(table.columns)} columns")
+                table.rows += 1
+                try:
+                    table.crc32 += zlib.crc32("#".join(values).encode("utf-8"))
+                except TypeError:  # NULLs or bytes
+                    table.crc32 += zlib.crc32(row_bytes(values))
+                    table.binary = table.binary or any(isinstance(v, bytes) for v in values)
+                if table.chunks:
+                    table.chunks.add(values)
+                table.block.append(values)
+                if len(table.block) >= BLOCK_ROWS:
+                    cache.flush(table)
+        for table in tables.values():
+            cache.flush(table)
+    finally:
+        for table in tables.values():
+            if table.chunks:
+                table.chunks.close()
+    cache.close(tables.values(), input_signature(inputs))
+    seconds = time.perf_counter() - start
+
+    order = [t for t in schema.tables if t in tables] + [t for t in tables if t not in schema.tables]
+    if write_chunks:
+        manifest = {
+            "source": [os.path.relpath(p, out_dir) for p in inputs],
+            "format": fmt,
+            "tables": {t: {"rows": tables[t].rows, "files": tables[t].chunks.files, "columns": tables[t].columns,
+                           "charset": "binary" if tables[t].binary else "utf8mb4"} for t in order},
+        }
+        with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+    with open(os.path.join(out_dir, "expected.txt"), "w") as f:
+        f.write(f"# converted from {', '.join(os.path.basename(p) for p in inputs)}\n")
+        f.write("# checksum = SUM(CRC32(CONCAT_WS('#', columns...)))\n")
+        for t in order:
+            f.write(f"{t}:{tables[t].rows}:{tables[t].crc32}:{','.join(tables[t].columns)}\n")
+    return [tables[t] for t in order], seconds
+
+
+# --- Checking ---------------------------------------------------------------
+
+@dataclass
+class ChainCheck:
+    """One ordered hash chain of test_employees_md5.sql / test_employees_sha.sql."""
+    table: str
+    function: str  # md5 | sha1
+    columns: List[str]
+    order: List[str]
+    expected_rows: Optional[int] = None
+    expected: Optional[str] = None
+    rows: int = 0
+    found: Optional[str] = None
+
+    @property
+    def ok(self):
+        return self.found == self.expected and self.rows == self.expected_rows
+
+
+def parse_checks(path):
+    """Chains and expected (count, digest) values of a test_employees_*.sql script."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    checks = []
+    for m in CHAIN.finditer(text):
+        function = "md5" if m.group(1).upper() == "MD5" else "sha1"
+        columns = [c.strip().strip("`") for c in m.group(2).split(",") if c.strip()]
+        order = [c.strip().strip("`") for c in m.group(4).split(",") if c.strip()]
+        checks.append(ChainCheck(m.group(3), function, columns, order))
+    expected = EXPECTED_VALUES.search(text)
+    if expected:
+        # expected_values (table_name, recs, crc_sha, crc_md5)
+        for values in iter_tuples(expected.group(1)):
+            for check in checks:
+                if check.table == values[0]:
+                    check.expected_rows = int(values[1])
+                    check.expected = values[3] if check.function == "md5" else values[2]
+    return checks
+
+
+def run_chain(reader, check):
+    """Recomputes ``@crc := MD5(CONCAT_WS('#', @crc, columns...)) ... ORDER BY order`` from the cache."""
+    info = reader.tables[check.table]
+    values = {c: reader.column(check.table, c) for c in set(check.columns)}
+    keys = list(zip(*(reader.column(check.table, c, as_text=False) for c in check.order)))
+    rows = list(range(info["rows"]))
+    if any(b < a for a, b in zip(keys, keys[1:])):
+        rows.sort(key=keys.__getitem__)
+    digest = hashlib.md5 if check.function == "md5" else hashlib.sha1
+    columns = [values[c] for c in check.columns]
+    crc = b""
+    for i in rows:
+        crc = digest(crc + b"#" + row_bytes([col[i] for col in columns])).hexdigest().encode()
+    check.rows = info["rows"]
+    check.found = crc.decode()
+    return check
+
+
+def cache_is_fresh(reader, inputs):
+    return reader.inputs == input_signature(inputs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert extended-INSERT dumps to LOAD DATA chunks and a columnar cache, and check them offline.")
+    parser.add_argument("--schema", default="employees/employees.sql", help="Schema script: table columns, and the dumps it sources when --input is not given")
+    parser.add_argument("--input", action="append", help="INSERT script to convert (repeatable), e.g. sakila/sakila-mv-data.sql")
+    parser.add_argument("--out", help="Output directory (default: converted/ next to the schema)")
+    parser.add_argument("--format", choices=FORMATS, default="tsv", help="Chunk file format")
+    parser.add_argument("--chunk-rows", type=int, default=500000, help="Rows per chunk file")
+    parser.add_argument("--cache-only", action="store_true", help="Write the columnar cache and expected.txt only, no chunk files")
+    parser.add_argument("--check", help="Checksum script whose ordered MD5/SHA1 chains are verified (default: test_employees_md5.sql next to the schema, if any)")
+    parser.add_argument("--force", action="store_true", help="Parse the inputs even when the cache is up to date")
+    args = parser.parse_args()
+    if args.chunk_rows < 1:
+        print("Error: --chunk-rows must be positive")
+        sys.exit(1)
+
+    if not os.path.exists(args.schema):
+        print(f"Error: schema script not found at {args.schema}")
+        sys.exit(1)
+    schema = parse_schema(args.schema)
+    base = os.path.dirname(os.path.abspath(args.schema))
+    inputs = args.input or [os.path.join(base, name) for name in schema.sources]
+    missing = [p for p in inputs if not os.path.exists(p)]
+    if missing:
+        print(f"Error: input file(s) not found: {', '.join(missing)}")
+        sys.exit(1)
+    if not inputs:
+        print(f"Error: {args.schema} sources no dump files; pass --input")
+        sys.exit(1)
+    out_dir = args.out or os.path.join(base, "converted")
+    check_path = args.check
+    if check_path is None and os.path.exists(os.path.join(base, "test_employees_md5.sql")):
+        check_path = os.path.join(base, "test_employees_md5.sql")
+
+    cache_path = os.path.join(out_dir, CACHE_FILE)
+    reader = None
+    if not args.force and os.path.exists(cache_path):
+        try:
+            reader = CacheReader(cache_path)
+        except ValueError:
+            reader = None
+        if reader and not cache_is_fresh(reader, inputs):
+            reader = None
+    if reader and not args.cache_only and not os.path.exists(os.path.join(out_dir, "manifest.json")):
+        reader = None
+
+    if reader:
+        print(f"♻️  {cache_path} is up to date with {len(inputs)} input file(s); skipping conversion")
+    else:
+        print(f"🔄 Converting {len(inputs)} file(s) into {out_dir} ({'cache only' if args.cache_only else args.format})")
+        try:
+            tables, seconds = convert(inputs, schema, out_dir, args.format, args.chunk_rows, not args.cache_only)
+        except (ValueError, UnicodeDecodeError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        total = sum(t.rows for t in tables)
+        size = sum(os.path.getsize(p) for p in inputs)
+        print(f"📦 {total:,} rows in {seconds:.2f}s ({total / seconds if seconds > 0 else 0:,.0f} rows/s, "
+              f"{size / 1048576 / seconds if seconds > 0 else 0:.1f} MB/s)")
+        reader = CacheReader(cache_path)
+    cache_size = os.path.getsize(cache_path)
+    print(f"🗜️  Column cache: {cache_size / 1048576:.2f} MB for {sum(os.path.getsize(p) for p in inputs) / 1048576:.2f} MB of SQL")
+
+    print(f"\n{'Table':<16} {'Rows':>10} {'CRC32 sum':>18} {'Chain':<8} Status")
+    checks = {c.table: c for c in parse_checks(check_path)} if check_path else {}
+    failed = []
+    start = time.perf_counter()
+    for name, info in reader.tables.items():
+        check = checks.get(name)
+        if check is None:
+            print(f"{name:<16} {info['rows']:>10} {info['crc32']:>18} {'-':<8} converted")
+            continue
+        run_chain(reader, check)
+        if not check.ok:
+            failed.append(check)
+        print(f"{name:<16} {info['rows']:>10} {info['crc32']:>18} {check.function:<8} "
+              f"{'✅ OK' if check.ok else '❌ expected ' + str(check.expected_rows) + ' rows, ' + str(check.expected)}")
+    # With an explicit --input list, tables that are not in it are skipped.
+    absent = [c for c in checks.values() if c.table not in reader.tables]
+    for check in absent:
+        status = "⏭️  not in --input" if args.input else "❌ no rows in the inputs"
+        print(f"{check.table:<16} {'-':>10} {'-':>18} {check.function:<8} {status}")
+    if args.input:
+        absent = []
+    if checks:
+        print(f"\nChains recomputed from the cache in {time.perf_counter() - start:.2f}s ({os.path.basename(check_path)})")
+    if failed or absent:
+        sys.exit(1)
+    print(f"✅ Done. Load with: python3 scripts/bulk_loader.py --schema {args.schema} --data {out_dir}" if not args.cache_only else "✅ Done.")
+
+
+if __name__ == "__main__":
+    main()
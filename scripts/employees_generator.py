@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""Synthetic scale-up generator for the employees dataset.
+
+Produces a dataset statistically close to the shipped one (~300k employees,
+~2.8M salaries) at any scale factor, as bulk-loadable TSV chunks:
+
+- employees: uniform birth dates (1952-1965), hire dates from 1985 with a
+  decreasing density, 60/40 gender split, names drawn from fixed pools of the
+  original cardinality (1,275 first names, 1,637 last names);
+- dept_emp: the original department weights, ~10% of employees transferred
+  once; titles: one or two titles per employee along the engineer/staff
+  ladders; salaries: one row per year of employment with yearly raises;
+- temporal chains: the dept_emp, titles and salaries chains of an employee
+  start on the same date (the hire date for 60% of employees, a later one
+  otherwise) and are contiguous; current rows end at ``9999-01-01`` and ~20% of
+  employees leave before the data end date (2002-08-01);
+- foreign keys: every dept_emp/dept_manager/titles/salaries row references
+  a generated employee and one of the nine departments.
+
+Employees are generated in emp_no ranges (one chunk per range) by a pool of
+processes. Each chunk is built in memory in one batch and written with a
+single write per file; rows are also checksummed as they are generated, so
+the expected counts and ``SUM(CRC32(CONCAT_WS('#', cols...)))`` checksums
+are emitted without re-reading the files. Output is deterministic for a
+given scale, chunk size and seed.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import zlib
+from datetime import date
+from multiprocessing import Pool
+
+ORIGINAL_EMPLOYEES = 300024
+FIRST_EMP_NO = 10001
+CURRENT = "9999-01-01"
+
+BIRTH_START = date(1952, 2, 1)
+BIRTH_END = date(1965, 2, 1)
+HIRE_START = date(1985, 1, 1)
+HIRE_END = date(2000, 1, 28)
+DATA_END = date(2002, 8, 1)
+
+MALE_SHARE = 0.6
+LEAVER_SHARE = 0.2
+TRANSFER_SHARE = 0.105
+PROMOTION_SHARE = 0.55
+HISTORY_FROM_HIRE_SHARE = 0.6
+FIRST_NAMES = 1275
+LAST_NAMES = 1637
+
+# (dept_no, dept_name, weight in the original dept_emp)
+DEPARTMENTS = (
+    ("d001", "Marketing", 20211),
+    ("d002", "Finance", 17346),
+    ("d003", "Human Resources", 17786),
+    ("d004", "Production", 73485),
+    ("d005", "Development", 85707),
+    ("d006", "Quality Management", 20117),
+    ("d007", "Sales", 52245),
+    ("d008", "Research", 21126),
+    ("d009", "Customer Service", 23580),
+)
+ENGINEERING = {"d004", "d005", "d006", "d008"}
+
+# First title -> title after a promotion (None: no promotion ladder).
+ENGINEER_TITLES = (("Engineer", 0.8), ("Assistant Engineer", 0.1), ("Technique Leader", 0.1))
+PROMOTIONS = {
+    "Assistant Engineer": "Engineer",
+    "Engineer": "Senior Engineer",
+    "Staff": "Senior Staff",
+    "Technique Leader": None,
+}
+
+# Column lists, in TSV and checksum order (CONCAT_WS order of the verifier).
+TABLES = {
+    "departments": ("dept_no", "dept_name"),
+    "employees": ("emp_no", "birth_date", "first_name", "last_name", "gender", "hire_date"),
+    "dept_manager": ("emp_no", "dept_no", "from_date", "to_date"),
+    "dept_emp": ("emp_no", "dept_no", "from_date", "to_date"),
+    "titles": ("emp_no", "title", "from_date", "to_date"),
+    "salaries": ("emp_no", "salary", "from_date", "to_date"),
+}
+# Foreign key order: parents first.
+LOAD_ORDER = ("departments", "employees", "dept_manager", "dept_emp", "titles", "salaries")
+
+# Dates are handled as ordinals; strings and "+1 year" come from lookup tables.
+DATE_BASE = BIRTH_START.toordinal()
+DATE_LAST = DATA_END.toordinal() + 400
+
+
+def _date_tables():
+    strings = []
+    next_year = []
+    for ordinal in range(DATE_BASE, DATE_LAST + 1):
+        day = date.fromordinal(ordinal)
+        strings.append(day.isoformat())
+        try:
+            following = day.replace(year=day.year + 1)
+        except ValueError:  # Feb 29
+            following = day.replace(year=day.year + 1, day=28)
+        next_year.append(following.toordinal())
+    return strings, next_year
+
+
+DATE_STR, NEXT_YEAR = _date_tables()
+
+
+def date_str(ordinal):
+    return DATE_STR[ordinal - DATE_BASE]
+
+
+def name_pool(size, max_len, seed):
+    """Deterministic pool of distinct, pronounceable capitalized names."""
+    rng = random.Random(seed)
+    onsets = ("b", "br", "c", "ch", "d", "f", "g", "h", "j", "k", "l", "m", "n", "p", "r", "s", "st", "t", "v", "w", "z")
+    vowels = ("a", "e", "i", "o", "u", "ai", "ei", "ou")
+    codas = ("", "", "n", "r", "l", "s", "m", "t", "k")
+    names = set()
+    while len(names) < size:
+        syllables = rng.choice((2, 2, 3))
+        name = "".join(rng.choice(onsets) + rng.choice(vowels) + rng.choice(codas) for _ in range(syllables))
+        names.add(name[:max_len].capitalize())
+    return sorted(names)
+
+
+class Table:
+    """Rows of one table for one chunk, with their count and checksum."""
+
+    def __init__(self):
+        self.lines = []
+        self.crc = 0
+
+    def add(self, line):
+        self.lines.append(line)
+        self.crc += zlib.crc32(line.replace("\t", "#").encode("utf-8"))
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            if self.lines:
+                f.write("\n".join(self.lines) + "\n")
+        return {"file": os.path.basename(path), "rows": len(self.lines), "crc": self.crc}
+
+
+def salary_chain(rng, emp_no, start, end, final_to, table):
+    """One salary row per year from start to end; the last row ends at final_to."""
+    salary = int(rng.triangular(38623, 88958, 40000))
+    while True:
+        following = NEXT_YEAR[start - DATE_BASE]
+        if following >= end:
+            table.add(f"{emp_no}\t{salary}\t{date_str(start)}\t{final_to}")
+            return
+        table.add(f"{emp_no}\t{salary}\t{date_str(start)}\t{date_str(following)}")
+        start = following
+        salary = min(158220, int(salary * (1 + rng.uniform(0.0, 0.06))))
+
+
+def generate_chunk(task):
+    """Generates employees [first, first + count) into one chunk of files; returns its manifest."""
+    index, first, count, out_dir, seed = task
+    rng = random.Random(f"{seed}:{index}")
+    first_names = name_pool(FIRST_NAMES, 14, f"{seed}:first")
+    last_names = name_pool(LAST_NAMES, 16, f"{seed}:last")
+    dept_codes = [d[0] for d in DEPARTMENTS]
+    dept_weights = [d[2] for d in DEPARTMENTS]
+    birth_lo, birth_span = BIRTH_START.toordinal(), (BIRTH_END - BIRTH_START).days
+    hire_lo, hire_span = HIRE_START.toordinal(), (HIRE_END - HIRE_START).days
+    data_end = DATA_END.toordinal()
+
+    tables = {name: Table() for name in ("employees", "dept_emp", "titles", "salaries")}
+    employees, dept_emp, titles, salaries = (tables[n] for n in ("employees", "dept_emp", "titles", "salaries"))
+    managers = {}  # dept_no -> current employees hired in 1985 (manager candidates, chunk 0 only)
+
+    birth_offsets = [rng.randrange(birth_span + 1) for _ in range(count)]
+    hire_offsets = [int(rng.triangular(0, hire_span, 0)) for _ in range(count)]
+    for k in range(count):
+        emp_no = first + k
+        hire = hire_lo + hire_offsets[k]
+        gender = "M" if rng.random() < MALE_SHARE else "F"
+        employees.add(f"{emp_no}\t{date_str(birth_lo + birth_offsets[k])}\t{rng.choice(first_names)}\t"
+                      f"{rng.choice(last_names)}\t{gender}\t{date_str(hire)}")
+
+        leaves = rng.random() < LEAVER_SHARE and hire + 365 < data_end
+        end = rng.randint(hire + 365, data_end) if leaves else data_end
+        final_to = date_str(end) if leaves else CURRENT
+        # As in the original data, recorded history starts at the hire date
+        # for most employees and later for the others, for all three chains.
+        start = hire if rng.random() < HISTORY_FROM_HIRE_SHARE else rng.randint(hire, end - 1)
+
+        # dept_emp: one department, or two with a transfer in between.
+        dept = rng.choices(dept_codes, dept_weights)[0]
+        transferred = rng.random() < TRANSFER_SHARE and start + 60 < end
+        if transferred:
+            transfer = rng.randint(start + 30, end - 30)
+            second = rng.choices(dept_codes, dept_weights)[0]
+            while second == dept:
+                second = rng.choices(dept_codes, dept_weights)[0]
+            dept_emp.add(f"{emp_no}\t{dept}\t{date_str(start)}\t{date_str(transfer)}")
+            dept_emp.add(f"{emp_no}\t{second}\t{date_str(transfer)}\t{final_to}")
+        else:
+            dept_emp.add(f"{emp_no}\t{dept}\t{date_str(start)}\t{final_to}")
+        if index == 0 and start < hire_lo + 365 and not leaves and not transferred:
+            managers.setdefault(dept, []).append(emp_no)
+
+        # titles: the engineer ladder in technical departments, staff elsewhere.
+        if dept in ENGINEERING:
+            title = rng.choices([t for t, _ in ENGINEER_TITLES], [w for _, w in ENGINEER_TITLES])[0]
+        else:
+            title = "Staff"
+        promoted = PROMOTIONS[title]
+        if promoted and rng.random() < PROMOTION_SHARE and start + 365 < end - 1:
+            promotion = rng.randint(start + 365, end - 1)
+            titles.add(f"{emp_no}\t{title}\t{date_str(start)}\t{date_str(promotion)}")
+            titles.add(f"{emp_no}\t{promoted}\t{date_str(promotion)}\t{final_to}")
+        else:
+            titles.add(f"{emp_no}\t{title}\t{date_str(start)}\t{final_to}")
+
+        salary_chain(rng, emp_no, start, end, final_to, salaries)
+
+    manifest = {name: table.write(os.path.join(out_dir, f"{name}.{index:05d}.tsv")) for name, table in tables.items()}
+    manifest["_managers"] = managers
+    return index, manifest
+
+
+def manager_table(managers, seed):
+    """2-4 consecutive managers per department, the last one current."""
+    rng = random.Random(f"{seed}:managers")
+    table = Table()
+    for dept_no, _, _ in DEPARTMENTS:
+        candidates = managers.get(dept_no, [])
+        if not candidates:
+            continue
+        chosen = sorted(rng.sample(candidates, min(len(candidates), rng.randint(2, 4))))
+        start = HIRE_START.toordinal()
+        span = DATA_END.toordinal() - start
+        cuts = sorted(rng.sample(range(365, span - 365), len(chosen) - 1))
+        bounds = [start] + [start + c for c in cuts]
+        for position, emp_no in enumerate(chosen):
+            to_date = date_str(bounds[position + 1]) if position + 1 < len(chosen) else CURRENT
+            table.add(f"{emp_no}\t{dept_no}\t{date_str(bounds[position])}\t{to_date}")
+    return table
+
+
+def generate(scale, out_dir, chunk_size=50000, jobs=None, seed=1):
+    """Generates the dataset into out_dir; returns the manifest (also written as manifest.json)."""
+    total = max(1, int(round(ORIGINAL_EMPLOYEES * scale)))
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = [(index, FIRST_EMP_NO + first, min(chunk_size, total - first), out_dir, seed)
+             for index, first in enumerate(range(0, total, chunk_size))]
+
+    chunks = {}
+    start = time.time()
+    with Pool(processes=jobs) as pool:
+        for done, (index, manifest) in enumerate(pool.imap_unordered(generate_chunk, tasks), 1):
+            chunks[index] = manifest
+            print(f"  chunk {index:05d} done ({done}/{len(tasks)}, {time.time() - start:.1f}s)")
+
+    departments = Table()
+    for dept_no, dept_name, _ in DEPARTMENTS:
+        departments.add(f"{dept_no}\t{dept_name}")
+    single = {
+        "departments": departments.write(os.path.join(out_dir, "departments.tsv")),
+        "dept_manager": manager_table(chunks[0].pop("_managers"), seed).write(os.path.join(out_dir, "dept_manager.tsv")),
+    }
+
+    tables = {}
+    for name in LOAD_ORDER:
+        files = [single[name]] if name in single else [chunks[i][name] for i in sorted(chunks)]
+        tables[name] = {
+            "columns": list(TABLES[name]),
+            "files": [f["file"] for f in files],
+            "rows": sum(f["rows"] for f in files),
+            "crc": sum(f["crc"] for f in files),
+        }
+    manifest = {"scale": scale, "seed": seed, "employees": total, "chunk_size": chunk_size,
+                "first_emp_no": FIRST_EMP_NO, "load_order": list(LOAD_ORDER), "tables": tables}
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    write_expected(manifest, os.path.join(out_dir, "expected.txt"))
+    return manifest
+
+
+def write_expected(manifest, path):
+    """verify_data.sh expected values: table:count:checksum:columns."""
+    with open(path, "w") as f:
+        f.write(f"# scale={manifest['scale']} seed={manifest['seed']} employees={manifest['employees']}\n")
+        f.write("# checksum = SUM(CRC32(CONCAT_WS('#', columns...)))\n")
+        for name in manifest["load_order"]:
+            table = manifest["tables"][name]
+            f.write(f"{name}:{table['rows']}:{table['crc']}:{','.join(table['columns'])}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a scaled-up synthetic employees dataset as TSV chunks.")
+    parser.add_argument("--scale", type=float, default=10, help="Scale factor relative to the original 300,024 employees")
+    parser.add_argument("--out", default=None, help="Output directory (default: employees/generated/x<scale>)")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Employees per chunk (one set of TSV files per chunk)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Generator processes")
+    parser.add_argument("--seed", default="1", help="Random seed (same seed, scale and chunk size give the same data)")
+    args = parser.parse_args()
+
+    if args.scale <= 0 or args.chunk_size <= 0:
+        print("Error: --scale and --chunk-size must be positive")
+        sys.exit(1)
+    out_dir = args.out or os.path.join("employees", "generated", f"x{args.scale:g}")
+    print(f"🏭 Generating employees x{args.scale:g} into {out_dir} ({args.jobs} processes)")
+    start = time.time()
+    manifest = generate(args.scale, out_dir, args.chunk_size, args.jobs, args.seed)
+    elapsed = time.time() - start
+    rows = sum(t["rows"] for t in manifest["tables"].values())
+    for name in manifest["load_order"]:
+        table = manifest["tables"][name]
+        print(f"{name:<15} {table['rows']:>14,} rows  {len(table['files']):>5} file(s)  crc {table['crc']}")
+    print(f"✅ {rows:,} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s). Expected values: {os.path.join(out_dir, 'expected.txt')}")
+
+
+if __name__ == "__main__":
+    main()
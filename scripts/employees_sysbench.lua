@@ -4,8 +4,40 @@
 local queries = {}
 local query_count = 0
 
+-- Unescape a statement written by scripts/sql_splitter.py (one per line,
+-- backslash, newline and tab escaped like mariadb batch output)
+local unescapes = { ["\\"] = "\\", n = "\n", t = "\t", ["0"] = "\0" }
+function unescape_statement(line)
+    return (string.gsub(line, "\\(.)", function(c) return unescapes[c] or ("\\" .. c) end))
+end
+
+-- Load pre-split statements, streaming the file line by line
+function load_statements(stmt_file)
+    local f = io.open(stmt_file, "r")
+    if not f then
+        return false
+    end
+    for line in f:lines() do
+        if line ~= "" then
+            table.insert(queries, unescape_statement(line))
+        end
+    end
+    f:close()
+    return true
+end
+
 -- Load queries from the SQL file
 function load_queries()
+    -- Statements split by scripts/sql_splitter.py handle quotes, comments,
+    -- DELIMITER blocks and routine bodies; prefer them when available.
+    if load_statements("/tmp/req_employees.stmts") then
+        query_count = #queries
+        if query_count == 0 then
+            error("No queries found in /tmp/req_employees.stmts")
+        end
+        return
+    end
+
     local sql_file = "/tmp/req_employees.sql"
     local f = io.open(sql_file, "r")
     if not f then
@@ -48,7 +80,10 @@ end
 -- sysbench entry point
 function thread_init()
     load_queries()
-    query_index = 0
+    -- Threads start at different offsets, so that with rendered templates
+    -- (scripts/query_templates.py) they do not all draw the same keys in
+    -- lockstep
+    query_index = math.floor(query_count * sysbench.tid / sysbench.opt.threads)
 end
 
 -- sysbench event loop
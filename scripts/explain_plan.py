@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Typed plan model built from ``EXPLAIN FORMAT=JSON``.
+
+Both the MariaDB and the MySQL JSON layouts are understood: the parser walks
+the document, turns every ``"table": {...}`` node into a ``PlanTable`` and
+records the query block nesting, temporary table and filesort context it was
+found in. ``ExplainPlan`` then derives the estimated rows examined and cost
+used by the analyzer's scoring.
+"""
+import json
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+# Keys whose subtree is sorted through a filesort.
+FILESORT_KEYS = ("filesort", "read_sorted_file")
+
+# Keys whose subtree is a nested query block.
+SUBQUERY_KEYS = ("subqueries", "materialized", "derived", "query_specifications", "attached_subqueries", "optimized_away_subqueries")
+
+
+@dataclass
+class PlanTable:
+    """One table access of the plan."""
+    table_name: str
+    access_type: str = ""
+    key: Optional[str] = None
+    key_length: Optional[str] = None
+    possible_keys: List[str] = field(default_factory=list)
+    rows: float = 0.0
+    filtered: float = 100.0
+    cost: Optional[float] = None
+    attached_condition: Optional[str] = None
+    using_temporary: bool = False
+    using_filesort: bool = False
+    select_id: int = 1
+    depth: int = 0
+
+    @property
+    def is_derived(self):
+        return self.table_name.startswith("<")
+
+
+@dataclass
+class QueryBlock:
+    """A SELECT (or subquery) and the tables it joins, in join order."""
+    select_id: int
+    depth: int
+    cost: Optional[float] = None
+    tables: List[PlanTable] = field(default_factory=list)
+
+    @property
+    def rows_examined(self):
+        """Nested-loop estimate: each table is read once per row of the prefix."""
+        examined = 0.0
+        prefix = 1.0
+        for table in self.tables:
+            examined += prefix * table.rows
+            prefix *= max(table.rows * table.filtered / 100.0, 1.0)
+        return examined
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ExplainPlan:
+    """Plan tree parsed from an EXPLAIN FORMAT=JSON document."""
+
+    def __init__(self, document):
+        self.document = document
+        self.blocks: List[QueryBlock] = []
+        self._walk(document, depth=-1, block=None, temporary=False, filesort=False)
+
+    @classmethod
+    def from_json(cls, text):
+        """Parses the JSON text; returns None when it is not a plan document."""
+        try:
+            document = json.loads(text)
+        except (TypeError, ValueError):
+            return None
+        if not isinstance(document, dict) or "query_block" not in document:
+            return None
+        return cls(document)
+
+    def _walk(self, node, depth, block, temporary, filesort):
+        if isinstance(node, list):
+            for child in node:
+                self._walk(child, depth, block, temporary, filesort)
+            return
+        if not isinstance(node, dict):
+            return
+
+        # MySQL flags its operations inline instead of nesting them.
+        temporary = temporary or bool(node.get("using_temporary_table"))
+        filesort = filesort or bool(node.get("using_filesort"))
+
+        for key, child in node.items():
+            if key == "query_block" and isinstance(child, dict):
+                cost = _number(child.get("cost"))
+                if cost is None and isinstance(child.get("cost_info"), dict):
+                    cost = _number(child["cost_info"].get("query_cost"))
+                new_block = QueryBlock(int(_number(child.get("select_id")) or 1), depth + 1, cost)
+                self.blocks.append(new_block)
+                self._walk(child, depth + 1, new_block, False, False)
+            elif key == "table" and isinstance(child, dict) and "table_name" in child:
+                self._add_table(child, depth, block, temporary, filesort)
+                self._walk(child, depth, block, temporary, filesort)
+            elif key in FILESORT_KEYS:
+                self._walk(child, depth, block, temporary, True)
+            elif key == "temporary_table":
+                self._walk(child, depth, block, True, filesort)
+            elif key in SUBQUERY_KEYS or isinstance(child, (dict, list)):
+                self._walk(child, depth, block, temporary, filesort)
+
+    def _add_table(self, node, depth, block, temporary, filesort):
+        cost = _number(node.get("cost"))
+        if cost is None and isinstance(node.get("cost_info"), dict):
+            cost = _number(node["cost_info"].get("prefix_cost"))
+        rows = _number(node.get("rows"))
+        if rows is None:
+            rows = _number(node.get("rows_examined_per_scan")) or 0.0
+        filtered = _number(node.get("filtered"))
+        table = PlanTable(
+            table_name=str(node.get("table_name")),
+            access_type=str(node.get("access_type", "")),
+            key=node.get("key"),
+            key_length=None if node.get("key_length") is None else str(node.get("key_length")),
+            possible_keys=list(node.get("possible_keys") or []),
+            rows=rows,
+            filtered=100.0 if filtered is None else filtered,
+            cost=cost,
+            attached_condition=node.get("attached_condition"),
+            using_temporary=temporary,
+            using_filesort=filesort,
+            select_id=block.select_id if block else 1,
+            depth=max(depth, 0),
+        )
+        if block is None:
+            block = QueryBlock(table.select_id, table.depth)
+            self.blocks.append(block)
+        block.tables.append(table)
+
+    @property
+    def tables(self):
+        return [t for block in self.blocks for t in block.tables]
+
+    def table_names(self):
+        """Real (non-derived) table names or aliases referenced by the plan."""
+        return sorted(set(t.table_name for t in self.tables if not t.is_derived))
+
+    def full_scans(self, min_rows=0):
+        """Tables read with ALL access whose estimated rows exceed min_rows."""
+        return [t for t in self.tables if t.access_type == "ALL" and t.rows > min_rows and not t.is_derived]
+
+    @property
+    def using_temporary(self):
+        return any(t.using_temporary for t in self.tables) or _contains_key(self.document, "temporary_table")
+
+    @property
+    def using_filesort(self):
+        return any(t.using_filesort for t in self.tables) or any(_contains_key(self.document, k) for k in FILESORT_KEYS)
+
+    @property
+    def rows_examined(self):
+        return sum(block.rows_examined for block in self.blocks)
+
+    @property
+    def cost(self):
+        """Top-level optimizer cost, or the sum of table costs when not reported."""
+        top = [b.cost for b in self.blocks if b.depth == 0 and b.cost is not None]
+        if top:
+            return sum(top)
+        costs = [t.cost for t in self.tables if t.cost is not None]
+        return sum(costs) if costs else None
+
+    def render(self):
+        """Tabular, tab-separated rendering for text reports."""
+        header = ["id", "depth", "table", "type", "key", "key_len", "rows", "filtered", "cost", "extra"]
+        lines = ["\t".join(header)]
+        for t in self.tables:
+            extra = []
+            if t.attached_condition:
+                extra.append(f"where: {t.attached_condition}")
+            if t.using_temporary:
+                extra.append("Using temporary")
+            if t.using_filesort:
+                extra.append("Using filesort")
+            lines.append("\t".join([
+                str(t.select_id), str(t.depth), t.table_name, t.access_type or "NULL",
+                t.key or "NULL", t.key_length or "NULL", f"{t.rows:.0f}", f"{t.filtered:.2f}",
+                "NULL" if t.cost is None else f"{t.cost:.4f}", "; ".join(extra) or "NULL",
+            ]))
+        return "\n".join(lines) + "\n"
+
+
+def _contains_key(node, key):
+    if isinstance(node, dict):
+        return key in node or any(_contains_key(v, key) for v in node.values())
+    if isinstance(node, list):
+        return any(_contains_key(v, key) for v in node)
+    return False
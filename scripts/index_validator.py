@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""What-if validation of the analyzer's index suggestions.
+
+Each candidate ``CREATE INDEX`` is actually built, the queries that suggested
+it are EXPLAINed and timed again, and the plan change, latency delta, build
+time and on-disk size are recorded. Only candidates with a measured speedup
+are kept as suggestions.
+
+Two isolation modes keep the real schema usable:
+
+- ``scratch``: candidate tables are copied into a scratch database (other
+  tables are exposed through views) and indexes are built on the copies.
+- ``ignored``: the index is added to the real table as ``IGNORED`` (MariaDB
+  10.6+), so no other session's plans change until it is switched to
+  ``NOT IGNORED`` for the measurement, then it is dropped. While it is
+  ``NOT IGNORED`` the optimizer of every session on the server may use it,
+  so run this mode when no other workload depends on stable plans.
+
+Every index that was actually created is dropped again, even when a later
+step of its validation fails or raises.
+"""
+import argparse
+import re
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from db_backend import open_backend, parse_rows
+
+INDEX_DDL = re.compile(r"CREATE INDEX (\w+) ON (\w+)\((\w+)\);")
+
+INDEX_SIZE_SQL = """
+SELECT stat_value * @@innodb_page_size AS bytes
+FROM mysql.innodb_index_stats
+WHERE database_name = '{db}' AND table_name = '{table}' AND index_name = '{index}' AND stat_name = 'size';
+"""
+
+TABLE_ROWS_SQL = """
+SELECT TABLE_NAME, TABLE_TYPE, TABLE_ROWS
+FROM information_schema.TABLES
+WHERE TABLE_SCHEMA = '{db}';
+"""
+
+
+@dataclass
+class IndexValidation:
+    """Measured effect of one candidate index on one query."""
+    ddl: str
+    table: str
+    column: str
+    query_id: int
+    base_median: float = 0.0
+    new_median: float = 0.0
+    base_p95: float = 0.0
+    new_p95: float = 0.0
+    base_rows_examined: Optional[float] = None
+    new_rows_examined: Optional[float] = None
+    plan_changes: List[str] = field(default_factory=list)
+    build_seconds: float = 0.0
+    size_bytes: Optional[int] = None
+    table_rows: Optional[int] = None
+    proven: bool = False
+    error: str = ""
+
+    @property
+    def speedup(self):
+        return self.base_median / self.new_median if self.new_median > 0 else 0.0
+
+    @property
+    def bytes_per_row(self):
+        if self.size_bytes is None or not self.table_rows:
+            return None
+        return self.size_bytes / self.table_rows
+
+    def summary(self):
+        """One-line description used in the text and HTML reports."""
+        if self.error:
+            return f"{self.ddl} -> not validated ({self.error})"
+        size = "n/a" if self.size_bytes is None else f"{self.size_bytes / 1048576:.1f} MB"
+        plan = "; ".join(self.plan_changes) or "plan unchanged"
+        return (f"{self.ddl} -> median {self.base_median:.4f}s => {self.new_median:.4f}s (x{self.speedup:.2f}), "
+                f"{plan}, size {size}, build {self.build_seconds:.2f}s"
+                f"{'' if self.proven else ' [rejected]'}")
+
+
+def parse_candidate(ddl):
+    """Returns (index, table, column) from a generated CREATE INDEX statement."""
+    match = INDEX_DDL.match(ddl.strip())
+    return match.groups() if match else None
+
+
+def plan_changes(base_plan, new_plan):
+    """Describes per-table access changes between two ExplainPlans."""
+    if base_plan is None or new_plan is None:
+        return []
+    before = {t.table_name: t for t in base_plan.tables}
+    changes = []
+    for table in new_plan.tables:
+        old = before.get(table.table_name)
+        if old is None:
+            continue
+        if (old.access_type, old.key) != (table.access_type, table.key):
+            changes.append(f"{table.table_name}: {old.access_type}/{old.key or '-'} -> {table.access_type}/{table.key or '-'}")
+    return changes
+
+
+class IndexValidator:
+    """Builds candidate indexes in isolation and measures their effect.
+
+    ``measure(query, args, backend)`` and ``explain(query, args, backend)``
+    are the analyzer's own timing and EXPLAIN FORMAT=JSON functions, so the
+    validation uses exactly the same methodology as the main run.
+    """
+
+    def __init__(self, args, backend, measure, explain, mode="scratch", min_gain=0.1):
+        self.args = args
+        self.backend = backend
+        self.measure = measure
+        self.explain = explain
+        self.mode = mode
+        self.min_gain = min_gain
+        self.scratch_db = f"{args.db}_whatif"
+        self.env_args = args
+        self.env_backend = backend
+
+    def _setup_scratch(self, tables):
+        """Copies candidate tables into the scratch database, views for the rest."""
+        db, scratch = self.args.db, self.scratch_db
+        self._ddl(f"DROP DATABASE IF EXISTS `{scratch}`")
+        self._ddl(f"CREATE DATABASE `{scratch}`")
+        output, _ = self.backend.query(TABLE_ROWS_SQL.format(db=db))
+        for row in parse_rows(output):
+            name = row["TABLE_NAME"]
+            if name in tables:
+                self._ddl(f"CREATE TABLE `{scratch}`.`{name}` LIKE `{db}`.`{name}`")
+                self._ddl(f"INSERT INTO `{scratch}`.`{name}` SELECT * FROM `{db}`.`{name}`")
+            else:
+                self._ddl(f"CREATE VIEW `{scratch}`.`{name}` AS SELECT * FROM `{db}`.`{name}`")
+        self.env_args = argparse.Namespace(**vars(self.args))
+        self.env_args.db = scratch
+        self.env_args.backend = self.backend.name
+        self.env_args.pool_size = 1
+        self.env_backend = open_backend(self.env_args)
+
+    def _teardown_scratch(self):
+        if self.env_backend is not self.backend:
+            self.env_backend.close()
+        self._ddl(f"DROP DATABASE IF EXISTS `{self.scratch_db}`")
+
+    def _ddl(self, sql):
+        """Runs a DDL statement on the main backend; returns (seconds, error)."""
+        elapsed, _, err = self.backend.timed_query(sql)
+        return elapsed, err.strip()
+
+    def _table_rows(self, db, table):
+        output, _ = self.env_backend.query(TABLE_ROWS_SQL.format(db=db))
+        for row in parse_rows(output):
+            if row["TABLE_NAME"] == table and row["TABLE_ROWS"].isdigit():
+                return int(row["TABLE_ROWS"])
+        return None
+
+    def _index_size(self, db, table, index):
+        output, _ = self.backend.query(INDEX_SIZE_SQL.format(db=db, table=table, index=index))
+        rows = parse_rows(output)
+        try:
+            return int(float(rows[0]["bytes"])) if rows else None
+        except (KeyError, ValueError):
+            return None
+
+    def _create(self, db, index, table, column):
+        """Builds a candidate; returns (seconds, created, error).
+
+        ``created`` tells whether the index exists afterwards, which is also
+        the case when switching it to NOT IGNORED failed.
+        """
+        if self.mode == "ignored":
+            elapsed, err = self._ddl(f"ALTER TABLE `{db}`.`{table}` ADD INDEX `{index}` (`{column}`) IGNORED")
+            if err:
+                return elapsed, False, err
+            _, err = self._ddl(f"ALTER TABLE `{db}`.`{table}` ALTER INDEX `{index}` NOT IGNORED")
+            return elapsed, True, err
+        elapsed, err = self._ddl(f"CREATE INDEX `{index}` ON `{db}`.`{table}` (`{column}`)")
+        return elapsed, not err, err
+
+    def validate(self, items):
+        """Validates the index_sql of every item; returns {item id: [IndexValidation]}.
+
+        Each distinct candidate is built once and measured against every query
+        that suggested it, then dropped before the next candidate.
+        """
+        candidates = {}
+        for item in items:
+            for ddl in item['index_sql']:
+                parsed = parse_candidate(ddl)
+                if parsed:
+                    candidates.setdefault(ddl, (parsed, []))[1].append(item)
+        if not candidates:
+            return {}
+
+        results = {}
+        tables = set(parsed[1] for parsed, _ in candidates.values())
+        try:
+            if self.mode == "scratch":
+                self._setup_scratch(tables)
+            db = self.env_args.db
+
+            # Baselines in the measurement environment, before any candidate exists.
+            baselines = {}
+            for _, queued in candidates.values():
+                for item in queued:
+                    if item['id'] not in baselines:
+                        plan, _ = self.explain(item['query'], self.env_args, self.env_backend)
+                        baselines[item['id']] = (self.measure(item['query'], self.env_args, self.env_backend), plan)
+
+            for ddl, ((index, table, column), queued) in candidates.items():
+                build_seconds, created, err = self._create(db, index, table, column)
+                try:
+                    size = None if err else self._index_size(db, table, index)
+                    rows = self._table_rows(db, table)
+                    for item in queued:
+                        check = IndexValidation(ddl, table, column, item['id'], build_seconds=build_seconds,
+                                                size_bytes=size, table_rows=rows, error=err)
+                        if not err:
+                            self._measure(check, item, baselines[item['id']])
+                        results.setdefault(item['id'], []).append(check)
+                finally:
+                    if created:
+                        _, drop_err = self._ddl(f"DROP INDEX `{index}` ON `{db}`.`{table}`")
+                        if drop_err:
+                            print(f"⚠️ Could not drop candidate index {index} on {db}.{table}: {drop_err}")
+        finally:
+            if self.mode == "scratch":
+                self._teardown_scratch()
+        return results
+
+    def _measure(self, check, item, baseline):
+        base_timing, base_plan = baseline
+        new_plan, _ = self.explain(item['query'], self.env_args, self.env_backend)
+        new_timing = self.measure(item['query'], self.env_args, self.env_backend)
+        check.base_median, check.base_p95 = base_timing['median'], base_timing['p95']
+        check.new_median, check.new_p95 = new_timing['median'], new_timing['p95']
+        check.base_rows_examined = base_plan.rows_examined if base_plan else None
+        check.new_rows_examined = new_plan.rows_examined if new_plan else None
+        check.plan_changes = plan_changes(base_plan, new_plan)
+        # Proven: the median improves by min_gain and even the p95 beats the old median.
+        check.proven = (check.new_median < check.base_median * (1 - self.min_gain)
+                        and check.new_p95 < check.base_median)
+
+
+def run_validation(summary_data, args, backend, measure, explain):
+    """Validates suggestions in place: keeps only proven DDL in item['index_sql']."""
+    validator = IndexValidator(args, backend, measure, explain, args.validate_indexes, args.index_min_gain)
+    start = time.perf_counter()
+    results = validator.validate(summary_data)
+    for item in summary_data:
+        checks = results.get(item['id'], [])
+        item['index_validation'] = checks
+        if checks:
+            item['index_sql'] = [c.ddl for c in checks if c.proven]
+    return time.perf_counter() - start
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""Parallel, chunked data integrity verifier with drill-down.
+
+``verify_data.sh`` checks one whole table at a time (CHECKSUM TABLE then
+COUNT(*)), so a bad load can only be reported as "ERROR" for a table of
+millions of rows. This verifier compares the server against the dataset
+files that were (or should have been) loaded:
+
+1. The reference side reads the input files (generated TSV chunks with their
+   ``manifest.json``, or the ``load_*.dump`` INSERT scripts sourced by the
+   schema script) in worker processes and keeps, per table, a row count and
+   a hash sum per bucket of ``--bucket`` primary key values.
+2. Tables whose primary key starts with an integer column (``emp_no``) are
+   split into ``--chunk-size`` key ranges; other tables are one chunk. Every
+   chunk of every table is checked concurrently on ``--jobs`` connections
+   with ``COUNT(*)`` and ``SUM(CRC32(CONCAT_WS('#', columns)))`` (or an MD5
+   based sum, as in ``test_employees_md5.sql``), so the run takes about as
+   long as the largest chunk rather than the sum of all tables.
+3. Mismatching chunks only are split into ``--fanout`` sub-ranges, down to a
+   single bucket; the bucket ranges that still differ are then resolved key
+   by key (one GROUP BY per range against a re-read of the matching
+   reference rows), giving the exact ``emp_no`` values that are missing,
+   extra or different.
+
+The sums are the ones ``employees_generator.py`` writes to ``expected.txt``:
+CRC32 of the ``'#'``-joined row text.
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Tuple
+
+from bulk_loader import find_sources, parse_schema
+from db_backend import open_backend, parse_rows
+from dump_converter import iter_rows, row_bytes
+
+HASHES = ("crc32", "md5")
+MAX_LISTED_KEYS = 20
+
+
+@dataclass
+class Check:
+    """Server and reference aggregates of one key range (lo/hi None: whole table)."""
+    table: str
+    lo: Optional[int]
+    hi: Optional[int]
+    depth: int
+    server: Tuple[int, int]
+    reference: Tuple[int, int]
+
+    @property
+    def matches(self):
+        return self.server == self.reference
+
+    @property
+    def label(self):
+        return "whole table" if self.lo is None else f"{self.lo}-{self.hi}"
+
+
+@dataclass
+class KeyDiff:
+    table: str
+    key: str
+    kind: str  # missing | extra | different
+    server: Tuple[int, int]
+    reference: Tuple[int, int]
+
+
+@dataclass
+class TableResult:
+    name: str
+    key: str
+    chunks: int = 0
+    server_rows: int = 0
+    reference_rows: int = 0
+    bad_chunks: int = 0
+    queries: int = 0
+    leaves: List[Check] = field(default_factory=list)
+    keys: List[KeyDiff] = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return self.bad_chunks == 0
+
+
+def row_hash(data, hash_name):
+    """Python side of hash_sql(): CRC32, or the first 60 bits of the MD5, of the row bytes."""
+    if hash_name == "md5":
+        return int(hashlib.md5(data).hexdigest()[:15], 16)
+    return zlib.crc32(data)
+
+
+def hash_sql(columns, hash_name):
+    row = "CONCAT_WS('#', " + ", ".join(f"`{c}`" for c in columns) + ")"
+    if hash_name == "md5":
+        return f"CAST(CONV(SUBSTRING(MD5({row}), 1, 15), 16, 10) AS UNSIGNED)"
+    return f"CRC32({row})"
+
+
+def scan_file(task):
+    """Worker: per-bucket (or, with key ranges, per-key) [count, hash sum] of one input file."""
+    table, path, kind, key_index, integer_key, bucket, hash_name, ranges = task
+    sums: Dict = {}
+    for values in iter_rows(path, kind, table):
+        key = values[key_index]
+        if integer_key:
+            key = int(key)
+        elif isinstance(key, bytes):
+            key = key.decode("utf-8")
+        if ranges is not None:
+            if integer_key and not any(lo <= key <= hi for lo, hi in ranges):
+                continue
+            slot = key
+        else:
+            slot = key // bucket if integer_key else None
+        h = row_hash(row_bytes(values), hash_name)
+        entry = sums.get(slot)
+        if entry is None:
+            sums[slot] = [1, h]
+        else:
+            entry[0] += 1
+            entry[1] += h
+    return table, sums
+
+
+def merge(target, sums):
+    for slot, (n, h) in sums.items():
+        entry = target.get(slot)
+        if entry is None:
+            target[slot] = [n, h]
+        else:
+            entry[0] += n
+            entry[1] += h
+
+
+class Reference:
+    """Expected aggregates computed from the dataset files, without a server."""
+
+    def __init__(self, schema, sources, bucket, hash_name, workers):
+        self.schema = schema
+        self.sources = sources
+        self.bucket = bucket
+        self.hash_name = hash_name
+        self.workers = workers
+        self.buckets: Dict[str, Dict] = {}
+
+    def key_index(self, source):
+        table = self.schema.tables[source.table]
+        columns = list(source.columns) if source.columns else table.columns
+        return columns.index(table.primary_key[0]) if table.primary_key else 0
+
+    def columns(self, table):
+        """Column order of the input rows, which is the order hashed on both sides."""
+        sources = self.sources.get(table)
+        if sources and sources[0].columns:
+            return list(sources[0].columns)
+        return self.schema.tables[table].columns
+
+    def _scan(self, tables, ranges=None):
+        tasks = []
+        for table in tables:
+            integer_key = self.schema.tables[table].integer_key
+            for source in self.sources[table]:
+                tasks.append((table, source.path, source.kind, self.key_index(source), integer_key,
+                              self.bucket, self.hash_name, ranges.get(table) if ranges else None))
+        result: Dict[str, Dict] = {table: {} for table in tables}
+        # Largest files first so that one big dump does not start last.
+        tasks.sort(key=lambda t: -os.path.getsize(t[1]))
+        if self.workers > 1 and len(tasks) > 1:
+            with Pool(min(self.workers, len(tasks))) as pool:
+                for table, sums in pool.imap_unordered(scan_file, tasks):
+                    merge(result[table], sums)
+        else:
+            for task in tasks:
+                table, sums = scan_file(task)
+                merge(result[table], sums)
+        return result
+
+    def load(self, tables):
+        self.buckets = self._scan(tables)
+
+    def key_range(self, table):
+        slots = [s for s in self.buckets[table] if s is not None]
+        if not slots:
+            return None
+        return min(slots) * self.bucket, (max(slots) + 1) * self.bucket - 1
+
+    def aggregate(self, table, lo, hi):
+        sums = self.buckets[table]
+        if lo is None:
+            entries = list(sums.values())
+        else:
+            entries = [sums[b] for b in range(lo // self.bucket, hi // self.bucket + 1) if b in sums]
+        return sum(e[0] for e in entries), sum(e[1] for e in entries)
+
+    def keys(self, leaves):
+        """Per-key aggregates for the given ranges, re-reading only the tables concerned."""
+        ranges: Dict[str, List[Tuple[int, int]]] = {}
+        for leaf in leaves:
+            if leaf.lo is not None:
+                ranges.setdefault(leaf.table, []).append((leaf.lo, leaf.hi))
+            else:
+                ranges.setdefault(leaf.table, [])
+        return self._scan(list(ranges), ranges)
+
+
+def align_down(value, step):
+    return value - value % step
+
+
+def chunk_ranges(lo, hi, chunk_size):
+    start = lo
+    while start <= hi:
+        yield start, min(hi, start + chunk_size - 1)
+        start += chunk_size
+
+
+def split_range(lo, hi, parts, bucket):
+    """Splits an aligned range into at most ``parts`` bucket-aligned sub-ranges."""
+    buckets = (hi - lo + 1) // bucket
+    step = max(1, -(-buckets // parts)) * bucket
+    return list(chunk_ranges(lo, hi, step))
+
+
+class Verifier:
+    """Runs the server side of the checks on a pooled backend."""
+
+    def __init__(self, args, backend, reference):
+        self.args = args
+        self.backend = backend
+        self.reference = reference
+
+    def _query(self, sql):
+        output, err = self.backend.query(sql)
+        if err.strip():
+            raise RuntimeError(err.strip())
+        return parse_rows(output)
+
+    def _where(self, table, lo, hi):
+        if lo is None:
+            return ""
+        key = self.reference.schema.tables[table].primary_key[0]
+        return f" WHERE `{key}` BETWEEN {lo} AND {hi}"
+
+    def server_range(self, table):
+        key = self.reference.schema.tables[table].primary_key[0]
+        rows = self._query(f"SELECT MIN(`{key}`) AS lo, MAX(`{key}`) AS hi FROM `{table}`")
+        if not rows or rows[0]["lo"] in ("NULL", ""):
+            return None
+        return int(rows[0]["lo"]), int(rows[0]["hi"])
+
+    def check(self, table, lo, hi, depth):
+        expr = hash_sql(self.reference.columns(table), self.args.hash)
+        rows = self._query(f"SELECT COUNT(*) AS n, COALESCE(SUM({expr}), 0) AS h FROM `{table}`{self._where(table, lo, hi)}")
+        server = (int(rows[0]["n"]), int(rows[0]["h"])) if rows else (0, 0)
+        return Check(table, lo, hi, depth, server, self.reference.aggregate(table, lo, hi))
+
+    def server_keys(self, leaf):
+        table = self.reference.schema.tables[leaf.table]
+        key = table.primary_key[0] if table.primary_key else self.reference.columns(leaf.table)[0]
+        expr = hash_sql(self.reference.columns(leaf.table), self.args.hash)
+        rows = self._query(f"SELECT `{key}` AS k, COUNT(*) AS n, SUM({expr}) AS h FROM `{leaf.table}`"
+                           f"{self._where(leaf.table, leaf.lo, leaf.hi)} GROUP BY `{key}`")
+        convert = int if table.integer_key else str
+        return leaf, {convert(r["k"]): (int(r["n"]), int(r["h"])) for r in rows}
+
+    def plan(self, tables):
+        """Top-level chunks: key ranges covering both the reference and the server keys."""
+        chunks = []
+        step = max(self.args.bucket, align_down(self.args.chunk_size, self.args.bucket))
+        for table in tables:
+            if not self.reference.schema.tables[table].integer_key:
+                chunks.append((table, None, None))
+                continue
+            bounds = [b for b in (self.reference.key_range(table), self.server_range(table)) if b]
+            if not bounds:
+                chunks.append((table, None, None))
+                continue
+            lo = align_down(min(b[0] for b in bounds), self.args.bucket)
+            hi = align_down(max(b[1] for b in bounds), self.args.bucket) + self.args.bucket - 1
+            chunks.extend((table, a, b) for a, b in chunk_ranges(lo, hi, step))
+        return chunks
+
+    def run(self, tables):
+        results = {t: TableResult(t, (self.reference.schema.tables[t].primary_key or ["-"])[0]) for t in tables}
+        with ThreadPoolExecutor(max_workers=self.args.jobs) as pool:
+            pending = {pool.submit(self.check, table, lo, hi, 0) for table, lo, hi in self.plan(tables)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    check = future.result()
+                    result = results[check.table]
+                    result.queries += 1
+                    if check.depth == 0:
+                        result.chunks += 1
+                        result.server_rows += check.server[0]
+                        result.reference_rows += check.reference[0]
+                        result.bad_chunks += 0 if check.matches else 1
+                    if check.matches:
+                        continue
+                    if check.lo is None or check.hi - check.lo + 1 <= self.args.bucket:
+                        result.leaves.append(check)
+                        continue
+                    for lo, hi in split_range(check.lo, check.hi, self.args.fanout, self.args.bucket):
+                        pending.add(pool.submit(self.check, check.table, lo, hi, check.depth + 1))
+
+            leaves = [leaf for r in results.values() for leaf in r.leaves]
+            if leaves:
+                expected = self.reference.keys(leaves)
+                for leaf, actual in pool.map(self.server_keys, leaves):
+                    result = results[leaf.table]
+                    result.queries += 1
+                    result.keys.extend(diff_keys(leaf, actual, expected[leaf.table]))
+        for result in results.values():
+            result.leaves.sort(key=lambda c: (c.lo or 0))
+            result.keys.sort(key=lambda d: d.key)
+        return list(results.values())
+
+
+def diff_keys(leaf, actual, expected):
+    diffs = []
+    for key in set(actual) | set(expected):
+        if leaf.lo is not None and not leaf.lo <= key <= leaf.hi:
+            continue
+        server = actual.get(key, (0, 0))
+        reference = tuple(expected.get(key, (0, 0)))
+        if server == reference:
+            continue
+        kind = "missing" if key not in actual else "extra" if key not in expected else "different"
+        diffs.append(KeyDiff(leaf.table, str(key) if not isinstance(key, str) else key, kind, server, reference))
+    return diffs
+
+
+def key_ranges(keys):
+    """Collapses sorted integer keys into 'a-b' ranges."""
+    ranges = []
+    for key in sorted(keys):
+        if ranges and key == ranges[-1][1] + 1:
+            ranges[-1][1] = key
+        else:
+            ranges.append([key, key])
+    return [f"{a}" if a == b else f"{a}-{b}" for a, b in ranges]
+
+
+def describe_keys(result):
+    """'missing: 10001-10003, 10010; different: 10020' for a table's key differences."""
+    parts = []
+    for kind in ("missing", "extra", "different"):
+        keys = [d.key for d in result.keys if d.kind == kind]
+        if not keys:
+            continue
+        if all(k.lstrip("-").isdigit() for k in keys):
+            listed = key_ranges(int(k) for k in keys)
+        else:
+            listed = sorted(keys)
+        more = f" (+{len(listed) - MAX_LISTED_KEYS} more)" if len(listed) > MAX_LISTED_KEYS else ""
+        parts.append(f"{kind}: {', '.join(listed[:MAX_LISTED_KEYS])}{more}")
+    return "; ".join(parts)
+
+
+def generate_markdown(results, args, data_dir, wall, ref_seconds, timestamp):
+    lines = [f"# Data Integrity Report: {args.db}\n",
+             f"Generated: {timestamp}\n",
+             f"Reference: {data_dir} · hash: {args.hash} · chunk: {args.chunk_size} keys · bucket: {args.bucket} keys · "
+             f"{args.jobs} connection(s)\n",
+             f"Reference scan: {ref_seconds:.2f}s · verification: {wall:.2f}s\n",
+             "| Table | Key | Chunks | Rows (server) | Rows (expected) | Bad Chunks | Queries | Status |",
+             "|---|---|---|---|---|---|---|---|"]
+    for r in results:
+        status = "✅ OK" if r.ok else "❌ MISMATCH"
+        lines.append(f"| {r.name} | {r.key} | {r.chunks} | {r.server_rows} | {r.reference_rows} | {r.bad_chunks} | {r.queries} | {status} |")
+
+    bad = [r for r in results if not r.ok]
+    if bad:
+        lines.append("\n## Differences\n")
+        lines.append("| Table | Range | Rows (server) | Rows (expected) | Keys |")
+        lines.append("|---|---|---|---|---|")
+        for r in bad:
+            for leaf in r.leaves:
+                in_range = [d for d in r.keys if leaf.lo is None or leaf.lo <= int(d.key) <= leaf.hi]
+                detail = describe_keys(TableResult(r.name, r.key, keys=in_range)) or "n/a"
+                lines.append(f"| {r.name} | {r.key} {leaf.label} | {leaf.server[0]} | {leaf.reference[0]} | {detail} |")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify a loaded employees database chunk by chunk against its dataset files.")
+    parser.add_argument("--schema", default="employees/employees.sql", help="Schema script (table definitions and sourced dumps)")
+    parser.add_argument("--data", help="Data directory: a generated dataset (manifest.json) or the directory of the sourced dumps (default: the schema's directory)")
+    parser.add_argument("--tables", help="Comma-separated tables to verify (default: every table with data files)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Primary key values per top-level chunk")
+    parser.add_argument("--bucket", type=int, default=100, help="Smallest range (in key values) the drill-down splits down to before resolving single keys")
+    parser.add_argument("--fanout", type=int, default=10, help="Sub-ranges per drill-down step")
+    parser.add_argument("--hash", choices=HASHES, default="crc32", help="Row hash summed per range: CRC32 (as in expected.txt) or 60-bit MD5")
+    parser.add_argument("--jobs", type=int, default=4, help="Concurrent verification connections (and reference scan processes)")
+    parser.add_argument("--report-file", default="reports/integrity_report.md", help="Markdown integrity report")
+    parser.add_argument("--container", help="Name of the MariaDB container (if using Docker)")
+    parser.add_argument("--host", default="127.0.0.1", help="Database host")
+    parser.add_argument("--port", type=int, default=3306, help="Database port")
+    parser.add_argument("--user", default="root", help="Database user")
+    parser.add_argument("--password", default="root", help="Database password")
+    parser.add_argument("--db", default="employees", help="Database name")
+    parser.add_argument("--socket", help="Local socket path (driver backend only, instead of host/port)")
+    parser.add_argument("--backend", choices=["auto", "driver", "cli"], default="auto", help="Connection backend: pooled driver sessions, mariadb CLI per statement, or auto-detect")
+    args = parser.parse_args()
+    if args.bucket < 1 or args.chunk_size < 1 or args.fanout < 2 or args.jobs < 1:
+        print("Error: --bucket, --chunk-size and --jobs must be positive and --fanout at least 2")
+        sys.exit(1)
+    args.pool_size = args.jobs
+
+    if not os.path.exists(args.schema):
+        print(f"Error: schema script not found at {args.schema}")
+        sys.exit(1)
+    schema = parse_schema(args.schema)
+    data_dir = args.data or os.path.dirname(os.path.abspath(args.schema))
+    try:
+        sources, _ = find_sources(args.data, schema, args.schema)
+    except FileNotFoundError as e:
+        print(f"Error: data file not found: {e}")
+        sys.exit(1)
+    tables = [t for t in schema.tables if t in sources]
+    if args.tables:
+        wanted = [t.strip() for t in args.tables.split(",") if t.strip()]
+        unknown = [t for t in wanted if t not in sources]
+        if unknown:
+            print(f"Error: no data files for table(s): {', '.join(unknown)}")
+            sys.exit(1)
+        tables = [t for t in tables if t in wanted]
+    if not tables:
+        print(f"Error: no data files found for {', '.join(schema.tables)}")
+        sys.exit(1)
+
+    print(f"📖 Reading reference data from {data_dir} ({sum(len(sources[t]) for t in tables)} file(s))")
+    reference = Reference(schema, sources, args.bucket, args.hash, args.jobs)
+    start = time.perf_counter()
+    reference.load(tables)
+    ref_seconds = time.perf_counter() - start
+
+    print(f"🔍 Verifying {args.db}: {len(tables)} table(s) on {args.jobs} connection(s)")
+    try:
+        backend = open_backend(args)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    start = time.perf_counter()
+    try:
+        results = Verifier(args, backend, reference).run(tables)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        backend.close()
+    wall = time.perf_counter() - start
+
+    report = generate_markdown(results, args, data_dir, wall, ref_seconds, time.strftime('%Y-%m-%d %H:%M:%S'))
+    print(report)
+    if os.path.dirname(args.report_file):
+        os.makedirs(os.path.dirname(args.report_file), exist_ok=True)
+    with open(args.report_file, "w") as f:
+        f.write(report)
+
+    bad = [r for r in results if not r.ok]
+    if bad:
+        for r in bad:
+            print(f"❌ {r.name}: {r.bad_chunks} chunk(s) differ; {describe_keys(r) or 'see report'}")
+        sys.exit(1)
+    print(f"✅ All {len(tables)} table(s) match. Report: {args.report_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""HDR-style latency histogram: log-linear buckets with a fixed relative error.
+
+Values are recorded in integer microseconds. Below ``2 ** PRECISION_BITS`` µs
+every value has its own bucket; above, each power of two is split into
+``2 ** (PRECISION_BITS - 1)`` buckets, so a recorded value is known to within
+``2 ** -(PRECISION_BITS - 1)`` (0.8% with 8 bits) whatever its magnitude, in
+a few hundred buckets for the whole µs-to-hours range. Histograms of several
+threads or processes merge by adding counts, and serialize to JSON as
+``[[lowest value, count], ...]`` pairs.
+"""
+
+PRECISION_BITS = 8
+HALF = 1 << (PRECISION_BITS - 1)
+
+
+def bucket_index(value):
+    """Bucket of a non-negative integer value."""
+    shift = value.bit_length() - PRECISION_BITS
+    if shift <= 0:
+        return value
+    return shift * HALF + (value >> shift)
+
+
+def bucket_low(index):
+    """Lowest value of a bucket."""
+    if index < 2 * HALF:
+        return index
+    shift = (index >> (PRECISION_BITS - 1)) - 1
+    return (index - shift * HALF) << shift
+
+
+def bucket_high(index):
+    """Highest value of a bucket."""
+    return bucket_low(index + 1) - 1
+
+
+class LatencyHistogram:
+    """Counts of microsecond latencies per log-linear bucket."""
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.sum = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, micros, count=1):
+        micros = max(0, int(micros))
+        index = bucket_index(micros)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total += count
+        self.sum += micros * count
+        self.min = micros if self.min is None else min(self.min, micros)
+        self.max = max(self.max, micros)
+
+    def record_seconds(self, seconds):
+        self.record(round(seconds * 1e6))
+
+    def record_corrected(self, micros, expected_interval):
+        """Records a value plus the samples a stalled closed loop did not send.
+
+        Same as HdrHistogram's recordValueWithExpectedInterval: while a request
+        took longer than the expected interval between requests, the requests
+        that would have been issued meanwhile are recorded with the latency
+        they would have seen (value - interval, value - 2 * interval, ...).
+        """
+        self.record(micros)
+        if expected_interval <= 0:
+            return
+        missing = micros - expected_interval
+        while missing >= expected_interval:
+            self.record(missing)
+            missing -= expected_interval
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def value_at(self, pct):
+        """Highest equivalent value (µs) at a percentile (0-100), capped by the recorded max."""
+        if not self.total:
+            return 0
+        target = max(1, -(-self.total * pct // 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(bucket_high(index), self.max)
+        return self.max
+
+    def count_at_or_above(self, micros):
+        """Samples whose bucket lies entirely at or above a value."""
+        return sum(count for index, count in self.counts.items() if bucket_low(index) >= micros)
+
+    def mean(self):
+        return self.sum / self.total if self.total else 0.0
+
+    def summary_ms(self):
+        """min/mean/p50/p90/p95/p99/p99.9/max in milliseconds."""
+        ms = 1000.0
+        return {
+            "count": self.total,
+            "min": (self.min or 0) / ms,
+            "mean": self.mean() / ms,
+            "p50": self.value_at(50) / ms,
+            "p90": self.value_at(90) / ms,
+            "p95": self.value_at(95) / ms,
+            "p99": self.value_at(99) / ms,
+            "p999": self.value_at(99.9) / ms,
+            "max": self.max / ms,
+        }
+
+    def to_dict(self):
+        return {
+            "unit": "us",
+            "precision_bits": PRECISION_BITS,
+            "total": self.total,
+            "sum": self.sum,
+            "min": self.min or 0,
+            "max": self.max,
+            "counts": [[bucket_low(i), self.counts[i]] for i in sorted(self.counts)],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        hist = cls()
+        if data.get("precision_bits", PRECISION_BITS) != PRECISION_BITS:
+            # Re-bucket at this precision; values stay within the coarser error.
+            for value, count in data["counts"]:
+                hist.record(value, count)
+            hist.sum = data.get("sum", hist.sum)
+            return hist
+        for value, count in data["counts"]:
+            index = bucket_index(value)
+            hist.counts[index] = hist.counts.get(index, 0) + count
+        hist.total = data.get("total", sum(hist.counts.values()))
+        hist.sum = data.get("sum", 0)
+        hist.min = data.get("min") if hist.total else None
+        hist.max = data.get("max", 0)
+        return hist
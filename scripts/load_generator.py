@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""Native load generator with per-query latency histograms.
+
+Runs the statement corpus of ``req_employees.sql`` (split by
+``sql_splitter.py``, ids numbered as in the SQL analyzer) on ``--threads``
+workers, each holding one persistent session, optionally spread over
+``--processes`` processes so that the Python client does not become the
+bottleneck at high thread counts.
+
+- **closed** loop (default): every worker sends its next statement as soon
+  as the previous one returned (plus ``--think-ms``), like the sysbench
+  script. Workers start at different offsets in the corpus. With
+  ``--co-interval-ms`` the latencies are corrected for coordinated omission
+  the HdrHistogram way: a stall longer than the expected interval also
+  records the requests that would have been sent meanwhile.
+- **open** loop (``--rate``): requests arrive at a fixed rate (evenly spaced
+  or Poisson) whatever the server does. Latency is measured from the
+  intended start time, so queueing behind a slow statement is counted
+  (coordinated omission correction); service time (actual start to end) is
+  reported as well. Arrivals that could not even be started before the end
+  of the run are reported as backlog.
+
+A template file (``query_templates.py``) is rendered ``--template-rounds``
+times before the run, so every worker walks through pre-drawn keys and value
+generation costs nothing during the measurement; the query ids are the
+template numbers.
+
+Every query id gets its own HDR-style histogram (see ``latency_histogram.py``)
+with p50/p99/p99.9. Each run writes ``loadgen_<threads>_threads.json`` into
+``--out-dir``, which ``perf_threads_reporter.py`` reads next to (or instead
+of) the sysbench ``results_<threads>_threads.txt`` files.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from multiprocessing import Pool
+from typing import Dict, List
+
+from db_backend import open_backend
+from latency_histogram import LatencyHistogram
+from query_templates import TemplateSet, is_template_file
+from sql_splitter import iter_statements
+
+MODES = ("closed", "open")
+ARRIVALS = ("uniform", "poisson")
+START_DELAY = 0.5  # seconds granted to every process to open its sessions
+MAX_ERROR_SAMPLES = 5
+
+
+@dataclass
+class QueryStats:
+    """Latency (from intended start) and service time histograms of one query id."""
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    service: LatencyHistogram = field(default_factory=LatencyHistogram)
+    count: int = 0
+    errors: int = 0
+    rows: int = 0
+
+    def merge(self, other):
+        self.latency.merge(other.latency)
+        self.service.merge(other.service)
+        self.count += other.count
+        self.errors += other.errors
+        self.rows += other.rows
+        return self
+
+    def to_dict(self):
+        return {"count": self.count, "errors": self.errors, "rows": self.rows,
+                "latency": self.latency.to_dict(), "service": self.service.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(LatencyHistogram.from_dict(data["latency"]), LatencyHistogram.from_dict(data["service"]),
+                   data["count"], data["errors"], data["rows"])
+
+
+def load_corpus(path, backend=None, rounds=1, seed=1):
+    """(id, line, statement) for every statement of a SQL file, ids from 1.
+
+    A template file is rendered ``rounds`` times; its ids repeat every round.
+    """
+    if is_template_file(path):
+        return TemplateSet(path).resolve(backend, seed).rounds(rounds, seed)
+    return [(i + 1, stmt.line, stmt.text) for i, stmt in enumerate(iter_statements(path))]
+
+
+class Arrivals:
+    """Open-loop arrival times of one process, shared by its threads.
+
+    With P processes, process p owns the global arrivals p, p + P, p + 2P, ...
+    (evenly spaced) or a Poisson stream of rate / P (the superposition of the
+    streams is a Poisson stream of the full rate).
+    """
+
+    def __init__(self, rate, arrival, start, process, processes, seed):
+        self.rate = rate
+        self.arrival = arrival
+        self.start = start
+        self.process = process
+        self.processes = processes
+        self.random = random.Random(seed * 1000003 + process)
+        self.lock = threading.Lock()
+        self.k = 0
+        self.clock = start
+        self.dropped = 0
+
+    def next(self):
+        """(global arrival number, intended start time)."""
+        with self.lock:
+            number = self.process + self.processes * self.k
+            self.k += 1
+            if self.arrival == "poisson":
+                self.clock += self.random.expovariate(self.rate / self.processes)
+                return number, self.clock
+            return number, self.start + number / self.rate
+
+    def drop(self):
+        """Counts an arrival taken by a worker that the end of the run kept from starting."""
+        with self.lock:
+            self.dropped += 1
+
+
+def run_session(backend, corpus, plan, stats, errors, thread_id):
+    """One worker: a persistent session (re-opened if it breaks) running its share of the plan."""
+    start, measure_from, stop = plan["start"], plan["measure_from"], plan["stop"]
+    co_interval = plan["co_interval_us"]
+    think = plan["think_s"]
+    arrivals = plan.get("arrivals")
+    position = thread_id * len(corpus) // max(1, plan["threads"])
+    delay = start - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+
+    def record(index, intended, began, ended, rows, err):
+        if intended < measure_from:
+            return
+        query = stats.setdefault(corpus[index][0], QueryStats())
+        if err:
+            query.errors += 1
+            sample = f"query {corpus[index][0]}: {err.strip()}"
+            if len(errors) < MAX_ERROR_SAMPLES and sample not in errors:
+                errors.append(sample)
+            return
+        query.count += 1
+        query.rows += rows
+        query.service.record_seconds(ended - began)
+        latency = round((ended - intended) * 1e6)
+        if co_interval:
+            query.latency.record_corrected(latency, co_interval)
+        else:
+            query.latency.record(latency)
+
+    while time.monotonic() < stop:
+        try:
+            with backend.session() as sess:
+                while not getattr(sess, "broken", False):
+                    if arrivals is not None:
+                        number, intended = arrivals.next()
+                        if intended >= stop:
+                            return
+                        wait = intended - time.monotonic()
+                        if wait > 0:
+                            time.sleep(wait)
+                        elif time.monotonic() >= stop:
+                            arrivals.drop()
+                            return
+                        index = number % len(corpus)
+                    else:
+                        intended = time.monotonic()
+                        if intended >= stop:
+                            return
+                        index = position % len(corpus)
+                        position += 1
+                    began = time.monotonic()
+                    rows, err = sess.execute(corpus[index][2])
+                    ended = time.monotonic()
+                    record(index, began if arrivals is None else intended, began, ended, rows, err)
+                    if think:
+                        time.sleep(think)
+        except Exception as e:  # connection failures: count them and retry
+            if len(errors) < MAX_ERROR_SAMPLES and f"session: {e}" not in errors:
+                errors.append(f"session: {e}")
+            time.sleep(0.1)
+
+
+def run_process(task):
+    """Runs ``threads`` workers in this process; returns serialized stats, errors and backlog."""
+    args, corpus, plan, process, threads, first_thread = task
+    args.pool_size = threads
+    backend = open_backend(args)
+    if plan["rate"]:
+        plan = dict(plan, arrivals=Arrivals(plan["rate"], plan["arrival"], plan["start"], process, plan["processes"], args.seed))
+    per_thread = [{} for _ in range(threads)]
+    errors: List[str] = []
+    workers = [threading.Thread(target=run_session, args=(backend, corpus, plan, per_thread[i], errors, first_thread + i), daemon=True)
+               for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    backend.close()
+
+    merged: Dict[int, QueryStats] = {}
+    for stats in per_thread:
+        for qid, query in stats.items():
+            merged.setdefault(qid, QueryStats()).merge(query)
+    backlog = 0
+    arrivals = plan.get("arrivals")
+    if arrivals is not None:
+        # Arrivals scheduled before the end of the run that no worker started:
+        # those taken too late to run, then those never taken.
+        backlog = arrivals.dropped
+        _, intended = arrivals.next()
+        while intended < plan["stop"]:
+            backlog += 1
+            _, intended = arrivals.next()
+    return {qid: q.to_dict() for qid, q in merged.items()}, errors, backlog
+
+
+def run_level(args, corpus, threads):
+    """Runs one thread count; returns the JSON document of the run."""
+    processes = max(1, min(args.processes, threads))
+    start = time.monotonic() + START_DELAY * processes
+    plan = {
+        "start": start,
+        "measure_from": start + args.warmup,
+        "stop": start + args.warmup + args.time,
+        "threads": threads,
+        "processes": processes,
+        "rate": args.rate,
+        "arrival": args.arrival,
+        "co_interval_us": round(args.co_interval_ms * 1000) if args.co_interval_ms else 0,
+        "think_s": args.think_ms / 1000.0,
+    }
+    shares = [threads // processes + (1 if p < threads % processes else 0) for p in range(processes)]
+    tasks = [(args, corpus, plan, p, shares[p], sum(shares[:p])) for p in range(processes)]
+    started = time.strftime('%Y-%m-%d %H:%M:%S')
+    if processes == 1:
+        results = [run_process(tasks[0])]
+    else:
+        # time.monotonic() is system-wide on Linux, so every process shares the schedule.
+        with Pool(processes) as pool:
+            results = pool.map(run_process, tasks)
+
+    stats: Dict[int, QueryStats] = {}
+    errors: List[str] = []
+    backlog = 0
+    for per_query, errs, late in results:
+        for qid, data in per_query.items():
+            stats.setdefault(int(qid), QueryStats()).merge(QueryStats.from_dict(data))
+        errors.extend(e for e in errs if e not in errors)
+        backlog += late
+    return build_document(args, corpus, threads, processes, stats, errors[:MAX_ERROR_SAMPLES], backlog, started)
+
+
+def build_document(args, corpus, threads, processes, stats, errors, backlog, started):
+    total = QueryStats()
+    for query in stats.values():
+        total.merge(query)
+    seconds = float(args.time)
+    queries = []
+    seen = set()
+    for qid, line, text in corpus:
+        query = stats.get(qid)
+        if query is None or qid in seen:
+            continue
+        seen.add(qid)
+        queries.append({
+            "id": qid,
+            "line": line,
+            "query": " ".join(text.split())[:300],
+            "count": query.count,
+            "errors": query.errors,
+            "rows": query.rows,
+            "qps": query.count / seconds,
+            "latency_ms": query.latency.summary_ms(),
+            "service_ms": query.service.summary_ms(),
+            "histogram": query.latency.to_dict(),
+            "service_histogram": query.service.to_dict(),
+        })
+    return {
+        "tool": "load_generator",
+        "format": 1,
+        "started": started,
+        "query_file": args.query_file,
+        "template_rounds": args.template_rounds if len({entry[0] for entry in corpus}) < len(corpus) else None,
+        "db": args.db,
+        "mode": "open" if args.rate else "closed",
+        "arrival": args.arrival if args.rate else None,
+        "rate": args.rate,
+        "threads": threads,
+        "processes": processes,
+        "duration": args.time,
+        "warmup": args.warmup,
+        "think_ms": args.think_ms,
+        "co_interval_ms": args.co_interval_ms,
+        "summary": {
+            "queries": total.count,
+            "errors": total.errors,
+            "rows": total.rows,
+            "qps": total.count / seconds,
+            "backlog": backlog,
+            "latency_ms": total.latency.summary_ms(),
+            "service_ms": total.service.summary_ms(),
+        },
+        "histogram": total.latency.to_dict(),
+        "error_samples": errors,
+        "queries": queries,
+    }
+
+
+def print_level(doc, top):
+    s = doc["summary"]
+    lat = s["latency_ms"]
+    print(f"📈 {doc['threads']} thread(s): {s['qps']:.1f} q/s, p50 {lat['p50']:.2f} ms, p99 {lat['p99']:.2f} ms, "
+          f"p99.9 {lat['p999']:.2f} ms, max {lat['max']:.2f} ms, {s['errors']} error(s)")
+    if s["backlog"]:
+        print(f"⚠️  {s['backlog']} arrival(s) were never started: the server did not sustain {doc['rate']} q/s")
+    for err in doc["error_samples"]:
+        print(f"   ❌ {err}")
+    slowest = sorted(doc["queries"], key=lambda q: -q["latency_ms"]["p99"])[:top]
+    if slowest:
+        print(f"   {'ID':>4} {'count':>8} {'p50 ms':>9} {'p99 ms':>9} {'p99.9 ms':>9}")
+        for q in slowest:
+            l = q["latency_ms"]
+            print(f"   {q['id']:>4} {q['count']:>8} {l['p50']:>9.2f} {l['p99']:>9.2f} {l['p999']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the statement corpus with concurrent sessions and record per-query latency histograms.")
+    parser.add_argument("--query-file", default="employees/req_employees.sql", help="Path to SQL file")
+    parser.add_argument("--threads", default="8", help="Concurrent sessions, or a comma-separated list of levels run one after another (e.g. 1,4,16,64)")
+    parser.add_argument("--processes", type=int, default=1, help="Client processes sharing the sessions (use several for high thread counts)")
+    parser.add_argument("--time", type=int, default=30, help="Measured seconds per level")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured seconds before each level")
+    parser.add_argument("--rate", type=float, help="Open loop: fixed arrival rate in queries/s for the whole level (default: closed loop)")
+    parser.add_argument("--arrival", choices=ARRIVALS, default="uniform", help="Open-loop arrival process")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Closed loop: pause after every statement")
+    parser.add_argument("--co-interval-ms", type=float, help="Closed loop: expected interval between requests, enables coordinated omission correction")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the Poisson arrivals and of the template values")
+    parser.add_argument("--template-rounds", type=int, default=500, help="Renderings of every statement of a template file, drawn before the run")
+    parser.add_argument("--out-dir", default="reports/perf_threads", help="Directory of the loadgen_<threads>_threads.json files")
+    parser.add_argument("--top", type=int, default=5, help="Slowest queries (by p99) printed per level")
+    parser.add_argument("--container", help="Name of the MariaDB container (if using Docker)")
+    parser.add_argument("--host", default="127.0.0.1", help="Database host")
+    parser.add_argument("--port", type=int, default=3306, help="Database port")
+    parser.add_argument("--user", default="root", help="Database user")
+    parser.add_argument("--password", default="root", help="Database password")
+    parser.add_argument("--db", default="employees", help="Database name")
+    parser.add_argument("--socket", help="Local socket path (driver backend only, instead of host/port)")
+    parser.add_argument("--backend", choices=["auto", "driver", "cli"], default="auto", help="Connection backend: pooled driver sessions, mariadb CLI per statement, or auto-detect")
+    args = parser.parse_args()
+
+    try:
+        levels = [int(t) for t in args.threads.split(",") if t.strip()]
+    except ValueError:
+        levels = []
+    if not levels or min(levels) < 1:
+        print(f"Error: --threads must be positive integers, got '{args.threads}'")
+        sys.exit(1)
+    if args.time < 1 or args.warmup < 0 or args.processes < 1 or (args.rate is not None and args.rate <= 0):
+        print("Error: --time, --processes and --rate must be positive, --warmup non-negative")
+        sys.exit(1)
+    if args.rate and args.co_interval_ms:
+        print("Error: --co-interval-ms applies to the closed loop; open-loop latencies are already measured from the intended start")
+        sys.exit(1)
+    if args.template_rounds < 1:
+        print("Error: --template-rounds must be positive")
+        sys.exit(1)
+    if not os.path.exists(args.query_file):
+        print(f"Error: Query file not found at {args.query_file}")
+        sys.exit(1)
+
+    try:
+        probe = open_backend(args)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if probe.name == "cli":
+        print("⚠️  CLI backend: every statement starts a mariadb client, so latencies include process start-up. Install a driver for persistent sessions.")
+    try:
+        corpus = load_corpus(args.query_file, probe, args.template_rounds, args.seed)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        probe.close()
+    if not corpus:
+        print(f"Error: no statements in {args.query_file}")
+        sys.exit(1)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    mode = f"open loop at {args.rate:g} q/s ({args.arrival})" if args.rate else "closed loop"
+    distinct = len({entry[0] for entry in corpus})
+    source = f"{len(corpus)} statements" if distinct == len(corpus) else f"{distinct} templates x {args.template_rounds} rounds"
+    print(f"🏁 {source} from {args.query_file}, {mode}, {args.warmup}s warmup + {args.time}s per level")
+    for threads in levels:
+        doc = run_level(args, corpus, threads)
+        path = os.path.join(args.out_dir, f"loadgen_{threads}_threads.json")
+        with open(path, "w") as f:
+            json.dump(doc, f, indent=1)
+        print_level(doc, args.top)
+        print(f"   → {path}")
+    print(f"✅ Done. Report: python3 scripts/perf_threads_reporter.py --dir {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,50 +2,191 @@
 import os
 import re
 import sys
+import json
+import math
 import argparse
 from datetime import datetime
 
+from latency_histogram import LatencyHistogram
+from resource_sampler import efficiency
+from bench_store import BenchStore
+from scalability_model import curve, fit_usl, littles_law
+from sysbench_series import parse_histogram, parse_intervals, steady_state
+
+LOADGEN_FILE = re.compile(r'loadgen_(\d+)_threads\.json$')
+SYSBENCH_FILE = re.compile(r'results_(\d+)_threads\.txt$')
+RUN_COLORS = ['#6366f1', '#f97316', '#10b981', '#ef4444', '#0ea5e9', '#a855f7', '#eab308', '#64748b']
+
 class PerfReporter:
-    def __init__(self, results_dir, output_md, output_html):
+    def __init__(self, results_dir, output_md, output_html, source="auto", top=10):
         self.results_dir = results_dir
         self.output_md = output_md
         self.output_html = output_html
+        self.source = source
+        self.top = top
         self.data = []
+        self.queries = []
+        self.sweep = None
+        self.model = None
+        self.little = []
+        self.runs = []
+        self.change_threshold = 0.05
 
     def parse_results(self):
-        """Parses all results_N_threads.txt files in the results directory."""
+        """Parses results_N_threads.txt (sysbench) or loadgen_N_threads.json (load_generator.py) files.
+
+        With source "auto", the load generator files are used when there are any.
+        """
         if not os.path.exists(self.results_dir):
             print(f"Directory {self.results_dir} not found.")
             return
 
-        files = [f for f in os.listdir(self.results_dir) if f.startswith('results_') and f.endswith('_threads.txt')]
+        sweep_file = os.path.join(self.results_dir, 'sweep.json')
+        if os.path.exists(sweep_file):
+            with open(sweep_file) as f:
+                self.sweep = json.load(f)
+
+        if self.source == "loadgen" or (self.source == "auto" and any(LOADGEN_FILE.match(f) for f in os.listdir(self.results_dir))):
+            self.parse_loadgen()
+        else:
+            self.parse_sysbench()
+
+    def parse_sysbench(self):
+        files = [f for f in os.listdir(self.results_dir) if SYSBENCH_FILE.match(f)]
         # Sort by thread number
-        files.sort(key=lambda x: int(re.search(r'results_(\d+)_threads\.txt', x).group(1)))
+        files.sort(key=lambda x: int(SYSBENCH_FILE.match(x).group(1)))
 
         for filename in files:
-            threads = int(re.search(r'results_(\d+)_threads\.txt', filename).group(1))
-            filepath = os.path.join(self.results_dir, filename)
-            
-            with open(filepath, 'r') as f:
-                content = f.read()
-                
-            metrics = {
-                'threads': threads,
-                'read': self._extract(r'read:\s+(\d+)', content),
-                'write': self._extract(r'write:\s+(\d+)', content),
-                'other': self._extract(r'other:\s+(\d+)', content),
-                'total': self._extract(r'total:\s+(\d+)', content),
-                'transactions': self._extract(r'transactions:\s+(\d+)', content),
-                'tps': self._extract(r'transactions:.*?\((\d+\.\d+) per sec\.\)', content),
-                'queries_per_sec': self._extract(r'queries:.*?\((\d+\.\d+) per sec\.\)', content),
-                'total_time': self._extract(r'total time:\s+(\d+\.\d+)s', content),
-                'total_events': self._extract(r'total number of events:\s+(\d+)', content),
-                'min_lat': self._extract(r'min:\s+(\d+\.\d+)', content),
-                'avg_lat': self._extract(r'avg:\s+(\d+\.\d+)', content),
-                'max_lat': self._extract(r'max:\s+(\d+\.\d+)', content),
-                'p95_lat': self._extract(r'95th percentile:\s+(\d+\.\d+)', content),
-            }
+            metrics = self.parse_sysbench_file(os.path.join(self.results_dir, filename))
+            metrics['resources'] = self._resources(metrics)
+            self.data.append(metrics)
+
+    def _resources(self, d):
+        """Efficiency metrics from resources_N_threads.json (resource_sampler.py), over the steady part of the level."""
+        path = os.path.join(self.results_dir, f"resources_{d['threads']}_threads.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            doc = json.load(f)
+        steady = d.get('steady')
+        res = efficiency(doc, self._steady_qps(d), steady['tps'] if steady else d['tps'],
+                         since=steady['warmup'] if steady else 0)
+        if res:
+            res['status_error'] = doc.get('status_error')
+            res['cpus'] = doc['cpus']
+        return res
+
+    def parse_sysbench_file(self, filepath):
+        """Metrics of one results_N_threads.txt file."""
+        threads = int(SYSBENCH_FILE.search(filepath).group(1))
+        with open(filepath, 'r') as f:
+            content = f.read()
+
+        metrics = {
+            'threads': threads,
+            'read': self._extract(r'read:\s+(\d+)', content),
+            'write': self._extract(r'write:\s+(\d+)', content),
+            'other': self._extract(r'other:\s+(\d+)', content),
+            'total': self._extract(r'total:\s+(\d+)', content),
+            'transactions': self._extract(r'transactions:\s+(\d+)', content),
+            'tps': self._extract(r'transactions:.*?\((\d+\.\d+) per sec\.\)', content),
+            'queries_per_sec': self._extract(r'queries:.*?\((\d+\.\d+) per sec\.\)', content),
+            'total_time': self._extract(r'total time:\s+(\d+\.\d+)s', content),
+            'total_events': self._extract(r'total number of events:\s+(\d+)', content),
+            'min_lat': self._extract(r'min:\s+(\d+\.\d+)', content),
+            'avg_lat': self._extract(r'avg:\s+(\d+\.\d+)', content),
+            'max_lat': self._extract(r'max:\s+(\d+\.\d+)', content),
+            'p95_lat': self._extract(r'95th percentile:\s+(\d+\.\d+)', content),
+            'p50_lat': 0,
+            'p99_lat': 0,
+            'p999_lat': 0,
+        }
+        metrics.update(self._series_metrics(content, threads, metrics))
+        return metrics
+
+    def _series_metrics(self, content, threads, summary):
+        """Steady state from --report-interval lines and percentiles from the --histogram table.
+
+        Runs stopped before sysbench's summary (adaptive sweep) take their
+        throughput from the steady intervals, and their average latency from
+        Little's law (threads / TPS).
+        """
+        samples = parse_intervals(content)
+        steady = steady_state(samples)
+        histogram = parse_histogram(content)
+        metrics = {'series': samples, 'steady': steady, 'histogram': histogram}
+        if steady and not summary['queries_per_sec']:
+            metrics.update({
+                'tps': steady['tps'],
+                'queries_per_sec': steady['qps'],
+                'total_time': float(steady['seconds']),
+                'total_events': int(sum(s['tps'] for s in samples)),
+                'avg_lat': threads / steady['tps'] * 1000 if steady['tps'] else 0,
+                'p95_lat': steady['p95_median'],
+                'avg_lat_derived': True,
+            })
+        if histogram:
+            metrics.update({
+                'p50_lat': histogram.value_at(50) / 1000,
+                'p99_lat': histogram.value_at(99) / 1000,
+                'p999_lat': histogram.value_at(99.9) / 1000,
+            })
+        return metrics
+
+    def parse_loadgen(self):
+        """Maps load generator runs onto the sysbench metrics (one query = one transaction)."""
+        files = sorted((f for f in os.listdir(self.results_dir) if LOADGEN_FILE.match(f)),
+                       key=lambda x: int(LOADGEN_FILE.match(x).group(1)))
+        for filename in files:
+            metrics, doc = self.parse_loadgen_file(os.path.join(self.results_dir, filename))
             self.data.append(metrics)
+            # Per-query detail of the highest thread level (files are sorted).
+            self.queries = self._query_tails(doc)
+
+    def parse_loadgen_file(self, filepath):
+        """(metrics, JSON document) of one loadgen_N_threads.json file."""
+        with open(filepath) as f:
+            doc = json.load(f)
+        summary = doc['summary']
+        lat = summary['latency_ms']
+        metrics = {
+            'threads': doc['threads'],
+            'read': summary['queries'],
+            'write': 0,
+            'other': 0,
+            'total': summary['queries'],
+            'transactions': summary['queries'],
+            'tps': summary['qps'],
+            'queries_per_sec': summary['qps'],
+            'total_time': float(doc['duration']),
+            'total_events': summary['queries'],
+            'min_lat': lat['min'],
+            'avg_lat': lat['mean'],
+            'max_lat': lat['max'],
+            'p95_lat': lat['p95'],
+            'p50_lat': lat['p50'],
+            'p99_lat': lat['p99'],
+            'p999_lat': lat['p999'],
+            'service_lat': summary['service_ms']['mean'],
+            'errors': summary['errors'],
+            'backlog': summary.get('backlog', 0),
+            'mode': doc['mode'],
+        }
+        return metrics, doc
+
+    def _query_tails(self, doc):
+        """Queries sorted by p99, with their share of the samples at or above the overall p99."""
+        overall = LatencyHistogram.from_dict(doc['histogram'])
+        cutoff = overall.value_at(99)
+        tail = overall.count_at_or_above(cutoff) or 1
+        rows = []
+        for q in doc['queries']:
+            hist = LatencyHistogram.from_dict(q['histogram'])
+            rows.append(dict(q['latency_ms'], id=q['id'], line=q['line'], query=q['query'],
+                             count=q['count'], errors=q['errors'],
+                             tail_share=hist.count_at_or_above(cutoff) / tail * 100))
+        rows.sort(key=lambda r: (-r['p99'], r['id']))
+        return rows[:self.top]
 
     def _extract(self, pattern, content):
         match = re.search(pattern, content)
@@ -57,6 +198,44 @@ class PerfReporter:
                 return 0
         return 0
 
+    def fit_models(self):
+        """Fits the USL to QPS and checks every level against Little's law.
+
+        Open-loop load generator runs are skipped: their throughput is set by
+        the arrival rate, and their latency includes queueing before a thread
+        picks the request up.
+        """
+        closed = [d for d in self.data if d.get('mode', 'closed') == 'closed']
+        self.model = fit_usl([(d['threads'], self._steady_qps(d)) for d in closed])
+        # Load generator latencies may hold coordinated omission corrections;
+        # the time requests actually spent in flight is their service time.
+        self.little = [littles_law(d['threads'], d['tps'], d.get('service_lat', d['avg_lat'])) for d in closed
+                       if d['avg_lat'] and d['tps'] and not d.get('avg_lat_derived')]
+
+    @staticmethod
+    def _steady_qps(d):
+        """Warmup-free QPS when interval lines were captured, the run average otherwise."""
+        return d['steady']['qps'] if d.get('steady') else d['queries_per_sec']
+
+    def _model_predictions(self):
+        """(threads, predicted QPS, measured QPS or None) for the measured levels, the peak and beyond."""
+        measured = {d['threads']: self._steady_qps(d) for d in self.data}
+        top = max(measured)
+        levels = sorted(set(measured) | {top * 2, top * 4} |
+                        ({round(self.model.peak_threads)} if self.model.peak_threads else set()))
+        return [(n, self.model.predict(n), measured.get(n)) for n in levels if n >= 1]
+
+    def _model_summary(self):
+        m = self.model
+        peak = m.peak_threads
+        if peak is None:
+            text = (f"No retrograde region: throughput tends to {m.max_throughput:.0f} QPS (λ/σ)." if m.sigma > 0
+                    else "Linear scaling within the measured range.")
+        else:
+            text = f"Predicted peak: **{m.max_throughput:.0f} QPS at {peak:.1f} threads**."
+        quality = "good" if m.r2 >= 0.98 and m.mape <= 0.05 else "fair" if m.r2 >= 0.9 else "poor"
+        return text, f"R² {m.r2:.4f}, mean error {m.mape * 100:.1f}% over {m.points} levels ({quality} fit)"
+
     def generate_markdown(self):
         """Generates a Markdown report."""
         lines = [
@@ -69,7 +248,122 @@ class PerfReporter:
         
         for d in self.data:
             lines.append(f"| {d['threads']} | {d['queries_per_sec']:.2f} | {d['tps']:.2f} | {d['avg_lat']:.2f} | {d['p95_lat']:.2f} | {d['total_events']} |")
-        
+
+        steady = [d for d in self.data if d.get('steady')]
+        if steady:
+            lines += [
+                "",
+                "## Steady State",
+                "Warmup detected with MSER-5 and excluded. Jitter: coefficient of variation of the per-second QPS. "
+                "Stalls: seconds below half the steady median QPS.\n",
+                "| Threads | Warmup (s) | Steady QPS | Run QPS | Jitter | QPS Min–Max | p95 Median / Max (ms) | Stalls |",
+                "|---|---|---|---|---|---|---|---|",
+            ]
+            for d in steady:
+                st = d['steady']
+                lines.append(f"| {d['threads']} | {st['warmup']} | {st['qps']:.2f} | {d['queries_per_sec']:.2f} | "
+                             f"{st['jitter'] * 100:.1f}% | {st['qps_min']:.0f}–{st['qps_max']:.0f} | "
+                             f"{st['p95_median']:.2f} / {st['p95_max']:.2f} | {len(st['stalls'])} |")
+            for d in steady:
+                for stall in d['steady']['stalls']:
+                    lines.append(f"- ⚠️ {d['threads']} threads: stall at {stall['start']}–{stall['end']} s "
+                                 f"(down to {stall['min_qps']:.0f} QPS)")
+
+        if any(d['p99_lat'] for d in self.data):
+            lines += [
+                "",
+                "## Latency Percentiles",
+                "From the full latency distribution of each level (sysbench --histogram or load generator histograms).\n",
+                "| Threads | p50 (ms) | p95 (ms) | p99 (ms) | p99.9 (ms) | Max (ms) |",
+                "|---|---|---|---|---|---|",
+            ]
+            for d in self.data:
+                if d['p99_lat']:
+                    lines.append(f"| {d['threads']} | {d['p50_lat']:.2f} | {d['p95_lat']:.2f} | {d['p99_lat']:.2f} | "
+                                 f"{d['p999_lat']:.2f} | {d['max_lat']:.2f} |")
+
+        resources = [d for d in self.data if d.get('resources')]
+        if resources:
+            lines += [
+                "",
+                "## Resource Efficiency",
+                f"Host (/proc, {resources[0]['resources']['cpus']} CPUs) and SHOW GLOBAL STATUS samples over the steady part of each level. "
+                "Limit: cpu (≥85% busy), io (≥20% iowait or a disk ≥80% busy), locks (≥0.01 row lock waits per transaction).\n",
+                "| Threads | QPS | Busy Cores | CPU usr/sys/iowait | QPS / Core | Ctx Sw / Query | Disk I/O / Txn | KB Written / Txn | "
+                "BP Reads / Query | Redo KB / Txn | Lock Waits/s | Threads Running | Limit |",
+                "|---|---|---|---|---|---|---|---|---|---|---|---|---|",
+            ]
+            fmt = lambda v, spec=".2f": "—" if v is None else format(v, spec)
+            for d in resources:
+                r = d['resources']
+                lines.append(f"| {d['threads']} | {self._steady_qps(d):.2f} | {fmt(r['busy_cores'])} | "
+                             f"{r['cpu_user'] * 100:.0f}/{r['cpu_system'] * 100:.0f}/{r['cpu_iowait'] * 100:.0f}% | "
+                             f"{fmt(r['qps_per_core'], '.0f')} | {fmt(r['ctxt_per_query'])} | {fmt(r['io_per_txn'], '.3f')} | "
+                             f"{fmt(r['write_kb_per_txn'])} | {fmt(r['bp_reads_per_query'], '.3f')} | {fmt(r['redo_kb_per_txn'])} | "
+                             f"{fmt(r['lock_waits_s'])} | {fmt(r['threads_running'], '.1f')} | {r['limit'] or '—'} |")
+            errors = {d['resources']['status_error'] for d in resources if d['resources']['status_error']}
+            for error in errors:
+                lines.append(f"- ⚠️ SHOW GLOBAL STATUS unavailable: {error}")
+
+        if self.model:
+            m = self.model
+            peak_text, quality = self._model_summary()
+            lines += [
+                "",
+                "## Scalability Model (USL)",
+                "X(N) = λN / (1 + σ(N-1) + κN(N-1)), fitted to the measured QPS.\n",
+                "| λ (QPS at 1 thread) | σ (contention) | κ (coherency) | Peak Threads | Max QPS |",
+                "|---|---|---|---|---|",
+                f"| {m.lam:.2f} | {m.sigma:.5f} | {m.kappa:.6f} | "
+                + (f"{m.peak_threads:.1f}" if m.peak_threads else "—") + f" | {m.max_throughput:.0f} |",
+                "",
+                f"{peak_text} {quality}.",
+                "",
+                "| Threads | Predicted QPS | Measured QPS | Error |",
+                "|---|---|---|---|",
+            ]
+            for n, predicted, measured in self._model_predictions():
+                error = f"{(predicted - measured) / measured * 100:+.1f}%" if measured else ""
+                lines.append(f"| {n} | {predicted:.2f} | " + (f"{measured:.2f}" if measured else "—") + f" | {error} |")
+
+        if self.little:
+            lines += [
+                "",
+                "## Little's Law Check",
+                "Requests in flight X × R should equal the thread count; below it, threads wait on the client, not the server.\n",
+                "| Threads | TPS | Avg Latency (ms) | X × R | X × R / Threads | Status |",
+                "|---|---|---|---|---|---|",
+            ]
+            for c in self.little:
+                flag = "✅ ok" if c.status == "ok" else f"⚠️ {c.status}"
+                lines.append(f"| {c.threads} | {c.throughput:.2f} | {c.latency_ms:.2f} | {c.in_flight:.2f} | {c.ratio:.2f} | {flag} |")
+
+        if self.sweep:
+            lines += ["", "## Adaptive Sweep", self._sweep_summary() + "\n",
+                      "| Threads | Phase | Seconds | QPS | 95% CI | p95 (ms) | Stop |",
+                      "|---|---|---|---|---|---|---|"]
+            knee = (self.sweep.get('knee') or {}).get('threads')
+            for l in self.sweep['levels']:
+                mark = " 🎯" if l['threads'] == knee else ""
+                lines.append(f"| {l['threads']}{mark} | {l['phase']} | {l['seconds']} | {l['qps']:.2f} | "
+                             f"±{l['qps_ci']:.2f} | {l['p95']:.2f} | {l['stop']} |")
+
+        if self.queries:
+            level = self.data[-1]
+            lines += [
+                "",
+                f"## Per-Query Latency ({level['threads']} threads, {level['mode']} loop)",
+                f"p99 {level['p99_lat']:.2f} ms, p99.9 {level['p999_lat']:.2f} ms, {level['errors']} error(s)"
+                + (f", {level['backlog']} arrival(s) never started" if level['backlog'] else "") + ".",
+                "Tail share: fraction of all requests at or above the overall p99 that belong to the query.\n",
+                "| ID | Line | Count | Errors | p50 (ms) | p99 (ms) | p99.9 (ms) | Max (ms) | Tail Share | Query |",
+                "|---|---|---|---|---|---|---|---|---|---|",
+            ]
+            for q in self.queries:
+                text = q['query'][:80].replace('|', '\\|')
+                lines.append(f"| {q['id']} | {q['line']} | {q['count']} | {q['errors']} | {q['p50']:.2f} | {q['p99']:.2f} | "
+                             f"{q['p999']:.2f} | {q['max']:.2f} | {q['tail_share']:.1f}% | `{text}` |")
+
         with open(self.output_md, 'w') as f:
             f.write('\n'.join(lines))
         print(f"✅ Markdown report generated: {self.output_md}")
@@ -86,6 +380,11 @@ class PerfReporter:
             ('avg_lat', 'Average Latency (ms)', 'amber'),
             ('p95_lat', '95th Percentile Latency (ms)', 'orange'),
         ]
+        if any(d['p99_lat'] for d in self.data):
+            metrics_to_graph += [
+                ('p99_lat', '99th Percentile Latency (ms)', 'red'),
+                ('p999_lat', '99.9th Percentile Latency (ms)', 'rose'),
+            ]
 
         sections_html = ""
         for key, label, color in metrics_to_graph:
@@ -142,13 +441,516 @@ class PerfReporter:
             </section>
             """
 
-        html_content = f"""
+        if any(d.get('steady') for d in self.data):
+            sections_html += self._steady_html()
+        if sum(1 for d in self.data if d['p99_lat']) >= 2:
+            sections_html += self._percentiles_html()
+        if any(d.get('resources') for d in self.data):
+            sections_html += self._resources_html()
+        if self.model:
+            sections_html += self._model_html()
+        if self.little:
+            sections_html += self._little_html()
+        if self.sweep:
+            sections_html += self._sweep_html()
+        if self.queries:
+            sections_html += self._queries_html()
+
+        html_content = self._page("Scaling Performance", "Detailed analysis of database performance across multiple thread counts", sections_html)
+        with open(self.output_html, 'w') as f:
+            f.write(html_content)
+        print(f"✅ HTML report generated: {self.output_html}")
+
+    def _sparkline(self, d, width=520, height=70):
+        """Per-second QPS of one level: warmup shaded, steady mean dashed, stalls in red."""
+        series, st = d['series'], d['steady']
+        t_max = max(s['t'] for s in series) or 1
+        q_max = max(s['qps'] for s in series) * 1.1 or 1
+        sx = lambda t: t / t_max * width
+        sy = lambda q: height - q / q_max * height
+        path = " ".join(f"{sx(s['t']):.1f},{sy(s['qps']):.1f}" for s in series)
+        stalled = {t for stall in st['stalls'] for t in range(stall['start'], stall['end'] + 1)}
+        svg = [f'<svg viewBox="0 0 {width} {height}" class="w-full h-16" preserveAspectRatio="none">',
+               f'<rect x="0" y="0" width="{sx(st["warmup"]):.1f}" height="{height}" fill="#f1f5f9"/>',
+               f'<line x1="{sx(st["warmup"]):.1f}" x2="{width}" y1="{sy(st["qps"]):.1f}" y2="{sy(st["qps"]):.1f}" stroke="#94a3b8" stroke-dasharray="4 4"/>',
+               f'<polyline points="{path}" fill="none" stroke="#0ea5e9" stroke-width="1.5"/>']
+        for s in series:
+            if s['t'] in stalled:
+                svg.append(f'<circle cx="{sx(s["t"]):.1f}" cy="{sy(s["qps"]):.1f}" r="3" fill="#ef4444"><title>{s["t"]} s: {s["qps"]:.0f} QPS</title></circle>')
+        svg.append('</svg>')
+        return "".join(svg)
+
+    def _steady_html(self):
+        """Per-level QPS time series with the detected warmup, steady mean, jitter and stalls."""
+        rows = ""
+        for d in self.data:
+            st = d.get('steady')
+            if not st:
+                continue
+            stall_color = "text-red-600" if st['stalls'] else "text-slate-400"
+            rows += f"""
+                <div class="grid grid-cols-12 gap-4 items-center py-3 border-b border-slate-50">
+                    <div class="col-span-1 text-right text-xs font-bold text-slate-500">{d['threads']} T</div>
+                    <div class="col-span-7">{self._sparkline(d)}</div>
+                    <div class="col-span-4 grid grid-cols-2 gap-x-3 text-xs font-mono text-slate-600">
+                        <span>steady {st['qps']:.0f} QPS</span><span>warmup {st['warmup']} s</span>
+                        <span>jitter {st['jitter'] * 100:.1f}%</span><span>p95 {st['p95_median']:.2f}/{st['p95_max']:.2f} ms</span>
+                        <span class="{stall_color} font-bold">{len(st['stalls'])} stall(s)</span><span>{st['qps_min']:.0f}–{st['qps_max']:.0f} QPS</span>
+                    </div>
+                </div>"""
+        return f"""
+            <section class="bg-white rounded-3xl shadow-xl border border-slate-100 p-8 mb-10">
+                <h2 class="text-2xl font-extrabold text-slate-800 mb-2 flex items-center gap-3">
+                    <span class="w-2 h-8 bg-sky-500 rounded-full"></span>
+                    Steady State
+                </h2>
+                <p class="text-sm text-slate-500 mb-6">Per-second QPS. Grey: warmup detected with MSER-5 and excluded. Dashed: steady mean. Red: stalls below half the steady median.</p>
+                {rows}
+            </section>
+            """
+
+    def _resources_html(self):
+        """CPU breakdown and per-query / per-transaction costs of each level."""
+        fmt = lambda v, spec=".2f": "—" if v is None else format(v, spec)
+        limit_colors = {"cpu": "bg-red-100 text-red-700", "io": "bg-amber-100 text-amber-700", "locks": "bg-purple-100 text-purple-700"}
+        rows = ""
+        errors = set()
+        for d in self.data:
+            r = d.get('resources')
+            if not r:
+                continue
+            if r['status_error']:
+                errors.add(r['status_error'])
+            usr, sys_, io = (r[k] * 100 for k in ('cpu_user', 'cpu_system', 'cpu_iowait'))
+            limit = (f'<span class="px-2 py-1 rounded-lg text-[10px] font-bold uppercase {limit_colors[r["limit"]]}">{r["limit"]}</span>'
+                     if r['limit'] else '<span class="text-slate-300">—</span>')
+            rows += f"""
+                <tr class="border-b border-slate-50 hover:bg-slate-50/50">
+                    <td class="px-3 py-2 font-mono text-sm">{d['threads']}</td>
+                    <td class="px-3 py-2 w-48">
+                        <div class="flex h-4 rounded-full overflow-hidden bg-slate-100" title="user {usr:.0f}% / system {sys_:.0f}% / iowait {io:.0f}%">
+                            <div class="bg-blue-500" style="width: {usr:.1f}%"></div>
+                            <div class="bg-amber-400" style="width: {sys_:.1f}%"></div>
+                            <div class="bg-red-400" style="width: {io:.1f}%"></div>
+                        </div>
+                    </td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{fmt(r['busy_cores'])}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right font-bold">{fmt(r['qps_per_core'], '.0f')}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{fmt(r['ctxt_per_query'])}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{fmt(r['io_per_txn'], '.3f')}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{fmt(r['bp_reads_per_query'], '.3f')}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{fmt(r['redo_kb_per_txn'])}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{fmt(r['lock_waits_s'])}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{fmt(r['threads_running'], '.1f')}</td>
+                    <td class="px-3 py-2 text-center">{limit}</td>
+                </tr>"""
+        warning = "".join(f'<p class="text-sm text-amber-600 mt-4">⚠️ SHOW GLOBAL STATUS unavailable: {e}</p>' for e in sorted(errors))
+        return f"""
+            <section class="bg-white rounded-3xl shadow-xl border border-slate-100 p-8 mb-10">
+                <h2 class="text-2xl font-extrabold text-slate-800 mb-2 flex items-center gap-3">
+                    <span class="w-2 h-8 bg-teal-500 rounded-full"></span>
+                    Resource Efficiency
+                </h2>
+                <p class="text-sm text-slate-500 mb-6">Host (/proc) and SHOW GLOBAL STATUS samples over the steady part of each level. CPU bar: <span class="text-blue-500 font-bold">user</span>, <span class="text-amber-500 font-bold">system</span>, <span class="text-red-400 font-bold">iowait</span>. Limit: cpu (≥85% busy), io (≥20% iowait or a disk ≥80% busy), locks (≥0.01 row lock waits per transaction).</p>
+                <table class="w-full text-left">
+                    <thead>
+                        <tr class="text-[10px] font-bold text-slate-400 uppercase tracking-widest italic">
+                            <th class="px-3 py-2">Threads</th><th class="px-3 py-2">CPU</th><th class="px-3 py-2 text-right">Busy Cores</th>
+                            <th class="px-3 py-2 text-right">QPS / Core</th><th class="px-3 py-2 text-right">Ctx Sw / Query</th>
+                            <th class="px-3 py-2 text-right">Disk I/O / Txn</th><th class="px-3 py-2 text-right">BP Reads / Query</th>
+                            <th class="px-3 py-2 text-right">Redo KB / Txn</th><th class="px-3 py-2 text-right">Lock Waits/s</th>
+                            <th class="px-3 py-2 text-right">Threads Running</th><th class="px-3 py-2 text-center">Limit</th>
+                        </tr>
+                    </thead>
+                    <tbody>{rows}</tbody>
+                </table>
+                {warning}
+            </section>
+            """
+
+    def _percentiles_html(self, width=800, height=300, pad=48):
+        """p50/p99/p99.9 latency against threads on a log scale."""
+        levels = [d for d in self.data if d['p99_lat']]
+        values = [v for d in levels for v in (d['p50_lat'], d['p99_lat'], d['p999_lat']) if v > 0]
+        lo, hi = math.log10(min(values)), math.log10(max(values))
+        if hi - lo < 1e-9:
+            lo, hi = lo - 0.5, hi + 0.5
+        sx = lambda i: pad + i / max(1, len(levels) - 1) * (width - 2 * pad)
+        sy = lambda v: height - pad - (math.log10(v) - lo) / (hi - lo) * (height - 2 * pad)
+        svg = [f'<svg viewBox="0 0 {width} {height}" class="w-full">']
+        for e in range(math.floor(lo), math.ceil(hi) + 1):
+            v = 10 ** e
+            if lo <= e <= hi:
+                svg.append(f'<line x1="{pad}" x2="{width - pad}" y1="{sy(v):.1f}" y2="{sy(v):.1f}" stroke="#f1f5f9"/>'
+                           f'<text x="{pad - 6}" y="{sy(v) + 4:.1f}" text-anchor="end" font-size="10" fill="#94a3b8">{v:g} ms</text>')
+        for i, d in enumerate(levels):
+            svg.append(f'<text x="{sx(i):.1f}" y="{height - pad + 16}" text-anchor="middle" font-size="10" fill="#94a3b8">{d["threads"]}</text>')
+        legend = ""
+        for key, label, color in [('p50_lat', 'p50', '#22c55e'), ('p99_lat', 'p99', '#f97316'), ('p999_lat', 'p99.9', '#ef4444')]:
+            pts = [(sx(i), sy(d[key])) for i, d in enumerate(levels) if d[key] > 0]
+            svg.append(f'<polyline points="{" ".join(f"{x:.1f},{y:.1f}" for x, y in pts)}" fill="none" stroke="{color}" stroke-width="2.5"/>')
+            svg.extend(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="4" fill="{color}"/>' for x, y in pts)
+            legend += f'<span class="flex items-center gap-2"><span class="w-3 h-3 rounded-full" style="background: {color}"></span>{label}</span>'
+        svg.append('</svg>')
+        return f"""
+            <section class="bg-white rounded-3xl shadow-xl border border-slate-100 p-8 mb-10">
+                <h2 class="text-2xl font-extrabold text-slate-800 mb-2 flex items-center gap-3">
+                    <span class="w-2 h-8 bg-red-500 rounded-full"></span>
+                    Latency Percentiles
+                </h2>
+                <p class="text-sm text-slate-500 mb-4">From the full latency distribution of each level (log scale).</p>
+                <div class="flex gap-6 text-xs font-bold text-slate-500 mb-4">{legend}</div>
+                {"".join(svg)}
+            </section>
+            """
+
+    def _model_chart(self, width=800, height=320, pad=48):
+        """SVG of the measured QPS points over the fitted USL curve and linear scaling."""
+        m = self.model
+        points = [(d['threads'], self._steady_qps(d)) for d in self.data]
+        top = max(n for n, _ in points)
+        x_max = top
+        if m.peak_threads:
+            x_max = max(top, min(m.peak_threads * 1.25, top * 4))
+        fitted = curve(m, x_max)
+        y_max = max([x for _, x in points] + [x for _, x in fitted]) * 1.1
+        sx = lambda n: pad + (n - 1) / max(1e-9, x_max - 1) * (width - 2 * pad)
+        sy = lambda x: height - pad - x / y_max * (height - 2 * pad)
+        fitted_path = " ".join(f"{sx(n):.1f},{sy(x):.1f}" for n, x in fitted)
+        linear_end = min(x_max, y_max / m.lam) if m.lam else x_max
+        svg = [f'<svg viewBox="0 0 {width} {height}" class="w-full">']
+        for i in range(5):
+            y = y_max * i / 4
+            svg.append(f'<line x1="{pad}" x2="{width - pad}" y1="{sy(y):.1f}" y2="{sy(y):.1f}" stroke="#f1f5f9"/>'
+                       f'<text x="{pad - 6}" y="{sy(y) + 4:.1f}" text-anchor="end" font-size="10" fill="#94a3b8">{y:.0f}</text>')
+        for n, _ in points:
+            svg.append(f'<text x="{sx(n):.1f}" y="{height - pad + 16}" text-anchor="middle" font-size="10" fill="#94a3b8">{n}</text>')
+        svg.append(f'<line x1="{sx(1):.1f}" y1="{sy(m.lam):.1f}" x2="{sx(linear_end):.1f}" y2="{sy(m.lam * linear_end):.1f}" '
+                   f'stroke="#cbd5e1" stroke-dasharray="4 4"/>')
+        svg.append(f'<polyline points="{fitted_path}" fill="none" stroke="#6366f1" stroke-width="2.5"/>')
+        if m.peak_threads and m.peak_threads <= x_max:
+            svg.append(f'<line x1="{sx(m.peak_threads):.1f}" x2="{sx(m.peak_threads):.1f}" y1="{pad}" y2="{height - pad}" '
+                       f'stroke="#f59e0b" stroke-dasharray="2 4"/>'
+                       f'<text x="{sx(m.peak_threads) + 4:.1f}" y="{pad + 10}" font-size="10" fill="#b45309">N* = {m.peak_threads:.1f}</text>')
+        for n, x in points:
+            svg.append(f'<circle cx="{sx(n):.1f}" cy="{sy(x):.1f}" r="5" fill="#0ea5e9" stroke="white" stroke-width="2">'
+                       f'<title>{n} threads: {x:.2f} QPS measured, {m.predict(n):.2f} fitted</title></circle>')
+        svg.append('</svg>')
+        return "\n".join(svg)
+
+    def _model_html(self):
+        """USL parameters, capacity predictions and the fitted curve over the measured points."""
+        m = self.model
+        peak_text, quality = self._model_summary()
+        peak_text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', peak_text)
+        cards = ""
+        for label, value in [("λ (1 thread)", f"{m.lam:.1f}"), ("σ contention", f"{m.sigma:.5f}"),
+                             ("κ coherency", f"{m.kappa:.6f}"),
+                             ("Peak threads", f"{m.peak_threads:.1f}" if m.peak_threads else "—"),
+                             ("Max QPS", f"{m.max_throughput:.0f}")]:
+            cards += f"""
+                    <div class="bg-slate-50 rounded-2xl p-4">
+                        <div class="text-[10px] font-bold text-slate-400 uppercase tracking-widest">{label}</div>
+                        <div class="text-xl font-mono font-bold text-slate-800">{value}</div>
+                    </div>"""
+        rows = ""
+        for n, predicted, measured in self._model_predictions():
+            error = f"{(predicted - measured) / measured * 100:+.1f}%" if measured else ""
+            rows += f"""
+                <tr class="border-b border-slate-50 hover:bg-slate-50/50">
+                    <td class="px-3 py-2 font-mono text-sm">{n}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{predicted:.2f}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{f"{measured:.2f}" if measured else "—"}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{error}</td>
+                </tr>"""
+        return f"""
+            <section class="bg-white rounded-3xl shadow-xl border border-slate-100 p-8 mb-10">
+                <h2 class="text-2xl font-extrabold text-slate-800 mb-2 flex items-center gap-3">
+                    <span class="w-2 h-8 bg-violet-500 rounded-full"></span>
+                    Scalability Model (USL)
+                </h2>
+                <p class="text-sm text-slate-500 mb-6">X(N) = λN / (1 + σ(N-1) + κN(N-1)). {peak_text} {quality}.</p>
+                <div class="grid grid-cols-5 gap-4 mb-8">{cards}
+                </div>
+                {self._model_chart()}
+                <p class="text-xs text-slate-400 mt-2">Dots: measured QPS. Line: fitted USL. Dashed: linear scaling λN.</p>
+                <div class="mt-6 pt-6 border-t border-slate-100">
+                    <table class="w-full max-w-xl mx-auto text-left">
+                        <thead>
+                            <tr class="text-[10px] font-bold text-slate-400 uppercase tracking-widest italic">
+                                <th class="px-3 py-2">Threads</th>
+                                <th class="px-3 py-2 text-right">Predicted QPS</th>
+                                <th class="px-3 py-2 text-right">Measured QPS</th>
+                                <th class="px-3 py-2 text-right">Error</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            {rows}
+                        </tbody>
+                    </table>
+                </div>
+            </section>
+            """
+
+    def _little_html(self):
+        """Requests in flight (X × R) against the thread count of every level."""
+        rows = ""
+        for c in self.little:
+            color = "text-emerald-600" if c.status == "ok" else "text-amber-600"
+            rows += f"""
+                <tr class="border-b border-slate-50 hover:bg-slate-50/50">
+                    <td class="px-3 py-2 font-mono text-sm">{c.threads}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{c.throughput:.2f}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{c.latency_ms:.2f}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{c.in_flight:.2f}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{c.ratio:.2f}</td>
+                    <td class="px-3 py-2 text-sm font-bold {color}">{c.status}</td>
+                </tr>"""
+        return f"""
+            <section class="bg-white rounded-3xl shadow-xl border border-slate-100 p-8 mb-10">
+                <h2 class="text-2xl font-extrabold text-slate-800 mb-2 flex items-center gap-3">
+                    <span class="w-2 h-8 bg-teal-500 rounded-full"></span>
+                    Little's Law Check
+                </h2>
+                <p class="text-sm text-slate-500 mb-6">Requests in flight X × R should equal the thread count. Below it (client-bound), threads spend time outside the server: the benchmark client is the bottleneck.</p>
+                <table class="w-full text-left">
+                    <thead>
+                        <tr class="text-[10px] font-bold text-slate-400 uppercase tracking-widest italic">
+                            <th class="px-3 py-2">Threads</th>
+                            <th class="px-3 py-2 text-right">TPS</th>
+                            <th class="px-3 py-2 text-right">Avg ms</th>
+                            <th class="px-3 py-2 text-right">X × R</th>
+                            <th class="px-3 py-2 text-right">Ratio</th>
+                            <th class="px-3 py-2">Status</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {rows}
+                    </tbody>
+                </table>
+            </section>
+            """
+
+    def load_runs(self, store, run_ids):
+        """Loads stored runs (see bench_store.py) for a comparison report; the first one is the baseline."""
+        for run_id in run_ids:
+            self.runs.append({'run': store.run(run_id), 'levels': {row['threads']: row for row in store.levels(run_id)}})
+
+    @staticmethod
+    def _run_name(r):
+        run = r['run']
+        return f"#{run['run_id']}" + (f" {run['label']}" if run['label'] else "")
+
+    def _latency_key(self):
+        """p99 when every run has it (histograms), p95 otherwise."""
+        return 'p99' if all(any(l['p99'] for l in r['levels'].values()) for r in self.runs) else 'p95'
+
+    def _comparison(self, metric):
+        """[(threads, [(value, change vs baseline or None)])] over every level of every run."""
+        def value(row):
+            if row is None:
+                return None
+            return (row['steady_qps'] or row['qps']) if metric == 'qps' else row[metric]
+
+        rows = []
+        for threads in sorted({t for r in self.runs for t in r['levels']}):
+            base = value(self.runs[0]['levels'].get(threads))
+            cells = []
+            for r in self.runs:
+                v = value(r['levels'].get(threads))
+                cells.append((v, (v - base) / base if v is not None and base else None))
+            rows.append((threads, cells))
+        return rows
+
+    def _changed_variables(self):
+        """{variable: [value per run]} for the server variables that differ between runs."""
+        variables = [json.loads(r['run']['server_variables'] or '{}') for r in self.runs]
+        names = sorted({name for v in variables for name in v})
+        return {name: [v.get(name) for v in variables] for name in names
+                if len({v.get(name) for v in variables}) > 1}
+
+    def _flag(self, change, higher_is_better):
+        if change is None or abs(change) < self.change_threshold:
+            return ""
+        return "🟢" if (change > 0) == higher_is_better else "🔴"
+
+    def _changes(self):
+        """Lines describing every throughput or latency change beyond the threshold."""
+        lat = self._latency_key()
+        out = []
+        for metric, label, better in (('qps', 'QPS', True), (lat, lat, False)):
+            for threads, cells in self._comparison(metric):
+                for r, (_, change) in zip(self.runs[1:], cells[1:]):
+                    flag = self._flag(change, better)
+                    if flag:
+                        out.append(f"{flag} {label} {change * 100:+.1f}% at {threads} threads "
+                                   f"({self._run_name(r)} vs {self._run_name(self.runs[0])})")
+        return out
+
+    def generate_comparison_markdown(self):
+        """Markdown report comparing stored runs level by level."""
+        lat = self._latency_key()
+        names = [self._run_name(r) for r in self.runs]
+        lines = [
+            "# 🔀 Scaling Comparison",
+            f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+            "## Runs",
+            "| Run | Started | Source | Git | Server | CPUs | Dataset | Scale | Knee |",
+            "|---|---|---|---|---|---|---|---|---|",
+        ]
+        for r in self.runs:
+            run = r['run']
+            lines.append(f"| {self._run_name(r)} | {run['started_at']} | {run['source']} | {run['git_revision'] or ''} | "
+                         f"{run['server_version'] or ''} | {run['host_cpus'] or ''} | {run['dataset'] or ''} | "
+                         f"{run['scale'] or ''} | {run['knee'] or ''} |")
+        changed = self._changed_variables()
+        if changed:
+            lines += ["", "## Configuration Differences", "| Variable | " + " | ".join(names) + " |",
+                      "|---|" + "---|" * len(names)]
+            for name, values in changed.items():
+                lines.append(f"| {name} | " + " | ".join("" if v is None else str(v) for v in values) + " |")
+        for metric, title, better in (('qps', 'Throughput (QPS)', True), (lat, f'Latency ({lat} ms)', False)):
+            lines += ["", f"## {title}",
+                      f"Baseline: {names[0]}. Changes beyond ±{self.change_threshold * 100:g}% are flagged.\n",
+                      "| Threads | " + " | ".join(names) + " |", "|---|" + "---|" * len(names)]
+            for threads, cells in self._comparison(metric):
+                row = []
+                for i, (v, change) in enumerate(cells):
+                    if v is None:
+                        row.append("—")
+                    elif i == 0 or change is None:
+                        row.append(f"{v:.2f}")
+                    else:
+                        row.append(f"{v:.2f} ({change * 100:+.1f}%) {self._flag(change, better)}".rstrip())
+                lines.append(f"| {threads} | " + " | ".join(row) + " |")
+        changes = self._changes()
+        lines += ["", "## Changes"] + ([f"- {c}" for c in changes] or [f"No change beyond ±{self.change_threshold * 100:g}%."])
+
+        with open(self.output_md, 'w') as f:
+            f.write('\n'.join(lines))
+        print(f"✅ Markdown report generated: {self.output_md}")
+
+    def _overlay_chart(self, metric, width=800, height=320, pad=48):
+        """SVG of one metric against threads (log2 scale) with one line per run."""
+        series = []
+        for i, r in enumerate(self.runs):
+            points = [(t, (row['steady_qps'] or row['qps']) if metric == 'qps' else row[metric])
+                      for t, row in sorted(r['levels'].items())]
+            series.append((self._run_name(r), RUN_COLORS[i % len(RUN_COLORS)], [(t, v) for t, v in points if v]))
+        threads = sorted({t for _, _, pts in series for t, _ in pts})
+        values = [v for _, _, pts in series for _, v in pts]
+        if not threads or not values:
+            return ""
+        lo, hi = math.log2(threads[0]), math.log2(threads[-1])
+        y_max = max(values) * 1.1
+        sx = lambda t: pad + ((math.log2(t) - lo) / (hi - lo) if hi > lo else 0.5) * (width - 2 * pad)
+        sy = lambda v: height - pad - v / y_max * (height - 2 * pad)
+        svg = [f'<svg viewBox="0 0 {width} {height}" class="w-full">']
+        for k in range(5):
+            y = y_max * k / 4
+            svg.append(f'<line x1="{pad}" x2="{width - pad}" y1="{sy(y):.1f}" y2="{sy(y):.1f}" stroke="#f1f5f9"/>'
+                       f'<text x="{pad - 6}" y="{sy(y) + 4:.1f}" text-anchor="end" font-size="10" fill="#94a3b8">{y:.4g}</text>')
+        for t in threads:
+            svg.append(f'<text x="{sx(t):.1f}" y="{height - pad + 16}" text-anchor="middle" font-size="10" fill="#94a3b8">{t}</text>')
+        for name, color, pts in series:
+            svg.append(f'<polyline points="{" ".join(f"{sx(t):.1f},{sy(v):.1f}" for t, v in pts)}" fill="none" stroke="{color}" stroke-width="2.5"/>')
+            svg.extend(f'<circle cx="{sx(t):.1f}" cy="{sy(v):.1f}" r="4" fill="{color}"><title>{name}: {v:.2f} at {t} threads</title></circle>'
+                       for t, v in pts)
+        svg.append('</svg>')
+        return "".join(svg)
+
+    def generate_comparison_html(self):
+        """HTML report overlaying the scaling curves of stored runs."""
+        lat = self._latency_key()
+        names = [self._run_name(r) for r in self.runs]
+        legend = "".join(f'<span class="flex items-center gap-2"><span class="w-3 h-3 rounded-full" style="background: {RUN_COLORS[i % len(RUN_COLORS)]}"></span>{name}</span>'
+                         for i, name in enumerate(names))
+        run_rows = ""
+        for r in self.runs:
+            run = r['run']
+            run_rows += f"""
+                <tr class="border-b border-slate-50">
+                    <td class="px-3 py-2 font-bold text-sm">{self._run_name(r)}</td>
+                    <td class="px-3 py-2 font-mono text-xs">{run['started_at']}</td>
+                    <td class="px-3 py-2 text-sm">{run['source']}</td>
+                    <td class="px-3 py-2 font-mono text-xs">{run['git_revision'] or ''}</td>
+                    <td class="px-3 py-2 font-mono text-xs">{run['server_version'] or ''}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{run['host_cpus'] or ''}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{run['scale'] or ''}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{run['knee'] or ''}</td>
+                </tr>"""
+        changed = self._changed_variables()
+        config = ""
+        if changed:
+            config = '<h3 class="text-sm font-bold text-slate-500 uppercase tracking-widest mt-8 mb-3">Configuration differences</h3><table class="w-full text-left">'
+            for name, values in changed.items():
+                config += (f'<tr class="border-b border-slate-50"><td class="px-3 py-2 font-mono text-xs">{name}</td>'
+                           + "".join(f'<td class="px-3 py-2 font-mono text-xs">{"" if v is None else v}</td>' for v in values) + '</tr>')
+            config += '</table>'
+
+        sections_html = f"""
+            <section class="bg-white rounded-3xl shadow-xl border border-slate-100 p-8 mb-10">
+                <h2 class="text-2xl font-extrabold text-slate-800 mb-6 flex items-center gap-3">
+                    <span class="w-2 h-8 bg-slate-500 rounded-full"></span>
+                    Runs
+                </h2>
+                <table class="w-full text-left">
+                    <thead>
+                        <tr class="text-[10px] font-bold text-slate-400 uppercase tracking-widest italic">
+                            <th class="px-3 py-2">Run</th><th class="px-3 py-2">Started</th><th class="px-3 py-2">Source</th>
+                            <th class="px-3 py-2">Git</th><th class="px-3 py-2">Server</th><th class="px-3 py-2 text-right">CPUs</th>
+                            <th class="px-3 py-2 text-right">Scale</th><th class="px-3 py-2 text-right">Knee</th>
+                        </tr>
+                    </thead>
+                    <tbody>{run_rows}</tbody>
+                </table>
+                {config}
+            </section>
+            """
+        for metric, title, better, color in (('qps', 'Throughput (QPS)', True, 'blue'), (lat, f'Latency ({lat} ms)', False, 'orange')):
+            rows = ""
+            for threads, cells in self._comparison(metric):
+                tds = ""
+                for i, (v, change) in enumerate(cells):
+                    flag = self._flag(change, better) if i else ""
+                    tone = {"🟢": "bg-emerald-50 text-emerald-700", "🔴": "bg-red-50 text-red-700"}.get(flag, "")
+                    text = "—" if v is None else f"{v:.2f}" + (f" <span class='text-[10px]'>({change * 100:+.1f}%)</span>" if i and change is not None else "")
+                    tds += f'<td class="px-3 py-2 font-mono text-sm text-right {tone}">{text}</td>'
+                rows += f'<tr class="border-b border-slate-50"><td class="px-3 py-2 font-mono text-sm">{threads}</td>{tds}</tr>'
+            sections_html += f"""
+            <section class="bg-white rounded-3xl shadow-xl border border-slate-100 p-8 mb-10">
+                <h2 class="text-2xl font-extrabold text-slate-800 mb-2 flex items-center gap-3">
+                    <span class="w-2 h-8 bg-{color}-500 rounded-full"></span>
+                    {title}
+                </h2>
+                <p class="text-sm text-slate-500 mb-4">Baseline: {names[0]}. Changes beyond ±{self.change_threshold * 100:g}% are highlighted.</p>
+                <div class="flex gap-6 text-xs font-bold text-slate-500 mb-4">{legend}</div>
+                {self._overlay_chart(metric)}
+                <table class="w-full text-left mt-6">
+                    <thead>
+                        <tr class="text-[10px] font-bold text-slate-400 uppercase tracking-widest italic">
+                            <th class="px-3 py-2">Threads</th>{"".join(f'<th class="px-3 py-2 text-right">{n}</th>' for n in names)}
+                        </tr>
+                    </thead>
+                    <tbody>{rows}</tbody>
+                </table>
+            </section>
+            """
+
+        html_content = self._page("Scaling Comparison", f"{len(self.runs)} stored runs overlaid level by level", sections_html)
+        with open(self.output_html, 'w') as f:
+            f.write(html_content)
+        print(f"✅ HTML report generated: {self.output_html}")
+
+    def _page(self, title, subtitle, sections_html):
+        """Full HTML page around the report sections."""
+        return f"""
 <!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Scaling Performance Report</title>
+    <title>{title} Report</title>
     <script src="https://cdn.tailwindcss.com"></script>
     <link href="https://fonts.googleapis.com/css2?family=Plus+Jakarta+Sans:wght@300;400;500;600;700;800&family=JetBrains+Mono:wght@400;500;600&display=swap" rel="stylesheet">
     <style>
@@ -170,8 +972,8 @@ class PerfReporter:
                     </svg>
                 </div>
                 <div>
-                    <h1 class="text-4xl font-extrabold tracking-tight text-slate-900">Scaling Performance</h1>
-                    <p class="text-slate-500 font-medium">Detailed analysis of database performance across multiple thread counts</p>
+                    <h1 class="text-4xl font-extrabold tracking-tight text-slate-900">{title}</h1>
+                    <p class="text-slate-500 font-medium">{subtitle}</p>
                 </div>
             </div>
             
@@ -197,24 +999,154 @@ class PerfReporter:
 </body>
 </html>
         """
-        with open(self.output_html, 'w') as f:
-            f.write(html_content)
-        print(f"✅ HTML report generated: {self.output_html}")
+
+    def _sweep_summary(self):
+        sweep = self.sweep
+        knee = sweep.get('knee')
+        seconds = sum(l['seconds'] for l in sweep['levels'])
+        text = (f"Knee at **{knee['threads']} threads**: {knee['reason']}." if knee
+                else f"No knee: QPS still scales at {sweep['levels'][-1]['threads']} threads.")
+        ended = "QPS clearly falling" if sweep['end'] == 'falling' else "last level reached"
+        return f"{text} {len(sweep['levels'])} levels, {seconds} s of sysbench time (coarse pass ended: {ended})."
+
+    def _sweep_html(self):
+        """Levels chosen by thread_sweep.py and the detected knee."""
+        knee = (self.sweep.get('knee') or {}).get('threads')
+        summary = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', self._sweep_summary())
+        rows = ""
+        for l in self.sweep['levels']:
+            highlight = "bg-emerald-50 font-bold" if l['threads'] == knee else ""
+            badge = '<span class="ml-2 text-[10px] uppercase tracking-widest text-emerald-600">knee</span>' if l['threads'] == knee else ""
+            rows += f"""
+                <tr class="border-b border-slate-50 hover:bg-slate-50/50 {highlight}">
+                    <td class="px-3 py-2 font-mono text-sm">{l['threads']}{badge}</td>
+                    <td class="px-3 py-2 text-sm">{l['phase']}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{l['seconds']}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{l['qps']:.2f}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">±{l['qps_ci']:.2f}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{l['p95']:.2f}</td>
+                    <td class="px-3 py-2 text-sm">{l['stop']}</td>
+                </tr>
+                """
+        return f"""
+            <section class="bg-white rounded-3xl shadow-xl border border-slate-100 p-8 mb-10">
+                <h2 class="text-2xl font-extrabold text-slate-800 mb-2 flex items-center gap-3">
+                    <span class="w-2 h-8 bg-emerald-500 rounded-full"></span>
+                    Adaptive Sweep
+                </h2>
+                <p class="text-sm text-slate-500 mb-6">{summary}</p>
+                <table class="w-full text-left">
+                    <thead>
+                        <tr class="text-[10px] font-bold text-slate-400 uppercase tracking-widest italic">
+                            <th class="px-3 py-2">Threads</th>
+                            <th class="px-3 py-2">Phase</th>
+                            <th class="px-3 py-2 text-right">Seconds</th>
+                            <th class="px-3 py-2 text-right">QPS</th>
+                            <th class="px-3 py-2 text-right">95% CI</th>
+                            <th class="px-3 py-2 text-right">p95 ms</th>
+                            <th class="px-3 py-2">Stop</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {rows}
+                    </tbody>
+                </table>
+            </section>
+            """
+
+    def _queries_html(self):
+        """Per-query tail latency table of the highest thread level."""
+        level = self.data[-1]
+        rows = ""
+        for q in self.queries:
+            text = q['query'][:120].replace('&', '&amp;').replace('<', '&lt;')
+            rows += f"""
+                <tr class="border-b border-slate-50 hover:bg-slate-50/50">
+                    <td class="px-3 py-2 font-mono text-sm">{q['id']}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{q['count']}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{q['errors']}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{q['p50']:.2f}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right font-bold">{q['p99']:.2f}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{q['p999']:.2f}</td>
+                    <td class="px-3 py-2 font-mono text-sm text-right">{q['max']:.2f}</td>
+                    <td class="px-3 py-2 text-sm">
+                        <div class="bg-slate-100 rounded-full h-3 overflow-hidden w-24"><div class="bg-red-500 h-full" style="width: {q['tail_share']:.1f}%"></div></div>
+                        <span class="font-mono text-xs text-slate-500">{q['tail_share']:.1f}%</span>
+                    </td>
+                    <td class="px-3 py-2 font-mono text-xs text-slate-500">{text}</td>
+                </tr>
+                """
+        return f"""
+            <section class="bg-white rounded-3xl shadow-xl border border-slate-100 p-8 mb-10">
+                <h2 class="text-2xl font-extrabold text-slate-800 mb-2 flex items-center gap-3">
+                    <span class="w-2 h-8 bg-red-500 rounded-full"></span>
+                    Per-Query Latency ({level['threads']} threads, {level['mode']} loop)
+                </h2>
+                <p class="text-sm text-slate-500 mb-6">Slowest queries by p99. Tail share: fraction of all requests at or above the overall p99 ({level['p99_lat']:.2f} ms) that belong to the query.</p>
+                <table class="w-full text-left">
+                    <thead>
+                        <tr class="text-[10px] font-bold text-slate-400 uppercase tracking-widest italic">
+                            <th class="px-3 py-2">ID</th>
+                            <th class="px-3 py-2 text-right">Count</th>
+                            <th class="px-3 py-2 text-right">Errors</th>
+                            <th class="px-3 py-2 text-right">p50 ms</th>
+                            <th class="px-3 py-2 text-right">p99 ms</th>
+                            <th class="px-3 py-2 text-right">p99.9 ms</th>
+                            <th class="px-3 py-2 text-right">Max ms</th>
+                            <th class="px-3 py-2">Tail Share</th>
+                            <th class="px-3 py-2">Query</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {rows}
+                    </tbody>
+                </table>
+            </section>
+            """
 
 def main():
-    parser = argparse.ArgumentParser(description="Generate scaling performance reports from sysbench results.")
-    parser.add_argument("--dir", default="reports/perf_threads", help="Directory containing results_*_threads.txt files")
-    parser.add_argument("--md", default="reports/perf_threads/scaling_report.md", help="Output Markdown file")
-    parser.add_argument("--html", default="reports/perf_threads/scaling_report.html", help="Output HTML file")
+    parser = argparse.ArgumentParser(description="Generate scaling performance reports from sysbench or load generator results.")
+    parser.add_argument("--dir", default="reports/perf_threads", help="Directory containing results_*_threads.txt or loadgen_*_threads.json files")
+    parser.add_argument("--md", help="Output Markdown file (default: reports/perf_threads/scaling_report.md, comparison_report.md with --compare)")
+    parser.add_argument("--html", help="Output HTML file (default: reports/perf_threads/scaling_report.html, comparison_report.html with --compare)")
+    parser.add_argument("--source", choices=["auto", "sysbench", "loadgen"], default="auto", help="Result files to read (auto: load generator JSON when present)")
+    parser.add_argument("--top", type=int, default=10, help="Queries listed in the per-query latency section")
+    parser.add_argument("--compare", help="Comma-separated stored runs to overlay (ids, labels, latest, latest~1...); the first is the baseline")
+    parser.add_argument("--results-db", default="reports/bench_results.sqlite", help="SQLite benchmark database (see bench_store.py)")
+    parser.add_argument("--threshold", type=float, default=0.05, help="Relative change flagged in the comparison")
     
     args = parser.parse_args()
-    
-    reporter = PerfReporter(args.dir, args.md, args.html)
+    report = "comparison_report" if args.compare else "scaling_report"
+    args.md = args.md or f"reports/perf_threads/{report}.md"
+    args.html = args.html or f"reports/perf_threads/{report}.html"
+
+    if args.compare:
+        if not os.path.exists(args.results_db):
+            print(f"Error: benchmark database not found at {args.results_db}")
+            sys.exit(1)
+        store = BenchStore(args.results_db)
+        refs = [ref.strip() for ref in args.compare.split(",") if ref.strip()]
+        run_ids = [store.resolve_run(ref) for ref in refs]
+        unknown = [ref for ref, run_id in zip(refs, run_ids) if run_id is None]
+        if unknown or len(run_ids) < 2:
+            print(f"Error: need at least two stored runs, unknown: {', '.join(unknown) or 'none'}")
+            sys.exit(1)
+        reporter = PerfReporter(args.dir, args.md, args.html)
+        reporter.change_threshold = args.threshold
+        reporter.load_runs(store, run_ids)
+        store.close()
+        os.makedirs(os.path.dirname(args.md) or ".", exist_ok=True)
+        reporter.generate_comparison_markdown()
+        reporter.generate_comparison_html()
+        return
+
+    reporter = PerfReporter(args.dir, args.md, args.html, args.source, args.top)
     reporter.parse_results()
     if not reporter.data:
         print("No result files found. Run the performance tests first.")
         sys.exit(1)
         
+    reporter.fit_models()
     reporter.generate_markdown()
     reporter.generate_html()
 
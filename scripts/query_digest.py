@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Query normalization and fingerprints.
+
+Two statements that only differ by their literal values, comments,
+whitespace or keyword case normalize to the same text (in the spirit of
+``pt-fingerprint`` and the server's statement digests), so results can be
+tracked per query shape across runs.
+"""
+import hashlib
+import re
+
+COMMENT = re.compile(r"/\*(?![!+]).*?\*/|(?:--(?=\s|$)|#)[^\n]*", re.DOTALL)
+STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"", re.DOTALL)
+# A comment only starts outside quotes: quoted tokens are matched first and kept.
+QUOTED_OR_COMMENT = re.compile(rf"(`(?:[^`]|``)*`|{STRING.pattern})|{COMMENT.pattern}", re.DOTALL)
+NUMBER = re.compile(r"(?<![\w.`])(?:0x[0-9a-fA-F]+|\d+(?:\.\d+)?(?:e[-+]?\d+)?)(?![\w`])", re.IGNORECASE)
+IN_LIST = re.compile(r"\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+VALUES_LIST = re.compile(r"\bvalues\s*\([^()]*\)(?:\s*,\s*\([^()]*\))*", re.IGNORECASE)
+OPERATOR = re.compile(r"\s*(<=>|[<>!]=|<>|[=<>])\s*")
+COMMA = re.compile(r"\s*,\s*")
+WHITESPACE = re.compile(r"\s+")
+
+
+def strip_comments(sql):
+    """Replaces each comment with a space; '#' or '-- ' inside quotes is kept."""
+    return QUOTED_OR_COMMENT.sub(lambda m: m.group(1) or " ", sql)
+
+
+def normalize_query(sql):
+    """Returns the query shape: literals as ?, lists collapsed, lowercase, single spaces."""
+    text = strip_comments(sql)
+    text = STRING.sub("?", text)
+    text = NUMBER.sub("?", text)
+    text = IN_LIST.sub("in (?+)", text)
+    text = VALUES_LIST.sub("values (?+)", text)
+    text = OPERATOR.sub(r" \1 ", text)
+    text = COMMA.sub(", ", text)
+    text = WHITESPACE.sub(" ", text).strip().rstrip(";").strip()
+    return text.lower()
+
+
+def fingerprint(sql):
+    """Stable 16 hex digit identifier of the query shape."""
+    return hashlib.sha1(normalize_query(sql).encode("utf-8")).hexdigest()[:16]
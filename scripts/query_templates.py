@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""Parameterized query templates with skewed key distributions.
+
+A template file is an ordinary SQL file (split by ``sql_splitter.py``) whose
+statements contain ``{name}`` placeholders, declared once anywhere in the
+file with a comment line::
+
+    -- @param <name> <int|date|str> <distribution> <domain>
+
+Distributions:
+
+- ``uniform``: every value of the domain is equally likely;
+- ``zipf:<s>``: the k-th hottest value is drawn with a weight of 1/k^s
+  (s = 0 is uniform, s around 1 is typical of real traffic, larger is more
+  skewed);
+- ``hotspot:<fraction>:<probability>``: a ``fraction`` of the values receives
+  ``probability`` of the draws, the rest is uniform (``hotspot:0.01:0.9``:
+  1% of the keys take 90% of the traffic);
+- ``daterange:<days>`` (date parameters): a window of ``days`` days starting
+  at a uniform date, used as ``{name.from}`` and ``{name.to}``.
+
+Domains are ``table.column`` (the distinct values of the column, or its
+MIN..MAX range for dates, read once from the server), a list ``[a,b,c]`` or
+a range ``lo..hi`` (integers or ISO dates). The hot values of ``zipf`` and
+``hotspot`` are spread over the domain by a fixed stride, not the smallest
+keys, so they land on different pages like real hot rows.
+
+Values are drawn up front: ``TemplateSet.rounds`` renders every template
+``rounds`` times in statement order, which costs a few microseconds per
+statement once instead of slowing the workers. As a command line tool it
+writes the rendered statements one per line, escaped like
+``sql_splitter.py`` output, for ``employees_sysbench.lua``;
+``load_generator.py`` and ``sql_analyzer.py`` render template files
+themselves.
+"""
+import argparse
+import bisect
+import datetime
+import itertools
+import math
+import random
+import re
+import sys
+
+from db_backend import open_backend, unescape_value
+from sql_splitter import escape_statement, iter_statements
+
+KINDS = ("int", "date", "str")
+DISTRIBUTIONS = ("uniform", "zipf", "hotspot", "daterange")
+DECLARATION = re.compile(r"^[ \t]*--[ \t]*@param[ \t]+(.*?)[ \t]*$", re.MULTILINE)
+PLACEHOLDER = re.compile(r"\{(\w+)(?:\.(from|to))?\}")
+IDENTIFIER = re.compile(r"^\w+$")
+# Multiplier spreading the ranks of the hot values over the domain.
+SCATTER = 2654435761
+
+
+def is_template_file(path):
+    """True when the SQL file declares at least one @param."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return any(DECLARATION.match(line) for line in f)
+
+
+def to_literal(kind, value):
+    """SQL literal of a drawn value: integers bare, dates and strings quoted."""
+    if kind == "int":
+        return str(value)
+    if kind == "date":
+        return f"'{value.isoformat()}'"
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "''") + "'"
+
+
+def parse_scalar(kind, text):
+    text = text.strip().strip("'\"")
+    if kind == "int":
+        return int(text)
+    if kind == "date":
+        return datetime.date.fromisoformat(text)
+    return text
+
+
+class Param:
+    """One declared placeholder: its type, distribution and resolved domain."""
+
+    def __init__(self, declaration):
+        fields = declaration.split(None, 3)
+        if len(fields) != 4:
+            raise ValueError(f"@param needs <name> <type> <distribution> <domain>: '{declaration}'")
+        self.name, self.kind, spec, self.domain = fields
+        if self.kind not in KINDS:
+            raise ValueError(f"@param {self.name}: type must be one of {', '.join(KINDS)}, got '{self.kind}'")
+        self.dist, *options = spec.split(":")
+        if self.dist not in DISTRIBUTIONS:
+            raise ValueError(f"@param {self.name}: distribution must be one of {', '.join(DISTRIBUTIONS)}, got '{self.dist}'")
+        try:
+            options = [float(o) for o in options]
+        except ValueError:
+            raise ValueError(f"@param {self.name}: invalid distribution options in '{spec}'")
+        self.skew = options[0] if self.dist == "zipf" and options else 1.0
+        self.hot_fraction, self.hot_probability = (options + [0.01, 0.9][len(options):])[:2] if self.dist == "hotspot" else (0, 0)
+        self.days = int(options[0]) if self.dist == "daterange" and options else 30
+        if self.dist == "daterange" and self.kind != "date":
+            raise ValueError(f"@param {self.name}: daterange applies to date parameters")
+        hotspot_ok = self.dist != "hotspot" or (0 < self.hot_fraction <= 1 and 0 <= self.hot_probability <= 1)
+        if self.skew < 0 or self.days < 1 or not hotspot_ok:
+            raise ValueError(f"@param {self.name}: distribution options out of range in '{spec}'")
+        self.values = None
+        self.cumulative = None
+        self.stride = 1
+        self.offset = 0
+
+    @property
+    def from_server(self):
+        """True for table.column domains, which are read from the database."""
+        domain = self.domain.strip()
+        return not domain.startswith("[") and ".." not in domain
+
+    def resolve(self, backend, seed=1):
+        """Reads the domain (from the server for table.column) and prepares the sampler."""
+        domain = self.domain.strip()
+        if self.from_server:
+            values = self._read_column(backend, domain)
+        elif domain.startswith("[") and domain.endswith("]"):
+            values = [parse_scalar(self.kind, v) for v in domain[1:-1].split(",") if v.strip()]
+            if self.kind == "date":
+                values = sorted(v.toordinal() for v in values)
+        else:
+            lo, hi = (parse_scalar(self.kind, v) for v in domain.split("..", 1))
+            if self.kind == "str":
+                raise ValueError(f"@param {self.name}: ranges apply to int and date parameters")
+            if self.kind == "date":
+                lo, hi = lo.toordinal(), hi.toordinal()
+            values = range(lo, hi + 1)
+        if self.dist == "daterange":
+            # Window starts, so that the whole window stays inside the domain.
+            values = range(values[0], max(values[0], values[-1] - self.days + 1) + 1) if values else values
+        if not values:
+            raise ValueError(f"@param {self.name}: empty domain '{self.domain}'")
+        self.values = values
+        n = len(values)
+        if self.dist == "zipf":
+            self.cumulative = list(itertools.accumulate(1.0 / (k ** self.skew) for k in range(1, n + 1)))
+        if self.dist in ("zipf", "hotspot"):
+            self.stride = SCATTER % n or 1
+            while math.gcd(self.stride, n) != 1:
+                self.stride += 1
+            self.offset = random.Random(f"{seed}:{self.name}").randrange(n)
+        return self
+
+    def _read_column(self, backend, domain):
+        table, _, column = domain.partition(".")
+        if not (IDENTIFIER.match(table) and IDENTIFIER.match(column)):
+            raise ValueError(f"@param {self.name}: domain must be table.column, [a,b,...] or lo..hi, got '{domain}'")
+        if backend is None:
+            raise ValueError(f"@param {self.name}: domain {domain} needs a database connection")
+        if self.kind == "date":
+            sql = f"SELECT MIN(`{column}`), MAX(`{column}`) FROM `{table}` WHERE `{column}` < '9999-01-01'"
+        else:
+            sql = f"SELECT DISTINCT `{column}` FROM `{table}` WHERE `{column}` IS NOT NULL ORDER BY 1"
+        out, err = backend.query(sql)
+        if err.strip():
+            raise ValueError(f"@param {self.name}: could not read {domain}: {err.strip()}")
+        rows = [line.split("\t") for line in out.split("\n")[1:] if line]
+        if self.kind == "date":
+            if not rows or len(rows[0]) < 2 or "NULL" in rows[0]:
+                return []
+            lo, hi = (parse_scalar("date", v).toordinal() for v in rows[0][:2])
+            return range(lo, hi + 1)
+        values = [unescape_value(row[0]) for row in rows]
+        return [int(v) for v in values] if self.kind == "int" else values
+
+    def index(self, rng):
+        """Position in the domain of the next draw."""
+        n = len(self.values)
+        if self.dist == "zipf":
+            rank = min(bisect.bisect_left(self.cumulative, rng.random() * self.cumulative[-1]), n - 1)
+        elif self.dist == "hotspot":
+            hot = max(1, min(n, round(n * self.hot_fraction)))
+            rank = rng.randrange(hot) if hot == n or rng.random() < self.hot_probability else rng.randrange(hot, n)
+        else:
+            return rng.randrange(n)
+        return (rank * self.stride + self.offset) % n
+
+    def value(self, index):
+        value = self.values[index]
+        return datetime.date.fromordinal(value) if self.kind == "date" else value
+
+    def draw(self, rng):
+        """Literals of one draw: {name}, plus {name.from} and {name.to} for date ranges."""
+        value = self.value(self.index(rng))
+        literals = {self.name: to_literal(self.kind, value)}
+        if self.dist == "daterange":
+            literals[f"{self.name}.from"] = literals[self.name]
+            literals[f"{self.name}.to"] = to_literal("date", value + datetime.timedelta(days=self.days - 1))
+        return literals
+
+
+class TemplateSet:
+    """The statements of a template file and the parameters they draw."""
+
+    def __init__(self, path):
+        self.path = path
+        self.params = {}
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for match in DECLARATION.finditer(f.read()):
+                param = Param(match.group(1))
+                if param.name in self.params:
+                    raise ValueError(f"@param {param.name} is declared twice")
+                self.params[param.name] = param
+        # Comments (and so the declarations) are dropped from the statements.
+        self.statements = [(stmt.line, stmt.text) for stmt in iter_statements(path, strip_comments=True)]
+        for line, text in self.statements:
+            for name, bound in PLACEHOLDER.findall(text):
+                if bound and name in self.params and self.params[name].dist != "daterange":
+                    raise ValueError(f"line {line}: {{{name}.{bound}}} needs a daterange parameter")
+        self.resolved = False
+
+    @property
+    def needs_server(self):
+        return any(param.from_server for param in self.params.values())
+
+    def resolve(self, backend, seed=1):
+        """Reads every domain; the backend is only used for table.column domains."""
+        for param in self.params.values():
+            param.resolve(backend, seed)
+        self.resolved = True
+        return self
+
+    def render(self, index, rng):
+        """One rendering of statement ``index``; a parameter used twice gets the same value."""
+        drawn = {}
+
+        def substitute(match):
+            param = self.params.get(match.group(1))
+            if param is None:
+                return match.group(0)
+            if param.name not in drawn:
+                drawn[param.name] = param.draw(rng)
+            return drawn[param.name][match.group(0)[1:-1]]
+
+        return PLACEHOLDER.sub(substitute, self.statements[index][1])
+
+    def rounds(self, rounds, seed=1):
+        """(statement number from 1, line, SQL) for ``rounds`` passes over the file."""
+        if not self.resolved:
+            raise ValueError("resolve() the template set before rendering it")
+        rng = random.Random(seed)
+        return [(i + 1, self.statements[i][0], self.render(i, rng))
+                for _ in range(rounds) for i in range(len(self.statements))]
+
+
+def skew_summary(param, draws=10000, seed=1):
+    """Share of the draws taken by the hottest value and by the hottest 1% of the domain."""
+    rng = random.Random(seed)
+    counts = {}
+    for _ in range(draws):
+        index = param.index(rng)
+        counts[index] = counts.get(index, 0) + 1
+    ranked = sorted(counts.values(), reverse=True)
+    top = max(1, len(param.values) // 100)
+    hottest = max(counts, key=counts.get)
+    return {"size": len(param.values), "distinct": len(counts), "hottest": param.value(hottest),
+            "top_share": ranked[0] / draws, "top1pct_share": sum(ranked[:top]) / draws}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a query template file into escaped statements, one per line, with values drawn from the declared distributions.")
+    parser.add_argument("file", help="Template SQL file (-- @param declarations)")
+    parser.add_argument("--rounds", type=int, default=500, help="Renderings of every template, written in statement order")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the drawn values")
+    parser.add_argument("--out", default="-", help="Output file ('-' for stdout)")
+    parser.add_argument("--summary", action="store_true", help="Print the domain size and skew of every parameter (to stderr)")
+    parser.add_argument("--container", help="Name of the MariaDB container (if using Docker)")
+    parser.add_argument("--host", default="127.0.0.1", help="Database host")
+    parser.add_argument("--port", type=int, default=3306, help="Database port")
+    parser.add_argument("--user", default="root", help="Database user")
+    parser.add_argument("--password", default="root", help="Database password")
+    parser.add_argument("--db", default="employees", help="Database name")
+    parser.add_argument("--socket", help="Local socket path (driver backend only, instead of host/port)")
+    parser.add_argument("--backend", choices=["auto", "driver", "cli"], default="auto", help="Connection backend: pooled driver sessions, mariadb CLI per statement, or auto-detect")
+    args = parser.parse_args()
+
+    if args.rounds < 1:
+        print("Error: --rounds must be positive")
+        sys.exit(1)
+    try:
+        templates = TemplateSet(args.file)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    backend = None
+    try:
+        if templates.needs_server:
+            backend = open_backend(args)
+        templates.resolve(backend, args.seed)
+    except (RuntimeError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        if backend is not None:
+            backend.close()
+
+    rendered = templates.rounds(args.rounds, args.seed)
+    out = sys.stdout if args.out == "-" else open(args.out, "w")
+    try:
+        for _, _, sql in rendered:
+            out.write(escape_statement(sql) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if args.summary:
+        print(f"🎯 {len(templates.statements)} statements x {args.rounds} rounds = {len(rendered)} rendered from {args.file}", file=sys.stderr)
+        for param in templates.params.values():
+            s = skew_summary(param, seed=args.seed)
+            print(f"   {param.name:<12} {param.kind:<4} {param.dist:<9} {s['size']:>9} values, hottest {s['hottest']} "
+                  f"{s['top_share']:.1%}, top 1% of keys {s['top1pct_share']:.1%} of draws", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
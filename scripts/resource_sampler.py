@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""Host and server resource sampling during a benchmark level.
+
+A background thread takes a snapshot every ``interval`` seconds of:
+
+- host CPU time (user, system, iowait, idle), context switches and disk
+  activity (requests, bytes, busy time per device) from ``/proc/stat`` and
+  ``/proc/diskstats``. A container shares the kernel of its host, so with
+  ``--container`` these are the database host's figures; with a remote
+  ``--host`` they describe the machine running the benchmark client;
+- ``SHOW GLOBAL STATUS`` counters (statements, commits, row lock waits,
+  buffer pool reads, redo bytes...) and gauges (Threads_running).
+
+Each sample holds per-second rates between two snapshots; the totals cover
+the whole level. ``efficiency`` turns them into per-query and per-transaction
+costs (QPS per busy core, I/O and redo per transaction, lock waits) and a
+likely limit, which tell a CPU-bound curve from an I/O- or lock-bound one.
+
+``thread_sweep.py`` writes one ``resources_<N>_threads.json`` per level next
+to the sysbench output; ``make bench`` runs this script in the background
+(it writes its file on SIGTERM or Ctrl+C).
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+
+from db_backend import open_backend, parse_rows
+
+STATUS_COUNTERS = (
+    "Questions", "Com_commit", "Innodb_row_lock_waits", "Innodb_row_lock_time",
+    "Innodb_buffer_pool_read_requests", "Innodb_buffer_pool_reads", "Innodb_buffer_pool_pages_flushed",
+    "Innodb_data_reads", "Innodb_data_writes", "Innodb_os_log_written", "Created_tmp_disk_tables",
+)
+STATUS_GAUGES = ("Threads_running", "Threads_connected")
+# Devices that would count the I/O of the physical disks twice, or no disk at all.
+VIRTUAL_DEVICES = ("loop", "ram", "zram", "dm-", "md", "sr")
+SECTOR_BYTES = 512
+CPU_BOUND = 0.85
+IO_BOUND_IOWAIT = 0.2
+IO_BOUND_BUSY = 0.8
+LOCK_BOUND_WAITS = 0.01
+
+
+def read_cpu(proc="/proc"):
+    """Cumulative CPU jiffies (all cores) and context switches from /proc/stat."""
+    cpu = {}
+    with open(os.path.join(proc, "stat")) as f:
+        for line in f:
+            fields = line.split()
+            if fields[0] == "cpu":
+                user, nice, system, idle, iowait, irq, softirq, steal = (int(v) for v in (fields[1:9] + ["0"] * 8)[:8])
+                cpu.update({"user": user + nice, "system": system + irq + softirq, "iowait": iowait,
+                            "idle": idle, "steal": steal})
+            elif fields[0] == "ctxt":
+                cpu["ctxt"] = int(fields[1])
+    cpu["total"] = cpu["user"] + cpu["system"] + cpu["iowait"] + cpu["idle"] + cpu["steal"]
+    return cpu
+
+
+def read_disks(proc="/proc", sys_block="/sys/block"):
+    """{device: (reads, writes, bytes read, bytes written, busy ms)} of the whole disks in /proc/diskstats."""
+    disks = {}
+    whole = set(os.listdir(sys_block)) if os.path.isdir(sys_block) else None
+    with open(os.path.join(proc, "diskstats")) as f:
+        for line in f:
+            fields = line.split()
+            name = fields[2]
+            if len(fields) < 13 or name.startswith(VIRTUAL_DEVICES) or (whole is not None and name not in whole):
+                continue
+            disks[name] = (int(fields[3]), int(fields[7]), int(fields[5]) * SECTOR_BYTES,
+                           int(fields[9]) * SECTOR_BYTES, int(fields[12]))
+    return disks
+
+
+def _delta(a, b, elapsed):
+    """Per-second rates (and CPU shares) between two snapshots, plus raw counts."""
+    cpu_total = (b["cpu"]["total"] - a["cpu"]["total"]) or 1
+    share = lambda key: (b["cpu"][key] - a["cpu"][key]) / cpu_total
+    reads = writes = read_bytes = write_bytes = 0
+    busy = 0.0
+    for name, now in b["disks"].items():
+        before = a["disks"].get(name, now)
+        reads += now[0] - before[0]
+        writes += now[1] - before[1]
+        read_bytes += now[2] - before[2]
+        write_bytes += now[3] - before[3]
+        busy = max(busy, (now[4] - before[4]) / (elapsed * 1000))
+    d = {
+        "cpu_user": share("user"),
+        "cpu_system": share("system"),
+        "cpu_iowait": share("iowait"),
+        "cpu_steal": share("steal"),
+        "ctxt": b["cpu"]["ctxt"] - a["cpu"]["ctxt"],
+        "disk_reads": reads,
+        "disk_writes": writes,
+        "disk_read_bytes": read_bytes,
+        "disk_write_bytes": write_bytes,
+        "disk_busy": min(busy, 1.0),
+        "status": {k: b["status"][k] - a["status"][k] for k in STATUS_COUNTERS
+                   if k in a["status"] and k in b["status"]},
+    }
+    d["cpu_busy"] = d["cpu_user"] + d["cpu_system"]
+    return d
+
+
+class ResourceSampler:
+    """Samples /proc and SHOW GLOBAL STATUS on a background thread between start() and stop()."""
+
+    def __init__(self, args, interval=1.0, proc="/proc"):
+        self.args = args
+        self.interval = interval
+        self.proc = proc
+        self.cpus = os.cpu_count() or 1
+        self.samples = []
+        self.status_error = None
+        self._backend = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._first = self._last = None
+        self._started = 0.0
+
+    def _status(self):
+        """Current counters and gauges, {} once the server could not be queried."""
+        if self.status_error:
+            return {}
+        names = ", ".join(f"'{name}'" for name in STATUS_COUNTERS + STATUS_GAUGES)
+        try:
+            if self._backend is None:
+                self._backend = open_backend(self.args)
+            out, err = self._backend.query(f"SHOW GLOBAL STATUS WHERE Variable_name IN ({names});")
+        except Exception as e:
+            out, err = "", str(e)
+        rows = parse_rows(out)
+        if not rows:
+            self.status_error = (err or "no status returned").strip().splitlines()[-1]
+            return {}
+        return {row["Variable_name"]: int(row["Value"]) for row in rows if row["Value"].isdigit()}
+
+    def _snapshot(self):
+        return {"time": time.monotonic(), "cpu": read_cpu(self.proc), "disks": read_disks(self.proc),
+                "status": self._status()}
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            snap = self._snapshot()
+            self._append(self._last, snap)
+            self._last = snap
+
+    def _append(self, a, b):
+        elapsed = b["time"] - a["time"]
+        if elapsed <= 0:
+            return
+        d = _delta(a, b, elapsed)
+        sample = {
+            "t": round(b["time"] - self._started, 1),
+            "cpu_user": d["cpu_user"], "cpu_system": d["cpu_system"], "cpu_iowait": d["cpu_iowait"],
+            "busy_cores": d["cpu_busy"] * self.cpus,
+            "ctxt_s": d["ctxt"] / elapsed,
+            "disk_reads_s": d["disk_reads"] / elapsed,
+            "disk_writes_s": d["disk_writes"] / elapsed,
+            "disk_read_kb_s": d["disk_read_bytes"] / 1024 / elapsed,
+            "disk_write_kb_s": d["disk_write_bytes"] / 1024 / elapsed,
+            "disk_busy": d["disk_busy"],
+        }
+        sample.update({f"{k.lower()}_s": v / elapsed for k, v in d["status"].items()})
+        for gauge in STATUS_GAUGES:
+            if gauge in b["status"]:
+                sample[gauge.lower()] = b["status"][gauge]
+        self.samples.append({k: round(v, 4) if isinstance(v, float) else v for k, v in sample.items()})
+
+    def start(self):
+        self._started = time.monotonic()
+        self._first = self._last = self._snapshot()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops sampling and returns the document (settings, samples and whole-level totals)."""
+        self._stop.set()
+        self._thread.join()
+        final = self._snapshot()
+        if final["time"] - self._last["time"] >= self.interval / 2:
+            self._append(self._last, final)
+        if self._backend is not None:
+            self._backend.close()
+        elapsed = final["time"] - self._first["time"]
+        totals = _delta(self._first, final, elapsed) if elapsed > 0 else {}
+        running = [s["threads_running"] for s in self.samples if "threads_running" in s]
+        if totals:
+            totals["busy_cores"] = totals["cpu_busy"] * self.cpus
+            totals["threads_running_avg"] = sum(running) / len(running) if running else None
+            totals["threads_running_max"] = max(running) if running else None
+        return {
+            "tool": "resource_sampler",
+            "interval": self.interval,
+            "cpus": self.cpus,
+            "seconds": round(elapsed, 1),
+            "status_error": self.status_error,
+            "totals": {k: round(v, 4) if isinstance(v, float) else v for k, v in totals.items()},
+            "samples": self.samples,
+        }
+
+
+def _mean(samples, key):
+    values = [s[key] for s in samples if s.get(key) is not None]
+    return sum(values) / len(values) if values else None
+
+
+def efficiency(doc, qps, tps, since=0):
+    """Derived costs of a level from its resource document, over the samples after ``since`` seconds.
+
+    Returns busy cores, CPU shares, QPS per busy core, context switches per
+    query, disk I/O and KB written per transaction, buffer pool misses per
+    query, redo KB per transaction, row lock waits per second and the likely
+    limit ("cpu", "io", "locks" or "" when none stands out).
+    """
+    samples = [s for s in doc.get("samples", []) if s["t"] > since] or doc.get("samples", [])
+    if not samples:
+        return None
+    per = lambda value, rate: value / rate if value is not None and rate else None
+    cores = _mean(samples, "busy_cores")
+    cpu_busy = cores / doc["cpus"] if cores is not None else 0.0
+    iowait = _mean(samples, "cpu_iowait") or 0.0
+    disk_busy = max(s["disk_busy"] for s in samples)
+    io = (_mean(samples, "disk_reads_s") or 0.0) + (_mean(samples, "disk_writes_s") or 0.0)
+    lock_waits = _mean(samples, "innodb_row_lock_waits_s")
+    lock_time = _mean(samples, "innodb_row_lock_time_s")
+    if cpu_busy >= CPU_BOUND:
+        limit = "cpu"
+    elif iowait >= IO_BOUND_IOWAIT or disk_busy >= IO_BOUND_BUSY:
+        limit = "io"
+    elif (per(lock_waits, tps) or 0) >= LOCK_BOUND_WAITS:
+        limit = "locks"
+    else:
+        limit = ""
+    return {
+        "busy_cores": cores,
+        "cpu_busy": cpu_busy,
+        "cpu_user": _mean(samples, "cpu_user"),
+        "cpu_system": _mean(samples, "cpu_system"),
+        "cpu_iowait": iowait,
+        "disk_busy": disk_busy,
+        "qps_per_core": per(qps, cores),
+        "ctxt_per_query": per(_mean(samples, "ctxt_s"), qps),
+        "io_per_txn": per(io, tps),
+        "write_kb_per_txn": per(_mean(samples, "disk_write_kb_s"), tps),
+        "bp_reads_per_query": per(_mean(samples, "innodb_buffer_pool_reads_s"), qps),
+        "redo_kb_per_txn": per(_mean(samples, "innodb_os_log_written_s") / 1024
+                               if _mean(samples, "innodb_os_log_written_s") is not None else None, tps),
+        "lock_waits_s": lock_waits,
+        "lock_ms_per_wait": per(lock_time, lock_waits),
+        "threads_running": _mean(samples, "threads_running"),
+        "limit": limit,
+    }
+
+
+def print_summary(doc):
+    t = doc["totals"]
+    if not t:
+        return
+    print(f"🔍 Resources over {doc['seconds']} s: {t['busy_cores']:.2f}/{doc['cpus']} cores busy "
+          f"(user {t['cpu_user'] * 100:.0f}%, sys {t['cpu_system'] * 100:.0f}%, iowait {t['cpu_iowait'] * 100:.0f}%), "
+          f"{t['disk_reads'] + t['disk_writes']} disk I/O, {t['ctxt']} context switches")
+    if doc["status_error"]:
+        print(f"⚠️ SHOW GLOBAL STATUS unavailable: {doc['status_error']}")
+    elif t["status"]:
+        s = t["status"]
+        print(f"   {s.get('Questions', 0)} statements, {s.get('Innodb_buffer_pool_reads', 0)} buffer pool reads, "
+              f"{s.get('Innodb_row_lock_waits', 0)} row lock waits, {s.get('Innodb_os_log_written', 0) // 1024} KB redo, "
+              f"Threads_running avg {t['threads_running_avg'] or 0:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sample host (/proc) and server (SHOW GLOBAL STATUS) resources until stopped with SIGTERM or Ctrl+C.")
+    parser.add_argument("--out", required=True, help="Output JSON file (e.g. reports/bench/resources_1_threads.json)")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between samples")
+    parser.add_argument("--duration", type=float, help="Stop after this many seconds instead of waiting for a signal")
+    parser.add_argument("--container", help="Name of the MariaDB container (if using Docker)")
+    parser.add_argument("--host", default="127.0.0.1", help="Database host")
+    parser.add_argument("--port", type=int, default=3306, help="Database port")
+    parser.add_argument("--user", default="root", help="Database user")
+    parser.add_argument("--password", default="root", help="Database password")
+    parser.add_argument("--db", default="employees", help="Database name")
+    parser.add_argument("--socket", help="Local socket path (driver backend only, instead of host/port)")
+    parser.add_argument("--backend", choices=["auto", "driver", "cli"], default="auto", help="Connection backend: pooled driver sessions, mariadb CLI per statement, or auto-detect")
+    args = parser.parse_args()
+
+    if args.interval <= 0:
+        print("Error: --interval must be positive")
+        sys.exit(1)
+    if not os.path.exists("/proc/stat"):
+        print("Error: /proc/stat not found (Linux only)")
+        sys.exit(1)
+
+    done = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: done.set())
+    sampler = ResourceSampler(args, args.interval).start()
+    try:
+        done.wait(args.duration)
+    except KeyboardInterrupt:
+        pass
+    doc = sampler.stop()
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(doc, f, indent=1)
+    print_summary(doc)
+    print(f"✅ Resource samples written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Capacity models for the thread-scaling reports.
+
+- **Universal Scalability Law** (Gunther): throughput at concurrency N is
+  ``X(N) = λN / (1 + σ(N - 1) + κN(N - 1))`` where λ is the single-thread
+  throughput, σ the contention (serialized fraction, Amdahl) and κ the
+  coherency cost (crosstalk between threads, which makes throughput fall
+  past the peak ``N* = sqrt((1 - σ) / κ)``). For given σ and κ the best λ is
+  a linear least-squares solution, so only (σ, κ) are searched: a log grid
+  followed by a Nelder-Mead refinement, with σ and κ kept non-negative.
+- **Little's law**: in a closed loop without think time, N busy threads
+  sustain ``N = X × R`` (throughput × mean latency). A measured ``X × R``
+  well below N means threads spent time outside the database (client CPU,
+  benchmark driver, network): the curve then measures the client, not the
+  server.
+"""
+import math
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+LITTLE_TOLERANCE = 0.2
+SIGMA_GRID = [0.0] + [10 ** (e / 4) for e in range(-20, 0)]
+KAPPA_GRID = [0.0] + [10 ** (e / 4) for e in range(-28, -3)]
+
+
+def usl(n, lam, sigma, kappa):
+    """Throughput predicted by the USL at concurrency n."""
+    return lam * n / (1 + sigma * (n - 1) + kappa * n * (n - 1))
+
+
+@dataclass
+class UslFit:
+    lam: float
+    sigma: float
+    kappa: float
+    r2: float
+    mape: float
+    points: int
+
+    def predict(self, n):
+        return usl(n, self.lam, self.sigma, self.kappa)
+
+    @property
+    def peak_threads(self) -> Optional[float]:
+        """Concurrency of maximum throughput, None when throughput never falls."""
+        if self.kappa <= 0 or self.sigma >= 1:
+            return None
+        return max(1.0, math.sqrt((1 - self.sigma) / self.kappa))
+
+    @property
+    def max_throughput(self) -> float:
+        """Throughput at the peak, or the asymptote λ/σ (inf if linear) without retrograde region."""
+        peak = self.peak_threads
+        if peak is not None:
+            return self.predict(peak)
+        return self.lam / self.sigma if self.sigma > 0 else math.inf
+
+
+def _best_lambda(points, sigma, kappa):
+    """Least-squares λ and the residual sum of squares for fixed σ, κ."""
+    shape = [usl(n, 1.0, sigma, kappa) for n, _ in points]
+    lam = sum(g * x for g, (_, x) in zip(shape, points)) / sum(g * g for g in shape)
+    return lam, sum((lam * g - x) ** 2 for g, (_, x) in zip(shape, points))
+
+
+def _nelder_mead(f, start, step, iterations=400, tolerance=1e-12):
+    """Minimizes f over R^2 (small, dependency-free Nelder-Mead)."""
+    simplex = [list(start), [start[0] + step[0], start[1]], [start[0], start[1] + step[1]]]
+    values = [f(p) for p in simplex]
+    for _ in range(iterations):
+        order = sorted(range(3), key=lambda i: values[i])
+        simplex = [simplex[i] for i in order]
+        values = [values[i] for i in order]
+        if abs(values[2] - values[0]) <= tolerance * (abs(values[0]) + tolerance):
+            break
+        centroid = [(simplex[0][k] + simplex[1][k]) / 2 for k in range(2)]
+        reflected = [centroid[k] + (centroid[k] - simplex[2][k]) for k in range(2)]
+        fr = f(reflected)
+        if fr < values[0]:
+            expanded = [centroid[k] + 2 * (centroid[k] - simplex[2][k]) for k in range(2)]
+            fe = f(expanded)
+            simplex[2], values[2] = (expanded, fe) if fe < fr else (reflected, fr)
+        elif fr < values[1]:
+            simplex[2], values[2] = reflected, fr
+        else:
+            contracted = [centroid[k] + 0.5 * (simplex[2][k] - centroid[k]) for k in range(2)]
+            fc = f(contracted)
+            if fc < values[2]:
+                simplex[2], values[2] = contracted, fc
+            else:
+                for i in (1, 2):
+                    simplex[i] = [simplex[0][k] + 0.5 * (simplex[i][k] - simplex[0][k]) for k in range(2)]
+                    values[i] = f(simplex[i])
+    best = min(range(3), key=lambda i: values[i])
+    return simplex[best]
+
+
+def fit_usl(points: Sequence[Tuple[float, float]]) -> Optional[UslFit]:
+    """Fits (threads, throughput) points; None with fewer than 3 distinct thread counts."""
+    points = [(float(n), float(x)) for n, x in points if n > 0 and x > 0]
+    if len({n for n, _ in points}) < 3:
+        return None
+    _, sigma, kappa = min((_best_lambda(points, s, k)[1], s, k) for s in SIGMA_GRID for k in KAPPA_GRID)
+
+    # σ = a², κ = b² keeps both non-negative during the refinement.
+    def sse(p):
+        return _best_lambda(points, p[0] ** 2, p[1] ** 2)[1]
+
+    a, b = _nelder_mead(sse, (math.sqrt(sigma), math.sqrt(kappa)),
+                        (max(0.05, math.sqrt(sigma) / 2), max(0.005, math.sqrt(kappa) / 2)))
+    sigma, kappa = a * a, b * b
+    lam, rss = _best_lambda(points, sigma, kappa)
+    mean = sum(x for _, x in points) / len(points)
+    tss = sum((x - mean) ** 2 for _, x in points)
+    mape = sum(abs(usl(n, lam, sigma, kappa) - x) / x for n, x in points) / len(points)
+    return UslFit(lam, sigma, kappa, 1 - rss / tss if tss else 1.0, mape, len(points))
+
+
+@dataclass
+class LittleCheck:
+    threads: int
+    throughput: float
+    latency_ms: float
+    in_flight: float
+    ratio: float
+    status: str
+
+
+def littles_law(threads, throughput, latency_ms, tolerance=LITTLE_TOLERANCE) -> LittleCheck:
+    """Compares the concurrency implied by X × R with the number of threads.
+
+    ``client-bound``: fewer requests in flight than threads, the driver or the
+    client host is the bottleneck. ``inconsistent``: more in flight than
+    threads, the latency includes time not spent in a request.
+    """
+    in_flight = throughput * latency_ms / 1000.0
+    ratio = in_flight / threads if threads else 0.0
+    if ratio < 1 - tolerance:
+        status = "client-bound"
+    elif ratio > 1 + tolerance:
+        status = "inconsistent"
+    else:
+        status = "ok"
+    return LittleCheck(threads, throughput, latency_ms, in_flight, ratio, status)
+
+
+def curve(fit: UslFit, upto: float, steps=60) -> List[Tuple[float, float]]:
+    """Fitted throughput sampled from 1 to ``upto`` threads, for plotting."""
+    return [(n, fit.predict(n)) for n in (1 + (upto - 1) * i / steps for i in range(steps + 1))]
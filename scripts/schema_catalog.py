@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Run-wide schema metadata cache for the SQL analyzer.
+
+All columns, indexes and index cardinalities of the target database are read
+with one bulk information_schema query and kept in memory. The catalog is also
+persisted to disk, keyed by a fingerprint of the schema structure: each
+table's CREATE_TIME, columns and indexes. UPDATE_TIME is left out on purpose,
+since the DML of the query corpus would change it on every run. Index
+cardinalities are those of the run that introspected; ``--refresh-schema``
+reloads them.
+"""
+import hashlib
+import json
+import os
+import re
+
+from db_backend import parse_rows
+
+CATALOG_VERSION = 2
+
+FINGERPRINT_TABLES_SQL = """
+SELECT TABLE_NAME, CREATE_TIME
+FROM information_schema.TABLES
+WHERE TABLE_SCHEMA = '{db}'
+ORDER BY TABLE_NAME;
+"""
+
+FINGERPRINT_COLUMNS_SQL = """
+SELECT TABLE_NAME, ORDINAL_POSITION, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE
+FROM information_schema.COLUMNS
+WHERE TABLE_SCHEMA = '{db}'
+ORDER BY TABLE_NAME, ORDINAL_POSITION;
+"""
+
+FINGERPRINT_INDEXES_SQL = """
+SELECT TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX, COLUMN_NAME, NON_UNIQUE
+FROM information_schema.STATISTICS
+WHERE TABLE_SCHEMA = '{db}'
+ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX;
+"""
+
+BULK_SQL = """
+SELECT
+    c.TABLE_NAME, c.COLUMN_NAME, c.COLUMN_TYPE, c.COLUMN_KEY, c.ORDINAL_POSITION,
+    COALESCE(s.INDEX_NAME, '') AS INDEX_NAME,
+    COALESCE(s.SEQ_IN_INDEX, 0) AS SEQ_IN_INDEX,
+    COALESCE(s.NON_UNIQUE, 1) AS NON_UNIQUE,
+    COALESCE(s.CARDINALITY, 0) AS CARDINALITY
+FROM information_schema.COLUMNS c
+LEFT JOIN information_schema.STATISTICS s
+    ON c.TABLE_SCHEMA = s.TABLE_SCHEMA
+    AND c.TABLE_NAME = s.TABLE_NAME
+    AND c.COLUMN_NAME = s.COLUMN_NAME
+WHERE c.TABLE_SCHEMA = '{db}'
+ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION, s.INDEX_NAME;
+"""
+
+
+class SchemaCatalog:
+    """In-memory view of columns and indexes for every table of one database."""
+
+    def __init__(self, db, fingerprint="", tables=None, table_fingerprints=None):
+        self.db = db
+        self.fingerprint = fingerprint
+        # {table: hash of its create time, columns and indexes}
+        self.table_fingerprints = table_fingerprints or {}
+        # {table: {"columns": [{"name", "type", "key"}], "indexes": {name: {...}}}}
+        self.tables = tables or {}
+        self.from_disk = False
+
+    @staticmethod
+    def compute_table_fingerprints(backend, db):
+        """{table: hash of its create time, columns and indexes}; {} on failure."""
+        parts = {}
+        for sql in (FINGERPRINT_TABLES_SQL, FINGERPRINT_COLUMNS_SQL, FINGERPRINT_INDEXES_SQL):
+            output, err = backend.query(sql.format(db=db))
+            if err.strip():
+                return {}
+            for row in parse_rows(output):
+                parts.setdefault(row["TABLE_NAME"], []).append(json.dumps(row, sort_keys=True))
+        return {table: hashlib.sha256("\n".join(rows).encode("utf-8")).hexdigest() for table, rows in parts.items()}
+
+    @staticmethod
+    def combine(table_fingerprints):
+        """One hash for a set of table fingerprints."""
+        return hashlib.sha256(json.dumps(sorted(table_fingerprints.items())).encode("utf-8")).hexdigest()
+
+    def fingerprint_for(self, sql):
+        """Fingerprint of the tables a statement names (the whole schema if it names none).
+
+        A table counts as named when it appears as a word of the statement, so
+        an unrelated table changing does not invalidate the statement's entries.
+        """
+        words = set(re.findall(r"\w+", sql.lower()))
+        touched = {t: fp for t, fp in self.table_fingerprints.items() if t.lower() in words}
+        return self.combine(touched) if touched else self.fingerprint
+
+    @classmethod
+    def load(cls, backend, db, cache_dir=None, refresh=False):
+        """Returns the catalog from disk when its fingerprint matches, else introspects.
+
+        Returns None when the server cannot be introspected.
+        """
+        table_fingerprints = cls.compute_table_fingerprints(backend, db)
+        if not table_fingerprints:
+            return None
+        fingerprint = cls.combine(table_fingerprints)
+        cache_file = os.path.join(cache_dir, f"{db}.json") if cache_dir else None
+
+        if cache_file and not refresh and os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'r') as f:
+                    cached = json.load(f)
+                if cached.get("version") == CATALOG_VERSION and cached.get("fingerprint") == fingerprint:
+                    catalog = cls(db, fingerprint, cached["tables"], table_fingerprints)
+                    catalog.from_disk = True
+                    return catalog
+            except (OSError, ValueError, KeyError):
+                pass
+
+        output, err = backend.query(BULK_SQL.format(db=db))
+        if err.strip():
+            return None
+        catalog = cls(db, fingerprint, table_fingerprints=table_fingerprints)
+        catalog._ingest(parse_rows(output))
+
+        if cache_file:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(cache_file, 'w') as f:
+                json.dump({"version": CATALOG_VERSION, "fingerprint": fingerprint, "tables": catalog.tables}, f)
+        return catalog
+
+    def _ingest(self, rows):
+        positions = {}
+        for row in rows:
+            table = self.tables.setdefault(row["TABLE_NAME"], {"columns": [], "indexes": {}})
+            column = row["COLUMN_NAME"]
+            if not table["columns"] or table["columns"][-1]["name"] != column:
+                table["columns"].append({"name": column, "type": row["COLUMN_TYPE"], "key": row["COLUMN_KEY"]})
+            index_name = row["INDEX_NAME"]
+            if not index_name or index_name == "NULL":
+                continue
+            index = table["indexes"].setdefault(index_name, {
+                "columns": [],
+                "unique": row["NON_UNIQUE"] == "0",
+                "cardinality": 0,
+            })
+            positions.setdefault((row["TABLE_NAME"], index_name), []).append((int(row["SEQ_IN_INDEX"]), column))
+            if row["CARDINALITY"].isdigit():
+                index["cardinality"] = max(index["cardinality"], int(row["CARDINALITY"]))
+        # Index columns are stored in SEQ_IN_INDEX order.
+        for (table, index_name), cols in positions.items():
+            self.tables[table]["indexes"][index_name]["columns"] = [col for _, col in sorted(cols)]
+
+    def has_table(self, table):
+        return table in self.tables
+
+    def column_names(self, table):
+        return [c["name"] for c in self.tables.get(table, {}).get("columns", [])]
+
+    def indexes_for_column(self, table, column):
+        """Returns the names of the indexes containing a column."""
+        indexes = self.tables.get(table, {}).get("indexes", {})
+        return [name for name, idx in indexes.items() if column in idx["columns"]]
+
+    def is_leading_index_column(self, table, column):
+        """True when some index of the table starts with this column."""
+        indexes = self.tables.get(table, {}).get("indexes", {})
+        return any(idx["columns"] and idx["columns"][0] == column for idx in indexes.values())
+
+    def needs_index(self, table, column):
+        """True when the column exists in the table and no index starts with it."""
+        return column in self.column_names(table) and not self.is_leading_index_column(table, column)
+
+    def table_info(self, table):
+        """Renders a table the same way get_table_schema_info's query does."""
+        if table not in self.tables:
+            return ""
+        indexes = self.tables[table]["indexes"]
+        lines = ["Field\tType\tKey\tIndexes"]
+        for col in self.tables[table]["columns"]:
+            names = self.indexes_for_column(table, col["name"])
+            labels = [f"{name} [{indexes[name]['cardinality']}]" for name in sorted(names)]
+            lines.append("\t".join([col["name"], col["type"], col["key"], ", ".join(labels) or "None"]))
+        return "\n".join(lines) + "\n"
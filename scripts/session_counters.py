@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Per-query server counter deltas.
+
+One extra, untimed execution of the query is wrapped in ``SHOW SESSION
+STATUS`` snapshots taken on the same connection. The deltas show why a
+query is slow: rows actually touched by the storage engine (handler reads),
+logical vs physical InnoDB reads, temporary tables spilled to disk and sort
+merge passes. The cost of the snapshot statements themselves is measured
+once per session and subtracted.
+
+When performance_schema is enabled, the matching statement event (and its
+stage events, if the stages consumers are on) is read for the same thread.
+
+Note: the ``Innodb_buffer_pool_*`` counters are server-wide, so their deltas
+are only exact when no other lane is running (``--exec-lanes 1``).
+"""
+from db_backend import parse_rows
+
+COUNTERS = (
+    "Handler_read_first",
+    "Handler_read_key",
+    "Handler_read_next",
+    "Handler_read_prev",
+    "Handler_read_rnd",
+    "Handler_read_rnd_next",
+    "Innodb_buffer_pool_read_requests",
+    "Innodb_buffer_pool_reads",
+    "Created_tmp_tables",
+    "Created_tmp_disk_tables",
+    "Sort_merge_passes",
+    "Sort_rows",
+    "Select_scan",
+    "Select_full_join",
+)
+
+# Handler counters that each count one row handed to the server.
+HANDLER_READS = ("Handler_read_first", "Handler_read_key", "Handler_read_next",
+                 "Handler_read_prev", "Handler_read_rnd", "Handler_read_rnd_next")
+
+STATUS_SQL = "SHOW SESSION STATUS WHERE Variable_name IN ({});".format(
+    ", ".join(f"'{name}'" for name in COUNTERS))
+
+THREAD_ID_SQL = "(SELECT THREAD_ID FROM performance_schema.threads WHERE PROCESSLIST_ID = CONNECTION_ID())"
+
+PS_STATEMENT_SQL = f"""
+SELECT EVENT_ID, TIMER_WAIT, LOCK_TIME, ROWS_EXAMINED, ROWS_SENT, CREATED_TMP_TABLES,
+       CREATED_TMP_DISK_TABLES, SORT_MERGE_PASSES, SELECT_SCAN, SELECT_FULL_JOIN, NO_INDEX_USED
+FROM performance_schema.events_statements_history
+WHERE THREAD_ID = {THREAD_ID_SQL}
+  AND SQL_TEXT NOT LIKE 'SHOW %'
+ORDER BY EVENT_ID DESC
+LIMIT 1;
+"""
+
+PS_STAGES_SQL = f"""
+SELECT EVENT_NAME, TIMER_WAIT
+FROM performance_schema.events_stages_history_long
+WHERE THREAD_ID = {THREAD_ID_SQL} AND NESTING_EVENT_ID = {{event_id}}
+ORDER BY EVENT_ID;
+"""
+
+PICOSECONDS = 1e12
+
+
+def parse_status(output):
+    """{Variable_name: int} from the last SHOW STATUS result set in the output."""
+    lines = output.strip().split("\n")
+    headers = [i for i, line in enumerate(lines) if line.startswith("Variable_name\t")]
+    if not headers:
+        return {}
+    status = {}
+    for row in parse_rows("\n".join(lines[headers[-1]:])):
+        try:
+            status[row["Variable_name"]] = int(row["Value"])
+        except (KeyError, ValueError):
+            continue
+    return status
+
+
+def delta(before, after, overhead=None):
+    """Per-counter difference, minus the snapshot overhead, never below zero."""
+    overhead = overhead or {}
+    return {name: max(0, after.get(name, 0) - before.get(name, 0) - overhead.get(name, 0))
+            for name in COUNTERS if name in after}
+
+
+def rows_read(counters):
+    return sum(counters.get(name, 0) for name in HANDLER_READS)
+
+
+def buffer_pool_miss_ratio(counters):
+    """Physical reads per logical read request, or None without requests."""
+    requests = counters.get("Innodb_buffer_pool_read_requests", 0)
+    if not requests:
+        return None
+    return counters.get("Innodb_buffer_pool_reads", 0) / requests
+
+
+def _performance_schema(sess):
+    """Latest statement event of this thread and its stages; None when unavailable."""
+    output, err = sess.query(PS_STATEMENT_SQL)
+    rows = parse_rows(output) if not err.strip() else []
+    if not rows:
+        return None
+    row = rows[0]
+    event = {}
+    for key, value in row.items():
+        try:
+            event[key.lower()] = int(value)
+        except ValueError:
+            event[key.lower()] = None
+    event["seconds"] = (event.get("timer_wait") or 0) / PICOSECONDS
+    event["lock_seconds"] = (event.get("lock_time") or 0) / PICOSECONDS
+    stages_out, stages_err = sess.query(PS_STAGES_SQL.format(event_id=event.get("event_id") or 0))
+    event["stages"] = []
+    if not stages_err.strip():
+        for stage in parse_rows(stages_out):
+            name = stage["EVENT_NAME"].replace("stage/sql/", "")
+            wait = int(stage["TIMER_WAIT"]) if stage["TIMER_WAIT"].isdigit() else 0
+            event["stages"].append((name, wait / PICOSECONDS))
+    return event
+
+
+def collect(sess, query, backend_name):
+    """Counter deltas for one execution of the query; None if SHOW STATUS fails.
+
+    Returns {"counters": {...}, "rows_read": int, "bp_miss_ratio": float|None,
+    "statement": {...}|None}.
+    """
+    if backend_name == "cli":
+        # Every CLI call is a new session: run the query and the snapshot in
+        # one client process, against a calibration process with no query.
+        overhead = parse_status(sess.query(STATUS_SQL)[0])
+        output, err = sess.query(f"{query.rstrip().rstrip(';')};\n{STATUS_SQL}")
+        after = parse_status(output)
+        if err.strip() or not after:
+            return None
+        counters = delta({}, after, overhead)
+        statement = None
+    else:
+        first, err = sess.query(STATUS_SQL)
+        if err.strip():
+            return None
+        second, _ = sess.query(STATUS_SQL)
+        before = parse_status(second)
+        overhead = delta(parse_status(first), before)
+        _, _, query_err = sess.timed_query(query)
+        after_out, _ = sess.query(STATUS_SQL)
+        after = parse_status(after_out)
+        if query_err.strip() or not after:
+            return None
+        counters = delta(before, after, overhead)
+        statement = _performance_schema(sess)
+    return {
+        "counters": counters,
+        "rows_read": rows_read(counters),
+        "bp_miss_ratio": buffer_pool_miss_ratio(counters),
+        "statement": statement,
+    }
+
+
+def format_counters(probe):
+    """Multi-line rendering for the text report."""
+    lines = [f"{name}: {value:,}" for name, value in probe["counters"].items()]
+    lines.append(f"Rows read (handler): {probe['rows_read']:,}")
+    if probe["bp_miss_ratio"] is not None:
+        lines.append(f"Buffer pool miss ratio: {probe['bp_miss_ratio'] * 100:.2f}%")
+    statement = probe["statement"]
+    if statement:
+        lines.append(f"performance_schema: {statement['seconds']:.6f}s, lock {statement['lock_seconds']:.6f}s, "
+                     f"rows examined {statement.get('rows_examined')}, rows sent {statement.get('rows_sent')}, "
+                     f"no index used {statement.get('no_index_used')}")
+        for name, seconds in statement["stages"]:
+            lines.append(f"  stage {name}: {seconds:.6f}s")
+    return "\n".join(lines)
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""Streaming slow query log / general log digest aggregation.
+
+The log is read line by line, so multi-gigabyte production logs are
+processed in constant memory per digest. Each statement is normalized into
+a digest (``query_digest.normalize_query``) and aggregated:
+
+- count, total / max ``Query_time`` and percentiles from a log-bucketed
+  histogram (fixed size, ~5% relative error);
+- total ``Lock_time``, ``Rows_examined`` and ``Rows_sent``;
+- the slowest concrete statement as a representative sample, with its schema.
+
+The number of tracked digests is bounded too: when it exceeds
+``max_digests``, the digests with the smallest total time are dropped.
+
+General logs carry no timings, so their digests are ranked by count.
+"""
+import argparse
+import math
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from query_digest import fingerprint, normalize_query
+
+# Histogram: bucket i covers [BASE * GROWTH**i, BASE * GROWTH**(i+1)).
+HISTOGRAM_BASE = 1e-6
+HISTOGRAM_GROWTH = 1.1
+SAMPLE_MAX_CHARS = 65536
+
+SLOW_HEADER = re.compile(r"^# (?:Time|User@Host|Thread_id|Query_time|Rows_affected|Full_scan|Filesort|QC_hit|Pages_accessed|Log_slow_rate_limit|explain|Schema|Bytes_sent|Tmp_tables|Stored_routine|No_good_index_used|Rows_sent|Sort_merge_passes)\b")
+SLOW_METRIC = re.compile(r"(\w+): (\S+)")
+GENERAL_QUERY = re.compile(r"^(?:\d{6}\s+\d{1,2}:\d{2}:\d{2}|\d{4}-\d{2}-\d{2}T\S+)?\s+(\d+)\s+([A-Z][A-Za-z]*(?: [a-z]+)?)\t(.*)$")
+SERVER_BANNER = re.compile(r"^(?:\S+, Version: |Tcp port: |Time\s+Id\s+Command\s+Argument)")
+SET_TIMESTAMP = re.compile(r"^SET timestamp=\d+;$", re.IGNORECASE)
+USE_SCHEMA = re.compile(r"^use `?(\w+)`?;$", re.IGNORECASE)
+READ_ONLY = re.compile(r"^\s*(?:\(\s*)*(?:SELECT|WITH)\b", re.IGNORECASE)
+
+
+def is_read_only(sql):
+    """True for statements that are safe to replay (SELECT / WITH ... SELECT)."""
+    return bool(READ_ONLY.match(sql))
+
+
+@dataclass
+class DigestStats:
+    """Aggregate of all the statements sharing one digest."""
+    digest: str
+    normalized: str
+    count: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    lock_time: float = 0.0
+    rows_examined: int = 0
+    rows_sent: int = 0
+    histogram: Dict[int, int] = field(default_factory=dict)
+    sample: str = ""
+    sample_time: float = -1.0
+    schema: Optional[str] = None
+
+    def add(self, sql, query_time=None, lock_time=0.0, rows_examined=0, rows_sent=0, schema=None):
+        self.count += 1
+        self.lock_time += lock_time
+        self.rows_examined += rows_examined
+        self.rows_sent += rows_sent
+        if query_time is not None:
+            self.total_time += query_time
+            self.max_time = max(self.max_time, query_time)
+            bucket = int(math.log(max(query_time, HISTOGRAM_BASE) / HISTOGRAM_BASE, HISTOGRAM_GROWTH))
+            self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+        # Keep the slowest occurrence as the representative sample.
+        if (query_time or 0.0) > self.sample_time:
+            self.sample = sql[:SAMPLE_MAX_CHARS]
+            self.sample_time = query_time or 0.0
+            self.schema = schema or self.schema
+
+    def percentile(self, pct):
+        """Approximate percentile of Query_time (bucket midpoint), 0.0 without timings."""
+        timed = sum(self.histogram.values())
+        if not timed:
+            return 0.0
+        rank = math.ceil(timed * pct / 100.0)
+        seen = 0
+        for bucket in sorted(self.histogram):
+            seen += self.histogram[bucket]
+            if seen >= rank:
+                low = HISTOGRAM_BASE * HISTOGRAM_GROWTH ** bucket
+                return min(low * (1 + HISTOGRAM_GROWTH) / 2, self.max_time)
+        return self.max_time
+
+    @property
+    def mean_time(self):
+        return self.total_time / self.count if self.count else 0.0
+
+    def summary(self):
+        """Plain dict used by the analyzer reports."""
+        return {
+            "digest": self.digest,
+            "normalized": self.normalized,
+            "count": self.count,
+            "total_time": self.total_time,
+            "mean_time": self.mean_time,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max_time": self.max_time,
+            "lock_time": self.lock_time,
+            "rows_examined": self.rows_examined,
+            "rows_sent": self.rows_sent,
+            "schema": self.schema,
+        }
+
+
+class DigestAggregator:
+    """Bounded-memory map of digest -> DigestStats."""
+
+    def __init__(self, max_digests=10000):
+        self.max_digests = max_digests
+        self.digests: Dict[str, DigestStats] = {}
+        self.statements = 0
+        self.evicted = 0
+
+    def add(self, sql, **metrics):
+        sql = sql.strip()
+        if not sql:
+            return
+        self.statements += 1
+        key = fingerprint(sql)
+        stats = self.digests.get(key)
+        if stats is None:
+            stats = self.digests[key] = DigestStats(key, normalize_query(sql))
+            if len(self.digests) > self.max_digests * 1.5:
+                self._prune()
+        stats.add(sql, **metrics)
+
+    def _prune(self):
+        """Keeps the max_digests digests with the largest total time (then count)."""
+        ranked = sorted(self.digests.values(), key=lambda s: (s.total_time, s.count), reverse=True)
+        self.evicted += len(ranked) - self.max_digests
+        self.digests = {s.digest: s for s in ranked[:self.max_digests]}
+
+    def top(self, n=20, sort="total", read_only=False):
+        """The n heaviest digests; sort is total, count, p95 or max."""
+        keys = {
+            "total": lambda s: (s.total_time, s.count),
+            "count": lambda s: (s.count, s.total_time),
+            "p95": lambda s: (s.percentile(95), s.count),
+            "max": lambda s: (s.max_time, s.count),
+        }
+        digests = [s for s in self.digests.values() if not read_only or is_read_only(s.sample)]
+        return sorted(digests, key=keys[sort], reverse=True)[:n]
+
+
+def parse_slow_log(lines, aggregator):
+    """Feeds every statement of a slow query log into the aggregator."""
+    metrics = {}
+    schema = None
+    statement = []
+
+    def flush():
+        if statement:
+            aggregator.add("\n".join(statement), **metrics, schema=schema)
+            statement.clear()
+
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if line.startswith("#") and (SLOW_HEADER.match(line) or not statement):
+            # Other '#' lines inside a statement belong to it: a comment or
+            # the continuation of a multi-line string literal.
+            if SLOW_HEADER.match(line):
+                if statement:
+                    flush()
+                    metrics = {}
+                for name, value in SLOW_METRIC.findall(line):
+                    if name == "Query_time":
+                        metrics["query_time"] = float(value)
+                    elif name == "Lock_time":
+                        metrics["lock_time"] = float(value)
+                    elif name == "Rows_examined":
+                        metrics["rows_examined"] = int(value)
+                    elif name == "Rows_sent":
+                        metrics["rows_sent"] = int(value)
+                    elif name == "Schema":
+                        schema = value
+            continue
+        if not line.strip() or SERVER_BANNER.match(line):
+            continue
+        if not statement and SET_TIMESTAMP.match(line.strip()):
+            continue
+        use = USE_SCHEMA.match(line.strip())
+        if not statement and use:
+            schema = use.group(1)
+            continue
+        statement.append(line)
+    flush()
+
+
+def parse_general_log(lines, aggregator):
+    """Feeds every Query/Execute statement of a general query log into the aggregator."""
+    statement = []
+    schemas = {}
+    thread = None
+
+    def flush():
+        if statement:
+            aggregator.add("\n".join(statement), schema=schemas.get(thread))
+            statement.clear()
+
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        match = GENERAL_QUERY.match(line)
+        if match:
+            flush()
+            thread, command, argument = match.groups()
+            if command in ("Query", "Execute"):
+                statement.append(argument)
+            elif command == "Init DB":
+                schemas[thread] = argument.strip()
+            elif " on " in argument:
+                target = argument.rsplit(" on ", 1)[1].split()
+                schemas[thread] = target[0] if target else None
+            continue
+        if statement and line and not SERVER_BANNER.match(line):
+            # Continuation line of a multi-line statement.
+            statement.append(line)
+    flush()
+
+
+def aggregate_log(path, general=False, max_digests=10000):
+    """Parses a log file ('-' for stdin) and returns its DigestAggregator."""
+    aggregator = DigestAggregator(max_digests)
+    parse = parse_general_log if general else parse_slow_log
+    if path == "-":
+        parse(sys.stdin, aggregator)
+    else:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            parse(f, aggregator)
+    return aggregator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate a MariaDB slow query log (or general log) by query digest.")
+    parser.add_argument("log", help="Log file ('-' for stdin)")
+    parser.add_argument("--general", action="store_true", help="The file is a general query log (no timings)")
+    parser.add_argument("--top", type=int, default=20, help="Number of digests to print")
+    parser.add_argument("--sort", choices=["total", "count", "p95", "max"], default="total", help="Ranking criterion")
+    parser.add_argument("--max-digests", type=int, default=10000, help="Maximum number of digests kept in memory")
+    args = parser.parse_args()
+
+    if args.log != "-" and not os.path.exists(args.log):
+        print(f"Error: log file not found at {args.log}")
+        sys.exit(1)
+    aggregator = aggregate_log(args.log, args.general, args.max_digests)
+    print(f"# {aggregator.statements} statements, {len(aggregator.digests)} digests"
+          f"{f' ({aggregator.evicted} evicted)' if aggregator.evicted else ''}")
+    print("rank\tdigest\tcount\ttotal_s\tp95_s\tmax_s\trows_examined\trows_sent\tquery")
+    for rank, stats in enumerate(aggregator.top(args.top, args.sort), 1):
+        s = stats.summary()
+        print(f"{rank}\t{s['digest']}\t{s['count']}\t{s['total_time']:.3f}\t{s['p95']:.3f}\t{s['max_time']:.3f}\t"
+              f"{s['rows_examined']}\t{s['rows_sent']}\t{s['normalized'][:120]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,92 @@
-import subprocess
 import time
 import os
 import argparse
 import sys
 import re
 import json
-
-def run_command(cmd_list):
-    """Runs a shell command and returns stdout and stderr."""
-    try:
-        result = subprocess.run(cmd_list, capture_output=True, text=True, check=False)
-        return result.stdout, result.stderr
-    except Exception as e:
-        return "", str(e)
-
-def get_db_command(args, query):
-    """Constructs the database command based on Docker or direct connection."""
-    if args.container:
-        return ["docker", "exec", args.container, "mariadb", "-h", args.host, "-P", str(args.port), "-u", args.user, f"-p{args.password}", args.db, "-e", query]
-    else:
-        return ["mariadb", "-h", args.host, "-P", str(args.port), "-u", args.user, f"-p{args.password}", args.db, "-e", query]
-
-def execute_query(query, args):
+from concurrent.futures import ThreadPoolExecutor
+
+from analysis_cache import AnalysisCache, format_age, server_fingerprint, settings_fingerprint
+from baseline_store import BaselineStore
+from db_backend import CliBackend, open_backend, parse_rows, unescape_value
+from explain_plan import ExplainPlan
+from index_validator import run_validation
+from query_digest import fingerprint
+from query_templates import TemplateSet, is_template_file
+from schema_catalog import SchemaCatalog
+from slow_log import aggregate_log
+from session_counters import buffer_pool_miss_ratio, collect as collect_counters, format_counters
+from sql_splitter import iter_statements
+from target_compare import compare_targets, generate_html as generate_comparison_html, generate_markdown as generate_comparison_markdown, parse_target, speedup_label
+from timing_stats import summarize, summarize_stream, format_distribution, format_stream
+
+# Plan scoring thresholds (optimizer estimates, not measured rows).
+FULL_SCAN_MIN_ROWS = 1000
+ROWS_EXAMINED_WARN = 10_000
+ROWS_EXAMINED_CRITICAL = 1_000_000
+# Physical reads per buffer pool read request above which a query is I/O bound.
+BUFFER_POOL_MISS_WARN = 0.01
+TRANSFER_SHARE_WARN = 0.5
+
+def execute_query(query, args, backend=None):
     """Executes a query and measures time."""
-    cmd = get_db_command(args, query)
-    start = time.time()
-    stdout, stderr = run_command(cmd)
-    end = time.time()
-    return end - start, stdout, stderr
+    backend = backend or CliBackend(args)
+    return backend.timed_query(query)
 
-def get_explain_plan(query, args):
+def measure_query(query, args, backend=None):
+    """Runs --warmup untimed runs, then --iterations timed runs on one session.
+
+    Returns the timing distribution (see timing_stats.summarize). With
+    --stream the samples are times to last row of streamed executions, and
+    ``timing['stream']`` holds the time to first row and transfer rates.
+    Failed executions are not samples; ``timing['failed']`` counts them.
+    """
+    backend = backend or CliBackend(args)
+    samples = []
+    first_rows = []
+    failed = 0
+    rows = nbytes = 0
+    with backend.session() as sess:
+        run = sess.stream_query if args.stream else sess.timed_query
+        for _ in range(max(0, args.warmup)):
+            run(query)
+        for _ in range(max(1, args.iterations)):
+            if args.stream:
+                first_row, elapsed, rows, nbytes, err = sess.stream_query(query)
+            else:
+                elapsed, _, err = sess.timed_query(query)
+            if err.strip():
+                failed += 1
+                continue
+            if args.stream:
+                first_rows.append(first_row)
+            samples.append(elapsed)
+    timing = summarize(samples, args.cv_threshold)
+    timing['failed'] = failed
+    if args.stream and samples:
+        timing['stream'] = summarize_stream(first_rows, samples, rows, nbytes)
+    return timing
+
+def probe_counters(query, args, backend=None):
+    """Runs one untimed, instrumented execution and returns its counter deltas (or None)."""
+    backend = backend or CliBackend(args)
+    with backend.session() as sess:
+        return collect_counters(sess, query, backend.name)
+
+def get_explain_plan(query, args, backend=None):
     """Gets the EXPLAIN plan for a query."""
-    explain_query = f"EXPLAIN {query}"
-    cmd = get_db_command(args, explain_query)
-    stdout, stderr = run_command(cmd)
-    return stdout, stderr
+    backend = backend or CliBackend(args)
+    return backend.query(f"EXPLAIN {query}")
+
+def get_explain_json(query, args, backend=None):
+    """Gets the EXPLAIN FORMAT=JSON plan as an ExplainPlan (None if unavailable)."""
+    backend = backend or CliBackend(args)
+    stdout, stderr = backend.query(f"EXPLAIN FORMAT=JSON {query}")
+    # Batch output is a header line followed by one escaped JSON value.
+    parts = stdout.split("\n", 1)
+    if len(parts) < 2:
+        return None, stderr
+    return ExplainPlan.from_json(unescape_value(parts[1].rstrip("\n"))), stderr
 
 def get_tables_from_explain(explain_output):
     """Parses table names from EXPLAIN output."""
@@ -74,10 +126,31 @@ def get_tables_from_explain(explain_output):
     
     return list(set(tables))
 
-def get_table_schema_info(tables, args):
+def get_table_aliases(query):
+    """Maps table aliases used in FROM/JOIN clauses to their real table names."""
+    aliases = {}
+    pattern = r'(?:FROM|JOIN)\s+`?(\w+)`?(?:\s+(?:AS\s+)?`?(\w+)`?)?'
+    reserved = {"WHERE", "JOIN", "INNER", "LEFT", "RIGHT", "CROSS", "ON", "USING", "GROUP", "ORDER", "LIMIT", "UNION", "SET", "HAVING", "NATURAL", "STRAIGHT_JOIN"}
+    for table, alias in re.findall(pattern, query, re.IGNORECASE):
+        aliases[table] = table
+        if alias and alias.upper() not in reserved:
+            aliases[alias] = table
+    return aliases
+
+def resolve_tables(tables, query):
+    """Replaces EXPLAIN table aliases by the real table names."""
+    aliases = get_table_aliases(query)
+    return sorted(set(aliases.get(t, t) for t in tables))
+
+def get_table_schema_info(tables, args, backend=None, catalog=None):
     """Gets a combined view of columns and their associated indexes."""
+    backend = backend or CliBackend(args)
     info = ""
     for table in tables:
+        if catalog is not None:
+            info += f"\n--- TABLE: {table} ---\n"
+            info += f"{catalog.table_info(table)}\n"
+            continue
         query = f"""
         SELECT 
             c.COLUMN_NAME AS 'Field', 
@@ -94,9 +167,8 @@ def get_table_schema_info(tables, args):
         GROUP BY c.COLUMN_NAME, c.COLUMN_TYPE, c.COLUMN_KEY, c.ORDINAL_POSITION
         ORDER BY c.ORDINAL_POSITION;
         """
-        cmd = get_db_command(args, query)
         info += f"\n--- TABLE: {table} ---\n"
-        output, _ = run_command(cmd)
+        output, _ = backend.query(query)
         info += f"{output}\n"
     return info
 
@@ -111,8 +183,14 @@ def extract_where_columns(query):
     cols = re.findall(r'(\w+)\s*(?:=|!=|<>|<|>|<=|>=|IN|LIKE|BETWEEN)', where_clause, re.IGNORECASE)
     return list(set(cols))
 
-def analyze_performance(query, explain_output, exec_time, args):
-    """Analyzes EXPLAIN output and time to provide rating and suggestions."""
+def analyze_performance(query, explain_output, exec_time, args, catalog=None, timing=None, plan=None, counters=None):
+    """Analyzes EXPLAIN output and time to provide rating and suggestions.
+
+    With a JSON plan, scoring uses the estimated rows examined and the access
+    type of each table; otherwise it falls back to scanning the text EXPLAIN.
+    Measured counter deltas (see session_counters) add what really happened:
+    rows read, disk temporary tables, sort merge passes and buffer pool misses.
+    """
     issues = []
     suggestions = []
     index_sql = []
@@ -121,34 +199,100 @@ def analyze_performance(query, explain_output, exec_time, args):
     if not explain_output:
         return 1, ["Could not analyze."], ["Ensure the query is valid and the database is accessible."], []
 
-    tables = get_tables_from_explain(explain_output)
-
-    if "ALL" in explain_output:
-        issues.append("Full Table Scan (ALL) detected.")
-        score -= 2
+    if plan is not None:
+        scans = plan.full_scans(FULL_SCAN_MIN_ROWS)
+        tables = sorted(set(t.table_name for t in scans))
+        full_scan = bool(scans)
+        using_temporary = plan.using_temporary
+        using_filesort = plan.using_filesort
+    else:
+        scans = []
+        tables = get_tables_from_explain(explain_output)
+        full_scan = "ALL" in explain_output
+        using_temporary = "Using temporary" in explain_output
+        using_filesort = "Using filesort" in explain_output
+    if catalog is not None:
+        tables = [t for t in resolve_tables(tables, query) if catalog.has_table(t)]
+
+    if full_scan:
+        if scans:
+            for t in scans:
+                issues.append(f"Full Table Scan (ALL) on {t.table_name} (~{t.rows:,.0f} rows).")
+            score -= 1
+        else:
+            issues.append("Full Table Scan (ALL) detected.")
+            score -= 2
         potential_cols = extract_where_columns(query)
         if potential_cols and tables:
-            suggestions.append(f"Consider indexing: {', '.join(potential_cols)}")
+            candidate_cols = []
             for table in tables:
                 for col in potential_cols:
+                    # Skip columns the table does not have or that already lead an index.
+                    if catalog is not None and not catalog.needs_index(table, col):
+                        continue
                     idx_name = f"idx_{table}_{col}"
                     index_sql.append(f"CREATE INDEX {idx_name} ON {table}({col});")
+                    if col not in candidate_cols:
+                        candidate_cols.append(col)
+            if candidate_cols:
+                suggestions.append(f"Consider indexing: {', '.join(candidate_cols)}")
     
-    if "Using temporary" in explain_output:
+    if plan is not None:
+        examined = plan.rows_examined
+        if examined > ROWS_EXAMINED_CRITICAL:
+            issues.append(f"~{examined:,.0f} rows examined (optimizer estimate).")
+            score -= 2
+        elif examined > ROWS_EXAMINED_WARN:
+            issues.append(f"~{examined:,.0f} rows examined (optimizer estimate).")
+            score -= 1
+
+    if using_temporary:
         issues.append("Temporary table used.")
         score -= 1
         suggestions.append("Optimize GROUP BY or DISTINCT to avoid temporary tables.")
         
-    if "Using filesort" in explain_output:
+    if using_filesort:
         issues.append("Filesort used (performance impact).")
         score -= 1
         suggestions.append("Add an index on columns used in ORDER BY.")
 
-    if exec_time > 1.0:
+    if exec_time > 5.0:
+        score -= 2
+        suggestions.append("Query is slow, consider partitioning or pre-aggregating data.")
+    elif exec_time > 1.0:
         score -= 1
         suggestions.append("Query is slow, consider partitioning or pre-aggregating data.")
-    elif exec_time > 5.0:
-        score -= 2
+
+    if counters is not None:
+        c = counters['counters']
+        scanned = c.get('Handler_read_rnd_next', 0)
+        if scanned > ROWS_EXAMINED_WARN and not full_scan:
+            issues.append(f"{scanned:,} rows read by table scans (Handler_read_rnd_next).")
+            score -= 1
+        if c.get('Created_tmp_disk_tables', 0) > 0:
+            issues.append(f"{c['Created_tmp_disk_tables']} temporary table(s) spilled to disk.")
+            score -= 1
+            suggestions.append("Reduce the rows grouped or raise tmp_table_size / max_heap_table_size.")
+        if c.get('Sort_merge_passes', 0) > 0:
+            issues.append(f"Sort needed {c['Sort_merge_passes']} merge pass(es).")
+            score -= 1
+            suggestions.append("Sort fewer rows (index on ORDER BY columns) or raise sort_buffer_size.")
+        miss_ratio = buffer_pool_miss_ratio(c)
+        if miss_ratio is not None and miss_ratio > BUFFER_POOL_MISS_WARN:
+            issues.append(f"Buffer pool miss ratio {miss_ratio * 100:.1f}% ({c['Innodb_buffer_pool_reads']:,} physical reads).")
+            score -= 1
+            suggestions.append("Working set exceeds the buffer pool: raise innodb_buffer_pool_size or read fewer pages.")
+
+    if timing and timing.get('failed'):
+        issues.append(f"{timing['failed']} of {timing['failed'] + timing['n']} timed runs failed and were not counted.")
+    if timing and timing['unstable']:
+        issues.append(f"Unstable timing (CV {timing['cv'] * 100:.0f}%), exec time is not trustworthy.")
+
+    stream = timing.get('stream') if timing else None
+    if stream and stream['transfer_share'] > TRANSFER_SHARE_WARN and stream['rows'] > ROWS_EXAMINED_WARN:
+        # Not scored: the server may be fine, the client just receives a lot.
+        issues.append(f"{stream['transfer_share'] * 100:.0f}% of the time is result transfer ({stream['rows']:,} rows, {stream['bytes'] / 1e6:.1f} MB).")
+        suggestions.append("Return fewer rows or columns (pagination, aggregation on the server).")
         
     score = max(1, min(5, score))
     if not suggestions:
@@ -156,25 +300,223 @@ def analyze_performance(query, explain_output, exec_time, args):
     
     return score, issues, suggestions[:3], index_sql
 
+def run_timed_executions(queries, args, backend):
+    """Runs the timed executions on --exec-lanes lanes.
+
+    Returns (timing, counters) pairs in query order; the counter probe runs
+    after the timed samples so its SHOW STATUS traffic is never timed.
+    """
+    def lane(query):
+        timing = measure_query(query, args, backend)
+        counters = None if args.no_counters else probe_counters(query, args, backend)
+        return timing, counters
+
+    with ThreadPoolExecutor(max_workers=max(1, args.exec_lanes)) as lanes:
+        return list(lanes.map(lane, queries))
+
+def format_workload(workload):
+    """One-line summary of a log digest's aggregate."""
+    return (f"digest {workload['digest']} | count {workload['count']} | total {workload['total_time']:.3f}s | "
+            f"p50 {workload['p50']:.3f}s | p95 {workload['p95']:.3f}s | p99 {workload['p99']:.3f}s | max {workload['max_time']:.3f}s | "
+            f"rows examined {workload['rows_examined']:,} | rows sent {workload['rows_sent']:,}")
+
+def write_query_report(item, args):
+    """Writes the detailed query_NNd.txt report for one analyzed query."""
+    report_file = os.path.join(args.report_dir, f"query_{item['id']:02}d.txt")
+    with open(report_file, 'w') as rf:
+        if item['line']: rf.write(f"SOURCE: {args.query_file}:{item['line']}\n")
+        if item['workload']: rf.write(f"WORKLOAD: {format_workload(item['workload'])}\nDIGEST: {item['workload']['normalized']}\n")
+        rf.write(f"QUERY: {item['query']}\n\nRATING: {'⭐' * item['rating']}\n\nTIMING: {format_distribution(item['timing'])}\n\n")
+        if item['timing'].get('stream'): rf.write(f"STREAMING: {format_stream(item['timing']['stream'])}\n\n")
+        rf.write(f"EXPLAIN:\n{item['explain']}\n\nSCHEMA:\n{item['schema_info']}\n")
+        if item['issues']: rf.write(f"ISSUES: {', '.join(item['issues'])}\n")
+        if item['index_sql']: rf.write(f"INDEX SUGGESTIONS:\n" + "\n".join(item['index_sql']) + "\n")
+        if item['counters']: rf.write(f"COUNTERS:\n{format_counters(item['counters'])}\n")
+        if item['index_validation']: rf.write("INDEX VALIDATION:\n" + "\n".join(c.summary() for c in item['index_validation']) + "\n")
+
+def analyze_query(i, query, timing, args, backend, catalog=None, line=None, counters=None, workload=None):
+    """EXPLAINs one query, collects its schema context and writes its report.
+
+    None of this is timing-sensitive, so it is safe to run on the worker pool.
+    """
+    exec_time = timing['median']
+    plan, _ = get_explain_json(query, args, backend)
+    if plan is not None:
+        explain_plan = plan.render()
+        tables = plan.table_names()
+    else:
+        explain_plan, explain_err = get_explain_plan(query, args, backend)
+        tables = get_tables_from_explain(explain_plan)
+    rating, issues, suggestions, index_sql = analyze_performance(query, explain_plan, exec_time, args, catalog, timing, plan, counters)
+    tables = resolve_tables(tables, query)
+    schema_info = get_table_schema_info(tables, args, backend, catalog)
+
+    item = {
+        "id": i,
+        "line": line,
+        "query": query,
+        "time": exec_time,
+        "timing": timing,
+        "rating": rating,
+        "issues": issues,
+        "suggestions": suggestions,
+        "index_sql": index_sql,
+        "index_validation": [],
+        "trend": [],
+        "comparison": None,
+        "schema_info": schema_info,
+        "explain": explain_plan,
+        "rows_examined": plan.rows_examined if plan is not None else None,
+        "cost": plan.cost if plan is not None else None,
+        "counters": counters,
+        "workload": workload,
+        "cached_at": None
+    }
+    write_query_report(item, args)
+    return item
+
+def cached_item(i, entry, line, workload, args):
+    """Rebuilds a report item from an analysis cache entry and writes its report."""
+    item = {name: value for name, value in entry.items() if name != "cached_at"}
+    item.update({
+        "id": i,
+        "line": line,
+        "index_validation": [],
+        "trend": [],
+        "comparison": None,
+        "workload": workload,
+        "cached_at": entry["cached_at"],
+    })
+    write_query_report(item, args)
+    return item
+
+def validation_badge(check):
+    """Speedup, plan change and size/build cost of a validated index, as HTML."""
+    if check is None:
+        return ""
+    size = "n/a" if check.size_bytes is None else f"{check.size_bytes / 1048576:.1f} MB"
+    plan = "; ".join(check.plan_changes) or "plan unchanged"
+    return (f"<span class='whitespace-nowrap px-1.5 py-0.5 rounded bg-emerald-50 text-emerald-600 text-[10px] font-bold' title='{plan}'>"
+            f"x{check.speedup:.2f}</span><span class='whitespace-nowrap text-[10px] text-slate-400'>{size} · {check.build_seconds:.1f}s build</span>")
+
+def rejected_item(check):
+    """A candidate index that did not prove a speedup, as an HTML list item."""
+    title = check.summary().replace("'", "&#39;")
+    detail = f"x{check.speedup:.2f}" if not check.error else check.error.replace("<", "&lt;")
+    return f"<li class='mb-1' title='{title}'><code class='text-[10px] line-through'>{check.ddl}</code> <span class='text-[10px]'>{detail}</span></li>"
+
+def sparkline_svg(values, width=90, height=24):
+    """Inline SVG polyline of a latency series; the last point is highlighted."""
+    if len(values) < 2:
+        return ""
+    low, high = min(values), max(values)
+    span = (high - low) or 1.0
+    step = width / (len(values) - 1)
+    points = [(i * step, height - 2 - (v - low) / span * (height - 4)) for i, v in enumerate(values)]
+    path = " ".join(f"{x:.1f},{y:.1f}" for x, y in points)
+    last_x, last_y = points[-1]
+    return (f"<svg width='{width}' height='{height}' class='overflow-visible'><polyline points='{path}' fill='none' stroke='#6366f1' stroke-width='1.5'/>"
+            f"<circle cx='{last_x:.1f}' cy='{last_y:.1f}' r='2.5' fill='#4f46e5'/></svg>")
+
+def comparison_badge(comparison):
+    """Regression / improvement / plan change badges against the baseline run."""
+    if comparison is None:
+        return "<span class='text-[10px] text-slate-400'>no baseline</span>"
+    delta = (comparison.ratio - 1) * 100
+    if comparison.regression:
+        badge = f"<span class='px-1.5 py-0.5 rounded text-[10px] font-bold bg-red-50 text-red-600'>REGRESSION {delta:+.0f}% (p={comparison.p_value:.3f})</span>"
+    elif comparison.improvement:
+        badge = f"<span class='px-1.5 py-0.5 rounded text-[10px] font-bold bg-emerald-50 text-emerald-600'>FASTER {delta:+.0f}% (p={comparison.p_value:.3f})</span>"
+    else:
+        badge = f"<span class='px-1.5 py-0.5 rounded text-[10px] font-bold bg-slate-100 text-slate-500'>{delta:+.0f}%</span>"
+    if comparison.plan_changed:
+        title = f"before: {comparison.base_plan} | after: {comparison.new_plan}".replace("'", "&#39;")
+        badge += f" <span class='px-1.5 py-0.5 rounded text-[10px] font-bold bg-amber-50 text-amber-600' title='{title}'>PLAN CHANGED</span>"
+    return badge
+
+def stream_lines(stream):
+    """Extra lines of the Exec Time cell for a streamed measurement."""
+    if not stream:
+        return ""
+    return (f"<br><span class='text-sky-600'>first row {stream['ttfr']:.4f} · {stream['transfer_share'] * 100:.0f}% transfer<br>"
+            f"{stream['rows']:,} rows · {stream['rows_per_sec']:,.0f} rows/s · {stream['bytes_per_sec'] / 1e6:.1f} MB/s</span>")
+
+def counter_cells(probe):
+    """Rows Read and I/O table cells from a session_counters probe."""
+    if probe is None:
+        na = "<td class='p-4 font-mono text-sm text-slate-400' data-value=''>n/a</td>"
+        return na, na
+    c = probe['counters']
+    statement = probe['statement']
+    examined = f"<br>P_S examined {statement['rows_examined']:,}" if statement and statement.get('rows_examined') is not None else ""
+    rows_cell = (f"<td class='p-4 font-mono text-sm text-slate-600' data-value='{probe['rows_read']}'>{probe['rows_read']:,}"
+                 f"<div class='mt-1 text-[10px] text-slate-500 leading-relaxed whitespace-nowrap'>rnd_next {c.get('Handler_read_rnd_next', 0):,}<br>"
+                 f"key {c.get('Handler_read_key', 0):,} · next {c.get('Handler_read_next', 0):,}{examined}</div></td>")
+    miss = probe['bp_miss_ratio']
+    miss_html = "n/a" if miss is None else f"{miss * 100:.2f}% miss"
+    badges = ""
+    if c.get('Created_tmp_disk_tables', 0):
+        badges += f"<span class='inline-block mt-1 mr-1 px-1.5 py-0.5 rounded text-[10px] font-bold bg-red-50 text-red-600'>tmp disk {c['Created_tmp_disk_tables']}</span>"
+    if c.get('Sort_merge_passes', 0):
+        badges += f"<span class='inline-block mt-1 px-1.5 py-0.5 rounded text-[10px] font-bold bg-red-50 text-red-600'>merge passes {c['Sort_merge_passes']}</span>"
+    io_cell = (f"<td class='p-4 font-mono text-sm text-slate-600' data-value='{c.get('Innodb_buffer_pool_reads', 0)}'>{miss_html}"
+               f"<div class='mt-1 text-[10px] text-slate-500 leading-relaxed whitespace-nowrap'>logical {c.get('Innodb_buffer_pool_read_requests', 0):,}<br>"
+               f"physical {c.get('Innodb_buffer_pool_reads', 0):,}</div>{badges}</td>")
+    return rows_cell, io_cell
+
 def generate_html_report(summary_data, footer_info, args):
     """Generates a standalone HTML report with Tailwind CSS, sorting, and filtering."""
     rows_html = ""
     for item in summary_data:
         rating_val = item['rating']
         rating_html = "⭐" * rating_val
+        line_html = f"<div class='text-[10px] text-slate-400'>L{item['line']}</div>" if item['line'] else ""
+        if item['cached_at'] is not None:
+            line_html += f"<div class='mt-1 inline-block px-1.5 py-0.5 rounded text-[10px] font-bold bg-sky-50 text-sky-600 whitespace-nowrap' title='Served from the analysis cache'>cached {format_age(time.time() - item['cached_at'])} ago</div>"
+        if item['workload']:
+            w = item['workload']
+            line_html += f"<div class='text-[10px] text-slate-400 whitespace-nowrap' title='p95 {w['p95']:.3f}s · rows examined {w['rows_examined']:,}'>×{w['count']:,} · {w['total_time']:.1f}s</div>"
+        est_rows_val = "" if item['rows_examined'] is None else f"{item['rows_examined']:.0f}"
+        est_rows_html = "n/a" if item['rows_examined'] is None else f"{item['rows_examined']:,.0f}"
+        cost_val = "" if item['cost'] is None else f"{item['cost']:.4f}"
+        cost_html = "n/a" if item['cost'] is None else f"{item['cost']:,.2f}"
         issues_list = "".join([f"<li class='text-red-600 mb-1 flex items-center'><span class='mr-2'>⚠️</span>{i}</li>" for i in item['issues']]) if item['issues'] else "<li class='text-green-600 flex items-center'><span class='mr-2'>✅</span>None</li>"
         sugg_list = "".join([f"<li class='mb-1 flex items-start'><span class='mr-2 font-bold text-indigo-500'>•</span>{s}</li>" for s in item['suggestions']])
-        idx_list = "".join([f"<div class='flex items-center gap-2 mb-1'><code class='bg-black/5 p-1 rounded text-[10px] flex-1'>{sql}</code></div>" for sql in item['index_sql']])
+        timing = item['timing']
+        rows_read_cell, io_cell = counter_cells(item['counters'])
+        stream_html = stream_lines(timing.get('stream'))
+        trend_val = "" if item['comparison'] is None else f"{item['comparison'].ratio:.4f}"
+        checks = {c.ddl: c for c in item['index_validation']}
+        idx_list = "".join([f"<div class='flex items-center gap-2 mb-1'><code class='bg-black/5 p-1 rounded text-[10px] flex-1'>{sql}</code>{validation_badge(checks.get(sql))}</div>" for sql in item['index_sql']])
+        rejected = [c for c in item['index_validation'] if not c.proven]
+        rejected_list = "".join([rejected_item(c) for c in rejected])
         
         rows_html += f"""
         <tr class="border-b border-gray-100 hover:bg-indigo-50/30 transition-colors duration-150 group" data-rating="{rating_val}">
-            <td class="p-4 text-center font-mono text-gray-500 text-sm">{item['id']}</td>
-            <td class="p-4 font-mono text-sm font-semibold text-indigo-700" data-value="{item['time']}">{item['time']:.4f}s</td>
+            <td class="p-4 text-center font-mono text-gray-500 text-sm" data-value="{item['id']}">{item['id']}{line_html}</td>
+            <td class="p-4 font-mono text-sm font-semibold text-indigo-700" data-value="{item['time']}">
+                {item['time']:.4f}s
+                <div class="mt-1 text-[10px] font-normal text-slate-500 leading-relaxed whitespace-nowrap">
+                    min {timing['min']:.4f} · mean {timing['mean']:.4f}<br>
+                    p95 {timing['p95']:.4f} · p99 {timing['p99']:.4f}<br>
+                    σ {timing['stddev']:.4f} · n={timing['n']}{stream_html}
+                </div>
+                <span class="inline-block mt-1 px-1.5 py-0.5 rounded text-[10px] font-bold {'bg-red-50 text-red-600' if timing['unstable'] else 'bg-emerald-50 text-emerald-600'}">CV {timing['cv'] * 100:.1f}%</span>
+            </td>
+            <td class="p-4" data-value="{trend_val}">
+                {sparkline_svg(item['trend'])}
+                <div class="mt-1 whitespace-nowrap">{comparison_badge(item['comparison'])}</div>
+            </td>
+            <td class="p-4 font-mono text-sm text-slate-600" data-value="{est_rows_val}">{est_rows_html}</td>
+            <td class="p-4 font-mono text-sm text-slate-600" data-value="{cost_val}">{cost_html}</td>
+            {rows_read_cell}
+            {io_cell}
             <td class="p-4 text-amber-500" data-value="{rating_val}">{rating_html}</td>
             <td class="p-4 text-sm"><ul class="list-none p-0">{issues_list}</ul></td>
             <td class="p-4 text-sm">
                 <ul class="list-none p-0 mb-3">{sugg_list}</ul>
                 {f'<div class="mt-2 p-3 bg-indigo-50 rounded-lg border border-indigo-100 shadow-sm"><p class="text-[10px] font-bold text-indigo-400 uppercase tracking-wider mb-2">Suggested Indexes</p>{idx_list}</div>' if item['index_sql'] else ''}
+                {f'<div class="mt-2 p-3 bg-slate-50 rounded-lg border border-slate-100"><p class="text-[10px] font-bold text-slate-400 uppercase tracking-wider mb-2">Rejected by What-If Validation</p><ul class="list-none p-0 text-slate-500">{rejected_list}</ul></div>' if rejected else ''}
             </td>
             <td class="p-4">
                 <div class="relative group/code">
@@ -235,7 +577,12 @@ def generate_html_report(summary_data, footer_info, args):
                         <thead>
                             <tr class="bg-slate-50 border-b border-slate-100 text-slate-600 uppercase text-[11px] font-bold tracking-wider">
                                 <th class="p-5 text-center sortable" data-sort="int">ID</th>
-                                <th class="p-5 sortable" data-sort="float">Exec Time</th>
+                                <th class="p-5 sortable" data-sort="float">Exec Time (median)</th>
+                                <th class="p-5 sortable" data-sort="float">Trend</th>
+                                <th class="p-5 sortable" data-sort="float">Est. Rows</th>
+                                <th class="p-5 sortable" data-sort="float">Cost</th>
+                                <th class="p-5 sortable" data-sort="float">Rows Read</th>
+                                <th class="p-5 sortable" data-sort="float">Buffer Pool I/O</th>
                                 <th class="p-5 sortable" data-sort="int">Rating</th>
                                 <th class="p-5">Analysis Issues</th>
                                 <th class="p-5">Optimization Advice</th>
@@ -325,11 +672,134 @@ def generate_html_report(summary_data, footer_info, args):
     """
     return html
 
+def analyze_statements(queries, lines, workloads, args, backend):
+    """Times, EXPLAINs and scores every statement on one server; returns the report items."""
+    # One bulk introspection (or a fingerprint-validated disk hit) for the whole run.
+    catalog = SchemaCatalog.load(backend, args.db, args.schema_cache_dir, args.refresh_schema)
+    if catalog is None:
+        print("⚠️ Schema catalog unavailable, falling back to per-table introspection.")
+
+    # Results of unchanged queries on an unchanged schema and server are reused.
+    cache = None
+    if not args.no_cache:
+        server_fp = server_fingerprint(backend)
+        if catalog is None or not server_fp:
+            print("⚠️ Schema or server fingerprint unavailable, analysis cache disabled for this run.")
+        else:
+            cache = AnalysisCache(args.analysis_cache_dir, catalog, server_fp, settings_fingerprint(args, backend),
+                                  args.cache_max_entries, args.cache_max_mb << 20)
+    cached = [None if cache is None or args.force else cache.get(q) for q in queries]
+    pending = [i for i in range(len(queries)) if cached[i] is None]
+
+    # Timed executions first, on their own lane(s), so that EXPLAIN and
+    # information_schema traffic from the worker pool never overlaps them.
+    measured = run_timed_executions([queries[i] for i in pending], args, backend)
+
+    def analyze_job(job):
+        i, (timing, counters) = job
+        return analyze_query(i + 1, queries[i], timing, args, backend, catalog, lines[i], counters, workloads[i])
+
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        fresh = list(pool.map(analyze_job, zip(pending, measured)))
+
+    summary_data = []
+    fresh_items = iter(fresh)
+    for i, entry in enumerate(cached):
+        summary_data.append(next(fresh_items) if entry is None else cached_item(i + 1, entry, lines[i], workloads[i], args))
+    if cache is not None:
+        for item in fresh:
+            cache.put(item)
+        evicted = cache.evict()
+        print(f"♻️ Analysis cache: {len(queries) - len(pending)} reused, {len(pending)} analyzed"
+              f"{f', {evicted} evicted' if evicted else ''}")
+    return summary_data
+
+def render_templates(args):
+    """One rendering of every statement of a template file, values drawn with --template-seed.
+
+    The same seed gives the same statements, so cached analyses and baselines
+    stay comparable from one run to the next.
+    """
+    templates = TemplateSet(args.query_file)
+    backend = open_backend(args) if templates.needs_server else None
+    try:
+        rendered = templates.resolve(backend, args.template_seed).rounds(1, args.template_seed)
+    finally:
+        if backend is not None:
+            backend.close()
+    return [sql for _, _, sql in rendered], [line for _, line, _ in rendered]
+
+def get_server_version(backend):
+    """VERSION() of the server, or None."""
+    version_out, _ = backend.query("SELECT VERSION() AS version;")
+    version_rows = parse_rows(version_out)
+    return version_rows[0]["version"] if version_rows else None
+
+def run_target_comparison(queries, lines, workloads, args):
+    """Runs the statements on every --target concurrently, one worker per target.
+
+    Writes a single comparison report to --report-file / --html-file and
+    returns the process exit status.
+    """
+    try:
+        targets = [parse_target(spec, args) for spec in args.target]
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    names = [name for name, _ in targets]
+    if len(set(names)) != len(names):
+        print("Error: target names must be unique")
+        return 1
+
+    def run(target):
+        name, target_args = target
+        os.makedirs(target_args.report_dir, exist_ok=True)
+        target_args.pool_size = max(target_args.pool_size, target_args.jobs, target_args.exec_lanes)
+        try:
+            backend = open_backend(target_args)
+        except RuntimeError as e:
+            print(f"⚠️ [{name}] {e}")
+            return None, None
+        try:
+            print(f"🎯 [{name}] analyzing {len(queries)} statements")
+            return analyze_statements(queries, lines, workloads, target_args, backend), get_server_version(backend)
+        finally:
+            backend.close()
+
+    with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+        outcomes = list(pool.map(run, targets))
+    results = {name: items for name, (items, _) in zip(names, outcomes)}
+    versions = {name: version for name, (_, version) in zip(names, outcomes)}
+    if results[names[0]] is None:
+        print(f"Error: reference target '{names[0]}' is unreachable")
+        return 1
+
+    rows, aggregates = compare_targets(names, results, args.regression_threshold)
+    timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+    with open(args.report_file, "w") as f:
+        f.write(generate_comparison_markdown(names, versions, rows, aggregates, timestamp))
+    with open(args.html_file, "w") as f:
+        f.write(generate_comparison_html(names, versions, rows, aggregates, timestamp, args.db))
+
+    for name in names[1:]:
+        agg = aggregates[name]
+        if agg is not None:
+            print(f"📊 {name} vs {names[0]}: {speedup_label(agg['geomean_ratio'])} (geomean), "
+                  f"{agg['slower']} slower, {agg['faster']} faster, {agg['plan_changes']} plan changes")
+    print(f"✅ Comparison complete. HTML report: {args.html_file}")
+    return 0
+
 def main():
     parser = argparse.ArgumentParser(description="Generate SQL performance and EXPLAIN reports.")
     # Targets
     parser.add_argument("--query-file", default="employees/req_employees.sql", help="Path to SQL file")
     parser.add_argument("--query", help="Execute a single query string instead of a file")
+    parser.add_argument("--slow-log", help="Analyze the top digests of a slow query log instead of a file")
+    parser.add_argument("--general-log", help="Analyze the most frequent digests of a general query log instead of a file")
+    parser.add_argument("--top-digests", type=int, default=20, help="Number of log digests to analyze")
+    parser.add_argument("--digest-sort", choices=["total", "count", "p95", "max"], default="total", help="Ranking of log digests (general logs only have counts)")
+    parser.add_argument("--max-digests", type=int, default=10000, help="Maximum number of digests kept in memory while reading a log")
+    parser.add_argument("--template-seed", type=int, default=1, help="Seed of the values drawn once for a query template file (-- @param)")
     
     # Connection
     parser.add_argument("--container", help="Name of the MariaDB container (if using Docker)")
@@ -338,70 +808,187 @@ def main():
     parser.add_argument("--user", default="root", help="Database user")
     parser.add_argument("--password", default="root", help="Database password")
     parser.add_argument("--db", default="employees", help="Database name")
+    parser.add_argument("--socket", help="Local socket path (driver backend only, instead of host/port)")
+    parser.add_argument("--backend", choices=["auto", "driver", "cli"], default="auto", help="Connection backend: pooled driver sessions, mariadb CLI per statement, or auto-detect")
+    parser.add_argument("--target", action="append", metavar="NAME:OPTIONS", help="Compare several servers side by side, e.g. 'old:container=mariadb1011' 'new:host=10.0.0.5,port=3307' (repeatable; the first is the reference)")
+    parser.add_argument("--pool-size", type=int, default=2, help="Number of persistent sessions in the driver pool")
     
     # Output
     parser.add_argument("--report-dir", default="reports/explain_reports", help="Directory for detailed reports")
     parser.add_argument("--report-file", default="reports/performance_report.md", help="Path to summary markdown")
     parser.add_argument("--html-file", default="reports/performance_report.html", help="Path to HTML report")
     parser.add_argument("--stdout", action="store_true", help="Print report to stdout (recommended for single query)")
+    parser.add_argument("--schema-cache-dir", default="reports/schema_cache", help="Directory where the schema catalog is persisted")
+    parser.add_argument("--refresh-schema", action="store_true", help="Ignore the persisted schema catalog and introspect again")
+    parser.add_argument("--analysis-cache-dir", default="reports/analysis_cache", help="Directory of the per-query analysis cache")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the analysis cache")
+    parser.add_argument("--force", action="store_true", help="Re-analyze every query, ignoring cached results (the cache is still refreshed)")
+    parser.add_argument("--cache-max-entries", type=int, default=5000, help="Maximum number of analysis cache entries (least recently used are evicted)")
+    parser.add_argument("--cache-max-mb", type=int, default=100, help="Maximum analysis cache size in MB")
+
+    # Timing
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed warmup runs per query")
+    parser.add_argument("--iterations", type=int, default=5, help="Timed runs per query")
+    parser.add_argument("--stream", action="store_true", help="Stream result sets (unbuffered cursor / mariadb --quick) and report time to first row, time to last row, rows/s and MB/s")
+    parser.add_argument("--cv-threshold", type=float, default=0.2, help="Coefficient of variation above which a timing is flagged as unstable")
+    parser.add_argument("--no-counters", action="store_true", help="Skip the extra instrumented execution that collects SHOW SESSION STATUS deltas")
+
+    # Concurrency
+    parser.add_argument("--jobs", type=int, default=1, help="Worker threads for EXPLAIN, schema lookups and report writing")
+    parser.add_argument("--exec-lanes", type=int, default=1, help="Concurrent lanes for timed executions (1 = serialized)")
+
+    # Index Validation
+    parser.add_argument("--validate-indexes", choices=["off", "scratch", "ignored"], default="off", help="Build each suggested index (in a scratch copy, or as an IGNORED index) and keep only those with a measured speedup")
+    parser.add_argument("--index-min-gain", type=float, default=0.1, help="Minimum median latency reduction (fraction) for an index to count as proven")
+
+    # Baselines
+    parser.add_argument("--baseline-db", default="reports/baselines.sqlite", help="SQLite database where every run is recorded")
+    parser.add_argument("--no-baseline", action="store_true", help="Do not record this run in the baseline database")
+    parser.add_argument("--run-label", help="Label stored with this run (e.g. a server version or branch name)")
+    parser.add_argument("--dataset", help="Dataset name stored with this run (defaults to --db)")
+    parser.add_argument("--compare-to", help="Baseline run to compare against: 'latest', a run id or a run label")
+    parser.add_argument("--regression-threshold", type=float, default=0.1, help="Minimum median slowdown (fraction) to report a regression")
+    parser.add_argument("--regression-alpha", type=float, default=0.05, help="Significance level of the Mann-Whitney U test on timing samples")
+    parser.add_argument("--trend-runs", type=int, default=10, help="Number of past runs shown in the trend sparklines")
 
     args = parser.parse_args()
 
+    workloads = None
     if args.query:
         queries = [args.query]
+        lines = [None]
+    elif args.slow_log or args.general_log:
+        log_file = args.slow_log or args.general_log
+        if log_file != "-" and not os.path.exists(log_file):
+            print(f"Error: Log file not found at {log_file}")
+            sys.exit(1)
+        aggregator = aggregate_log(log_file, general=not args.slow_log, max_digests=args.max_digests)
+        sort = args.digest_sort if args.slow_log else "count"
+        # Only read-only digests of this database are replayed.
+        top = [d for d in aggregator.top(len(aggregator.digests), sort, read_only=True) if d.schema in (None, args.db)]
+        top = top[:args.top_digests]
+        print(f"📜 {log_file}: {aggregator.statements} statements, {len(aggregator.digests)} digests, analyzing top {len(top)} read-only digests by {sort}")
+        queries = [d.sample.rstrip().rstrip(";") for d in top]
+        lines = [None] * len(top)
+        workloads = [d.summary() for d in top]
     else:
         if not os.path.exists(args.query_file):
             print(f"Error: Query file not found at {args.query_file}")
             sys.exit(1)
-        with open(args.query_file, 'r') as f:
-            content = f.read()
-        queries = [q.strip() for q in content.split(';') if q.strip()]
+        if is_template_file(args.query_file):
+            try:
+                queries, lines = render_templates(args)
+            except (RuntimeError, ValueError) as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+            print(f"🎯 {len(queries)} templates from {args.query_file} rendered with seed {args.template_seed}")
+        else:
+            statements = list(iter_statements(args.query_file))
+            queries = [stmt.text for stmt in statements]
+            lines = [stmt.line for stmt in statements]
+    workloads = workloads or [None] * len(queries)
 
     if not os.path.exists(args.report_dir):
         os.makedirs(args.report_dir, exist_ok=True)
 
-    summary_data = []
+    if args.target:
+        sys.exit(run_target_comparison(queries, lines, workloads, args))
+
+    # Every worker and timing lane may hold a session at the same time.
+    args.pool_size = max(args.pool_size, args.jobs, args.exec_lanes)
+    try:
+        backend = open_backend(args)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
     timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
 
-    for i, query in enumerate(queries, 1):
-        exec_time, _, _ = execute_query(query, args)
-        explain_plan, explain_err = get_explain_plan(query, args)
-        rating, issues, suggestions, index_sql = analyze_performance(query, explain_plan, exec_time, args)
-        tables = get_tables_from_explain(explain_plan)
-        schema_info = get_table_schema_info(tables, args)
-        
-        item = {
-            "id": i,
-            "query": query,
-            "time": exec_time,
-            "rating": rating,
-            "issues": issues,
-            "suggestions": suggestions,
-            "index_sql": index_sql,
-            "schema_info": schema_info,
-            "explain": explain_plan
-        }
-        summary_data.append(item)
-
-        # File report
-        report_file = os.path.join(args.report_dir, f"query_{i:02}d.txt")
-        with open(report_file, 'w') as rf:
-            rf.write(f"QUERY: {query}\n\nRATING: {'⭐' * rating}\n\nEXPLAIN:\n{explain_plan}\n\nSCHEMA:\n{schema_info}\n")
-            if issues: rf.write(f"ISSUES: {', '.join(issues)}\n")
-            if index_sql: rf.write(f"INDEX SUGGESTIONS:\n" + "\n".join(index_sql) + "\n")
-
-        if args.stdout:
-            print(f"--- QUERY {i} analysis ---")
-            print(f"Time: {exec_time:.4f}s | Rating: {'*' * rating}")
-            print(f"Issues: {', '.join(issues) if issues else 'None'}")
-            print(f"Suggestions: {', '.join(suggestions)}")
-            if index_sql: print("Suggested SQL:\n" + "\n".join(index_sql))
+    summary_data = analyze_statements(queries, lines, workloads, args, backend)
+
+    if args.validate_indexes != "off":
+        elapsed = run_validation(summary_data, args, backend, measure_query, get_explain_json)
+        for item in summary_data:
+            if item['index_validation']:
+                write_query_report(item, args)
+        proven = sum(1 for item in summary_data for c in item['index_validation'] if c.proven)
+        tried = sum(len(item['index_validation']) for item in summary_data)
+        print(f"🔬 Index validation ({args.validate_indexes}): {proven}/{tried} candidates proven in {elapsed:.1f}s")
+
+    server_version = get_server_version(backend)
+
+    # Compare against the chosen baseline before this run becomes the latest one.
+    baseline_run = None
+    if not args.no_baseline or args.compare_to:
+        store = BaselineStore(args.baseline_db)
+        if args.compare_to:
+            baseline_run = store.resolve_run(args.compare_to, args.db)
+            if baseline_run is None:
+                print(f"⚠️ Baseline run '{args.compare_to}' not found in {args.baseline_db}, skipping comparison.")
+            else:
+                comparisons = store.compare(summary_data, baseline_run, args.regression_alpha, args.regression_threshold)
+                for item in summary_data:
+                    item['comparison'] = comparisons.get(item['id'])
+        # Cached rows are not new measurements, so they are not recorded again.
+        measured_items = [item for item in summary_data if item['cached_at'] is None]
+        if not args.no_baseline and measured_items:
+            run_id = store.record_run(measured_items, args, server_version)
+            print(f"🗄️ Run {run_id} recorded in {args.baseline_db}")
+        for item in summary_data:
+            item['trend'] = store.trend(fingerprint(item['query']), args.trend_runs, args.db)
+        store.close()
+    regressions = [item for item in summary_data if item['comparison'] and item['comparison'].regression]
+
+    if args.stdout:
+        for item in summary_data:
+            print(f"--- QUERY {item['id']} analysis ---")
+            print(f"Time: {format_distribution(item['timing'])} | Rating: {'*' * item['rating']}")
+            if item['timing'].get('stream'): print(f"Streaming: {format_stream(item['timing']['stream'])}")
+            print(f"Issues: {', '.join(item['issues']) if item['issues'] else 'None'}")
+            print(f"Suggestions: {', '.join(item['suggestions'])}")
+            if item['index_sql']: print("Suggested SQL:\n" + "\n".join(item['index_sql']))
+
+    backend.close()
 
     # Save Markdown Summary
-    md_report = [f"# SQL Performance Report - {args.db}\n", f"Generated: {timestamp}\n", "| ID | Time (s) | Rating | Issues | Suggestions |", "|---|---|---|---|---|"]
+    md_report = [f"# SQL Performance Report - {args.db}\n", f"Generated: {timestamp}\n", "| ID | Median (s) | Min (s) | Mean (s) | p95 (s) | p99 (s) | Stddev (s) | CV | Est. Rows | Cost | Rows Read | BP Reads | Tmp Disk | Merge Passes | Rating | Issues | Suggestions |", "|---|---|---|---|---|---|---|---|---|---|---|---|---|---|---|---|---|"]
     for d in summary_data:
-        md_report.append(f"| {d['id']} | {d['time']:.4f} | {'⭐'*d['rating']} | {', '.join(d['issues']) or 'None'} | {', '.join(d['suggestions'])} |")
+        t = d['timing']
+        rows = "n/a" if d['rows_examined'] is None else f"{d['rows_examined']:.0f}"
+        cost = "n/a" if d['cost'] is None else f"{d['cost']:.2f}"
+        c = d['counters']['counters'] if d['counters'] else None
+        counters = "n/a | n/a | n/a | n/a" if c is None else f"{d['counters']['rows_read']} | {c.get('Innodb_buffer_pool_reads', 0)} | {c.get('Created_tmp_disk_tables', 0)} | {c.get('Sort_merge_passes', 0)}"
+        md_report.append(f"| {d['id']}{' ♻️' if d['cached_at'] is not None else ''} | {t['median']:.4f} | {t['min']:.4f} | {t['mean']:.4f} | {t['p95']:.4f} | {t['p99']:.4f} | {t['stddev']:.4f} | {t['cv'] * 100:.1f}%{' ⚠️' if t['unstable'] else ''} | {rows} | {cost} | {counters} | {'⭐'*d['rating']} | {', '.join(d['issues']) or 'None'} | {', '.join(d['suggestions'])} |")
     
+    if args.stream:
+        md_report.append("\n## Streaming\n")
+        md_report.append("| ID | First Row (s) | Last Row (s) | Transfer | Rows | MB | Rows/s | MB/s |")
+        md_report.append("|---|---|---|---|---|---|---|---|")
+        for d in summary_data:
+            st = d['timing'].get('stream')
+            if st:
+                md_report.append(f"| {d['id']} | {st['ttfr']:.4f} | {st['ttlr']:.4f} | {st['transfer_share'] * 100:.1f}% | {st['rows']} | {st['bytes'] / 1e6:.2f} | {st['rows_per_sec']:.0f} | {st['bytes_per_sec'] / 1e6:.2f} |")
+
+    if any(workloads):
+        md_report.append(f"\n## Workload ({args.slow_log or args.general_log})\n")
+        md_report.append("| ID | Digest | Count | Total (s) | p95 (s) | Max (s) | Rows Examined | Rows Sent |")
+        md_report.append("|---|---|---|---|---|---|---|---|")
+        for d in summary_data:
+            w = d['workload']
+            md_report.append(f"| {d['id']} | `{w['digest']}` | {w['count']} | {w['total_time']:.3f} | {w['p95']:.3f} | {w['max_time']:.3f} | {w['rows_examined']} | {w['rows_sent']} |")
+
+    if baseline_run is not None:
+        md_report.append(f"\n## Comparison with run {baseline_run}\n")
+        md_report.append("| ID | Baseline Median (s) | Median (s) | Delta | p-value | Status | Plan |")
+        md_report.append("|---|---|---|---|---|---|---|")
+        for d in summary_data:
+            c = d['comparison']
+            if c is None:
+                continue
+            status = "❌ regression" if c.regression else ("✅ faster" if c.improvement else "=")
+            plan = f"changed: {c.base_plan} → {c.new_plan}" if c.plan_changed else "same"
+            md_report.append(f"| {d['id']} | {c.base_median:.4f} | {c.new_median:.4f} | {(c.ratio - 1) * 100:+.1f}% | {c.p_value:.3f} | {status} | {plan} |")
+
     with open(args.report_file, "w") as f:
         f.write("\n".join(md_report))
 
@@ -413,5 +1000,9 @@ def main():
     if not args.stdout:
         print(f"✅ Analysis complete. HTML report: {args.html_file}")
 
+    if regressions:
+        print(f"❌ {len(regressions)} query(ies) regressed against run {baseline_run}: " + ", ".join(str(item['id']) for item in regressions))
+        sys.exit(3)
+
 if __name__ == "__main__":
     main()
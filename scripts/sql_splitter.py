@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""Streaming SQL statement splitter.
+
+Reads a SQL file in fixed-size chunks and yields one statement at a time with
+the line it starts on. The scanner understands:
+
+- string literals ('...', "...") with backslash and doubled-quote escapes,
+  and `quoted identifiers`;
+- comments (-- ..., # ..., /* ... */); /*! ... */ and /*+ ... */ are kept as
+  code since the server executes them;
+- the client-side ``DELIMITER`` directive (``employees/objects.sql``);
+- stored program bodies (BEGIN ... END) written without DELIMITER.
+
+Memory stays bounded by the largest single statement, not by the file size.
+
+As a command line tool it writes one statement per line, escaped the way the
+mariadb client escapes batch output (backslash, newline, tab), which is the
+format ``employees_sysbench.lua`` reads.
+"""
+import argparse
+import re
+import sys
+from dataclasses import dataclass
+
+CHUNK_SIZE = 1 << 16
+
+# Starts of the constructs that change the scanner state.
+SPECIAL = re.compile(r"['\"`#]|--|/\*")
+
+# Statements whose body may contain ';' before the real end.
+COMPOUND_HEAD = re.compile(
+    r"(?:CREATE\s+(?:OR\s+REPLACE\s+)?(?:DEFINER\s*=\s*\S+\s+)?(?:AGGREGATE\s+)?"
+    r"(?:PROCEDURE|FUNCTION|TRIGGER|EVENT|PACKAGE)\b|BEGIN\s+NOT\s+ATOMIC\b)",
+    re.IGNORECASE,
+)
+# The IF/LOOP/... suffix belongs to END only: "BEGIN CASE" opens two blocks.
+BLOCK_WORD = re.compile(r"\bEND\b(?:\s+(IF|LOOP|WHILE|REPEAT|FOR|CASE)\b)?|\b(BEGIN|CASE)\b", re.IGNORECASE)
+DELIMITER_DIRECTIVE = re.compile(r"DELIMITER[ \t]+(\S+)[ \t]*(?:\r?\n|$)", re.IGNORECASE)
+
+
+@dataclass
+class Statement:
+    """One statement and the 1-based line range it spans in the source."""
+    text: str
+    line: int
+    end_line: int
+
+
+class SqlSplitter:
+    """Incremental tokenizer over a text stream."""
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE, strip_comments=False):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.strip_comments = strip_comments
+        self.delimiter = ";"
+        self.buf = ""
+        self.eof = False
+        self.line = 1  # line number of buf[0]
+
+    def _fill(self):
+        """Appends the next chunk; returns False at end of input."""
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def _consume(self, end):
+        """Drops buf[:end] once a statement (or directive) is complete."""
+        self.line += self.buf.count("\n", 0, end)
+        self.buf = self.buf[end:]
+
+    def _quoted_end(self, i):
+        """End index (exclusive) of the quoted token at i, or -1 if incomplete."""
+        quote = self.buf[i]
+        j = i + 1
+        while True:
+            k = self.buf.find(quote, j)
+            if quote != "`":
+                b = self.buf.find("\\", j)
+                if b != -1 and (k == -1 or b < k):
+                    if b + 1 >= len(self.buf) and not self.eof:
+                        return -1
+                    j = b + 2
+                    continue
+            if k == -1:
+                return len(self.buf) if self.eof else -1
+            if k + 1 >= len(self.buf) and not self.eof:
+                return -1  # cannot tell a closing quote from a doubled one yet
+            if k + 1 < len(self.buf) and self.buf[k + 1] == quote:
+                j = k + 2
+                continue
+            return k + 1
+
+    def _comment_end(self, i):
+        """End index (exclusive) of the comment at i, or -1 if incomplete."""
+        if self.buf.startswith("/*", i):
+            k = self.buf.find("*/", i + 2)
+            if k != -1:
+                return k + 2
+        else:
+            k = self.buf.find("\n", i)
+            if k != -1:
+                return k + 1
+        return len(self.buf) if self.eof else -1
+
+    def _comment_at(self, i):
+        """True if a comment starts at i, False if not, None if more input is needed.
+
+        '--' needs a following whitespace/control character; /*! ... */ and
+        /*+ ... */ are executed by the server, so they count as code.
+        """
+        ch = self.buf[i]
+        if ch == "#":
+            return True
+        if ch not in "-/":
+            return False
+        if i + 2 >= len(self.buf) and not self.eof:
+            return None
+        pair = self.buf[i:i + 2]
+        nxt = self.buf[i + 2:i + 3]
+        if pair == "--":
+            return not nxt or nxt <= " "
+        if pair == "/*":
+            return nxt not in ("!", "+")
+        return False
+
+    def __iter__(self):
+        self._fill()
+        while self.buf or not self.eof:
+            stmt = self._next_statement()
+            if stmt is not None:
+                yield stmt
+
+    def _next_statement(self):
+        i = 0             # scan position in buf
+        lead = None       # first non-blank character (may be a comment)
+        start = None      # first significant (non-comment) character
+        comments = []     # comment spans inside the statement
+        compound = None   # BEGIN/END depth when inside a stored program body
+        while True:
+            if i >= len(self.buf):
+                if self._fill():
+                    continue
+                stmt = self._build(lead, start, len(self.buf), comments) if start is not None else None
+                self._consume(len(self.buf))
+                return stmt
+
+            if start is None:
+                if self.buf[i].isspace():
+                    i += 1
+                    continue
+                directive = self._match_directive(i)
+                if directive == -1:
+                    continue
+                if directive:
+                    self._consume(directive)
+                    i, lead, comments = 0, None, []
+                    continue
+                kind = self._comment_at(i)
+                if kind is None:
+                    self._fill()
+                    continue
+                if kind:
+                    end = self._comment_end(i)
+                    if end == -1:
+                        self._fill()
+                        continue
+                    lead = i if lead is None else lead
+                    comments.append((i, end))
+                    i = end
+                    continue
+                start = i
+                lead = i if lead is None else lead
+                if self.delimiter == ";":
+                    while len(self.buf) - start < 256 and self._fill():
+                        pass
+                    if COMPOUND_HEAD.match(self.buf, start):
+                        compound = 0
+
+            delim_at = self.buf.find(self.delimiter, i)
+            special = SPECIAL.search(self.buf, i)
+            special_at = special.start() if special else -1
+
+            if special_at != -1 and (delim_at == -1 or special_at < delim_at):
+                if compound is not None:
+                    compound += self._block_depth(self.buf[i:special_at])
+                i = special_at
+                if self.buf[i] in "'\"`":
+                    end, is_comment = self._quoted_end(i), False
+                else:
+                    kind = self._comment_at(i)
+                    if kind is None:
+                        self._fill()
+                        continue
+                    if not kind and not self.buf.startswith("/*", i):
+                        i += 1
+                        continue
+                    end, is_comment = self._comment_end(i), kind
+                if end == -1:
+                    self._fill()
+                    continue
+                if is_comment:
+                    comments.append((i, end))
+                i = end
+                continue
+
+            if delim_at == -1:
+                # No complete token or delimiter in the buffer yet.
+                if self._fill():
+                    continue
+                i = len(self.buf)
+                continue
+
+            if compound is not None:
+                compound += self._block_depth(self.buf[i:delim_at])
+                if compound > 0:
+                    # A ';' inside BEGIN ... END belongs to the program body.
+                    i = delim_at + len(self.delimiter)
+                    continue
+            stmt = self._build(lead, start, delim_at, comments)
+            self._consume(delim_at + len(self.delimiter))
+            return stmt
+
+    def _match_directive(self, i):
+        """Handles a DELIMITER line at i: returns its end, 0 if none, -1 if more input was read."""
+        head = self.buf[i:i + 10]
+        if not "DELIMITER".startswith(head[:9].upper()):
+            return 0
+        if ("\n" not in self.buf[i:]) and not self.eof:
+            return -1 if self._fill() else 0
+        match = DELIMITER_DIRECTIVE.match(self.buf, i)
+        if not match:
+            return 0
+        self.delimiter = match.group(1)
+        return match.end()
+
+    @staticmethod
+    def _block_depth(code):
+        depth = 0
+        for closes, opens in BLOCK_WORD.findall(code):
+            # END IF/LOOP/... close blocks that were never counted; END and
+            # END CASE close a BEGIN or a CASE.
+            if opens:
+                depth += 1
+            elif not closes or closes.upper() == "CASE":
+                depth -= 1
+        return depth
+
+    def _build(self, lead, start, end, comments):
+        if self.strip_comments:
+            pieces = []
+            pos = start
+            for c_start, c_end in comments:
+                if c_start < start:
+                    continue
+                pieces.append(self.buf[pos:c_start])
+                pieces.append(" ")
+                pos = c_end
+            pieces.append(self.buf[pos:end])
+            text = re.sub(r"[ \t]*\n\s*", "\n", "".join(pieces))
+        else:
+            text = self.buf[lead:end]
+        text = text.strip()
+        if not text:
+            return None
+        first = self.line + self.buf.count("\n", 0, start)
+        last = first + self.buf.count("\n", start, end)
+        return Statement(text, first, last)
+
+
+def iter_statements(source, chunk_size=CHUNK_SIZE, strip_comments=False):
+    """Yields Statement objects from a path or a text file object."""
+    if hasattr(source, "read"):
+        yield from SqlSplitter(source, chunk_size, strip_comments)
+        return
+    with open(source, "r", encoding="utf-8", errors="replace") as f:
+        yield from SqlSplitter(f, chunk_size, strip_comments)
+
+
+def escape_statement(text):
+    """Escapes a statement onto a single line (backslash, newline, tab)."""
+    return text.replace("\\", "\\\\").replace("\n", "\\n").replace("\t", "\\t")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split a SQL file into statements, one escaped statement per line.")
+    parser.add_argument("file", help="SQL file to split ('-' for stdin)")
+    parser.add_argument("--keep-comments", action="store_true", help="Keep comments inside statements")
+    parser.add_argument("--count", action="store_true", help="Only print the number of statements")
+    parser.add_argument("--with-lines", action="store_true", help="Prefix each statement with its source line number and a tab")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.file == "-" else args.file
+    count = 0
+    for stmt in iter_statements(source, strip_comments=not args.keep_comments):
+        count += 1
+        if args.count:
+            continue
+        prefix = f"{stmt.line}\t" if args.with_lines else ""
+        sys.stdout.write(f"{prefix}{escape_statement(stmt.text)}\n")
+    if args.count:
+        print(count)
+
+
+if __name__ == "__main__":
+    main()
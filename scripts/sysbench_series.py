@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Time series and latency distributions from sysbench output.
+
+``--report-interval=N`` prints one line per interval (throughput, one latency
+percentile, errors) and ``--histogram=on`` appends the full latency
+distribution to the final report. This module turns them into:
+
+- per-interval samples, with the warmup detected by MSER-5 (the marginal
+  standard error rule: average the series in batches of 5 and drop the
+  leading batches that minimize the standard error of the remaining mean,
+  searching the first half only). Ramp-up, cold buffer pool and connection
+  setup all show as a transient this rule trims without a fixed guess;
+- steady-state statistics over the rest: mean QPS, jitter (coefficient of
+  variation of the per-interval QPS), latency spread and stalls (intervals
+  below half the steady median QPS, typically checkpoint flushes or purge
+  lag, which a run average hides);
+- a ``LatencyHistogram`` from the ``--histogram`` table, for p50/p99/p99.9.
+"""
+import re
+from typing import List, Optional
+
+from latency_histogram import LatencyHistogram
+
+INTERVAL = re.compile(r"\[\s*(\d+)s\s*\]\s+thds:\s*(\d+)\s+tps:\s*([\d.]+)\s+qps:\s*([\d.]+).*?"
+                      r"lat \(ms,\d+%\):\s*([\d.]+)\s+err/s:\s*([\d.]+)")
+HISTOGRAM_HEADER = re.compile(r"Latency histogram \(values are in milliseconds\)")
+HISTOGRAM_ROW = re.compile(r"^\s*(\d+(?:\.\d+)?)\s+\|\**\s+(\d+)\s*$", re.M)
+MSER_BATCH = 5
+STALL_FRACTION = 0.5
+
+
+def parse_intervals(content) -> List[dict]:
+    """One sample per ``--report-interval`` line: t (s), threads, tps, qps, pct latency (ms), err/s."""
+    return [{"t": int(m.group(1)), "threads": int(m.group(2)), "tps": float(m.group(3)),
+             "qps": float(m.group(4)), "p95": float(m.group(5)), "err": float(m.group(6))}
+            for m in INTERVAL.finditer(content)]
+
+
+def parse_histogram(content) -> Optional[LatencyHistogram]:
+    """The ``--histogram`` table of a final report, or None when the run has none."""
+    header = HISTOGRAM_HEADER.search(content)
+    if not header:
+        return None
+    hist = LatencyHistogram()
+    for m in HISTOGRAM_ROW.finditer(content, header.end()):
+        hist.record(round(float(m.group(1)) * 1000), int(m.group(2)))
+    return hist if hist.total else None
+
+
+def mser_truncation(values, batch=MSER_BATCH):
+    """Number of leading samples to drop as warmup (MSER-5)."""
+    means = [sum(values[i:i + batch]) / batch for i in range(0, len(values) - batch + 1, batch)]
+    if len(means) < 4:
+        return 0
+    best, best_d = float("inf"), 0
+    for d in range(len(means) // 2 + 1):
+        rest = means[d:]
+        mean = sum(rest) / len(rest)
+        stat = sum((x - mean) ** 2 for x in rest) / len(rest) ** 2
+        if stat < best:
+            best, best_d = stat, d
+    return best_d * batch
+
+
+def _median(values):
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    return ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+
+
+def steady_state(samples):
+    """Warmup, steady mean, jitter and stalls of an interval series (None without samples)."""
+    if not samples:
+        return None
+    cut = mser_truncation([s["qps"] for s in samples])
+    steady = samples[cut:]
+    qps = [s["qps"] for s in steady]
+    mean = sum(qps) / len(qps)
+    std = (sum((x - mean) ** 2 for x in qps) / (len(qps) - 1)) ** 0.5 if len(qps) > 1 else 0.0
+    median = _median(qps)
+    stalls = []
+    for s in steady:
+        if s["qps"] < median * STALL_FRACTION:
+            if stalls and stalls[-1]["end"] == s["t"] - 1:
+                stalls[-1]["end"] = s["t"]
+                stalls[-1]["min_qps"] = min(stalls[-1]["min_qps"], s["qps"])
+            else:
+                stalls.append({"start": s["t"], "end": s["t"], "min_qps": s["qps"]})
+    p95 = [s["p95"] for s in steady]
+    return {
+        "warmup": samples[cut - 1]["t"] if cut else 0,
+        "seconds": samples[-1]["t"],
+        "intervals": len(steady),
+        "qps": mean,
+        "tps": sum(s["tps"] for s in steady) / len(steady),
+        "qps_min": min(qps),
+        "qps_max": max(qps),
+        "jitter": std / mean if mean else 0.0,
+        "p95_median": _median(p95),
+        "p95_max": max(p95),
+        "errors": sum(s["err"] for s in steady) / len(steady),
+        "stalls": stalls,
+    }
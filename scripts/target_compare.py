@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Side-by-side comparison of the same statements on several servers.
+
+Targets are given as ``NAME:key=value,key=value`` where the keys override
+the analyzer's connection options (container, host, port, user, password,
+socket, db, backend), e.g.::
+
+    --target 10.11:container=mariadb1011 --target 11.4:host=10.0.0.5,port=3307
+
+The first target is the reference: every other target gets a per-query
+latency ratio (median / reference median), a plan difference flag and an
+aggregate speedup (geometric mean of the ratios and total time ratio).
+"""
+import argparse
+import math
+import os
+
+from baseline_store import plan_signature
+
+TARGET_KEYS = {
+    "container": str,
+    "host": str,
+    "port": int,
+    "user": str,
+    "password": str,
+    "socket": str,
+    "db": str,
+    "backend": str,
+}
+
+
+def parse_target(spec, args):
+    """Returns (name, args copy) for one --target specification; raises ValueError."""
+    name, _, options = spec.partition(":")
+    if not name:
+        raise ValueError(f"Target '{spec}' has no name")
+    target = argparse.Namespace(**vars(args))
+    for option in filter(None, options.split(",")):
+        key, sep, value = option.partition("=")
+        if not sep or key not in TARGET_KEYS:
+            raise ValueError(f"Target '{name}': unknown option '{option}' (expected {', '.join(TARGET_KEYS)})")
+        setattr(target, key, TARGET_KEYS[key](value))
+    # Per-target report, schema catalog and analysis cache directories: two
+    # servers with the same version and settings still time differently.
+    target.report_dir = os.path.join(args.report_dir, name)
+    target.schema_cache_dir = os.path.join(args.schema_cache_dir, name)
+    target.analysis_cache_dir = os.path.join(args.analysis_cache_dir, name)
+    return name, target
+
+
+def geometric_mean(values):
+    values = [v for v in values if v > 0]
+    if not values:
+        return None
+    return math.exp(sum(math.log(v) for v in values) / len(values))
+
+
+def compare_targets(names, results, threshold=0.1):
+    """Builds the per-query rows and per-target aggregates.
+
+    ``results`` maps a target name to its list of analyzed items (or None
+    when the target failed). Returns (rows, aggregates).
+    """
+    reference = names[0]
+    ref_items = results[reference] or []
+    rows = []
+    for index, ref in enumerate(ref_items):
+        _, ref_plan = plan_signature(ref)
+        row = {"id": ref['id'], "query": ref['query'], "targets": {}}
+        for name in names:
+            items = results[name]
+            if not items:
+                continue
+            item = items[index]
+            _, plan = plan_signature(item)
+            ratio = item['time'] / ref['time'] if ref['time'] > 0 else None
+            row["targets"][name] = {
+                "median": item['time'],
+                "p95": item['timing']['p95'],
+                "rating": item['rating'],
+                "ratio": ratio,
+                "plan": plan,
+                "plan_differs": name != reference and plan != ref_plan,
+                "status": status(ratio, threshold) if name != reference else "reference",
+            }
+        rows.append(row)
+
+    aggregates = {}
+    for name in names:
+        if not results[name]:
+            aggregates[name] = None
+            continue
+        ratios = [row["targets"][name]["ratio"] for row in rows if row["targets"].get(name, {}).get("ratio")]
+        total = sum(row["targets"][name]["median"] for row in rows if name in row["targets"])
+        ref_total = sum(row["targets"][reference]["median"] for row in rows if reference in row["targets"])
+        aggregates[name] = {
+            "geomean_ratio": geometric_mean(ratios),
+            "total_time": total,
+            "total_ratio": total / ref_total if ref_total > 0 else None,
+            "faster": sum(1 for row in rows if row["targets"].get(name, {}).get("status") == "faster"),
+            "slower": sum(1 for row in rows if row["targets"].get(name, {}).get("status") == "slower"),
+            "plan_changes": sum(1 for row in rows if row["targets"].get(name, {}).get("plan_differs")),
+        }
+    return rows, aggregates
+
+
+def status(ratio, threshold):
+    if ratio is None:
+        return "n/a"
+    if ratio > 1 + threshold:
+        return "slower"
+    if ratio < 1 - threshold:
+        return "faster"
+    return "same"
+
+
+def speedup_label(ratio):
+    """'1.8x faster' / '1.3x slower' for a median ratio."""
+    if not ratio:
+        return "n/a"
+    if ratio <= 1:
+        return f"{1 / ratio:.2f}x faster"
+    return f"{ratio:.2f}x slower"
+
+
+def generate_markdown(names, versions, rows, aggregates, timestamp):
+    lines = ["# SQL Target Comparison\n", f"Generated: {timestamp}\n", f"Reference: **{names[0]}**\n",
+             "| Target | Version | Geomean Ratio | Total (s) | Total Ratio | Faster | Slower | Plan Changes |",
+             "|---|---|---|---|---|---|---|---|"]
+    for name in names:
+        agg = aggregates[name]
+        if agg is None:
+            lines.append(f"| {name} | unreachable | n/a | n/a | n/a | n/a | n/a | n/a |")
+            continue
+        geo = "n/a" if agg['geomean_ratio'] is None else f"{agg['geomean_ratio']:.3f} ({speedup_label(agg['geomean_ratio'])})"
+        total_ratio = "n/a" if agg['total_ratio'] is None else f"{agg['total_ratio']:.3f}"
+        lines.append(f"| {name} | {versions.get(name) or 'n/a'} | {geo} | {agg['total_time']:.4f} | {total_ratio} | {agg['faster']} | {agg['slower']} | {agg['plan_changes']} |")
+
+    lines.append("\n## Per Query\n")
+    lines.append("| ID | " + " | ".join(f"{name} median (s)" for name in names) + " | " +
+                 " | ".join(f"{name} ratio" for name in names[1:]) + " | Plan |")
+    lines.append("|" + "---|" * (2 + len(names) + len(names[1:])))
+    for row in rows:
+        medians = [f"{row['targets'][n]['median']:.4f}" if n in row['targets'] else "n/a" for n in names]
+        ratios = []
+        for n in names[1:]:
+            cell = row['targets'].get(n)
+            ratios.append("n/a" if not cell or cell['ratio'] is None else f"{cell['ratio']:.2f}{' ⚠️' if cell['status'] == 'slower' else ''}")
+        changed = [n for n in names[1:] if row['targets'].get(n, {}).get('plan_differs')]
+        plan = f"differs on {', '.join(changed)}" if changed else "same"
+        lines.append(f"| {row['id']} | " + " | ".join(medians) + " | " + " | ".join(ratios) + f" | {plan} |")
+    return "\n".join(lines)
+
+
+def _ratio_badge(cell):
+    if cell['status'] == "reference":
+        return ""
+    colors = {"slower": "bg-red-50 text-red-600", "faster": "bg-emerald-50 text-emerald-600"}.get(cell['status'], "bg-slate-100 text-slate-500")
+    label = "n/a" if cell['ratio'] is None else f"×{cell['ratio']:.2f}"
+    return f"<span class='ml-1 px-1.5 py-0.5 rounded text-[10px] font-bold {colors}'>{label}</span>"
+
+
+def _plan_badge(cell, reference_plan):
+    if not cell['plan_differs']:
+        return ""
+    title = f"reference: {reference_plan} | this target: {cell['plan']}".replace("'", "&#39;")
+    return f"<div class='mt-1'><span class='px-1.5 py-0.5 rounded text-[10px] font-bold bg-amber-50 text-amber-600' title='{title}'>PLAN DIFFERS</span></div>"
+
+
+def generate_html(names, versions, rows, aggregates, timestamp, db):
+    """Standalone Tailwind report, same look as the single-target dashboard."""
+    cards = ""
+    for name in names:
+        agg = aggregates[name]
+        if agg is None:
+            body = "<p class='text-red-600 font-bold'>unreachable</p>"
+        else:
+            headline = "reference" if name == names[0] else speedup_label(agg['geomean_ratio'])
+            body = (f"<p class='text-2xl font-extrabold text-slate-900'>{headline}</p>"
+                    f"<p class='text-xs text-slate-500 mt-1'>total {agg['total_time']:.4f}s · {agg['faster']} faster · "
+                    f"{agg['slower']} slower · {agg['plan_changes']} plan changes</p>")
+        cards += (f"<div class='bg-white rounded-2xl shadow-sm border border-slate-100 p-5'>"
+                  f"<p class='text-[11px] font-bold text-slate-400 uppercase tracking-widest'>{name}</p>"
+                  f"<p class='text-xs text-indigo-600 font-mono mb-2'>{versions.get(name) or ''}</p>{body}</div>")
+
+    header = "".join(f"<th class='p-5 sortable' data-sort='float'>{name}</th>" for name in names)
+    body_rows = ""
+    for row in rows:
+        reference_plan = row['targets'].get(names[0], {}).get('plan', "")
+        cells = ""
+        for name in names:
+            cell = row['targets'].get(name)
+            if cell is None:
+                cells += "<td class='p-4 text-slate-400' data-value=''>n/a</td>"
+                continue
+            sort_value = cell['ratio'] if cell['ratio'] is not None else ""
+            cells += (f"<td class='p-4 font-mono text-sm' data-value='{sort_value}'>{cell['median']:.4f}s{_ratio_badge(cell)}"
+                      f"<div class='text-[10px] text-slate-400'>p95 {cell['p95']:.4f} · {'⭐' * cell['rating']}</div>"
+                      f"{_plan_badge(cell, reference_plan)}</td>")
+        body_rows += (f"<tr class='border-b border-gray-100 hover:bg-indigo-50/30'>"
+                      f"<td class='p-4 text-center font-mono text-gray-500 text-sm' data-value='{row['id']}'>{row['id']}</td>{cells}"
+                      f"<td class='p-4'><code class='block font-mono text-[11px] text-gray-600 bg-gray-50 p-2 rounded border border-gray-200 truncate max-w-sm' title=\"{row['query']}\">{row['query']}</code></td></tr>")
+
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>SQL Target Comparison - {db}</title>
+    <script src="https://cdn.tailwindcss.com"></script>
+    <style>
+        th.sortable {{ cursor: pointer; }}
+        th.sortable:hover {{ background-color: #f3f4f6; }}
+    </style>
+</head>
+<body class="bg-[#f8fafc] text-slate-900 min-h-screen pb-20">
+    <div class="max-w-7xl mx-auto pt-10 px-6">
+        <header class="mb-8">
+            <h1 class="text-4xl font-extrabold tracking-tight">SQL Target Comparison</h1>
+            <p class="text-slate-500 font-medium mt-2">Database: <span class="text-indigo-600 font-bold">{db}</span> · reference: <span class="font-bold">{names[0]}</span> · ratios are median / reference median</p>
+        </header>
+        <div class="grid grid-cols-1 md:grid-cols-{min(len(names), 4)} gap-4 mb-8">{cards}</div>
+        <div class="bg-white rounded-[2rem] shadow-xl border border-slate-100 overflow-hidden">
+            <div class="overflow-x-auto">
+                <table class="w-full text-left border-collapse" id="cmpTable">
+                    <thead>
+                        <tr class="bg-slate-50 border-b border-slate-100 text-slate-600 uppercase text-[11px] font-bold tracking-wider">
+                            <th class="p-5 text-center sortable" data-sort="int">ID</th>{header}<th class="p-5">SQL Query</th>
+                        </tr>
+                    </thead>
+                    <tbody>{body_rows}</tbody>
+                </table>
+            </div>
+        </div>
+        <footer class="mt-8 text-slate-400 text-xs px-2">Generated on {timestamp}</footer>
+    </div>
+    <script>
+        document.querySelectorAll('th.sortable').forEach((th, idx) => th.addEventListener('click', () => {{
+            const tbody = th.closest('table').querySelector('tbody');
+            const asc = th.dataset.asc !== 'true';
+            th.dataset.asc = asc;
+            const value = tr => tr.children[idx].getAttribute('data-value');
+            const rows = Array.from(tbody.querySelectorAll('tr'))
+                .sort((a, b) => (parseFloat(value(a)) || 0) - (parseFloat(value(b)) || 0));
+            (asc ? rows : rows.reverse()).forEach(tr => tbody.appendChild(tr));
+        }}));
+    </script>
+</body>
+</html>
+"""
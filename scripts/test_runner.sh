@@ -2,11 +2,16 @@
 set -euo pipefail
 
 # Configuration
-CONTAINER_NAME="mariadb-11-8"
+CONTAINER_NAME="${CONTAINER_NAME:-mariadb-11-8}"
 DB_USER="root"
 DB_PASS="root"
 DB_NAME="employees"
+ANALYZE_JOBS="${ANALYZE_JOBS:-4}"
 SCRIPTS_DIR="$(dirname "$0")"
+# Statements run by analyze, bench and perf-threads; a template file
+# (-- @param declarations) is rendered with values drawn per round.
+QUERY_FILE="${QUERY_FILE:-employees/req_employees.sql}"
+TEMPLATE_ROUNDS="${TEMPLATE_ROUNDS:-500}"
 
 # Colors
 BLUE='\033[0;34m'
@@ -22,11 +27,41 @@ function show_help {
     echo "  verify    Verify data integrity (count and checksum)"
     echo "  analyze   Run performance analysis and EXPLAIN reports"
     echo "  bench     Run sysbench performance test"
-    echo "  perf-threads Run sysbench scaling test (1 to 64 threads)"
+    echo "  perf-threads Run adaptive sysbench scaling test (1 to 64 threads, refined around the knee)"
     echo "  all       Run all tests"
     echo "  help      Show this help message"
 }
 
+# True when the query file declares template parameters (-- @param).
+function is_template {
+    grep -qE '^[[:space:]]*--[[:space:]]*@param[[:space:]]' "$1"
+}
+
+# Splits the query file with sql_splitter.py (quotes, comments, DELIMITER and
+# routine bodies aware) and copies the statements next to the Lua script.
+# Template files are rendered by query_templates.py instead, the given number
+# of rounds. Prints the number of statements.
+function prepare_statements {
+    local query_file="$1"
+    local rounds="${2:-$TEMPLATE_ROUNDS}"
+    local stmt_file
+    stmt_file=$(mktemp)
+    local split_cmd=(python3 "$SCRIPTS_DIR/sql_splitter.py" "$query_file")
+    if is_template "$query_file"; then
+        split_cmd=(python3 "$SCRIPTS_DIR/query_templates.py" "$query_file"
+            --rounds "$rounds" --container "$CONTAINER_NAME"
+            --user "$DB_USER" --password "$DB_PASS" --db "$DB_NAME")
+    fi
+    if ! "${split_cmd[@]}" > "$stmt_file"; then
+        rm -f "$stmt_file"
+        echo -e "${RED}❌ Error: Could not split $query_file into statements.${NC}" >&2
+        return 1
+    fi
+    docker cp "$stmt_file" "$CONTAINER_NAME:/tmp/req_employees.stmts" >&2
+    wc -l < "$stmt_file" | tr -d ' '
+    rm -f "$stmt_file"
+}
+
 function run_verify {
     echo -e "${BLUE}=== Data Integrity Verification ===${NC}"
     bash "$SCRIPTS_DIR/verify_data.sh" "$CONTAINER_NAME" "$DB_USER" "$DB_PASS" "$DB_NAME"
@@ -40,34 +75,54 @@ function run_analyze {
         --user "$DB_USER" \
         --password "$DB_PASS" \
         --db "$DB_NAME" \
-        --query-file "employees/req_employees.sql"
+        --jobs "$ANALYZE_JOBS" \
+        --query-file "$QUERY_FILE"
     return $?
 }
 
 function run_bench {
     echo -e "${BLUE}=== Sysbench Performance Test ===${NC}"
-    local query_file="employees/req_employees.sql"
+    local query_file="$QUERY_FILE"
     
     # Check for the requested file or its variant
-    if [ ! -f "$query_file" ]; then
+    if [ ! -f "$query_file" ] && [ "$query_file" = "employees/req_employees.sql" ]; then
         query_file="employees/rerq_employees.sql"
     fi
 
     if [ ! -f "$query_file" ]; then
-        echo -e "${RED}❌ Error: Query file (req_employees.sql or rerq_employees.sql) not found in employees/.${NC}"
+        echo -e "${RED}❌ Error: Query file $query_file (or rerq_employees.sql) not found.${NC}"
         return 1
     fi
 
-    # Count number of queries (semicolon count)
-    local query_count=$(grep -c ";" "$query_file")
-    local total_events=$((query_count * 10))
-
     if [ -f "$SCRIPTS_DIR/employees_sysbench.lua" ]; then
         echo -e "${YELLOW}📦 Copying scripts and queries to container...${NC}"
         docker cp "$SCRIPTS_DIR/employees_sysbench.lua" "$CONTAINER_NAME:/tmp/employees_sysbench.lua"
         docker cp "$query_file" "$CONTAINER_NAME:/tmp/req_employees.sql"
+
+        # Count number of statements; templates are rendered 10 times and
+        # run once, with fresh values every round.
+        local query_count
+        if is_template "$query_file"; then
+            query_count=$(prepare_statements "$query_file" 10)
+            query_count=$((query_count / 10))
+        else
+            query_count=$(prepare_statements "$query_file")
+        fi
+        local total_events=$((query_count * 10))
         
+        # Host and server resources are sampled while sysbench runs and
+        # stored next to its output.
+        mkdir -p reports/bench
+        python3 "$SCRIPTS_DIR/resource_sampler.py" \
+            --container "$CONTAINER_NAME" \
+            --user "$DB_USER" \
+            --password "$DB_PASS" \
+            --db "$DB_NAME" \
+            --out "reports/bench/resources_1_threads.json" &
+        local sampler_pid=$!
+
         echo -e "${YELLOW}⚡ Running $query_count queries 10 times ($total_events events total)...${NC}"
+        local status=0
         docker exec -i "$CONTAINER_NAME" sysbench \
             --mysql-host=127.0.0.1 \
             --mysql-user="$DB_USER" \
@@ -76,7 +131,23 @@ function run_bench {
             --threads=1 \
             --events="$total_events" \
             --time=0 \
-            /tmp/employees_sysbench.lua run
+            --report-interval=1 \
+            --histogram=on \
+            /tmp/employees_sysbench.lua run | tee "reports/bench/results_1_threads.txt" || status=$?
+
+        kill -TERM "$sampler_pid" 2>/dev/null || true
+        wait "$sampler_pid" || true
+        if [ "$status" -eq 0 ]; then
+            python3 "$SCRIPTS_DIR/bench_store.py" \
+                --ingest "reports/bench" \
+                --container "$CONTAINER_NAME" \
+                --user "$DB_USER" \
+                --password "$DB_PASS" \
+                --db "$DB_NAME" \
+                ${RUN_LABEL:+--label "$RUN_LABEL"} \
+                ${BENCH_VARIABLES:+--variables "$BENCH_VARIABLES"}
+        fi
+        return $status
     else
         echo -e "${RED}❌ Error: scripts/employees_sysbench.lua not found.${NC}"
         return 1
@@ -87,8 +158,8 @@ function run_perf_threads {
     echo -e "${BLUE}=== Threaded Performance Test (Scale) ===${NC}"
     mkdir -p reports/perf_threads
     
-    local query_file="employees/req_employees.sql"
-    if [ ! -f "$query_file" ]; then
+    local query_file="$QUERY_FILE"
+    if [ ! -f "$query_file" ] && [ "$query_file" = "employees/req_employees.sql" ]; then
         query_file="employees/rerq_employees.sql"
     fi
 
@@ -97,34 +168,37 @@ function run_perf_threads {
         return 1
     fi
 
-    local query_count=$(grep -c ";" "$query_file")
-    local total_events=$((query_count * 10))
-
     docker cp "$SCRIPTS_DIR/employees_sysbench.lua" "$CONTAINER_NAME:/tmp/employees_sysbench.lua"
     docker cp "$query_file" "$CONTAINER_NAME:/tmp/req_employees.sql"
+    prepare_statements "$query_file" > /dev/null
 
-    for t in 1 2 4 8 16 32 64; do
-        echo -e "${YELLOW}⚡ Testing with $t threads...${NC}"
-        docker exec -i "$CONTAINER_NAME" sysbench \
-            --mysql-host=127.0.0.1 \
-            --mysql-user="$DB_USER" \
-            --mysql-password="$DB_PASS" \
-            --mysql-db="$DB_NAME" \
-            --threads="$t" \
-            --events=0 \
-            --time=60 \
-            /tmp/employees_sysbench.lua run > "reports/perf_threads/results_${t}_threads.txt"
-        
-        local tps=$(grep "queries:" "reports/perf_threads/results_${t}_threads.txt" | awk '{print $3}' | tr -d '(')
-        local lat=$(grep "avg:" "reports/perf_threads/results_${t}_threads.txt" | head -n 1 | awk '{print $2}')
-        echo -e "${GREEN}✅ Finished $t threads: $tps QPS, $lat ms avg latency${NC}"
-    done
+    # Adaptive sweep: each level stops once its QPS is stable, the doubling
+    # grid stops once QPS falls and is refined around the saturation knee.
+    # SWEEP_ARGS=--full-runs keeps every level to the end for its histogram.
+    python3 "$SCRIPTS_DIR/thread_sweep.py" \
+        --container "$CONTAINER_NAME" \
+        --user "$DB_USER" \
+        --password "$DB_PASS" \
+        --db "$DB_NAME" \
+        --out-dir "reports/perf_threads" \
+        ${SWEEP_ARGS:-}
 
     echo -e "${YELLOW}📊 Generating reports...${NC}"
     python3 "$SCRIPTS_DIR/perf_threads_reporter.py" \
         --dir "reports/perf_threads" \
         --md "reports/perf_threads/scaling_report.md" \
-        --html "reports/perf_threads/scaling_report.html"
+        --html "reports/perf_threads/scaling_report.html" \
+        --source sysbench
+
+    # Keep the run for cross-run comparison (make compare).
+    python3 "$SCRIPTS_DIR/bench_store.py" \
+        --ingest "reports/perf_threads" \
+        --container "$CONTAINER_NAME" \
+        --user "$DB_USER" \
+        --password "$DB_PASS" \
+        --db "$DB_NAME" \
+        ${RUN_LABEL:+--label "$RUN_LABEL"} \
+        ${BENCH_VARIABLES:+--variables "$BENCH_VARIABLES"}
     
     echo -e "${GREEN}✅ Scaling reports generated in reports/perf_threads/${NC}"
 }
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""Adaptive sysbench thread-scaling sweep.
+
+Drives ``make perf-threads`` (formerly a fixed 1..64 threads x 60 s loop):
+
+- every level runs sysbench with ``--report-interval=1`` and is stopped as
+  soon as its throughput is stable: after ``--warmup`` seconds, the 1 s QPS
+  samples are grouped in ``--batch`` second batches (batch means absorb the
+  autocorrelation of consecutive samples) and the level ends once the 95%
+  confidence interval of the mean is within ``--ci`` of it, or after
+  ``--max-time`` seconds;
+- levels double from ``--min-threads`` to ``--max-threads``, and the coarse
+  pass stops early once QPS is clearly falling (its confidence interval lies
+  entirely ``--drop`` below the best level);
+- the knee is the last level before QPS stops rising (marginal gain under
+  ``--min-efficiency`` of linear scaling) or p95 latency jumps (more than
+  ``--p95-jump`` per doubling of threads); the grid is then bisected
+  (geometric midpoints) around it for up to ``--refine`` extra levels, until
+  the two levels are less than ``--resolution`` apart.
+
+The raw sysbench output of every level goes to ``results_<N>_threads.txt``
+(interval lines, then the final summary and ``--histogram`` latency
+distribution unless the level was stopped early; ``--full-runs`` keeps every
+level running to ``--max-time`` to capture them all), the host and server
+resources sampled while it ran to ``resources_<N>_threads.json`` (see
+``resource_sampler.py``) and the levels, their stop reasons and the knee to
+``sweep.json``; all are read by ``perf_threads_reporter.py``.
+"""
+import argparse
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import List
+
+from resource_sampler import ResourceSampler
+from sysbench_series import INTERVAL
+
+MIN_BATCHES = 4
+PID_FILE = "/tmp/thread_sweep_sysbench.pid"
+# Two-sided 95% Student t quantiles by degrees of freedom.
+T95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262,
+       10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086, 30: 2.042, 60: 2.000}
+
+
+def t_quantile(df):
+    """95% two-sided t quantile (conservative: nearest tabulated df below)."""
+    if df >= 120:
+        return 1.96
+    return T95[max(d for d in T95 if d <= max(1, df))]
+
+
+def confidence(values, batch):
+    """(mean, 95% half-width, batches) of a series using non-overlapping batch means."""
+    means = [sum(values[i:i + batch]) / batch for i in range(0, len(values) - batch + 1, batch)]
+    if len(means) < 2:
+        return (sum(values) / len(values) if values else 0.0), float("inf"), len(means)
+    mean = sum(means) / len(means)
+    var = sum((m - mean) ** 2 for m in means) / (len(means) - 1)
+    return mean, t_quantile(len(means) - 1) * math.sqrt(var / len(means)), len(means)
+
+
+@dataclass
+class Level:
+    threads: int
+    phase: str
+    seconds: int = 0
+    measured: int = 0
+    qps: float = 0.0
+    qps_ci: float = 0.0
+    tps: float = 0.0
+    p95: float = 0.0
+    errors: float = 0.0
+    stop: str = ""
+    samples: List[dict] = field(default_factory=list, repr=False)
+
+    def summarize(self, warmup, batch):
+        steady = [s for s in self.samples if s["t"] > warmup] or self.samples
+        self.seconds = self.samples[-1]["t"] if self.samples else 0
+        self.measured = len(steady)
+        if not steady:
+            return
+        self.qps, self.qps_ci, _ = confidence([s["qps"] for s in steady], batch)
+        if math.isinf(self.qps_ci):
+            self.qps_ci = 0.0
+        self.tps = sum(s["tps"] for s in steady) / len(steady)
+        self.p95 = sum(s["p95"] for s in steady) / len(steady)
+        self.errors = sum(s["err"] for s in steady) / len(steady)
+
+    def to_dict(self):
+        data = asdict(self)
+        del data["samples"]
+        return {k: round(v, 3) if isinstance(v, float) else v for k, v in data.items()}
+
+
+class SysbenchRunner:
+    """Starts and stops sysbench, locally or inside the container."""
+
+    def __init__(self, args):
+        self.args = args
+
+    def command(self, threads):
+        a = self.args
+        options = [f"--mysql-user={a.user}", f"--mysql-password={a.password}", f"--mysql-db={a.db}",
+                   f"--threads={threads}", "--events=0", f"--time={a.max_time}", "--report-interval=1",
+                   "--histogram=on", a.lua, "run"]
+        if a.container:
+            # Record the pid so that the run can be stopped inside the container:
+            # killing the docker exec client does not stop sysbench.
+            inner = " ".join(["exec", "sysbench", "--mysql-host=127.0.0.1"] + [f"'{o}'" for o in options])
+            return ["docker", "exec", "-i", a.container, "sh", "-c", f"echo $$ > {PID_FILE}; {inner}"]
+        return ["sysbench", f"--mysql-host={a.host}", f"--mysql-port={a.port}"] + options
+
+    def stop(self, proc):
+        if self.args.container:
+            subprocess.run(["docker", "exec", self.args.container, "sh", "-c", f"kill $(cat {PID_FILE})"],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+def run_level(runner, threads, phase, args):
+    """Runs sysbench at one thread count until its QPS is stable or --max-time is reached."""
+    level = Level(threads, phase)
+    path = os.path.join(args.out_dir, f"results_{threads}_threads.txt")
+    sampler = ResourceSampler(args, args.sample_interval).start() if args.sample_interval > 0 else None
+    try:
+        proc = subprocess.Popen(runner.command(threads), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                text=True, bufsize=1)
+    except OSError as e:
+        if sampler:
+            sampler.stop()
+        print(f"Error: could not start sysbench: {e}")
+        sys.exit(1)
+    tail = []
+    with open(path, "w") as out:
+        for line in proc.stdout:
+            out.write(line)
+            m = INTERVAL.search(line)
+            if not m:
+                tail = (tail + [line.rstrip()])[-5:]
+                continue
+            level.samples.append({"t": int(m.group(1)), "tps": float(m.group(3)), "qps": float(m.group(4)),
+                                  "p95": float(m.group(5)), "err": float(m.group(6))})
+            steady = [s["qps"] for s in level.samples if s["t"] > args.warmup]
+            if args.full_runs or len(steady) < args.min_time:
+                continue
+            mean, half, batches = confidence(steady, args.batch)
+            if batches >= MIN_BATCHES and mean > 0 and half <= args.ci * mean:
+                level.stop = "stable"
+                break
+    if level.stop:
+        runner.stop(proc)
+    else:
+        proc.wait()
+        level.stop = "max-time" if level.samples else "failed"
+    if sampler:
+        with open(os.path.join(args.out_dir, f"resources_{threads}_threads.json"), "w") as f:
+            json.dump(sampler.stop(), f, indent=1)
+    if not level.samples:
+        print(f"Error: sysbench reported no intervals at {threads} threads:")
+        for line in tail:
+            print(f"   {line}")
+        sys.exit(1)
+    level.summarize(args.warmup, args.batch)
+    return level
+
+
+def find_knee(levels, min_efficiency, p95_jump):
+    """(last scaling level, first saturated level, reason), or (None, None, "") if QPS never saturates."""
+    for a, b in zip(levels, levels[1:]):
+        ideal = b.threads / a.threads - 1
+        gain = b.qps / a.qps - 1 if a.qps else 0.0
+        if gain < min_efficiency * ideal:
+            return a, b, f"QPS {gain * 100:+.1f}% from {a.threads} to {b.threads} threads (linear: +{ideal * 100:.0f}%)"
+        threshold = p95_jump ** math.log2(b.threads / a.threads)
+        if a.p95 and b.p95 > a.p95 * threshold:
+            return a, b, f"p95 x{b.p95 / a.p95:.2f} from {a.threads} to {b.threads} threads (limit x{threshold:.2f})"
+    return None, None, ""
+
+
+def clearly_falling(levels, drop):
+    """True when the last level's QPS interval lies entirely ``drop`` below the best level's."""
+    best = max(levels, key=lambda l: l.qps)
+    last = levels[-1]
+    return last is not best and last.qps + last.qps_ci < (best.qps - best.qps_ci) * (1 - drop)
+
+
+def print_level(level):
+    ci = f"±{level.qps_ci / level.qps * 100:.1f}%" if level.qps else "n/a"
+    print(f"   ✅ {level.threads} threads ({level.phase}): {level.qps:.1f} QPS {ci}, p95 {level.p95:.2f} ms, "
+          f"{level.seconds}s ({level.stop})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Adaptive sysbench thread-scaling sweep that stops stable levels early and refines around the knee.")
+    parser.add_argument("--min-threads", type=int, default=1, help="First level of the doubling grid")
+    parser.add_argument("--max-threads", type=int, default=64, help="Last level of the doubling grid")
+    parser.add_argument("--warmup", type=int, default=5, help="Seconds discarded at the start of every level")
+    parser.add_argument("--min-time", type=int, default=20, help="Minimum measured seconds per level")
+    parser.add_argument("--max-time", type=int, default=60, help="Maximum seconds per level (sysbench --time)")
+    parser.add_argument("--batch", type=int, default=5, help="Seconds per batch mean in the confidence interval")
+    parser.add_argument("--ci", type=float, default=0.03, help="Stop a level once the 95%% CI half-width is within this fraction of the mean QPS")
+    parser.add_argument("--min-efficiency", type=float, default=0.25, help="QPS gain, as a fraction of linear scaling, below which a level is saturated")
+    parser.add_argument("--p95-jump", type=float, default=1.5, help="p95 growth per doubling of threads that marks saturation")
+    parser.add_argument("--drop", type=float, default=0.05, help="Stop the coarse pass once QPS is this fraction below the best level")
+    parser.add_argument("--refine", type=int, default=4, help="Maximum extra levels bisecting the knee interval")
+    parser.add_argument("--resolution", type=float, default=0.2, help="Stop refining once the knee interval is narrower than this relative gap")
+    parser.add_argument("--full-runs", action="store_true", help="Run every level for --max-time (no early stop) so that each one ends with its latency histogram")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Seconds between host and server resource samples during each level (0 disables)")
+    parser.add_argument("--lua", default="/tmp/employees_sysbench.lua", help="sysbench script (path inside the container with --container)")
+    parser.add_argument("--out-dir", default="reports/perf_threads", help="Directory of the results_<N>_threads.txt files and sweep.json")
+    parser.add_argument("--container", help="Name of the MariaDB container (sysbench runs inside it)")
+    parser.add_argument("--host", default="127.0.0.1", help="Database host")
+    parser.add_argument("--port", type=int, default=3306, help="Database port")
+    parser.add_argument("--user", default="root", help="Database user")
+    parser.add_argument("--password", default="root", help="Database password")
+    parser.add_argument("--db", default="employees", help="Database name")
+    args = parser.parse_args()
+
+    if not 1 <= args.min_threads <= args.max_threads:
+        print("Error: --min-threads must be between 1 and --max-threads")
+        sys.exit(1)
+    if args.batch < 1 or args.min_time < args.batch * MIN_BATCHES or args.max_time < args.warmup + args.min_time:
+        print(f"Error: need --min-time >= {MIN_BATCHES} x --batch and --max-time >= --warmup + --min-time")
+        sys.exit(1)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    stale = [f for f in os.listdir(args.out_dir) if re.match(r"(results_\d+_threads\.txt|resources_\d+_threads\.json)$", f) or f == "sweep.json"]
+    if stale:
+        print(f"♻️  Removing {len(stale)} result file(s) of a previous sweep from {args.out_dir}")
+        for f in stale:
+            os.remove(os.path.join(args.out_dir, f))
+
+    runner = SysbenchRunner(args)
+    started = time.time()
+    levels = {}
+    grid = []
+    t = args.min_threads
+    while t <= args.max_threads:
+        grid.append(t)
+        t *= 2
+    if grid[-1] != args.max_threads:
+        grid.append(args.max_threads)
+
+    print(f"🔍 Coarse pass over {', '.join(map(str, grid))} threads (CI target ±{args.ci * 100:g}%, {args.min_time}-{args.max_time}s per level)")
+    end_reason = "max-threads"
+    for t in grid:
+        print(f"⚡ {t} threads...")
+        levels[t] = run_level(runner, t, "coarse", args)
+        print_level(levels[t])
+        if clearly_falling(sorted(levels.values(), key=lambda l: l.threads), args.drop):
+            end_reason = "falling"
+            print(f"📉 QPS is clearly falling at {t} threads, skipping the higher levels.")
+            break
+
+    for _ in range(args.refine):
+        a, b, _ = find_knee(sorted(levels.values(), key=lambda l: l.threads), args.min_efficiency, args.p95_jump)
+        if a is None:
+            break
+        mid = round(math.sqrt(a.threads * b.threads))
+        if b.threads / a.threads - 1 < args.resolution or mid in levels or not a.threads < mid < b.threads:
+            break
+        print(f"🔬 Refining between {a.threads} and {b.threads}: {mid} threads...")
+        levels[mid] = run_level(runner, mid, "refine", args)
+        print_level(levels[mid])
+
+    ordered = sorted(levels.values(), key=lambda l: l.threads)
+    a, b, reason = find_knee(ordered, args.min_efficiency, args.p95_jump)
+    wall = time.time() - started
+    doc = {
+        "tool": "thread_sweep",
+        "started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(started)),
+        "wall_seconds": round(wall, 1),
+        "warmup": args.warmup,
+        "ci_target": args.ci,
+        "end": end_reason,
+        "knee": {"threads": a.threads, "saturated_at": b.threads, "reason": reason} if a else None,
+        "best": max(ordered, key=lambda l: l.qps).threads,
+        "levels": [l.to_dict() for l in ordered],
+    }
+    with open(os.path.join(args.out_dir, "sweep.json"), "w") as f:
+        json.dump(doc, f, indent=1)
+
+    measured = sum(l.seconds for l in ordered)
+    fixed = 7 * 60
+    if measured < fixed:
+        print(f"\n📊 {len(ordered)} levels in {measured}s of sysbench time, {fixed - measured}s less than the fixed 1..64 sweep (7 x 60 s)")
+    else:
+        print(f"\n📊 {len(ordered)} levels in {measured}s of sysbench time (the fixed 1..64 sweep ran 7 x 60 s = {fixed} s)")
+    if a:
+        print(f"🎯 Knee at {a.threads} threads: {reason}")
+    else:
+        print(f"🎯 No knee: QPS still scales at {ordered[-1].threads} threads")
+    print(f"✅ Results in {args.out_dir} (sweep.json)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Descriptive statistics for repeated latency measurements."""
+import math
+
+
+def percentile(sorted_samples, pct):
+    """Linear-interpolated percentile (0-100) of an already sorted list."""
+    if not sorted_samples:
+        return 0.0
+    if len(sorted_samples) == 1:
+        return sorted_samples[0]
+    rank = (len(sorted_samples) - 1) * pct / 100.0
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return sorted_samples[low]
+    return sorted_samples[low] + (sorted_samples[high] - sorted_samples[low]) * (rank - low)
+
+
+def summarize(samples, cv_threshold=0.2):
+    """Summarizes timing samples (seconds).
+
+    Returns n, min, median, mean, p95, p99, max, stddev (sample), the
+    coefficient of variation (stddev / mean) and an ``unstable`` flag set when
+    the CV exceeds ``cv_threshold``.
+    """
+    ordered = sorted(samples)
+    n = len(ordered)
+    if n == 0:
+        return {"n": 0, "min": 0.0, "median": 0.0, "mean": 0.0, "p95": 0.0, "p99": 0.0,
+                "max": 0.0, "stddev": 0.0, "cv": 0.0, "unstable": False, "samples": []}
+    mean = sum(ordered) / n
+    stddev = math.sqrt(sum((x - mean) ** 2 for x in ordered) / (n - 1)) if n > 1 else 0.0
+    cv = stddev / mean if mean > 0 else 0.0
+    return {
+        "n": n,
+        "min": ordered[0],
+        "median": percentile(ordered, 50),
+        "mean": mean,
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1],
+        "stddev": stddev,
+        "cv": cv,
+        "unstable": n > 1 and cv > cv_threshold,
+        "samples": list(samples),
+    }
+
+
+def format_distribution(stats):
+    """One-line human readable rendering of a summarize() result."""
+    return (f"median {stats['median']:.4f}s | min {stats['min']:.4f}s | mean {stats['mean']:.4f}s | "
+            f"p95 {stats['p95']:.4f}s | p99 {stats['p99']:.4f}s | stddev {stats['stddev']:.4f}s | "
+            f"CV {stats['cv'] * 100:.1f}% (n={stats['n']})")
+
+
+def summarize_stream(first_rows, last_rows, rows, nbytes):
+    """Summarizes streamed executions (see DriverSession.stream_query).
+
+    ``first_rows`` and ``last_rows`` are the per-iteration times to first and
+    last row; ``rows`` / ``nbytes`` the result size of one execution. The
+    transfer share is the part of the median spent after the first row.
+    """
+    first = sorted(first_rows)
+    last = sorted(last_rows)
+    ttfr = percentile(first, 50)
+    ttlr = percentile(last, 50)
+    return {
+        "ttfr": ttfr,
+        "ttfr_p95": percentile(first, 95),
+        "ttlr": ttlr,
+        "ttlr_p95": percentile(last, 95),
+        "rows": rows,
+        "bytes": nbytes,
+        "rows_per_sec": rows / ttlr if ttlr > 0 else 0.0,
+        "bytes_per_sec": nbytes / ttlr if ttlr > 0 else 0.0,
+        "transfer_share": (ttlr - ttfr) / ttlr if ttlr > 0 else 0.0,
+        "first_row_samples": list(first_rows),
+    }
+
+
+def format_stream(stream):
+    """One-line human readable rendering of a summarize_stream() result."""
+    return (f"first row {stream['ttfr']:.4f}s (p95 {stream['ttfr_p95']:.4f}s) | last row {stream['ttlr']:.4f}s "
+            f"(p95 {stream['ttlr_p95']:.4f}s) | {stream['rows']:,} rows | {stream['bytes'] / 1e6:.2f} MB | "
+            f"{stream['rows_per_sec']:,.0f} rows/s | {stream['bytes_per_sec'] / 1e6:.2f} MB/s | "
+            f"transfer {stream['transfer_share'] * 100:.1f}%")
+
+
+def mann_whitney_greater(baseline, current):
+    """One-sided Mann-Whitney U test that ``current`` tends to be larger than ``baseline``.
+
+    Returns the p-value. Small samples use the exact U distribution (the
+    typical case: a handful of iterations per run); larger or tied samples
+    use the normal approximation with tie correction.
+    """
+    n1, n2 = len(baseline), len(current)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    pooled = sorted([(v, 0) for v in baseline] + [(v, 1) for v in current])
+    ranks = [0.0] * len(pooled)
+    ties = []
+    i = 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2.0 + 1
+        ties.append(j - i + 1)
+        i = j + 1
+    rank_sum = sum(r for r, (_, group) in zip(ranks, pooled) if group == 1)
+    u = rank_sum - n2 * (n2 + 1) / 2.0
+
+    if n1 + n2 <= 20 and all(t == 1 for t in ties):
+        # counts[k] = number of orderings with U == k, built one sample at a time.
+        counts = _u_distribution(n1, n2)
+        total = sum(counts)
+        return sum(counts[int(math.ceil(u)):]) / total
+
+    mean_u = n1 * n2 / 2.0
+    n = n1 + n2
+    tie_term = sum(t ** 3 - t for t in ties) / (n * (n - 1))
+    var_u = n1 * n2 / 12.0 * ((n + 1) - tie_term)
+    if var_u <= 0:
+        return 1.0
+    z = (u - mean_u - 0.5) / math.sqrt(var_u)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _u_distribution(n1, n2):
+    """Frequencies of U = 0..n1*n2 under the null hypothesis (no ties)."""
+    # table[i][j] is the U frequency list for sample sizes i and j.
+    table = [[None] * (n2 + 1) for _ in range(n1 + 1)]
+    for i in range(n1 + 1):
+        for j in range(n2 + 1):
+            if i == 0 or j == 0:
+                table[i][j] = [1]
+                continue
+            # The largest value belongs to the second sample (adds i to U) or to the first.
+            with_second = [0] * i + table[i][j - 1]
+            with_first = table[i - 1][j]
+            size = i * j + 1
+            table[i][j] = [(with_second[k] if k < len(with_second) else 0) + (with_first[k] if k < len(with_first) else 0)
+                           for k in range(size)]
+    return table[n1][n2]
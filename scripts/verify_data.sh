@@ -6,6 +6,9 @@ CONTAINER_NAME="${1:-mariadb-11-8}"
 DB_USER="${2:-root}"
 DB_PASS="${3:-root}"
 DB_NAME="${4:-employees}"
+# Optional expected values file written by employees_generator.py
+# (table:count:checksum:columns, checksum = SUM(CRC32(CONCAT_WS('#', columns))))
+EXPECTED_FILE="${5:-}"
 
 # Colors
 RED='\033[0;31m'
@@ -32,6 +35,18 @@ EXPECTED=(
     "titles:443308:1842528371"
 )
 
+if [ -n "$EXPECTED_FILE" ]; then
+    if [ ! -f "$EXPECTED_FILE" ]; then
+        echo -e "${RED}❌ Error: expected values file ${EXPECTED_FILE} not found.${NC}"
+        exit 1
+    fi
+    EXPECTED=()
+    while IFS= read -r LINE; do
+        [[ -z "$LINE" || "$LINE" == \#* ]] && continue
+        EXPECTED+=("$LINE")
+    done < "$EXPECTED_FILE"
+fi
+
 function get_expected {
     local table="$1"
     local field="$2"
@@ -42,6 +57,8 @@ function get_expected {
         if [ "$t" == "$table" ]; then
             if [ "$field" == "count" ]; then
                 echo "$count"
+            elif [ "$field" == "columns" ]; then
+                echo "$E" | cut -d':' -f4
             else
                 echo "$crc"
             fi 
@@ -61,13 +78,18 @@ TABLES=$($MYSQL_CMD -e "show full tables from ${DB_NAME} where table_type = 'BAS
 
 for T in $TABLES; do 
     # Use -BN to avoid borders, but be aware it might still include the table name
-    CRC_TEXT=$($MYSQL_CMD -e "checksum table $T" "${DB_NAME}")
+    COLUMNS=$(get_expected "$T" columns)
+    if [ -n "$COLUMNS" ]; then
+        # Generated datasets: engine-independent checksum computable offline
+        CRC=$($MYSQL_CMD -e "select sum(crc32(concat_ws('#', $COLUMNS))) from $T" "${DB_NAME}")
+    else
+        CRC_TEXT=$($MYSQL_CMD -e "checksum table $T" "${DB_NAME}")
+        # Checksum output with -BN is usually "dbname.tablename CRC"
+        # We take the last field to get the CRC
+        CRC=$(echo "$CRC_TEXT" | awk '{print $NF}')
+    fi
     COUNT=$($MYSQL_CMD -e "select count(*) from $T" "${DB_NAME}")
     
-    # Checksum output with -BN is usually "dbname.tablename CRC"
-    # We take the last field to get the CRC
-    CRC=$(echo "$CRC_TEXT" | awk '{print $NF}')
-    
     # Handle NULL or empty values
     if [ "$CRC" == "NULL" ] || [ -z "$CRC" ]; then
         CRC=0